@@ -0,0 +1,147 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark of the requests per second served by the API resources through the Flask test client,
+with a stub proxy client so that only the request handling gets measured.
+
+Compares:
+  - per_request: request parsers and marshmallow schemas built on every request, as resources used to
+  - shared: request parsers and schemas built once per resource class
+
+Usage: python benchmarks/api_requests.py [--requests 2000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+from contextlib import ExitStack
+from typing import (  # noqa: F401
+    Any, Callable, Dict, List, Tuple,
+)
+
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_restful import reqparse
+from mock import patch
+
+import search_service.proxy
+from search_service import create_app
+from search_service.api import (
+    base, batch, dashboard, document, search_all, serialization, table, user,
+)
+from search_service.models.dashboard import Dashboard, SearchDashboardResult
+from search_service.models.table import SearchTableResult, Table
+from search_service.models.user import SearchUserResult
+from search_service.proxy.base import BaseProxy
+
+RESOURCES = [table.SearchTableAPI, user.SearchUserAPI, dashboard.SearchDashboardAPI, base.BaseFilterAPI,
+             batch.SearchBatchAPI, search_all.SearchAllAPI, document.DocumentTablesAPI,
+             document.DocumentTableAPI]  # type: List[Any]
+
+
+def table_result(i: int) -> Table:
+    return Table(id=f'hive://gold.schema/table_{i}', name=f'table_{i}', key=f'hive://gold.schema/table_{i}',
+                 cluster='gold', database='hive', schema='schema', column_names=['column_a', 'column_b'])
+
+
+class StubProxy(BaseProxy):
+    def fetch_table_search_results(self, **kwargs: Any) -> SearchTableResult:
+        return SearchTableResult(total_results=10, results=[table_result(i) for i in range(10)])
+
+    def fetch_user_search_results(self, **kwargs: Any) -> SearchUserResult:
+        return SearchUserResult(total_results=0, results=[])
+
+    def fetch_search_results_with_filter(self, **kwargs: Any) -> SearchTableResult:
+        return self.fetch_table_search_results()
+
+    def fetch_dashboard_search_results(self, **kwargs: Any) -> SearchDashboardResult:
+        return SearchDashboardResult(total_results=1, results=[
+            Dashboard(id='dashboard', uri='mode_dashboard://gold.group/dashboard', cluster='gold', group_name='group',
+                      group_url='https://mode.example.com/group', product='mode', name='dashboard',
+                      url='https://mode.example.com/dashboard')])
+
+    def update_document(self, *, data: List[Dict[str, Any]], index: str = '') -> str:
+        return index
+
+    def create_document(self, *, data: List[Dict[str, Any]], index: str = '') -> str:
+        return index
+
+    def delete_document(self, *, data: List[str], index: str = '') -> str:
+        return index
+
+
+REQUESTS: List[Tuple[str, Callable[[FlaskClient], Any]]] = [
+    ('GET /search', lambda client: client.get('/search', query_string={'query_term': 'table'})),
+    ('GET /search_user', lambda client: client.get('/search_user', query_string={'query_term': 'user'})),
+    ('POST /search_table', lambda client: client.post('/search_table', json={
+        'query_term': 'table', 'search_request': {'type': 'AND', 'filters': {'database': ['hive']}}})),
+    ('POST /search_batch', lambda client: client.post('/search_batch', json={'requests': [
+        {'resource': 'table', 'query_term': 'table'}, {'resource': 'dashboard', 'query_term': 'dashboard'}]})),
+    ('PUT /document_table', lambda client: client.put('/document_table', json={'data': [
+        str({'id': 'table', 'name': 'table', 'key': 'table', 'cluster': 'gold', 'database': 'hive',
+             'schema': 'schema'})]})),
+]
+
+
+class CopiedParser:
+    """
+    Request parser copied on every parse, whether the resource reads it from the class or the instance
+    """
+
+    def __init__(self, parser: reqparse.RequestParser) -> None:
+        self.parser = parser
+
+    def parse_args(self, *args: Any, **kwargs: Any) -> Any:
+        return self.parser.copy().parse_args(*args, **kwargs)
+
+
+def per_request(stack: ExitStack) -> None:
+    """
+    Builds a copy of the request parser on every parse, and a new schema on every use
+    """
+    for resource in RESOURCES:
+        stack.enter_context(patch.object(resource, 'parser', CopiedParser(resource.parser)))
+    for module in (serialization, batch, document):
+        stack.enter_context(patch.object(module, 'get_schema',
+                                         lambda schema_class, many=False: schema_class(many=many)))
+
+
+def measure(app: Flask, send: Callable[[FlaskClient], Any], requests: int, repeat: int) -> float:
+    """
+    :return: best requests per second out of {repeat} runs
+    """
+    client = app.test_client()
+    for _ in range(min(requests, 100)):
+        # warm up
+        send(client)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = send(client)
+        best = min(best, time.perf_counter() - start)
+        assert response.status_code == 200, json.dumps(response.json)
+    return requests / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='number of requests per run')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs, the best one is reported')
+    args = parser.parse_args()
+
+    app = create_app(config_module_class='search_service.config.Config')
+    search_service.proxy._proxy_client = StubProxy()
+
+    print(f'{"request":<20}{"per_request req/s":>20}{"shared req/s":>16}{"speedup":>10}')
+    for name, send in REQUESTS:
+        with ExitStack() as stack:
+            per_request(stack)
+            before = measure(app, send, args.requests, args.repeat)
+        after = measure(app, send, args.requests, args.repeat)
+        print(f'{name:<20}{before:>20,.0f}{after:>16,.0f}{after / before:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark of the requests per second of table searches under concurrency, against Elasticsearch clients
+whose transport waits a fixed latency rather than calling any cluster.
+
+Compares:
+  - wsgi: the Flask app on a pool of {threads} threads, as gunicorn threaded workers serve it
+  - asgi: the ASGI entry point (search_asgi) awaiting searches on the async proxy client, on a single thread
+
+Usage: python benchmarks/asgi_concurrency.py [--requests 500] [--latency 0.05] [--threads 8]
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (  # noqa: F401
+    Any, Dict, List, Optional,
+)
+
+from elasticsearch import Elasticsearch, Transport
+from flask import Flask
+from mock import patch
+
+from search_service import create_app
+from search_service.proxy.async_elasticsearch import AsyncElasticsearchProxy
+from search_service.proxy.elasticsearch import ElasticsearchProxy
+from search_service.search_asgi import SearchASGIApplication
+
+LATENCY_SEC = 0.05
+
+
+def search_response() -> Dict[str, Any]:
+    return {'hits': {'total': 10, 'hits': [
+        {'_id': f'table_{i}', 'sort': [1.0, i, f'table_{i}'], '_source': {
+            'name': f'table_{i}', 'key': f'hive://gold.schema/table_{i}', 'cluster': 'gold', 'database': 'hive',
+            'schema': 'schema', 'column_names': ['column_a', 'column_b'], 'tags': ['tag'], 'badges': [],
+            'total_usage': i}}
+        for i in range(10)]}}
+
+
+class StubTransport(Transport):
+    def perform_request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                        params: Optional[Dict[str, Any]] = None, body: Any = None) -> Any:
+        time.sleep(LATENCY_SEC)
+        return search_response()
+
+
+class StubAsyncElasticsearch:
+    async def search(self, **kwargs: Any) -> Dict[str, Any]:
+        await asyncio.sleep(LATENCY_SEC)
+        return search_response()
+
+
+def measure_wsgi(app: Flask, requests: int, threads: int) -> float:
+    def search(_: int) -> int:
+        return app.test_client().get('/search', query_string={'query_term': 'table'}).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        statuses = list(executor.map(search, range(requests)))
+    elapsed = time.perf_counter() - start
+    assert statuses == [200] * requests
+    return requests / elapsed
+
+
+def measure_asgi(app: Flask, requests: int, concurrency: int) -> float:
+    asgi = SearchASGIApplication(app, proxy=AsyncElasticsearchProxy(
+        client=StubAsyncElasticsearch(), proxy=ElasticsearchProxy(client=Elasticsearch())))
+    statuses = []  # type: List[int]
+
+    async def search(semaphore: asyncio.Semaphore) -> None:
+        scope = {'type': 'http', 'method': 'GET', 'path': '/search', 'query_string': b'query_term=table',
+                 'headers': []}
+
+        async def receive() -> Dict[str, Any]:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        async with semaphore:
+            await asgi(scope, receive, send)
+
+    async def run() -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*[search(semaphore) for _ in range(requests)])
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    start = time.perf_counter()
+    loop.run_until_complete(run())
+    elapsed = time.perf_counter() - start
+    loop.close()
+    asgi.executor.shutdown()
+    assert statuses == [200] * requests
+    return requests / elapsed
+
+
+def main() -> None:
+    global LATENCY_SEC
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help='number of requests per run')
+    parser.add_argument('--latency', type=float, default=LATENCY_SEC, help='latency of every search, in seconds')
+    parser.add_argument('--threads', type=int, default=8, help='number of threads serving the Flask app')
+    args = parser.parse_args()
+    LATENCY_SEC = args.latency
+
+    app = create_app(config_module_class='search_service.config.LocalConfig')
+    app.app_context().push()
+
+    print(f'{"concurrency":<14}{"wsgi req/s":>14}{"asgi req/s":>14}')
+    with patch('search_service.proxy._proxy_client',
+               ElasticsearchProxy(client=Elasticsearch(transport_class=StubTransport))):
+        for concurrency in (1, args.threads, 4 * args.threads, 16 * args.threads):
+            wsgi = measure_wsgi(app, args.requests, threads=min(concurrency, args.threads))
+            asgi = measure_asgi(app, args.requests, concurrency=concurrency)
+            print(f'{concurrency:<14}{wsgi:>14,.0f}{asgi:>14,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Micro-benchmark of the hydration of search hits into Table, User and Dashboard models.
+
+Compares, in hits per second:
+  - legacy: elasticsearch_dsl wrapping of every hit, then a lookup of model.get_attrs() per attribute
+  - dsl: elasticsearch_dsl wrapping of every hit, then the precomputed field plan of the model
+  - raw: the precomputed field plan of the model applied to the decoded response
+    (ELASTICSEARCH_RAW_HYDRATION_ENABLED)
+
+Usage: python benchmarks/hydration.py [--hits 1000] [--repeat 5]
+"""
+
+import argparse
+import time
+from typing import (
+    Any, Callable, Dict, List,
+)
+
+from elasticsearch import Elasticsearch
+from elasticsearch_dsl import Search
+
+from search_service.models.dashboard import Dashboard
+from search_service.models.table import Table
+from search_service.models.user import User
+from search_service.proxy.elasticsearch import (
+    TAG_MAPPING, ElasticsearchProxy, FilteredResponse,
+)
+
+
+def table_source(i: int) -> Dict[str, Any]:
+    return {
+        'name': f'table_{i}',
+        'key': f'hive://gold.schema/table_{i}',
+        'description': 'description of the table ' * 5,
+        'cluster': 'gold',
+        'database': 'hive',
+        'schema': 'schema',
+        'column_names': [f'column_{c}' for c in range(200)],
+        'tags': ['tag_a', 'tag_b', 'tag_c'],
+        'badges': ['badge_a'],
+        'last_updated_timestamp': 1600000000,
+        'display_name': f'schema.table_{i}',
+        'programmatic_descriptions': ['programmatic description'],
+        'total_usage': i,
+        'schema_description': 'description of the schema',
+    }
+
+
+def user_source(i: int) -> Dict[str, Any]:
+    return {
+        'full_name': f'First{i} Last{i}',
+        'first_name': f'First{i}',
+        'last_name': f'Last{i}',
+        'team_name': 'team',
+        'email': f'user{i}@example.com',
+        'manager_email': 'manager@example.com',
+        'github_username': f'user{i}',
+        'is_active': True,
+        'employee_type': 'fte',
+        'role_name': 'engineer',
+    }
+
+
+def dashboard_source(i: int) -> Dict[str, Any]:
+    return {
+        'uri': f'mode_dashboard://gold.group/dashboard_{i}',
+        'cluster': 'gold',
+        'group_name': 'group',
+        'group_url': 'https://mode.example.com/group',
+        'product': 'mode',
+        'name': f'dashboard_{i}',
+        'url': f'https://mode.example.com/dashboard_{i}',
+        'description': 'description of the dashboard ' * 5,
+        'last_successful_run_timestamp': 1600000000,
+    }
+
+
+def build_response(source: Callable[[int], Dict[str, Any]], hits: int) -> Dict[str, Any]:
+    return {'hits': {'total': hits, 'hits': [{'_id': f'id_{i}', '_source': source(i), 'sort': [1.0, i, f'id_{i}']}
+                                             for i in range(hits)]}}
+
+
+def get_instance(attr: str, val: Any) -> Any:
+    # conversion of an attribute as done by ElasticsearchProxy before field plans
+    if attr in TAG_MAPPING:
+        return [TAG_MAPPING[attr](tag_name=property_val) for property_val in val]
+    return val
+
+
+def hydrate_legacy(proxy: ElasticsearchProxy, response: Dict[str, Any], model: Any) -> List[Any]:
+    # hydration of the hits as done before field plans
+    results = []
+    for hit in FilteredResponse(Search(), response):
+        es_metadata = hit.__dict__.get('meta', {})
+        es_payload = hit.__dict__.get('_d_', {})
+        result = {}
+        for attr, val in es_payload.items():
+            if attr in model.get_attrs():
+                result[attr] = get_instance(attr=attr, val=val)
+        result['id'] = get_instance(attr='id', val=es_metadata['id'])
+        results.append(model(**result))
+    return results
+
+
+def hydrate_dsl(proxy: ElasticsearchProxy, response: Dict[str, Any], model: Any) -> List[Any]:
+    return proxy._get_results_from_hits(hits=list(FilteredResponse(Search(), response)), model=model)
+
+
+def hydrate_raw(proxy: ElasticsearchProxy, response: Dict[str, Any], model: Any) -> List[Any]:
+    return proxy._get_results_from_raw_hits(hits=response['hits']['hits'], model=model)
+
+
+def measure(hydrate: Callable[[ElasticsearchProxy, Dict[str, Any], Any], List[Any]],
+            proxy: ElasticsearchProxy,
+            response: Dict[str, Any],
+            model: Any,
+            repeat: int) -> float:
+    """
+    :return: best hits per second out of {repeat} runs
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = hydrate(proxy, response, model)
+        best = min(best, time.perf_counter() - start)
+        assert len(results) == len(response['hits']['hits'])
+    return len(response['hits']['hits']) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hits', type=int, default=1000, help='number of hits per response')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs, the best one is reported')
+    args = parser.parse_args()
+
+    proxy = ElasticsearchProxy(client=Elasticsearch())
+    modes = [('legacy', hydrate_legacy), ('dsl', hydrate_dsl), ('raw', hydrate_raw)]
+
+    print(f'{"model":<10}' + ''.join(f'{name + " hits/s":>16}' for name, _ in modes) + f'{"raw/legacy":>12}')
+    for model, source in ((Table, table_source), (User, user_source), (Dashboard, dashboard_source)):
+        response = build_response(source, args.hits)
+        rates = [measure(hydrate, proxy, response, model, args.repeat) for _, hydrate in modes]
+        print(f'{model.__name__:<10}' + ''.join(f'{rate:>16,.0f}' for rate in rates) + f'{rates[2] / rates[0]:>11.1f}x')
+
+
+if __name__ == '__main__':
+    main()
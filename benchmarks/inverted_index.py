@@ -0,0 +1,129 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark of the in-memory search proxy (PROXY_CLIENT MEMORY) and of the SQLite proxy (PROXY_CLIENT SQLITE, on a
+temporary database file) against the Elasticsearch proxy, on a synthetic corpus of tables loaded through
+create_document.
+
+Compares, in searches per second of a single client:
+  - table: table search of a query term (fetch_table_search_results)
+  - filter: filtered table search of a schema and a tag wildcard, with a query term
+  - facets: facets of the table filter categories of a query term
+The Elasticsearch proxy is only measured with --es-host, against an index it fills with the same corpus.
+
+Usage: python benchmarks/inverted_index.py [--tables 1000000] [--searches 200] [--es-host localhost:9200]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+from typing import (  # noqa: F401
+    Any, Callable, Dict, List,
+)
+
+from search_service import create_app
+from search_service.api.table import TABLE_INDEX
+from search_service.models.table import Table
+from search_service.models.tag import Tag
+from search_service.proxy.base import BaseProxy
+from search_service.proxy.memory import InMemoryProxy
+from search_service.proxy.sqlite import SqliteProxy
+
+# vocabulary of the names and descriptions, whose words get picked with Zipf's law like words of real catalogs
+SYLLABLES = ['ac', 'bil', 'cam', 'cus', 'dai', 'dev', 'ev', 'in', 'lis', 'mar', 'mem', 'or', 'pay', 'pro', 'ra',
+             're', 'ses', 'sto', 'sub', 'tri', 'us', 'ven', 'vis', 'zo']
+WORDS = [first + second + third for first in SYLLABLES for second in SYLLABLES for third in ('', 'er', 'ing')]
+WORD_CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+SCHEMAS = [f'schema_{i}' for i in range(200)]
+TAGS = [f'tag_{i}' for i in range(50)]
+BATCH_SIZE = 10000
+
+
+def pick_words(rng: random.Random, count: int) -> List[str]:
+    return rng.choices(WORDS, cum_weights=WORD_CUM_WEIGHTS, k=count)
+
+
+def make_table(i: int, rng: random.Random) -> Table:
+    words = pick_words(rng, 3)
+    schema = rng.choice(SCHEMAS)
+    name = '_'.join(words[:2]) + f'_{i}'
+    return Table(id=f'hive://gold.{schema}/{name}', database=rng.choice(['hive', 'presto', 'bigquery']),
+                 cluster=rng.choice(['gold', 'silver']), schema=schema, name=name, key=f'hive://gold.{schema}/{name}',
+                 tags=[Tag(tag_name=tag) for tag in rng.sample(TAGS, 2)], badges=[],
+                 description=f'{" ".join(pick_words(rng, 6))} of every {words[2]}',
+                 column_names=[f'{word}_id' for word in pick_words(rng, 5)],
+                 column_descriptions=[], programmatic_descriptions=[],
+                 total_usage=int(rng.paretovariate(1.2)))
+
+
+def load(proxy: BaseProxy, tables: int, seed: int) -> float:
+    """
+    :return: seconds it took the proxy to index the corpus
+    """
+    rng = random.Random(seed)
+    elapsed = 0.0
+    for offset in range(0, tables, BATCH_SIZE):
+        # the proxies index the models the document APIs load, whatever BaseProxy declares
+        batch = [make_table(i, rng) for i in range(offset, min(offset + BATCH_SIZE, tables))]  # type: List[Any]
+        start = time.perf_counter()
+        proxy.create_document(data=batch, index=TABLE_INDEX)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def get_searches(proxy: BaseProxy) -> Dict[str, Callable[[str], Any]]:
+    return {
+        'table': lambda term: proxy.fetch_table_search_results(query_term=term, index=TABLE_INDEX),
+        'filter': lambda term: proxy.fetch_search_results_with_filter(
+            query_term=term, search_request={'filters': {'schema': [random.choice(SCHEMAS)], 'tag': ['tag_1*']}},
+            index=TABLE_INDEX),
+        'facets': lambda term: proxy.fetch_facets(query_term=term, index=TABLE_INDEX),
+    }
+
+
+def measure(search: Callable[[str], Any], searches: int) -> float:
+    """
+    :return: searches per second, after a first search warming up the caches of the proxy
+    """
+    rng = random.Random(0)
+    terms = [' '.join(pick_words(rng, 1 + i % 2)) for i in range(searches)]
+    search(terms[0])
+    start = time.perf_counter()
+    for term in terms:
+        search(term)
+    return searches / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', type=int, default=1000000, help='number of tables of the corpus')
+    parser.add_argument('--searches', type=int, default=200, help='number of searches of every kind')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the corpus')
+    parser.add_argument('--es-host', help='Elasticsearch host to compare with, whose table index gets filled')
+    args = parser.parse_args()
+
+    app = create_app(config_module_class='search_service.config.LocalConfig')
+    with app.app_context(), tempfile.TemporaryDirectory() as directory:
+        proxies = {
+            'memory': InMemoryProxy(),
+            'sqlite': SqliteProxy(host=os.path.join(directory, 'search.db')),
+        }  # type: Dict[str, BaseProxy]
+        if args.es_host:
+            from search_service.proxy.elasticsearch import ElasticsearchProxy
+            proxies['elasticsearch'] = ElasticsearchProxy(host=args.es_host)
+
+        header = ''.join(f'{name + " qps":>14}' for name in get_searches(proxies['memory']))
+        print(f'{"proxy":<16}{"load s":>10}{header}')
+        for name, proxy in proxies.items():
+            load_sec = load(proxy, args.tables, args.seed)
+            random.seed(args.seed)
+            qps = [measure(search, args.searches) for search in get_searches(proxy).values()]
+            print(f'{name:<16}{load_sec:>10,.1f}' + ''.join(f'{value:>14,.1f}' for value in qps))
+
+
+if __name__ == '__main__':
+    main()
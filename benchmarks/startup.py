@@ -0,0 +1,70 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark of the cold start of a worker: the import of the service and create_app, in a fresh interpreter.
+
+Compares, in milliseconds, resident memory and number of loaded modules:
+  - eager: the optional modules the service used to import up front (flasgger, flask_cors) imported first
+  - lazy: the service as is, importing them only when SWAGGER_ENABLED or CORS_ENABLED need them
+
+Usage: python benchmarks/startup.py [--runs 10] [--config search_service.config.Config]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import (  # noqa: F401
+    Any, Dict, List, Tuple,
+)
+
+EAGER_MODULES = ['flasgger', 'flask_cors']
+
+# measures the import and create_app within a fresh interpreter, then prints the measures as json
+WORKER = '''
+import json, resource, sys, time
+start = time.perf_counter()
+for module in {modules}:
+    __import__(module)
+from search_service import create_app
+create_app(config_module_class={config!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000,
+                  'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'modules': len(sys.modules)}}))
+'''
+
+
+def cold_start(modules: List[str], config: str) -> Dict[str, Any]:
+    output = subprocess.run([sys.executable, '-c', WORKER.format(modules=modules, config=config)],
+                            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def measure(modules: List[str], config: str, runs: int) -> Dict[str, float]:
+    """
+    :return: median of each measure out of {runs} cold starts
+    """
+    # first run fills the bytecode caches
+    cold_start(modules, config)
+    samples = [cold_start(modules, config) for _ in range(runs)]
+    return {name: statistics.median(sample[name] for sample in samples) for name in samples[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='number of cold starts, the median is reported')
+    parser.add_argument('--config', default='search_service.config.Config', help='config module class')
+    args = parser.parse_args()
+
+    print(f'{"mode":<8}{"create_app ms":>16}{"rss MB":>10}{"modules":>10}')
+    modes = [('eager', EAGER_MODULES), ('lazy', [])]  # type: List[Tuple[str, List[str]]]
+    for mode, modules in modes:
+        result = measure(modules, args.config, args.runs)
+        print(f'{mode:<8}{result["ms"]:>16,.1f}{result["rss_mb"]:>10,.1f}{result["modules"]:>10,.0f}')
+
+
+if __name__ == '__main__':
+    main()
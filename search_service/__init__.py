@@ -9,18 +9,26 @@ import os
 import sys
 from typing import Any, Dict  # noqa: F401
 
-from flasgger import Swagger
 from flask import Blueprint, Flask
-from flask_cors import CORS
 from flask_restful import Api
 
-from search_service.api.dashboard import SearchDashboardAPI, SearchDashboardFilterAPI
+from search_service.api.autocomplete import AutocompleteAPI
+from search_service.api.batch import SearchBatchAPI
+from search_service.api.count import SearchCountAPI
+from search_service.api.dashboard import (
+    SearchDashboardAPI, SearchDashboardFacetsAPI, SearchDashboardFilterAPI,
+)
 from search_service.api.document import (
-    DocumentTableAPI, DocumentTablesAPI, DocumentUserAPI, DocumentUsersAPI,
+    DocumentDashboardAPI, DocumentDashboardsAPI, DocumentTableAPI, DocumentTablesAPI, DocumentUserAPI, DocumentUsersAPI,
 )
 from search_service.api.healthcheck import healthcheck
-from search_service.api.table import SearchTableAPI, SearchTableFilterAPI
+from search_service.api.search_all import SearchAllAPI
+from search_service.api.swagger import init_swagger
+from search_service.api.table import (
+    SearchTableAPI, SearchTableFacetsAPI, SearchTableFilterAPI,
+)
 from search_service.api.user import SearchUserAPI
+from search_service.proxy.warm_up import prepare_proxy_client_searches, warm_up_proxy_client
 
 # For customized flask use below arguments to override.
 FLASK_APP_MODULE_NAME = os.getenv('FLASK_APP_MODULE_NAME')
@@ -67,6 +75,7 @@ def create_app(*, config_module_class: str) -> Flask:
         app = Flask(__name__)
 
     if CORS_ENABLED:
+        from flask_cors import CORS
         CORS(app)
     config_module_class = \
         os.getenv('SEARCH_SVC_CONFIG_MODULE_CLASS') or config_module_class
@@ -88,6 +97,7 @@ def create_app(*, config_module_class: str) -> Flask:
     # Table Search API
 
     api.add_resource(SearchTableFilterAPI, '/search_table')
+    api.add_resource(SearchTableFacetsAPI, '/search_table_facets')
     # TODO: Rename endpoint to be more generic and accept a resource type so that logic can be re-used
     api.add_resource(SearchTableAPI, '/search')
 
@@ -97,17 +107,38 @@ def create_app(*, config_module_class: str) -> Flask:
     # Dashboard Search API
     api.add_resource(SearchDashboardAPI, '/search_dashboard')
     api.add_resource(SearchDashboardFilterAPI, '/search_dashboard_filter')
+    api.add_resource(SearchDashboardFacetsAPI, '/search_dashboard_facets')
+
+    # Batch Search API
+    api.add_resource(SearchBatchAPI, '/search_batch')
+
+    # Search API over tables, users and dashboards at once
+    api.add_resource(SearchAllAPI, '/search_all')
+
+    # Autocomplete API over table, dashboard and user names
+    api.add_resource(AutocompleteAPI, '/autocomplete')
+
+    # Count API of the results of a search, without any result
+    api.add_resource(SearchCountAPI, '/search_count')
 
     # DocumentAPI
-    # todo: needs to update to handle dashboard/user or other entities use cases.
     api.add_resource(DocumentTablesAPI, '/document_table')
     api.add_resource(DocumentTableAPI, '/document_table/<document_id>')
 
     api.add_resource(DocumentUsersAPI, '/document_user')
     api.add_resource(DocumentUserAPI, '/document_user/<document_id>')
 
+    api.add_resource(DocumentDashboardsAPI, '/document_dashboard')
+    api.add_resource(DocumentDashboardAPI, '/document_dashboard/<document_id>')
+
     app.register_blueprint(api_bp)
 
     if app.config.get('SWAGGER_ENABLED'):
-        Swagger(app, template_file=os.path.join(ROOT_DIR, app.config.get('SWAGGER_TEMPLATE_PATH')), parse=True)
+        init_swagger(app, root_path=ROOT_DIR)
+
+    if app.config.get('PROXY_CLIENT_WARMUP_ENABLED'):
+        warm_up_proxy_client(app)
+    elif app.config.get('ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'):
+        # registers the search templates before the first search, which the warm-up does otherwise
+        prepare_proxy_client_searches(app)
     return app
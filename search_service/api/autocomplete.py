@@ -0,0 +1,81 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from http import HTTPStatus
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, List,
+)
+
+from flask_restful import Resource, reqparse
+
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.serialization import dump, make_json_response
+from search_service.api.swagger import swag_from
+from search_service.api.table import TABLE_INDEX
+from search_service.api.user import USER_INDEX
+from search_service.models.autocomplete import AutocompleteResultSchema
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER,
+)
+from search_service.proxy import get_proxy_client
+from search_service.proxy.base import DEFAULT_AUTOCOMPLETE_SIZE
+
+MAX_SIZE = 20
+
+RESOURCE_INDICES = {
+    RESOURCE_TABLE: TABLE_INDEX,
+    RESOURCE_DASHBOARD: DASHBOARD_INDEX,
+    RESOURCE_USER: USER_INDEX,
+}
+
+
+def resources_type(value: str) -> List[str]:
+    """
+    Request argument type of the resources to suggest, separated by commas
+    """
+    resources = [resource.strip() for resource in value.split(',') if resource.strip()]
+    for resource in resources:
+        if resource not in RESOURCE_INDICES:
+            raise ValueError(f'{resource} is not a valid resource, valid resources are {", ".join(RESOURCE_INDICES)}')
+    return resources
+
+
+class AutocompleteAPI(Resource):
+    """
+    Suggests table, dashboard and user names starting with a prefix, as a user types it
+    """
+
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('prefix', required=True, type=str)
+    parser.add_argument('resources', required=False, type=resources_type)
+    parser.add_argument('size', required=False, default=DEFAULT_AUTOCOMPLETE_SIZE, type=int)
+
+    def __init__(self) -> None:
+        self.proxy = get_proxy_client()
+
+        super(AutocompleteAPI, self).__init__()
+
+    @swag_from('swagger_doc/autocomplete.yml')
+    def get(self) -> Iterable[Any]:
+        """
+        Fetch the top names of every resource starting with the prefix, most used first.
+
+        :return: suggestions per resource, along with the resources whose lookup failed
+        """
+        args = self.parser.parse_args(strict=True)
+        resources = args['resources'] or list(RESOURCE_INDICES)
+        size = min(max(args['size'], 1), MAX_SIZE)
+
+        try:
+            results = self.proxy.fetch_autocomplete_results(prefix=args['prefix'],
+                                                            indices={resource: RESOURCE_INDICES[resource]
+                                                                     for resource in resources},
+                                                            size=size)
+        except RuntimeError:
+            err_msg = 'Exception encountered while processing autocomplete request'
+            return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+        return make_json_response({
+            'results': {resource: dump(result, AutocompleteResultSchema) for resource, result in results.items()},
+            'failed': [resource for resource in resources if resource not in results],
+        })
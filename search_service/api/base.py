@@ -3,31 +3,81 @@
 
 from http import HTTPStatus
 from typing import (  # noqa: F401
-    Any, Dict, Iterable,
+    Any, Dict, Iterable, Tuple,
 )
 
-from flask_restful import Resource, reqparse
+from flask import request
+from flask_restful import (
+    Resource, abort, reqparse,
+)
 from marshmallow3_annotations.ext.attrs import AttrsSchema
 
+from search_service.api.serialization import make_result_response
+from search_service.models.facets import SearchFacetsResultSchema
+from search_service.models.search_result import cursor_type, track_total_hits_type
 from search_service.proxy import get_proxy_client
 
 
+def get_cursor_kwargs(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Proxy keyword arguments of the cursor of a request. Nothing is passed for requests without cursor,
+    so that proxies which don't support cursor pagination keep serving them.
+    """
+    return {'cursor': args['cursor']} if args.get('cursor') else {}
+
+
+# Request header with the key of the session of a search, e.g. the id of the user searching
+SESSION_HEADER = 'X-Search-Session'
+
+
+def get_preference_kwargs() -> Dict[str, Any]:
+    """
+    Proxy keyword arguments of the session of the current request, from its SESSION_HEADER. The searches
+    of a session prefer the same shard copies. Nothing is passed for requests without session.
+    """
+    session = request.headers.get(SESSION_HEADER)
+    return {'preference': session} if session else {}
+
+
+def get_track_total_hits_kwargs(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Proxy keyword arguments of the counting of the results of a request. Nothing is passed for requests
+    counting every result, the default of every proxy.
+    """
+    return {'track_total_hits': args['track_total_hits']} if args.get('track_total_hits') is not None else {}
+
+
+def get_not_implemented_response(e: NotImplementedError) -> Tuple[Dict[str, Any], int]:
+    """
+    Response to a request the search proxy doesn't support, e.g. a cursor on the Atlas proxy
+    """
+    return {'message': str(e) or 'The request is not supported by the search proxy'}, HTTPStatus.NOT_IMPLEMENTED
+
+
+def get_search_kwargs(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Optional proxy keyword arguments of a search request: its cursor, its counting of results and its session
+    """
+    return dict(get_cursor_kwargs(args), **get_track_total_hits_kwargs(args), **get_preference_kwargs())
+
+
 class BaseFilterAPI(Resource):
     """
     Base Filter API for search filtering
 
     This API should be generic enough to support every search filter use case.
     """
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('page_index', required=False, default=0, type=int)
+    parser.add_argument('query_term', required=False, type=str)
+    parser.add_argument('search_request', type=dict)
+    parser.add_argument('cursor', required=False, type=cursor_type)
+    parser.add_argument('track_total_hits', required=False, type=track_total_hits_type)
 
     def __init__(self, *, schema: AttrsSchema, index: str) -> None:
         self.proxy = get_proxy_client()
         self.schema = schema
         self.index = index
-        self.parser = reqparse.RequestParser(bundle_errors=True)
-
-        self.parser.add_argument('page_index', required=False, default=0, type=int)
-        self.parser.add_argument('query_term', required=False, type=str)
-        self.parser.add_argument('search_request', type=dict)
 
         super(BaseFilterAPI, self).__init__()
 
@@ -38,27 +88,74 @@ class BaseFilterAPI(Resource):
         :return: json payload of schema.
         doesn't match any tables
         """
-        args = self.parser.parse_args(strict=True)
+        search_kwargs = self.parse_search_args(index=self.index)
+
+        try:
+            results = self.proxy.fetch_search_results_with_filter(**search_kwargs)
+
+            return make_result_response(results, self.schema)
+        except NotImplementedError as e:
+            return get_not_implemented_response(e)
+        except RuntimeError as e:
+            raise e
+
+    @classmethod
+    def parse_search_args(cls, *, index: str) -> Dict[str, Any]:
+        """
+        Parses and validates the arguments of the current request.
+
+        :return: keyword arguments of the fetch_search_results_with_filter proxy method
+        :raises BadRequest: if the request is invalid
+        """
+        args = cls.parser.parse_args(strict=True)
         page_index = args.get('page_index')  # type: int
 
         search_request = args.get('search_request')  # type: Dict
         if search_request is None:
-            msg = 'The search request payload is not available in the request'
-            return {'message': msg}, HTTPStatus.BAD_REQUEST
+            abort(HTTPStatus.BAD_REQUEST, message='The search request payload is not available in the request')
 
         query_term = args.get('query_term')  # type: str
         if ':' in query_term:
-            msg = 'The query term contains an invalid character'
-            return {'message': msg}, HTTPStatus.BAD_REQUEST
+            abort(HTTPStatus.BAD_REQUEST, message='The query term contains an invalid character')
+
+        return dict(search_request=search_request,
+                    query_term=query_term,
+                    page_index=page_index,
+                    index=index,
+                    **get_search_kwargs(args))
+
+
+class BaseFacetsAPI(Resource):
+    """
+    Base Facets API, counting the values of the filter categories of the resources matching
+    a query term and filters, so that filter panels render without fetching any resource
+    """
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('query_term', required=False, type=str)
+    parser.add_argument('search_request', required=False, type=dict)
+
+    def __init__(self, *, index: str) -> None:
+        self.proxy = get_proxy_client()
+        self.index = index
+
+        super(BaseFacetsAPI, self).__init__()
+
+    def post(self) -> Iterable[Any]:
+        """
+        Fetch the facets of the query_term and search_request dictionary posted in the request JSON.
+        :return: json payload of SearchFacetsResultSchema
+        """
+        args = self.parser.parse_args(strict=True)
+        query_term = args.get('query_term') or ''
+        if ':' in query_term:
+            abort(HTTPStatus.BAD_REQUEST, message='The query term contains an invalid character')
 
         try:
-            results = self.proxy.fetch_search_results_with_filter(
-                search_request=search_request,
-                query_term=query_term,
-                page_index=page_index,
-                index=self.index
-            )
-
-            return self.schema().dump(results), HTTPStatus.OK
-        except RuntimeError as e:
-            raise e
+            results = self.proxy.fetch_facets(query_term=query_term,
+                                              search_request=args.get('search_request'),
+                                              index=self.index,
+                                              **get_preference_kwargs())
+        except NotImplementedError:
+            return {'message': 'Facets are not supported by the search proxy'}, HTTPStatus.NOT_IMPLEMENTED
+
+        return make_result_response(results, SearchFacetsResultSchema)
@@ -0,0 +1,135 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+from http import HTTPStatus
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, List, Optional,
+)
+
+from flask import current_app
+from flask_restful import (
+    Resource, abort, reqparse,
+)
+from marshmallow.exceptions import ValidationError
+
+from search_service import config
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.serialization import (
+    dump, get_schema, make_json_response,
+)
+from search_service.api.swagger import swag_from
+from search_service.api.table import TABLE_INDEX
+from search_service.api.user import USER_INDEX
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER, BatchSearchRequest, BatchSearchRequestSchema, BatchSearchResult,
+)
+from search_service.models.dashboard import SearchDashboardResultSchema
+from search_service.models.table import SearchTableResultSchema
+from search_service.models.user import SearchUserResultSchema
+from search_service.proxy import get_proxy_client
+
+LOGGING = logging.getLogger(__name__)
+
+DEFAULT_BATCH_MAX_SIZE = 10
+
+# default index and result schema per resource type
+RESOURCE_INDEX = {
+    RESOURCE_TABLE: TABLE_INDEX,
+    RESOURCE_USER: USER_INDEX,
+    RESOURCE_DASHBOARD: DASHBOARD_INDEX,
+}
+RESOURCE_SCHEMA: Dict[str, Any] = {
+    RESOURCE_TABLE: SearchTableResultSchema,
+    RESOURCE_USER: SearchUserResultSchema,
+    RESOURCE_DASHBOARD: SearchDashboardResultSchema,
+}
+
+
+class SearchBatchAPI(Resource):
+    """
+    Runs several table, user and dashboard searches, plain or filtered, in a single request
+    """
+
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('requests', required=True, type=dict, location='json', action='append')
+
+    def __init__(self) -> None:
+        self.proxy = get_proxy_client()
+
+        super(SearchBatchAPI, self).__init__()
+
+    @swag_from('swagger_doc/batch/search_batch.yml')
+    def post(self) -> Iterable[Any]:
+        """
+        Fetch search results of every search posted in the request JSON.
+
+        :return: one item per search, in the same order. Item holds either the search results
+        or the error message of that search.
+        """
+        requests = self.parse_requests()
+
+        try:
+            batch_results = self.proxy.fetch_search_results_batch(requests=requests)
+        except Exception:
+            err_msg = 'Exception encountered while processing search request'
+            LOGGING.exception(err_msg)
+            return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+        return self.make_response(requests, batch_results)
+
+    @classmethod
+    def parse_requests(cls) -> List[BatchSearchRequest]:
+        """
+        Parses and validates the searches of the current request, defaulting their index.
+
+        :raises BadRequest: if any search is invalid
+        """
+        args = cls.parser.parse_args(strict=True)
+
+        try:
+            requests: List[BatchSearchRequest] = get_schema(BatchSearchRequestSchema, many=True).load(args['requests'])
+        except ValidationError as e:
+            abort(HTTPStatus.BAD_REQUEST, message='Invalid search requests', errors=e.messages)
+
+        max_size = current_app.config.get(config.SEARCH_BATCH_MAX_SIZE, DEFAULT_BATCH_MAX_SIZE)
+        if len(requests) > max_size:
+            abort(HTTPStatus.BAD_REQUEST, message=f'The batch contains more than {max_size} searches')
+
+        for request in requests:
+            err_msg = cls._validate(request)
+            if err_msg:
+                abort(HTTPStatus.BAD_REQUEST, message=err_msg)
+            request.index = request.index or RESOURCE_INDEX[request.resource]
+        return requests
+
+    @staticmethod
+    def make_response(requests: List[BatchSearchRequest], batch_results: List[BatchSearchResult]) -> Any:
+        """
+        :return: one item per search, holding either the search results or the error message of that search
+        """
+        items = []  # type: List[Dict[str, Any]]
+        for request, batch_result in zip(requests, batch_results):
+            if batch_result.error is not None:
+                items.append({'status': HTTPStatus.INTERNAL_SERVER_ERROR.value, 'message': batch_result.error})
+            else:
+                schema = RESOURCE_SCHEMA[request.resource]
+                items.append({'status': HTTPStatus.OK.value, 'result': dump(batch_result.result, schema)})
+
+        return make_json_response({'results': items})
+
+    @staticmethod
+    def _validate(request: BatchSearchRequest) -> Optional[str]:
+        """
+        Applies the validation of the single search APIs to a search of the batch.
+
+        :return: error message, None if the search is valid
+        """
+        if request.resource not in RESOURCE_INDEX:
+            return f'Unsupported resource {request.resource}'
+        if request.is_filter_search:
+            if request.resource == RESOURCE_USER:
+                return 'Search filter is not supported for users'
+            if ':' in request.query_term:
+                return 'The query term contains an invalid character'
+        return None
@@ -0,0 +1,70 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from http import HTTPStatus
+from typing import Any, Iterable  # noqa: F401
+
+from flask_restful import Resource, reqparse
+
+from search_service.api.autocomplete import RESOURCE_INDICES
+from search_service.api.serialization import make_result_response
+from search_service.api.swagger import swag_from
+from search_service.models.count import SearchCountResultSchema
+from search_service.proxy import get_proxy_client
+
+
+def resource_type(value: str) -> str:
+    """
+    Request argument type of the resource to count
+    """
+    if value not in RESOURCE_INDICES:
+        raise ValueError(f'{value} is not a valid resource, valid resources are {", ".join(RESOURCE_INDICES)}')
+    return value
+
+
+def max_count_type(value: str) -> int:
+    """
+    Request argument type of the number of results to count at most
+    """
+    max_count = int(value)
+    if max_count < 1:
+        raise ValueError(f'Invalid max_count {value}')
+    return max_count
+
+
+class SearchCountAPI(Resource):
+    """
+    Counts the tables, dashboards or users matching a query term, without any of them, e.g. for the badges
+    of the number of results of every resource
+    """
+
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('query_term', required=True, type=str)
+    parser.add_argument('resource', required=True, type=resource_type)
+    parser.add_argument('max_count', required=False, type=max_count_type)
+
+    def __init__(self) -> None:
+        self.proxy = get_proxy_client()
+
+        super(SearchCountAPI, self).__init__()
+
+    @swag_from('swagger_doc/search_count.yml')
+    def get(self) -> Iterable[Any]:
+        """
+        Count the results of the search of the query term.
+
+        :return: number of results, and total_relation gte when it is a lower bound as the count stopped
+        at max_count
+        """
+        args = self.parser.parse_args(strict=True)
+
+        try:
+            result = self.proxy.fetch_count(query_term=args['query_term'],
+                                            resource=args['resource'],
+                                            index=RESOURCE_INDICES[args['resource']],
+                                            max_count=args['max_count'])
+        except RuntimeError:
+            err_msg = 'Exception encountered while processing count request'
+            return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+        return make_result_response(result, SearchCountResultSchema)
@@ -5,12 +5,16 @@ import logging
 from http import HTTPStatus
 from typing import Any, Iterable
 
-from flasgger import swag_from
 from flask_restful import Resource, reqparse  # noqa: I201
 
-from search_service.api.base import BaseFilterAPI
+from search_service.api.base import (
+    BaseFacetsAPI, BaseFilterAPI, get_not_implemented_response, get_search_kwargs,
+)
+from search_service.api.serialization import make_result_response
+from search_service.api.swagger import swag_from
 from search_service.exception import NotFoundException
 from search_service.models.dashboard import SearchDashboardResultSchema
+from search_service.models.search_result import cursor_type, track_total_hits_type
 from search_service.proxy import get_proxy_client
 
 DASHBOARD_INDEX = 'dashboard_search_index'
@@ -22,16 +26,16 @@ class SearchDashboardAPI(Resource):
     """
     Search Dashboard API
     """
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('query_term', required=True, type=str)
+    parser.add_argument('page_index', required=False, default=0, type=int)
+    parser.add_argument('index', required=False, default=DASHBOARD_INDEX, type=str)
+    parser.add_argument('cursor', required=False, type=cursor_type)
+    parser.add_argument('track_total_hits', required=False, type=track_total_hits_type)
 
     def __init__(self) -> None:
         self.proxy = get_proxy_client()
 
-        self.parser = reqparse.RequestParser(bundle_errors=True)
-
-        self.parser.add_argument('query_term', required=True, type=str)
-        self.parser.add_argument('page_index', required=False, default=0, type=int)
-        self.parser.add_argument('index', required=False, default=DASHBOARD_INDEX, type=str)
-
         super(SearchDashboardAPI, self).__init__()
 
     @swag_from('swagger_doc/dashboard/search_dashboard.yml')
@@ -47,14 +51,18 @@ class SearchDashboardAPI(Resource):
             results = self.proxy.fetch_dashboard_search_results(
                 query_term=args.get('query_term'),
                 page_index=args['page_index'],
-                index=args['index']
+                index=args['index'],
+                **get_search_kwargs(args)
             )
 
-            return SearchDashboardResultSchema().dump(results), HTTPStatus.OK
+            return make_result_response(results, SearchDashboardResultSchema)
 
         except NotFoundException:
             return {'message': 'query_term does not exist'}, HTTPStatus.NOT_FOUND
 
+        except NotImplementedError as e:
+            return get_not_implemented_response(e)
+
         except Exception:
 
             err_msg = 'Exception encountered while processing search request'
@@ -78,3 +86,20 @@ class SearchDashboardFilterAPI(BaseFilterAPI):
         except RuntimeError:
             err_msg = 'Exception encountered while processing search request'
             return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+class SearchDashboardFacetsAPI(BaseFacetsAPI):
+    """
+    Facets of the dashboard search filters
+    """
+
+    def __init__(self) -> None:
+        super().__init__(index=DASHBOARD_INDEX)
+
+    @swag_from('swagger_doc/dashboard/search_dashboard_facets.yml')
+    def post(self) -> Iterable[Any]:
+        try:
+            return super().post()
+        except RuntimeError:
+            err_msg = 'Exception encountered while processing facets request'
+            return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
@@ -6,12 +6,15 @@ from ast import literal_eval
 from http import HTTPStatus
 from typing import Any, Tuple
 
-from flasgger import swag_from
 from flask_restful import Resource, reqparse
 from marshmallow.exceptions import ValidationError
 
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.serialization import get_schema
+from search_service.api.swagger import swag_from
 from search_service.api.table import TABLE_INDEX
 from search_service.api.user import USER_INDEX
+from search_service.models.dashboard import DashboardSchema
 from search_service.models.table import TableSchema
 from search_service.models.user import UserSchema
 from search_service.proxy import get_proxy_client
@@ -20,11 +23,26 @@ from search_service.proxy.base import BaseProxy
 LOGGER = logging.getLogger(__name__)
 
 
+def get_document_parser(*, index: str, with_data: bool) -> reqparse.RequestParser:
+    """
+    Parser of the arguments of the document APIs, built once per API
+
+    :param index: default index of the documents
+    :param with_data: whether the documents are posted in the request
+    """
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('index', required=False, default=index, type=str)
+    if with_data:
+        parser.add_argument('data', required=True, action='append')
+    return parser
+
+
 class BaseDocumentAPI(Resource):
+    parser: reqparse.RequestParser
+
     def __init__(self, schema: Any, proxy: BaseProxy) -> None:
         self.schema = schema
         self.proxy = proxy
-        self.parser = reqparse.RequestParser(bundle_errors=True)
         super(BaseDocumentAPI, self).__init__()
 
     def delete(self, *, document_id: str) -> Tuple[Any, int]:
@@ -46,10 +64,11 @@ class BaseDocumentAPI(Resource):
 
 
 class BaseDocumentsAPI(Resource):
+    parser: reqparse.RequestParser
+
     def __init__(self, schema: Any, proxy: BaseProxy) -> None:
         self.schema = schema
         self.proxy = proxy
-        self.parser = reqparse.RequestParser(bundle_errors=True)
         super(BaseDocumentsAPI, self).__init__()
 
     def post(self) -> Tuple[Any, int]:
@@ -60,13 +79,12 @@ class BaseDocumentsAPI(Resource):
          :param data: list of data objects to be indexed in Elasticsearch
          :return: name of new index
          """
-        self.parser.add_argument('data', required=True, action='append')
         args = self.parser.parse_args()
 
         try:
             table_dict_list = [literal_eval(table_str) for table_str in args.get('data')]
             try:
-                data = self.schema(many=True).load(table_dict_list)
+                data = get_schema(self.schema, many=True).load(table_dict_list)
             except ValidationError as e:
                 logging.warning("Invalid input: %s", e.messages)
 
@@ -87,13 +105,12 @@ class BaseDocumentsAPI(Resource):
         :param data: list of data objects to be indexed in Elasticsearch
         :return: name of index
         """
-        self.parser.add_argument('data', required=True, action='append')
         args = self.parser.parse_args()
 
         try:
             table_dict_list = [literal_eval(table_str) for table_str in args.get('data')]
             try:
-                data = self.schema(many=True).load(table_dict_list)
+                data = get_schema(self.schema, many=True).load(table_dict_list)
             except ValidationError as e:
                 logging.warning("Invalid input: %s", e.messages)
 
@@ -108,10 +125,10 @@ class BaseDocumentsAPI(Resource):
 
 
 class DocumentTableAPI(BaseDocumentAPI):
+    parser = get_document_parser(index=TABLE_INDEX, with_data=False)
 
     def __init__(self) -> None:
         super().__init__(schema=TableSchema, proxy=get_proxy_client())
-        self.parser.add_argument('index', required=False, default=TABLE_INDEX, type=str)
 
     @swag_from('swagger_doc/document/table_delete.yml')
     def delete(self, *, document_id: str) -> Tuple[Any, int]:
@@ -119,21 +136,32 @@ class DocumentTableAPI(BaseDocumentAPI):
 
 
 class DocumentUserAPI(BaseDocumentAPI):
+    parser = get_document_parser(index=USER_INDEX, with_data=False)
 
     def __init__(self) -> None:
         super().__init__(schema=UserSchema, proxy=get_proxy_client())
-        self.parser.add_argument('index', required=False, default=USER_INDEX, type=str)
 
     @swag_from('swagger_doc/document/user_delete.yml')
     def delete(self, *, document_id: str) -> Tuple[Any, int]:
         return super().delete(document_id=document_id)
 
 
+class DocumentDashboardAPI(BaseDocumentAPI):
+    parser = get_document_parser(index=DASHBOARD_INDEX, with_data=False)
+
+    def __init__(self) -> None:
+        super().__init__(schema=DashboardSchema, proxy=get_proxy_client())
+
+    @swag_from('swagger_doc/document/dashboard_delete.yml')
+    def delete(self, *, document_id: str) -> Tuple[Any, int]:
+        return super().delete(document_id=document_id)
+
+
 class DocumentTablesAPI(BaseDocumentsAPI):
+    parser = get_document_parser(index=TABLE_INDEX, with_data=True)
 
     def __init__(self) -> None:
         super().__init__(schema=TableSchema, proxy=get_proxy_client())
-        self.parser.add_argument('index', required=False, default=TABLE_INDEX, type=str)
 
     @swag_from('swagger_doc/document/table_post.yml')
     def post(self) -> Tuple[Any, int]:
@@ -145,10 +173,10 @@ class DocumentTablesAPI(BaseDocumentsAPI):
 
 
 class DocumentUsersAPI(BaseDocumentsAPI):
+    parser = get_document_parser(index=USER_INDEX, with_data=True)
 
     def __init__(self) -> None:
         super().__init__(schema=UserSchema, proxy=get_proxy_client())
-        self.parser.add_argument('index', required=False, default=USER_INDEX, type=str)
 
     @swag_from('swagger_doc/document/user_post.yml')
     def post(self) -> Tuple[Any, int]:
@@ -157,3 +185,18 @@ class DocumentUsersAPI(BaseDocumentsAPI):
     @swag_from('swagger_doc/document/user_put.yml')
     def put(self) -> Tuple[Any, int]:
         return super().put()
+
+
+class DocumentDashboardsAPI(BaseDocumentsAPI):
+    parser = get_document_parser(index=DASHBOARD_INDEX, with_data=True)
+
+    def __init__(self) -> None:
+        super().__init__(schema=DashboardSchema, proxy=get_proxy_client())
+
+    @swag_from('swagger_doc/document/dashboard_post.yml')
+    def post(self) -> Tuple[Any, int]:
+        return super().post()
+
+    @swag_from('swagger_doc/document/dashboard_put.yml')
+    def put(self) -> Tuple[Any, int]:
+        return super().put()
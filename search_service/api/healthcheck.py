@@ -3,9 +3,13 @@
 
 from typing import Tuple
 
-from flasgger import swag_from
+from search_service.api.swagger import swag_from
+from search_service.proxy.warm_up import is_proxy_client_ready
 
 
 @swag_from('swagger_doc/healthcheck.yml')
 def healthcheck() -> Tuple[str, int]:
+    if not is_proxy_client_ready():
+        # the proxy client is warming up, see PROXY_CLIENT_WARMUP_ENABLED
+        return '', 503
     return '', 200
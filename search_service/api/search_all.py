@@ -0,0 +1,129 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+from concurrent.futures import (  # noqa: F401
+    Future, ThreadPoolExecutor, wait,
+)
+from http import HTTPStatus
+from threading import Lock
+from typing import (  # noqa: F401
+    Any, Callable, Dict, Iterable, List, Optional,
+)
+
+from flask import Flask, current_app
+from flask_restful import Resource, reqparse
+
+from search_service import config
+from search_service.api.base import get_preference_kwargs
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.serialization import dump, make_json_response
+from search_service.api.swagger import swag_from
+from search_service.api.table import TABLE_INDEX
+from search_service.api.user import USER_INDEX
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER,
+)
+from search_service.models.dashboard import SearchDashboardResultSchema
+from search_service.models.table import SearchTableResultSchema
+from search_service.models.user import SearchUserResultSchema
+from search_service.proxy import get_proxy_client
+
+LOGGING = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SEC = 2.0
+DEFAULT_MAX_WORKERS = 12
+
+_executor = None  # type: Optional[ThreadPoolExecutor]
+_executor_lock = Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Provides the thread pool shared by every request of the search all API, so that the number
+    of concurrent searches stays bounded regardless of the number of requests.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = current_app.config.get(config.SEARCH_ALL_MAX_WORKERS, DEFAULT_MAX_WORKERS)
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='search_all')
+    return _executor
+
+
+def _run_in_app_context(app: Flask, fetch: Callable[[], Any]) -> Any:
+    with app.app_context():
+        return fetch()
+
+
+class SearchAllAPI(Resource):
+    """
+    Searches tables, users and dashboards at once
+    """
+
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('query_term', required=True, type=str)
+    parser.add_argument('page_index', required=False, default=0, type=int)
+
+    def __init__(self) -> None:
+        self.proxy = get_proxy_client()
+
+        super(SearchAllAPI, self).__init__()
+
+    @swag_from('swagger_doc/search_all.yml')
+    def get(self) -> Iterable[Any]:
+        """
+        Fetch table, user and dashboard search results based on query_term, concurrently.
+
+        :return: one section per resource that got searched within the latency budget, along with
+        the resources that timed out or failed. Response is partial rather than an error when
+        some of the resources are missing.
+        """
+        args = self.parser.parse_args(strict=True)
+        kwargs = dict(query_term=args['query_term'], page_index=args['page_index'], **get_preference_kwargs())
+
+        searches = {
+            RESOURCE_TABLE: (lambda: self.proxy.fetch_table_search_results(index=TABLE_INDEX, **kwargs),
+                             SearchTableResultSchema),
+            RESOURCE_USER: (lambda: self.proxy.fetch_user_search_results(index=USER_INDEX, **kwargs),
+                            SearchUserResultSchema),
+            RESOURCE_DASHBOARD: (lambda: self.proxy.fetch_dashboard_search_results(index=DASHBOARD_INDEX, **kwargs),
+                                 SearchDashboardResultSchema),
+        }  # type: Dict[str, Any]
+
+        app = current_app._get_current_object()
+        executor = get_executor()
+        futures = {resource: executor.submit(_run_in_app_context, app, fetch)
+                   for resource, (fetch, _) in searches.items()}  # type: Dict[str, Future]
+        wait(futures.values(), timeout=current_app.config.get(config.SEARCH_ALL_TIMEOUT_SEC, DEFAULT_TIMEOUT_SEC))
+
+        results = {}  # type: Dict[str, Any]
+        timed_out = []  # type: List[str]
+        failed = []  # type: List[str]
+        for resource, future in futures.items():
+            if not future.done():
+                # the search keeps running in the background, but nobody waits for it anymore
+                future.cancel()
+                timed_out.append(resource)
+            elif future.exception() is not None:
+                LOGGING.error(f'Failed to search {resource}', exc_info=future.exception())
+                failed.append(resource)
+            else:
+                schema = searches[resource][1]
+                results[resource] = dump(future.result(), schema)
+
+        return self.make_response(results=results, timed_out=timed_out, failed=failed)
+
+    @staticmethod
+    def make_response(*, results: Dict[str, Any], timed_out: List[str], failed: List[str]) -> Any:
+        """
+        :param results: serialized results of every resource that got searched
+        :param timed_out: resources that didn't get searched within the latency budget
+        :param failed: resources that failed to get searched
+        """
+        if failed and not results and not timed_out:
+            err_msg = 'Exception encountered while processing search request'
+            return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+        return make_json_response({'results': results, 'timed_out': timed_out, 'failed': failed})
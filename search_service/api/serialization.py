@@ -0,0 +1,241 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import logging
+from functools import lru_cache
+from http import HTTPStatus
+from threading import Lock
+from typing import (  # noqa: F401
+    Any, Callable, Dict, List, Optional, Tuple, Type,
+)
+
+from flask import Response, current_app
+from marshmallow import fields
+from marshmallow3_annotations.ext.attrs import AttrsSchema
+
+from search_service import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None  # type: ignore
+
+LOGGING = logging.getLogger(__name__)
+
+ENCODER_AUTO = 'auto'
+ENCODER_MARSHMALLOW = 'marshmallow'
+
+# attributes of the search results memoizing their serialized form. Proxies return the same result
+# objects on cache hits, which then skip marshalling and encoding entirely.
+_SERIALIZED_ATTR = '_serialized'
+_ENCODED_ATTR = '_encoded'
+
+# post dump hooks the field plans know how to apply
+_SUPPORTED_HOOKS = {'remove_unset_optional_fields'}
+
+# (attribute, key, serializer of the value or None when the value is dumped as it is)
+FieldPlan = List[Tuple[str, str, Optional[Callable[[Any], Any]]]]
+
+
+def _orjson_dumps(data: Any) -> bytes:
+    return orjson.dumps(data)
+
+
+def _ujson_dumps(data: Any) -> bytes:
+    return ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False).encode('utf-8')
+
+
+def _json_dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# available JSON encoders, fastest first
+JSON_ENCODERS: Dict[str, Callable[[Any], bytes]] = {}
+if orjson is not None:
+    JSON_ENCODERS['orjson'] = _orjson_dumps
+if ujson is not None:
+    JSON_ENCODERS['ujson'] = _ujson_dumps
+JSON_ENCODERS['json'] = _json_dumps
+
+
+class UnsupportedSchemaError(Exception):
+    """
+    Raised when a schema uses features that a field plan can't reproduce
+    """
+    pass
+
+
+_field_plans = {}  # type: Dict[Type[AttrsSchema], Optional[FieldPlan]]
+_field_plans_lock = Lock()
+
+
+@lru_cache(maxsize=None)
+def get_schema(schema_class: Type[AttrsSchema], many: bool = False) -> AttrsSchema:
+    """
+    Instance of the schema shared by every request. Schemas don't keep any state across dump and load calls.
+    """
+    return schema_class(many=many)
+
+
+def _serialize_int(value: Any) -> Any:
+    return None if value is None else int(value)
+
+
+def _serialize_bool(value: Any) -> Any:
+    return None if value is None else bool(value)
+
+
+def _serialize_list(value: Any) -> Any:
+    return None if value is None else list(value)
+
+
+def _serialize_dict(value: Any) -> Any:
+    return None if value is None else dict(value)
+
+
+def _serialize_nested(plan: FieldPlan, many: bool) -> Callable[[Any], Any]:
+    if many:
+        return lambda value: None if value is None else [_apply(plan, item) for item in value]
+    return lambda value: None if value is None else _apply(plan, value)
+
+
+def _compile_field(field: fields.Field) -> Optional[Callable[[Any], Any]]:
+    if isinstance(field, fields.Nested):
+        schema = field.schema
+        if schema.only or schema.exclude:
+            raise UnsupportedSchemaError(f'Nested schema {type(schema).__name__} is restricted')
+        return _serialize_nested(_compile(type(schema)), many=field.many)
+    if isinstance(field, fields.List) and isinstance(field.inner, (fields.String, fields.Integer)):
+        return _serialize_list
+    if isinstance(field, fields.Dict) and all(inner is None or type(inner) is fields.String
+                                              for inner in (field.key_field, field.value_field)):
+        return _serialize_dict
+    if isinstance(field, fields.Integer):
+        return _serialize_int
+    if isinstance(field, fields.Boolean):
+        return _serialize_bool
+    if type(field) is fields.String:
+        return None
+    raise UnsupportedSchemaError(f'Field {field.name} of type {type(field).__name__} is not supported')
+
+
+def _compile(schema_class: Type[AttrsSchema]) -> FieldPlan:
+    # marshmallow keys the hooks by (tag, pass_many), and adds the hooks it looked up by their tag alone, without
+    # any name, to the hooks of a schema class on its first load
+    hooks = {name for key, names in schema_class._hooks.items()
+             if (key[0] if isinstance(key, tuple) else key) != 'post_load' for name in names}
+    if hooks - _SUPPORTED_HOOKS:
+        raise UnsupportedSchemaError(f'Schema {schema_class.__name__} has hooks {hooks - _SUPPORTED_HOOKS}')
+
+    schema = schema_class()
+    return [(field.attribute or name, field.data_key or name, _compile_field(field))
+            for name, field in schema.dump_fields.items()]
+
+
+def _apply(plan: FieldPlan, obj: Any) -> Dict[str, Any]:
+    return {key: getattr(obj, attribute) if serialize is None else serialize(getattr(obj, attribute))
+            for attribute, key, serialize in plan}
+
+
+def get_field_plan(schema_class: Type[AttrsSchema]) -> Optional[FieldPlan]:
+    """
+    Precompiled plan of the fields that the schema dumps, which serializes an object
+    to the same data as the schema does, minus the per-field overhead of marshmallow.
+
+    :return: None if the schema can't be reproduced by a field plan
+    """
+    if schema_class not in _field_plans:
+        with _field_plans_lock:
+            if schema_class not in _field_plans:
+                try:
+                    _field_plans[schema_class] = _compile(schema_class)
+                except UnsupportedSchemaError as e:
+                    LOGGING.warning(f'Serializing {schema_class.__name__} with marshmallow: {e}')
+                    _field_plans[schema_class] = None
+                except Exception:
+                    # a schema the plans fail to read, e.g. with internals of another marshmallow version
+                    LOGGING.exception(f'Serializing {schema_class.__name__} with marshmallow, its plan failed')
+                    _field_plans[schema_class] = None
+    return _field_plans[schema_class]
+
+
+def get_json_encoder() -> Optional[Tuple[str, Callable[[Any], bytes]]]:
+    """
+    JSON encoder picked by the SEARCH_JSON_ENCODER config
+
+    :return: name and function of the encoder, None to leave both serialization and encoding of the responses
+    to marshmallow and Flask-RESTful
+    """
+    name = current_app.config.get(config.SEARCH_JSON_ENCODER, ENCODER_AUTO)
+    if name == ENCODER_MARSHMALLOW:
+        return None
+    if name == ENCODER_AUTO:
+        name = next(iter(JSON_ENCODERS))
+    elif name not in JSON_ENCODERS:
+        LOGGING.warning(f'JSON encoder {name} is not available, using json')
+        name = 'json'
+    return name, JSON_ENCODERS[name]
+
+
+def _memoize(obj: Any, attribute: str, value: Any) -> None:
+    try:
+        setattr(obj, attribute, value)
+    except AttributeError:
+        # slotted objects
+        pass
+
+
+def dump(result: Any, schema_class: Type[AttrsSchema]) -> Dict[str, Any]:
+    """
+    Serializes a search result as schema_class().dump(result) does, with the field plan of the schema
+    unless the responses are left to marshmallow. The serialized result is memoized on the result.
+    """
+    memo = getattr(result, _SERIALIZED_ATTR, None)
+    if memo is not None and memo[0] is schema_class:
+        return memo[1]
+
+    plan = get_field_plan(schema_class) if get_json_encoder() is not None else None
+    if plan is None:
+        return get_schema(schema_class).dump(result)
+
+    data = _apply(plan, result)
+    for key in getattr(schema_class, 'OPTIONAL_FIELDS', ()):
+        if data.get(key, '') is None:
+            del data[key]
+    _memoize(result, _SERIALIZED_ATTR, (schema_class, data))
+    return data
+
+
+def make_json_response(data: Any, status: HTTPStatus = HTTPStatus.OK) -> Any:
+    """
+    Encodes the response data with the configured JSON encoder
+    """
+    encoder = get_json_encoder()
+    if encoder is None:
+        return data, status
+    return Response(encoder[1](data), status=status, mimetype='application/json')
+
+
+def make_result_response(result: Any, schema_class: Type[AttrsSchema]) -> Any:
+    """
+    Serializes and encodes a search result with the configured JSON encoder. The encoded result is memoized
+    on the result, so that the search results served from a cache are only ever encoded once.
+    """
+    encoder = get_json_encoder()
+    if encoder is None:
+        return get_schema(schema_class).dump(result), HTTPStatus.OK
+
+    name, dumps = encoder
+    memo = getattr(result, _ENCODED_ATTR, None)
+    if memo is not None and memo[:2] == (schema_class, name):
+        body = memo[2]
+    else:
+        body = dumps(dump(result, schema_class))
+        _memoize(result, _ENCODED_ATTR, (schema_class, name, body))
+    return Response(body, status=HTTPStatus.OK, mimetype='application/json')
@@ -0,0 +1,92 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import json
+import os
+import sys
+from typing import (
+    Any, Callable, Dict,
+)
+
+from flask import Flask
+
+# endpoint of the spec served by flasgger, at /apispec_1.json
+SWAGGER_SPEC_ENDPOINT = 'apispec_1'
+# compiled spec shipped with the service, relative to the search_service package
+COMPILED_SPEC_PATH = os.path.join('api', 'swagger_doc', 'swagger.json')
+
+
+def swag_from(specs: str) -> Callable[[Any], Any]:
+    """
+    Documents a view with the Swagger spec file {specs}, relative to the module of the view.
+
+    Sets the same attributes as flasgger.swag_from does for a file without validation, so that flasgger still
+    picks the spec up when SWAGGER_ENABLED, but without importing flasgger and jsonschema into every worker
+    that has Swagger disabled.
+    """
+    def decorator(function: Any) -> Any:
+        root_path = os.path.dirname(os.path.abspath(sys.modules[function.__module__].__file__ or ''))
+        function.root_path = root_path
+        function.swag_path = os.path.join(root_path, specs)
+        function.swag_type = specs.split('.')[-1]
+        return function
+    return decorator
+
+
+def init_swagger(app: Flask, *, root_path: str) -> Any:
+    """
+    Serves the Swagger UI and spec of {app}.
+
+    With SWAGGER_SPEC_PATH, the spec compiled by this module is served as is. Otherwise, or in debug mode, flasgger
+    generates it from SWAGGER_TEMPLATE_PATH and the spec files of the views, loading a dozen of yaml files in every
+    worker.
+
+    :param root_path: directory the paths of the config are relative to
+    :return: flasgger.Swagger extension of the app
+    """
+    # imported here, as flasgger and its dependencies take most of the import time of the service
+    from flasgger import Swagger
+
+    spec_path = app.config.get('SWAGGER_SPEC_PATH')
+    if spec_path and not app.debug:
+        with open(os.path.join(root_path, spec_path)) as spec_file:
+            spec = json.load(spec_file)
+        swagger = Swagger(app, parse=True)
+        # flasgger serves the specs it already generated from this cache, and parses the requests against them
+        swagger.apispecs[SWAGGER_SPEC_ENDPOINT] = spec
+        return swagger
+
+    return Swagger(app, template_file=os.path.join(root_path, app.config['SWAGGER_TEMPLATE_PATH']), parse=True)
+
+
+def compile_spec(app: Flask) -> Dict[str, Any]:
+    """
+    Swagger spec of {app}, as served at /apispec_1.json
+    """
+    response = app.test_client().get(f'/{SWAGGER_SPEC_ENDPOINT}.json')
+    return json.loads(response.get_data(as_text=True))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compiles the Swagger spec of the service into a single json file, '
+                                                 'to serve with SWAGGER_SPEC_PATH instead of the yaml files')
+    parser.add_argument('--config', default='search_service.config.LocalConfig',
+                        help='config module class with SWAGGER_ENABLED, without SWAGGER_SPEC_PATH')
+    parser.add_argument('--output', help='path of the compiled spec, defaults to the one shipped with the service')
+    args = parser.parse_args()
+
+    from search_service import ROOT_DIR, create_app
+    app = create_app(config_module_class=args.config)
+    if not app.config.get('SWAGGER_ENABLED') or app.config.get('SWAGGER_SPEC_PATH'):
+        parser.error(f'{args.config} must enable Swagger without SWAGGER_SPEC_PATH, to compile the yaml files')
+
+    output = args.output or os.path.join(ROOT_DIR, COMPILED_SPEC_PATH)
+    with open(output, 'w') as spec_file:
+        json.dump(compile_spec(app), spec_file, indent=2, sort_keys=True)
+        spec_file.write('\n')
+    print(f'Compiled the Swagger spec into {output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
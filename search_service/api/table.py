@@ -4,10 +4,14 @@
 from http import HTTPStatus
 from typing import Any, Iterable  # noqa: F401
 
-from flasgger import swag_from
 from flask_restful import Resource, reqparse
 
-from search_service.api.base import BaseFilterAPI
+from search_service.api.base import (
+    BaseFacetsAPI, BaseFilterAPI, get_not_implemented_response, get_search_kwargs,
+)
+from search_service.api.serialization import make_result_response
+from search_service.api.swagger import swag_from
+from search_service.models.search_result import cursor_type, track_total_hits_type
 from search_service.models.table import SearchTableResultSchema
 from search_service.proxy import get_proxy_client
 
@@ -18,16 +22,16 @@ class SearchTableAPI(Resource):
     """
     Search Table API
     """
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('query_term', required=True, type=str)
+    parser.add_argument('page_index', required=False, default=0, type=int)
+    parser.add_argument('index', required=False, default=TABLE_INDEX, type=str)
+    parser.add_argument('cursor', required=False, type=cursor_type)
+    parser.add_argument('track_total_hits', required=False, type=track_total_hits_type)
 
     def __init__(self) -> None:
         self.proxy = get_proxy_client()
 
-        self.parser = reqparse.RequestParser(bundle_errors=True)
-
-        self.parser.add_argument('query_term', required=True, type=str)
-        self.parser.add_argument('page_index', required=False, default=0, type=int)
-        self.parser.add_argument('index', required=False, default=TABLE_INDEX, type=str)
-
         super(SearchTableAPI, self).__init__()
 
     @swag_from('swagger_doc/table/search_table.yml')
@@ -45,10 +49,14 @@ class SearchTableAPI(Resource):
             results = self.proxy.fetch_table_search_results(
                 query_term=args.get('query_term'),
                 page_index=args.get('page_index'),
-                index=args.get('index')
+                index=args.get('index'),
+                **get_search_kwargs(args)
             )
 
-            return SearchTableResultSchema().dump(results), HTTPStatus.OK
+            return make_result_response(results, SearchTableResultSchema)
+
+        except NotImplementedError as e:
+            return get_not_implemented_response(e)
 
         except RuntimeError:
 
@@ -72,3 +80,20 @@ class SearchTableFilterAPI(BaseFilterAPI):
         except RuntimeError:
             err_msg = 'Exception encountered while processing search request'
             return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+class SearchTableFacetsAPI(BaseFacetsAPI):
+    """
+    Facets of the table search filters
+    """
+
+    def __init__(self) -> None:
+        super().__init__(index=TABLE_INDEX)
+
+    @swag_from('swagger_doc/table/search_table_facets.yml')
+    def post(self) -> Iterable[Any]:
+        try:
+            return super().post()
+        except RuntimeError:
+            err_msg = 'Exception encountered while processing facets request'
+            return {'message': err_msg}, HTTPStatus.INTERNAL_SERVER_ERROR
@@ -4,9 +4,12 @@
 from http import HTTPStatus
 from typing import Any, Iterable
 
-from flasgger import swag_from
 from flask_restful import Resource, reqparse
 
+from search_service.api.base import get_not_implemented_response, get_search_kwargs
+from search_service.api.serialization import make_result_response
+from search_service.api.swagger import swag_from
+from search_service.models.search_result import cursor_type, track_total_hits_type
 from search_service.models.user import SearchUserResultSchema
 from search_service.proxy import get_proxy_client
 
@@ -19,15 +22,16 @@ class SearchUserAPI(Resource):
     """
     USER_INDEX = 'user_search_index'
 
+    parser = reqparse.RequestParser(bundle_errors=True)
+    parser.add_argument('query_term', required=True, type=str)
+    parser.add_argument('page_index', required=False, default=0, type=int)
+    parser.add_argument('index', required=False, default=USER_INDEX, type=str)
+    parser.add_argument('cursor', required=False, type=cursor_type)
+    parser.add_argument('track_total_hits', required=False, type=track_total_hits_type)
+
     def __init__(self) -> None:
         self.proxy = get_proxy_client()
 
-        self.parser = reqparse.RequestParser(bundle_errors=True)
-
-        self.parser.add_argument('query_term', required=True, type=str)
-        self.parser.add_argument('page_index', required=False, default=0, type=int)
-        self.parser.add_argument('index', required=False, default=SearchUserAPI.USER_INDEX, type=str)
-
         super(SearchUserAPI, self).__init__()
 
     @swag_from('swagger_doc/user.yml')
@@ -44,10 +48,14 @@ class SearchUserAPI(Resource):
             results = self.proxy.fetch_user_search_results(
                 query_term=args['query_term'],
                 page_index=args['page_index'],
-                index=args.get('index')
+                index=args.get('index'),
+                **get_search_kwargs(args)
             )
 
-            return SearchUserResultSchema().dump(results), HTTPStatus.OK
+            return make_result_response(results, SearchUserResultSchema)
+
+        except NotImplementedError as e:
+            return get_not_implemented_response(e)
 
         except RuntimeError:
 
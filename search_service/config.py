@@ -14,8 +14,61 @@ PROXY_CLIENT = 'PROXY_CLIENT'
 PROXY_CLIENT_KEY = 'PROXY_CLIENT_KEY'
 PROXY_CLIENTS = {
     'ELASTICSEARCH': 'search_service.proxy.elasticsearch.ElasticsearchProxy',
-    'ATLAS': 'search_service.proxy.atlas.AtlasProxy'
+    'ATLAS': 'search_service.proxy.atlas.AtlasProxy',
+    'MEMORY': 'search_service.proxy.memory.InMemoryProxy',
+    'SQLITE': 'search_service.proxy.sqlite.SqliteProxy',
 }
+PROXY_CLIENT_WARMUP_ENABLED = 'PROXY_CLIENT_WARMUP_ENABLED'
+PROXY_CLIENT_WARMUP_CONNECTIONS = 'PROXY_CLIENT_WARMUP_CONNECTIONS'
+PROXY_CLIENT_WARMUP_QUERIES = 'PROXY_CLIENT_WARMUP_QUERIES'
+# proxy clients with an async variant, which the ASGI entry point (search_asgi) awaits searches on
+ASYNC_PROXY_CLIENT = 'ASYNC_PROXY_CLIENT'
+ASYNC_PROXY_CLIENTS = {
+    'ELASTICSEARCH': 'search_service.proxy.async_elasticsearch.AsyncElasticsearchProxy',
+}
+
+# connections of the Elasticsearch client
+ELASTICSEARCH_POOL_MAXSIZE = 'ELASTICSEARCH_POOL_MAXSIZE'
+ELASTICSEARCH_POOL_BLOCK = 'ELASTICSEARCH_POOL_BLOCK'
+ELASTICSEARCH_CONNECT_TIMEOUT_SEC = 'ELASTICSEARCH_CONNECT_TIMEOUT_SEC'
+ELASTICSEARCH_READ_TIMEOUT_SEC = 'ELASTICSEARCH_READ_TIMEOUT_SEC'
+ELASTICSEARCH_MAX_RETRIES = 'ELASTICSEARCH_MAX_RETRIES'
+ELASTICSEARCH_RETRY_ON_TIMEOUT = 'ELASTICSEARCH_RETRY_ON_TIMEOUT'
+ELASTICSEARCH_HTTP_COMPRESS = 'ELASTICSEARCH_HTTP_COMPRESS'
+ELASTICSEARCH_SNIFF_ON_START = 'ELASTICSEARCH_SNIFF_ON_START'
+ELASTICSEARCH_SNIFF_ON_CONNECTION_FAIL = 'ELASTICSEARCH_SNIFF_ON_CONNECTION_FAIL'
+ELASTICSEARCH_SNIFFER_TIMEOUT_SEC = 'ELASTICSEARCH_SNIFFER_TIMEOUT_SEC'
+
+SEARCH_CACHE_ENABLED = 'SEARCH_CACHE_ENABLED'
+SEARCH_CACHE_MAX_SIZE = 'SEARCH_CACHE_MAX_SIZE'
+SEARCH_CACHE_TTL_SEC = 'SEARCH_CACHE_TTL_SEC'
+SEARCH_CACHE_EMPTY_RESULT_TTL_SEC = 'SEARCH_CACHE_EMPTY_RESULT_TTL_SEC'
+SEARCH_COUNT_CACHE_MAX_SIZE = 'SEARCH_COUNT_CACHE_MAX_SIZE'
+SEARCH_COUNT_CACHE_TTL_SEC = 'SEARCH_COUNT_CACHE_TTL_SEC'
+SEARCH_COALESCING_ENABLED = 'SEARCH_COALESCING_ENABLED'
+
+SEARCH_CIRCUIT_BREAKER_ENABLED = 'SEARCH_CIRCUIT_BREAKER_ENABLED'
+SEARCH_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 'SEARCH_CIRCUIT_BREAKER_FAILURE_THRESHOLD'
+SEARCH_CIRCUIT_BREAKER_SLOW_CALL_SEC = 'SEARCH_CIRCUIT_BREAKER_SLOW_CALL_SEC'
+SEARCH_CIRCUIT_BREAKER_OPEN_SEC = 'SEARCH_CIRCUIT_BREAKER_OPEN_SEC'
+SEARCH_STALE_RESULTS_MAX_SIZE = 'SEARCH_STALE_RESULTS_MAX_SIZE'
+SEARCH_STALE_RESULTS_TTL_SEC = 'SEARCH_STALE_RESULTS_TTL_SEC'
+
+SEARCH_BATCH_MAX_SIZE = 'SEARCH_BATCH_MAX_SIZE'
+
+SEARCH_FACET_SIZE = 'SEARCH_FACET_SIZE'
+
+ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED = 'ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'
+ELASTICSEARCH_RAW_HYDRATION_ENABLED = 'ELASTICSEARCH_RAW_HYDRATION_ENABLED'
+ELASTICSEARCH_NGRAM_SUBFIELDS_ENABLED = 'ELASTICSEARCH_NGRAM_SUBFIELDS_ENABLED'
+
+ELASTICSEARCH_SEARCH_TIMEOUT_SEC = 'ELASTICSEARCH_SEARCH_TIMEOUT_SEC'
+ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC = 'ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC'
+
+SEARCH_ALL_TIMEOUT_SEC = 'SEARCH_ALL_TIMEOUT_SEC'
+SEARCH_ALL_MAX_WORKERS = 'SEARCH_ALL_MAX_WORKERS'
+
+SEARCH_JSON_ENCODER = 'SEARCH_JSON_ENCODER'
 
 
 class Config:
@@ -29,10 +82,100 @@ class Config:
     # LOG_CONFIG_FILE = 'search_service/logging.conf'
     LOG_CONFIG_FILE = None
 
+    # Builds the proxy client when the app is created, in a background thread, instead of at the first request.
+    # It opens PROXY_CLIENT_WARMUP_CONNECTIONS pooled connections to every Elasticsearch node (up to the pool size),
+    # then searches tables, users and dashboards for each of PROXY_CLIENT_WARMUP_QUERIES, e.g. ['test'].
+    # The healthcheck responds 503 until this warm-up completes.
+    PROXY_CLIENT_WARMUP_ENABLED = False
+    PROXY_CLIENT_WARMUP_CONNECTIONS = 2
+    PROXY_CLIENT_WARMUP_QUERIES = []  # type: list
+
     # Config used by ElastichSearch
     ELASTICSEARCH_INDEX = 'table_search_index'
+    # Run the table, user, dashboard and filter searches as stored search templates, which get registered
+    # in the cluster by the warm-up of the proxy client, or when the app is created without warm-up. Template ids
+    # embed a hash of the query, so a change of the query registers a new template rather than overwriting
+    # the stored one.
+    ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED = False
+    # Build search results straight from the decoded Elasticsearch responses, bypassing
+    # the elasticsearch_dsl wrapping of every hit. Much cheaper on large pages.
+    ELASTICSEARCH_RAW_HYDRATION_ENABLED = False
+    # Match the query term of filter searches within words on the ngram subfields of the searched fields, rather
+    # than with leading wildcards. Requires indices created with these subfields, see docs/ngram-reindex.md.
+    ELASTICSEARCH_NGRAM_SUBFIELDS_ENABLED = False
+
+    # Connections of the Elasticsearch client, to every host of PROXY_ENDPOINT (hosts separated by commas).
+    # None keeps the default of the client library.
+    # Number of connections kept open per node (10 by default)
+    ELASTICSEARCH_POOL_MAXSIZE = None
+    # Requests finding every connection of the pool in use wait for one, rather than opening a connection
+    # that gets closed right after the request
+    ELASTICSEARCH_POOL_BLOCK = False
+    # Timeouts of connecting to a node and of reading its response (10 seconds in total by default)
+    ELASTICSEARCH_CONNECT_TIMEOUT_SEC = None
+    ELASTICSEARCH_READ_TIMEOUT_SEC = None
+    # Retries of failed requests on another node (3 by default), including the timed out ones when enabled
+    ELASTICSEARCH_MAX_RETRIES = None
+    ELASTICSEARCH_RETRY_ON_TIMEOUT = None
+    # Gzip compression of requests and responses
+    ELASTICSEARCH_HTTP_COMPRESS = None
+    # Discovery of the nodes of the cluster: on start, on connection failures and every SNIFFER_TIMEOUT_SEC seconds
+    ELASTICSEARCH_SNIFF_ON_START = None
+    ELASTICSEARCH_SNIFF_ON_CONNECTION_FAIL = None
+    ELASTICSEARCH_SNIFFER_TIMEOUT_SEC = None
+
+    # In-process cache of search results that decorates the configured proxy client.
+    # Entries are evicted by size (LRU) and by TTL, and are invalidated per index on document writes.
+    SEARCH_CACHE_ENABLED = False
+    SEARCH_CACHE_MAX_SIZE = 1024
+    SEARCH_CACHE_TTL_SEC = 60
+    # Searches without any result are cached for a shorter period of time
+    SEARCH_CACHE_EMPTY_RESULT_TTL_SEC = 10
+    # Results of the count API are cached apart from the search results, with the same invalidation
+    SEARCH_COUNT_CACHE_MAX_SIZE = 4096
+    SEARCH_COUNT_CACHE_TTL_SEC = 300
+    # Concurrent identical searches wait for a single search and share its result. It works with the cache module
+    # disabled too, which then only coalesces the searches.
+    SEARCH_COALESCING_ENABLED = False
+
+    # Circuit breaker around the configured proxy client, between it and the cache. The circuit opens after
+    # FAILURE_THRESHOLD failed calls in a row, calls slower than SLOW_CALL_SEC failing too, and lets a trial call
+    # through every OPEN_SEC seconds. Meanwhile, searches return their last good result marked stale, kept for
+    # SEARCH_STALE_RESULTS_TTL_SEC seconds, and fail if they have none.
+    SEARCH_CIRCUIT_BREAKER_ENABLED = False
+    SEARCH_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+    SEARCH_CIRCUIT_BREAKER_SLOW_CALL_SEC = 2.0
+    SEARCH_CIRCUIT_BREAKER_OPEN_SEC = 30
+    SEARCH_STALE_RESULTS_MAX_SIZE = 4096
+    SEARCH_STALE_RESULTS_TTL_SEC = 3600
+
+    # Maximum number of searches in a single request of the batch search API
+    SEARCH_BATCH_MAX_SIZE = 10
+
+    # Maximum number of values of every facet of the facets APIs, most frequent first
+    SEARCH_FACET_SIZE = 20
+
+    # Latency budget of every search, passed to Elasticsearch, whose shards return the hits found by then, and
+    # enforced by the client a bit later. Responses of searches that ran out of time are marked partial.
+    # None disables it. ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC overrides it per index, e.g. {'table_search_index': 1.0}
+    ELASTICSEARCH_SEARCH_TIMEOUT_SEC = None
+    ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC = {}  # type: dict
+
+    # Latency budget of the search all API. Sections that aren't done by then are left out of the response.
+    SEARCH_ALL_TIMEOUT_SEC = 2.0
+    # Size of the thread pool shared by all requests of the search all API
+    SEARCH_ALL_MAX_WORKERS = 12
+
+    # Encoder of the search responses: one of 'orjson', 'ujson' (when installed) or 'json', or 'auto' for the
+    # fastest one installed. Search results get serialized with field plans precompiled from their schemas,
+    # and keep their encoded form so that cached results are encoded only once.
+    # 'marshmallow' leaves both serialization and encoding to marshmallow and Flask-RESTful.
+    SEARCH_JSON_ENCODER = 'auto'
 
     SWAGGER_ENABLED = os.environ.get('SWAGGER_ENABLED', False)
+    # Swagger spec compiled by `python -m search_service.api.swagger`, relative to the search_service package, e.g.
+    # api/swagger_doc/swagger.json. Served as is, instead of generating it from the yaml files in every worker.
+    SWAGGER_SPEC_PATH = os.environ.get('SWAGGER_SPEC_PATH')
 
 
 class LocalConfig(Config):
@@ -47,6 +190,9 @@ class LocalConfig(Config):
                                         PORT=PROXY_PORT)
                                     )
     PROXY_CLIENT = PROXY_CLIENTS[os.environ.get('PROXY_CLIENT', 'ELASTICSEARCH')]
+    # Async variant of the proxy client, used by the ASGI entry point only. Requires the elasticsearch-async package
+    # with the 6.x Elasticsearch clients (the asgi extra), without which the ASGI entry point fails to start.
+    ASYNC_PROXY_CLIENT = ASYNC_PROXY_CLIENTS.get(os.environ.get('PROXY_CLIENT', 'ELASTICSEARCH'))
     PROXY_CLIENT_KEY = os.environ.get('PROXY_CLIENT_KEY')
     PROXY_USER = os.environ.get('CREDENTIALS_PROXY_USER', 'elastic')
     PROXY_PASSWORD = os.environ.get('CREDENTIALS_PROXY_PASSWORD', 'elastic')
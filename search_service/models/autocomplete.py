@@ -0,0 +1,39 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import List
+
+import attr
+from marshmallow3_annotations.ext.attrs import AttrsSchema
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class Suggestion:
+    """
+    Name of a resource matching the prefix typed by a user
+
+    name: name to display, e.g. schema.table of a table, or the full name of a user
+    key: key of the resource, e.g. the key of a table, the uri of a dashboard or the email of a user
+    """
+    name: str
+    key: str
+
+
+class SuggestionSchema(AttrsSchema):
+    class Meta:
+        target = Suggestion
+        register_as_scheme = True
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class AutocompleteResult:
+    """
+    Top suggestions of a resource, most used first
+    """
+    results: List[Suggestion] = attr.ib(factory=list)
+
+
+class AutocompleteResultSchema(AttrsSchema):
+    class Meta:
+        target = AutocompleteResult
+        register_as_scheme = True
@@ -0,0 +1,45 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import (
+    Any, Dict, Optional,
+)
+
+import attr
+from marshmallow3_annotations.ext.attrs import AttrsSchema
+
+RESOURCE_TABLE = 'table'
+RESOURCE_USER = 'user'
+RESOURCE_DASHBOARD = 'dashboard'
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class BatchSearchRequest:
+    """
+    A single search of a batch. It's a filtered search when {search_request} is provided,
+    which is supported for table and dashboard resources only.
+    """
+    resource: str
+    query_term: str = ''
+    page_index: int = 0
+    index: str = ''
+    search_request: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_filter_search(self) -> bool:
+        return self.search_request is not None
+
+
+class BatchSearchRequestSchema(AttrsSchema):
+    class Meta:
+        target = BatchSearchRequest
+        register_as_scheme = True
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class BatchSearchResult:
+    """
+    Outcome of a single search of a batch: either the search result or the error message.
+    """
+    result: Optional[Any] = None
+    error: Optional[str] = None
@@ -0,0 +1,24 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Optional
+
+import attr
+
+from search_service.models.search_result import SearchResultSchema
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class SearchCountResult:
+    """
+    Number of results of a search, without any of the results. total_relation is TOTAL_RELATION_GTE when
+    the count stopped early and total_results is a lower bound.
+    """
+    total_results: int = attr.ib()
+    total_relation: Optional[str] = attr.ib(default=None)
+
+
+class SearchCountResultSchema(SearchResultSchema):
+    class Meta:
+        target = SearchCountResult
+        register_as_scheme = True
@@ -1,13 +1,15 @@
 # Copyright Contributors to the Amundsen project.
 # SPDX-License-Identifier: Apache-2.0
 
-from typing import List, Set
+from typing import (
+    List, Optional, Set,
+)
 
 import attr
 from amundsen_common.models.dashboard import DashboardSummary, DashboardSummarySchema
-from marshmallow3_annotations.ext.attrs import AttrsSchema
 
 from search_service.models.base import Base
+from search_service.models.search_result import SearchResultSchema
 
 
 @attr.s(auto_attribs=True, kw_only=True)
@@ -37,6 +39,9 @@ class Dashboard(Base,
             'last_successful_run_timestamp'
         }
 
+    def get_attrs_dict(self) -> dict:
+        return {attr: getattr(self, attr) for attr in self.get_attrs()}
+
     @staticmethod
     def get_type() -> str:
         return 'dashboard'
@@ -52,9 +57,13 @@ class DashboardSchema(DashboardSummarySchema):
 class SearchDashboardResult:
     total_results: int = attr.ib()
     results: List[Dashboard] = attr.ib(factory=list)
+    next_cursor: Optional[str] = attr.ib(default=None)
+    total_relation: Optional[str] = attr.ib(default=None)
+    partial: Optional[bool] = attr.ib(default=None)
+    stale: Optional[bool] = attr.ib(default=None)
 
 
-class SearchDashboardResultSchema(AttrsSchema):
+class SearchDashboardResultSchema(SearchResultSchema):
     class Meta:
         target = SearchDashboardResult
         register_as_scheme = True
@@ -0,0 +1,53 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import List
+
+import attr
+from marshmallow3_annotations.ext.attrs import AttrsSchema
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class FacetValue:
+    """
+    Value of a filter category, and the number of resources having it
+    """
+    value: str
+    count: int
+
+
+class FacetValueSchema(AttrsSchema):
+    class Meta:
+        target = FacetValue
+        register_as_scheme = True
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class Facet:
+    """
+    Most frequent values of a filter category, e.g. database or tag, most frequent first
+    """
+    name: str
+    values: List[FacetValue] = attr.ib(factory=list)
+
+
+class FacetSchema(AttrsSchema):
+    class Meta:
+        target = Facet
+        register_as_scheme = True
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class SearchFacetsResult:
+    """
+    Facets of the resources matching a query term and filters. The values of a category are counted
+    with the filters of the other categories only, so that selecting a value doesn't hide the others.
+    """
+    total_results: int
+    facets: List[Facet] = attr.ib(factory=list)
+
+
+class SearchFacetsResultSchema(AttrsSchema):
+    class Meta:
+        target = SearchFacetsResult
+        register_as_scheme = True
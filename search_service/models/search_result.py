@@ -1,15 +1,100 @@
 # Copyright Contributors to the Amundsen project.
 # SPDX-License-Identifier: Apache-2.0
 
-from typing import Any, List
+import base64
+import binascii
+import json
+from typing import (  # noqa: F401
+    Any, Dict, List, Optional, Tuple, Union,
+)
+
+from marshmallow import post_dump
+from marshmallow3_annotations.ext.attrs import AttrsSchema
 
 
 class SearchResult:
     def __init__(self, *,
                  total_results: int,
-                 results: List[Any]) -> None:
+                 results: List[Any],
+                 next_cursor: Optional[str] = None,
+                 total_relation: Optional[str] = None,
+                 partial: Optional[bool] = None,
+                 stale: Optional[bool] = None) -> None:
         self.total_results = total_results
         self.results = results
+        self.next_cursor = next_cursor
+        self.total_relation = total_relation
+        self.partial = partial
+        self.stale = stale
 
     def __repr__(self) -> str:
         return 'SearchResult(total_results={!r}, results{!r})'.format(self.total_results, self.results)
+
+
+class SearchResultSchema(AttrsSchema):
+    """
+    Base schema of search results, which leaves out the optional fields that aren't set
+    """
+    OPTIONAL_FIELDS = ('next_cursor', 'total_relation', 'partial', 'stale')
+
+    @post_dump
+    def remove_unset_optional_fields(self, data: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        return {key: value for key, value in data.items()
+                if value is not None or key not in self.OPTIONAL_FIELDS}
+
+
+# total_relation of a search result whose total_results is a lower bound of the number of results, as the count
+# of the matching documents stopped there. Exact totals have no total_relation.
+TOTAL_RELATION_GTE = 'gte'
+
+# Types of the sort values of a cursor: the score, the total usage and the id of the last result of a page
+CURSOR_VALUE_TYPES = ((int, float), (int,), (str,))  # type: Tuple[Tuple[type, ...], ...]
+
+
+def encode_cursor(sort_values: List[Any]) -> str:
+    """
+    Encodes the sort values of the last result of a page into an opaque cursor to the next page
+    """
+    payload = json.dumps(list(sort_values), separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Decodes the sort values of a cursor built by encode_cursor
+
+    :raises ValueError: if the cursor is malformed, or its sort values aren't of CURSOR_VALUE_TYPES
+    """
+    try:
+        sort_values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f'Invalid cursor {cursor}') from e
+    if not isinstance(sort_values, list) or len(sort_values) != len(CURSOR_VALUE_TYPES) or \
+            not all(isinstance(value, value_type) and not isinstance(value, bool)
+                    for value, value_type in zip(sort_values, CURSOR_VALUE_TYPES)):
+        raise ValueError(f'Invalid cursor {cursor}')
+    return sort_values
+
+
+def cursor_type(value: str) -> str:
+    """
+    Request argument type validating a cursor
+    """
+    decode_cursor(value)
+    return value
+
+
+def track_total_hits_type(value: Any) -> Union[bool, int]:
+    """
+    Request argument type of the counting of the results of a search: true (default) counts every result,
+    false skips counting, and a number N counts up to N results. Query strings pass it as a string, JSON payloads
+    as a boolean or a number.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    limit = int(value)
+    if limit < 0:
+        raise ValueError(f'Invalid track_total_hits {value}')
+    return limit
@@ -9,6 +9,7 @@ from typing import (
 import attr
 from marshmallow3_annotations.ext.attrs import AttrsSchema
 
+from search_service.models.search_result import SearchResultSchema
 from search_service.models.tag import Tag
 
 from .base import Base
@@ -88,9 +89,13 @@ class TableSchema(AttrsSchema):
 class SearchTableResult:
     total_results: int = attr.ib()
     results: List[Table] = attr.ib(factory=list)
+    next_cursor: Optional[str] = attr.ib(default=None)
+    total_relation: Optional[str] = attr.ib(default=None)
+    partial: Optional[bool] = attr.ib(default=None)
+    stale: Optional[bool] = attr.ib(default=None)
 
 
-class SearchTableResultSchema(AttrsSchema):
+class SearchTableResultSchema(SearchResultSchema):
     class Meta:
         target = SearchTableResult
         register_as_scheme = True
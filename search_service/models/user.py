@@ -10,6 +10,8 @@ import attr
 from amundsen_common.models.user import User as CommonUser
 from marshmallow3_annotations.ext.attrs import AttrsSchema
 
+from search_service.models.search_result import SearchResultSchema
+
 from .base import Base
 
 
@@ -56,9 +58,13 @@ class UserSchema(AttrsSchema):
 class SearchUserResult:
     total_results: int = attr.ib()
     results: List[User] = attr.ib(factory=list)
+    next_cursor: Optional[str] = attr.ib(default=None)
+    total_relation: Optional[str] = attr.ib(default=None)
+    partial: Optional[bool] = attr.ib(default=None)
+    stale: Optional[bool] = attr.ib(default=None)
 
 
-class SearchUserResultSchema(AttrsSchema):
+class SearchUserResultSchema(SearchResultSchema):
     class Meta:
         target = SearchUserResult
         register_as_scheme = True
@@ -8,6 +8,8 @@ from werkzeug.utils import import_string
 
 from search_service import config
 from search_service.proxy.base import BaseProxy
+from search_service.proxy.cache import CachingProxy
+from search_service.proxy.circuit_breaker import CircuitBreakerProxy
 
 _proxy_client = None
 _proxy_client_lock = Lock()
@@ -42,4 +44,26 @@ def get_proxy_client() -> BaseProxy:
 
             _proxy_client = client(host=host, user=user, password=password, client=obj, page_size=page_size)
 
+            if current_app.config.get(config.SEARCH_CIRCUIT_BREAKER_ENABLED):
+                _proxy_client = CircuitBreakerProxy(
+                    proxy=_proxy_client,
+                    failure_threshold=current_app.config[config.SEARCH_CIRCUIT_BREAKER_FAILURE_THRESHOLD],
+                    slow_call_sec=current_app.config[config.SEARCH_CIRCUIT_BREAKER_SLOW_CALL_SEC],
+                    open_sec=current_app.config[config.SEARCH_CIRCUIT_BREAKER_OPEN_SEC],
+                    stale_max_size=current_app.config[config.SEARCH_STALE_RESULTS_MAX_SIZE],
+                    stale_ttl=current_app.config[config.SEARCH_STALE_RESULTS_TTL_SEC])
+
+            cache_enabled = current_app.config.get(config.SEARCH_CACHE_ENABLED)
+            coalesce = bool(current_app.config.get(config.SEARCH_COALESCING_ENABLED))
+            if cache_enabled or coalesce:
+                # without the cache, the caching proxy keeps nothing and only coalesces the searches
+                _proxy_client = CachingProxy(
+                    proxy=_proxy_client,
+                    max_size=current_app.config[config.SEARCH_CACHE_MAX_SIZE] if cache_enabled else 0,
+                    ttl=current_app.config[config.SEARCH_CACHE_TTL_SEC],
+                    empty_result_ttl=current_app.config[config.SEARCH_CACHE_EMPTY_RESULT_TTL_SEC],
+                    count_max_size=current_app.config[config.SEARCH_COUNT_CACHE_MAX_SIZE] if cache_enabled else 0,
+                    count_ttl=current_app.config[config.SEARCH_COUNT_CACHE_TTL_SEC],
+                    coalesce=coalesce)
+
     return _proxy_client
@@ -0,0 +1,251 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+from typing import (  # noqa: F401
+    Any, Dict, List, Optional, Union,
+)
+
+from elasticsearch.exceptions import ConnectionTimeout
+from flask import current_app, has_app_context
+
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER, BatchSearchRequest, BatchSearchResult,
+)
+from search_service.models.dashboard import SearchDashboardResult
+from search_service.models.search_result import decode_cursor
+from search_service.models.table import SearchTableResult
+from search_service.models.user import SearchUserResult
+from search_service.proxy.elasticsearch import (
+    MULTI_SEARCH_FILTER_PATH, SEARCH_AFTER_BATCH_SIZE, SEARCH_FILTER_PATH, SEARCH_TEMPLATES, ElasticsearchProxy,
+    get_count_limit, get_count_params, get_preference_params, get_search_timeout, get_timeout_body, get_timeout_params,
+    get_total_results, get_track_total_hits_body, needs_count, record_search_timeout, set_counted_total,
+)
+from search_service.proxy.elasticsearch_connection import get_async_client_options, get_hosts
+
+LOGGING = logging.getLogger(__name__)
+
+
+def get_async_client_class() -> Any:
+    """
+    AsyncElasticsearch client class of the installed Elasticsearch clients
+    :raises ImportError: when none of them is async
+    """
+    try:
+        # elasticsearch-async, the asyncio transport of the 6.x clients
+        from elasticsearch_async import AsyncElasticsearch
+    except ImportError:
+        try:
+            # elasticsearch>=7.8 ships its own
+            from elasticsearch import AsyncElasticsearch  # type: ignore
+        except ImportError:
+            raise ImportError('The async proxy client needs elasticsearch-async with Elasticsearch 6.x: install it '
+                              'with `pip install amundsen-search[asgi]`, or set ASYNC_PROXY_CLIENT to None to serve '
+                              'the searches with the Flask app') from None
+    return AsyncElasticsearch
+
+
+def _get_async_client(host: Optional[str], http_auth: Optional[Any]) -> Any:
+    client_options = get_async_client_options(current_app.config) if has_app_context() else {}
+    return get_async_client_class()(get_hosts(host), http_auth=http_auth, **client_options)
+
+
+class AsyncElasticsearchProxy:
+    """
+    Asyncio variant of the searches of ElasticsearchProxy, for the ASGI entry point (see search_asgi).
+
+    Searches get built and hydrated by an ElasticsearchProxy, and only go over the wire through the async client,
+    so that they return the same results as the searches of ElasticsearchProxy. Search templates get registered in
+    the cluster by the ElasticsearchProxy, with its synchronous client, once.
+
+    Searches don't go through the CachingProxy and CircuitBreakerProxy decorating the proxy client of the Flask app.
+    """
+
+    @staticmethod
+    def check_dependencies() -> None:
+        """
+        Raises an ImportError when the async Elasticsearch client isn't installed, before any proxy gets created
+        """
+        get_async_client_class()
+
+    def __init__(self, *,
+                 host: str = None,
+                 user: str = '',
+                 password: str = '',
+                 client: Any = None,
+                 page_size: int = 10,
+                 proxy: ElasticsearchProxy = None
+                 ) -> None:
+        """
+        :param host: Elasticsearch host we should connect to
+        :param user: user name to use for authentication
+        :param password: user password to use for authentication
+        :param client: async Elasticsearch client to use, if provided
+        :param page_size: Number of search results to return per request
+        :param proxy: proxy building the searches and hydrating their results, if provided
+        """
+        http_auth = (user, password) if user else None
+        self.elasticsearch = client or _get_async_client(host, http_auth)
+        self.proxy = proxy or ElasticsearchProxy(host=host, user=user, password=password, page_size=page_size)
+        self.page_size = page_size
+
+    async def close(self) -> None:
+        await self.elasticsearch.transport.close()
+
+    async def fetch_table_search_results(self, *,
+                                         query_term: str,
+                                         page_index: int = 0,
+                                         index: str = '',
+                                         cursor: Optional[str] = None,
+                                         preference: Optional[str] = None,
+                                         track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
+        request = BatchSearchRequest(resource=RESOURCE_TABLE, query_term=query_term, page_index=page_index,
+                                     index=index)
+        return await self._search(request=request, cursor=cursor, preference=preference,
+                                  track_total_hits=track_total_hits)
+
+    async def fetch_user_search_results(self, *,
+                                        query_term: str,
+                                        page_index: int = 0,
+                                        index: str = '',
+                                        cursor: Optional[str] = None,
+                                        preference: Optional[str] = None,
+                                        track_total_hits: Optional[Union[bool, int]] = None) -> SearchUserResult:
+        request = BatchSearchRequest(resource=RESOURCE_USER, query_term=query_term, page_index=page_index,
+                                     index=index)
+        return await self._search(request=request, cursor=cursor, preference=preference,
+                                  track_total_hits=track_total_hits)
+
+    async def fetch_dashboard_search_results(self, *,
+                                             query_term: str,
+                                             page_index: int = 0,
+                                             index: str = '',
+                                             cursor: Optional[str] = None,
+                                             preference: Optional[str] = None,
+                                             track_total_hits: Optional[Union[bool, int]] = None) \
+            -> SearchDashboardResult:
+        request = BatchSearchRequest(resource=RESOURCE_DASHBOARD, query_term=query_term, page_index=page_index,
+                                     index=index)
+        return await self._search(request=request, cursor=cursor, preference=preference,
+                                  track_total_hits=track_total_hits)
+
+    async def fetch_search_results_with_filter(self, *,
+                                               query_term: str,
+                                               search_request: dict,
+                                               page_index: int = 0,
+                                               index: str = '',
+                                               cursor: Optional[str] = None,
+                                               preference: Optional[str] = None,
+                                               track_total_hits: Optional[Union[bool, int]] = None) \
+            -> Union[SearchDashboardResult, SearchTableResult]:
+        # the resource is resolved from the index
+        request = BatchSearchRequest(resource='', query_term=query_term, page_index=page_index, index=index,
+                                     search_request=search_request or {})
+        return await self._search(request=request, cursor=cursor, preference=preference,
+                                  track_total_hits=track_total_hits)
+
+    async def fetch_search_results_batch(self, *,
+                                         requests: List[BatchSearchRequest]) -> List[BatchSearchResult]:
+        results, pending, body, use_templates = self.proxy._build_batch_search(requests)
+        if body:
+            search = self.elasticsearch.msearch_template if use_templates else self.elasticsearch.msearch
+            response = await search(body=body, filter_path=MULTI_SEARCH_FILTER_PATH)
+            self.proxy._read_batch_responses(pending, response['responses'])
+        return results
+
+    async def _search(self, *, request: BatchSearchRequest, cursor: Optional[str], preference: Optional[str],
+                      track_total_hits: Optional[Union[bool, int]] = None) -> Any:
+        """
+        Runs a single search the way the fetch methods of ElasticsearchProxy do
+        """
+        index, name, query_param, search_result_model = self.proxy._prepare_search(request)
+        if not query_param:
+            # return empty result for blank query term
+            return search_result_model(total_results=0, results=[])
+
+        timeout = get_search_timeout(index)
+        params = dict(filter_path=SEARCH_FILTER_PATH, **get_preference_params(preference),
+                      **get_timeout_params(timeout))
+        try:
+            return await self._run_search(request=request, cursor=cursor, track_total_hits=track_total_hits,
+                                          index=index, name=name, query_param=query_param,
+                                          search_result_model=search_result_model, timeout=timeout, params=params)
+        except ConnectionTimeout:
+            if not timeout:
+                raise
+            LOGGING.warning(f'Search of {index} timed out')
+            record_search_timeout(index, 'client')
+            return search_result_model(total_results=0, results=[], partial=True)
+
+    async def _run_search(self, *, request: BatchSearchRequest, cursor: Optional[str],
+                          track_total_hits: Optional[Union[bool, int]], index: str, name: str, query_param: Any,
+                          search_result_model: Any, timeout: Optional[float], params: Dict[str, Any]) -> Any:
+        model = SEARCH_TEMPLATES[name][1]
+        if self.proxy._use_search_templates(request.page_index, cursor, track_total_hits):
+            body = self.proxy._get_search_template_body(name, query_param, request.page_index)
+            response = await self.elasticsearch.search_template(index=index, body=body, **params)
+            return self.proxy._get_search_result_from_response(response=response,
+                                                               model=model,
+                                                               search_result_model=search_result_model,
+                                                               start_from=body['params']['from'])
+
+        s = self.proxy._build_search(name, query_param)
+        s = s.extra(**get_timeout_body(timeout), **get_track_total_hits_body(track_total_hits))
+        if request.page_index == -1 and not cursor:
+            return await self._search_all(search=s, index=index, model=model,
+                                          search_result_model=search_result_model, params=params)
+
+        start_from = None  # type: Optional[int]
+        if cursor:
+            s = s.extra(search_after=decode_cursor(cursor))[0:self.page_size]
+        else:
+            start_from = request.page_index * self.page_size
+            s = s[start_from:start_from + self.page_size]
+
+        response = await self.elasticsearch.search(index=index, body=s.to_dict(), **params)
+        if response.get('timed_out'):
+            record_search_timeout(index, 'shard')
+        result = self.proxy._get_search_result_from_response(response=response,
+                                                             model=model,
+                                                             search_result_model=search_result_model,
+                                                             start_from=start_from,
+                                                             search_after=bool(cursor))
+
+        limit = get_count_limit(track_total_hits)
+        if limit is not None and needs_count(result, limit, start_from, self.page_size):
+            count_response = await self.elasticsearch.count(index=index,
+                                                            body={'query': s.to_dict()['query']},
+                                                            params=get_count_params(limit))
+            set_counted_total(result, count_response, limit, start_from)
+        return result
+
+    async def _search_all(self, *, search: Any, index: str, model: Any, search_result_model: Any,
+                          params: Dict[str, Any]) -> Any:
+        """
+        Fetches every result page after page with search_after, as ElasticsearchProxy does
+        """
+        results = []  # type: List[Any]
+        search_after = None  # type: Optional[List[Any]]
+        while True:
+            page = search.extra(search_after=search_after) if search_after else search
+            response = await self.elasticsearch.search(index=index,
+                                                       body=page[0:SEARCH_AFTER_BATCH_SIZE].to_dict(),
+                                                       **params)
+            page_result = self.proxy._get_search_result_from_response(response=response,
+                                                                      model=model,
+                                                                      search_result_model=search_result_model)
+            results.extend(page_result.results)
+
+            hits = response.get('hits', {}).get('hits', [])
+            # a page cut short by the timeout ends the results
+            search_after = hits[-1].get('sort') if len(hits) == SEARCH_AFTER_BATCH_SIZE \
+                and not page_result.partial else None
+            if not search_after:
+                if page_result.partial:
+                    record_search_timeout(index, 'shard')
+                total_results, total_relation = get_total_results(response.get('hits', {}).get('total', 0),
+                                                                  len(results), 0)
+                return search_result_model(total_results=total_results,
+                                           results=results,
+                                           total_relation=total_relation,
+                                           partial=page_result.partial)
@@ -4,7 +4,7 @@
 import logging
 from re import sub
 from typing import (
-    Any, Dict, List, Optional, Tuple,
+    Any, Dict, List, Optional, Tuple, Union,
 )
 
 from atlasclient.client import Atlas
@@ -197,7 +197,10 @@ class AtlasProxy(BaseProxy):
     def fetch_table_search_results(self, *,
                                    query_term: str,
                                    page_index: int = 0,
-                                   index: str = '') -> SearchTableResult:
+                                   index: str = '',
+                                   cursor: Optional[str] = None,
+                                   preference: Optional[str] = None,
+                                   track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
         """
         Conduct a 'Basic Search' in Amundsen UI.
 
@@ -208,8 +211,13 @@ class AtlasProxy(BaseProxy):
         :param query_term: Search Query Term
         :param page_index: Index of search page user is currently on (for pagination)
         :param index: Search Index (different resource corresponding to different index)
+        :param cursor: not supported, Atlas Basic Search only paginates with an offset
+        :param preference: ignored, Atlas has no shard copies to stick to
+        :param track_total_hits: ignored, Atlas always counts every result
         :return: SearchTableResult Object
         """
+        if cursor:
+            raise NotImplementedError('Cursor pagination is not supported by the Atlas proxy')
         if not query_term:
             # return empty result for blank query term
             return SearchTableResult(total_results=0, results=[])
@@ -224,7 +232,10 @@ class AtlasProxy(BaseProxy):
                                          query_term: str,
                                          search_request: dict,
                                          page_index: int = 0,
-                                         index: str = '') -> SearchTableResult:
+                                         index: str = '',
+                                         cursor: Optional[str] = None,
+                                         preference: Optional[str] = None,
+                                         track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
         """
         Conduct an 'Advanced Search' to narrow down search results with a use of filters.
 
@@ -235,8 +246,13 @@ class AtlasProxy(BaseProxy):
         :param search_request: Values from Filters
         :param page_index: Index of search page user is currently on (for pagination)
         :param index: Search Index (different resource corresponding to different index)
+        :param cursor: not supported, Atlas Basic Search only paginates with an offset
+        :param preference: ignored, Atlas has no shard copies to stick to
+        :param track_total_hits: ignored, Atlas always counts every result
         :return: SearchTableResult Object
         """
+        if cursor:
+            raise NotImplementedError('Cursor pagination is not supported by the Atlas proxy')
         _filters = search_request.get('filters', dict())
 
         db_filter_value = _filters.get('database')
@@ -271,7 +287,10 @@ class AtlasProxy(BaseProxy):
     def fetch_user_search_results(self, *,
                                   query_term: str,
                                   page_index: int = 0,
-                                  index: str = '') -> SearchUserResult:
+                                  index: str = '',
+                                  cursor: Optional[str] = None,
+                                  preference: Optional[str] = None,
+                                  track_total_hits: Optional[Union[bool, int]] = None) -> SearchUserResult:
         pass
 
     def update_document(self, *, data: List[Dict[str, Any]], index: str = '') -> str:
@@ -286,5 +305,8 @@ class AtlasProxy(BaseProxy):
     def fetch_dashboard_search_results(self, *,
                                        query_term: str,
                                        page_index: int = 0,
-                                       index: str = '') -> SearchDashboardResult:
+                                       index: str = '',
+                                       cursor: Optional[str] = None,
+                                       preference: Optional[str] = None,
+                                       track_total_hits: Optional[Union[bool, int]] = None) -> SearchDashboardResult:
         pass
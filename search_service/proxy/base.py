@@ -1,15 +1,26 @@
 # Copyright Contributors to the Amundsen project.
 # SPDX-License-Identifier: Apache-2.0
 
+import logging
 from abc import ABCMeta, abstractmethod
 from typing import (
-    Any, Dict, List, Union,
+    Any, Dict, List, Optional, Union,
 )
 
+from search_service.models.autocomplete import AutocompleteResult, Suggestion
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER, BatchSearchRequest, BatchSearchResult,
+)
+from search_service.models.count import SearchCountResult
 from search_service.models.dashboard import SearchDashboardResult
+from search_service.models.facets import SearchFacetsResult
 from search_service.models.table import SearchTableResult
 from search_service.models.user import SearchUserResult
 
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_AUTOCOMPLETE_SIZE = 5
+
 
 class BaseProxy(metaclass=ABCMeta):
     """
@@ -21,14 +32,20 @@ class BaseProxy(metaclass=ABCMeta):
     def fetch_table_search_results(self, *,
                                    query_term: str,
                                    page_index: int = 0,
-                                   index: str = '') -> SearchTableResult:
+                                   index: str = '',
+                                   cursor: Optional[str] = None,
+                                   preference: Optional[str] = None,
+                                   track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
         pass
 
     @abstractmethod
     def fetch_user_search_results(self, *,
                                   query_term: str,
                                   page_index: int = 0,
-                                  index: str = '') -> SearchUserResult:
+                                  index: str = '',
+                                  cursor: Optional[str] = None,
+                                  preference: Optional[str] = None,
+                                  track_total_hits: Optional[Union[bool, int]] = None) -> SearchUserResult:
         pass
 
     @abstractmethod
@@ -54,13 +71,165 @@ class BaseProxy(metaclass=ABCMeta):
                                          query_term: str,
                                          search_request: dict,
                                          page_index: int = 0,
-                                         index: str = '') -> Union[SearchTableResult,
-                                                                   SearchDashboardResult]:
+                                         index: str = '',
+                                         cursor: Optional[str] = None,
+                                         preference: Optional[str] = None,
+                                         track_total_hits: Optional[Union[bool, int]] = None) \
+            -> Union[SearchTableResult, SearchDashboardResult]:
         pass
 
     @abstractmethod
     def fetch_dashboard_search_results(self, *,
                                        query_term: str,
                                        page_index: int = 0,
-                                       index: str = '') -> SearchDashboardResult:
+                                       index: str = '',
+                                       cursor: Optional[str] = None,
+                                       preference: Optional[str] = None,
+                                       track_total_hits: Optional[Union[bool, int]] = None) -> SearchDashboardResult:
         pass
+
+    def fetch_search_results_batch(self, *,
+                                   requests: List[BatchSearchRequest]) -> List[BatchSearchResult]:
+        """
+        Runs several searches of any resource type at once.
+
+        This default implementation runs the searches one after another. Proxies backed by a search
+        engine with a multi search API should override it to run the batch in one round trip.
+
+        :param requests: searches to run
+        :return: one BatchSearchResult per request, in the same order. Failure of a search doesn't fail the batch.
+        """
+        results = []
+        for request in requests:
+            try:
+                results.append(BatchSearchResult(result=self._fetch_batch_item(request)))
+            except Exception as e:
+                LOGGER.exception('Failed to run a search of the batch')
+                results.append(BatchSearchResult(error=str(e)))
+        return results
+
+    def _fetch_batch_item(self, request: BatchSearchRequest) -> Any:
+        if request.search_request is not None:
+            if request.resource not in (RESOURCE_TABLE, RESOURCE_DASHBOARD):
+                raise ValueError(f'Search filter is not supported for resource {request.resource}')
+            return self.fetch_search_results_with_filter(query_term=request.query_term,
+                                                         search_request=request.search_request,
+                                                         page_index=request.page_index,
+                                                         index=request.index)
+        if request.resource == RESOURCE_TABLE:
+            return self.fetch_table_search_results(query_term=request.query_term,
+                                                   page_index=request.page_index,
+                                                   index=request.index)
+        if request.resource == RESOURCE_USER:
+            return self.fetch_user_search_results(query_term=request.query_term,
+                                                  page_index=request.page_index,
+                                                  index=request.index)
+        if request.resource == RESOURCE_DASHBOARD:
+            return self.fetch_dashboard_search_results(query_term=request.query_term,
+                                                       page_index=request.page_index,
+                                                       index=request.index)
+        raise ValueError(f'Unsupported resource {request.resource}')
+
+    def fetch_facets(self, *,
+                     query_term: str,
+                     search_request: Optional[dict] = None,
+                     index: str = '',
+                     preference: Optional[str] = None) -> SearchFacetsResult:
+        """
+        Counts the values of the filter categories of the resources matching a query term and filters,
+        without fetching any of them.
+
+        :param query_term: query term, matching every resource when empty
+        :param search_request: filters of the search, as in fetch_search_results_with_filter
+        :param index: table or dashboard index
+        :raises NotImplementedError: if the proxy doesn't support facets
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not support facets')
+
+    def fetch_count(self, *,
+                    query_term: str,
+                    resource: str,
+                    index: str = '',
+                    max_count: Optional[int] = None) -> SearchCountResult:
+        """
+        Counts the resources matching a query term, without fetching any of them.
+
+        This default implementation takes the total of the first page of a regular search, and counts every
+        result. Proxies backed by a search engine should override it with a count request stopping at {max_count}.
+
+        :param query_term: search query term
+        :param resource: RESOURCE_TABLE, RESOURCE_USER or RESOURCE_DASHBOARD
+        :param index: index of the resource
+        :param max_count: number of results to count at most, the count is a lower bound past it
+        """
+        search_result = self._fetch_batch_item(BatchSearchRequest(resource=resource, query_term=query_term,
+                                                                  index=index))
+        if search_result is None:
+            # the proxy doesn't search this resource
+            return SearchCountResult(total_results=0)
+        return SearchCountResult(total_results=search_result.total_results,
+                                 total_relation=getattr(search_result, 'total_relation', None))
+
+    def fetch_autocomplete_results(self, *,
+                                   prefix: str,
+                                   indices: Dict[str, str],
+                                   size: int = DEFAULT_AUTOCOMPLETE_SIZE) -> Dict[str, AutocompleteResult]:
+        """
+        Suggests the names of the resources starting with a prefix, as a user types it.
+
+        This default implementation takes the names of the first page of a regular search of every resource.
+        Proxies backed by a search engine should override it with a lookup of the prefix, much cheaper than
+        a search.
+
+        :param prefix: prefix typed by the user
+        :param indices: index of every resource type to suggest, among RESOURCE_TABLE, RESOURCE_USER
+        and RESOURCE_DASHBOARD
+        :param size: maximum number of suggestions per resource type
+        :return: top suggestions of every resource type, most used first. A resource type whose lookup
+        failed is left out.
+        """
+        results = {}  # type: Dict[str, AutocompleteResult]
+        for resource, index in indices.items():
+            try:
+                search_result = self._fetch_batch_item(BatchSearchRequest(resource=resource, query_term=prefix,
+                                                                          index=index))
+            except Exception:
+                LOGGER.exception(f'Failed to suggest {resource} names')
+                continue
+            if search_result is None:
+                # the proxy doesn't search this resource
+                continue
+            results[resource] = AutocompleteResult(results=[get_suggestion(resource, result)
+                                                            for result in search_result.results[:size]])
+        return results
+
+    def open_connections(self, *, count: int) -> int:
+        """
+        Opens connections of the proxy to its backend ahead of the first searches, at the warm-up of the proxy client.
+
+        This default implementation opens nothing, for proxies without a pool of connections.
+
+        :param count: number of connections to open per node of the backend, within the size of the pool
+        :return: number of connections opened
+        """
+        return 0
+
+    def prepare_searches(self) -> None:
+        """
+        Stores in the backend what the searches of the proxy need there, before the first search, at the warm-up of
+        the proxy client or at the creation of the app. Raises the error of the backend when that fails.
+
+        This default implementation prepares nothing, for proxies searching without anything stored in the backend.
+        """
+        pass
+
+
+def get_suggestion(resource: str, result: Any) -> Suggestion:
+    """
+    Suggestion of a Table, User or Dashboard model of {resource}
+    """
+    if resource == RESOURCE_TABLE:
+        return Suggestion(name=result.display_name or f'{result.schema}.{result.name}', key=result.key)
+    if resource == RESOURCE_USER:
+        return Suggestion(name=result.full_name or f'{result.first_name} {result.last_name}', key=result.email)
+    return Suggestion(name=result.name, key=result.uri)
@@ -0,0 +1,580 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import logging
+import time
+from collections import Counter, OrderedDict
+from threading import Event, Lock
+from typing import (  # noqa: F401
+    Any, Callable, Dict, Hashable, List, Optional, Tuple, Union,
+)
+
+from flask import current_app
+
+from search_service import config
+from search_service.models.autocomplete import AutocompleteResult
+from search_service.models.batch import BatchSearchRequest, BatchSearchResult
+from search_service.models.count import SearchCountResult
+from search_service.models.dashboard import SearchDashboardResult
+from search_service.models.facets import SearchFacetsResult
+from search_service.models.table import SearchTableResult
+from search_service.models.user import SearchUserResult
+from search_service.proxy.base import DEFAULT_AUTOCOMPLETE_SIZE, BaseProxy
+from search_service.proxy.statsd_utilities import incr_counter
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL_SEC = 60
+DEFAULT_EMPTY_RESULT_TTL_SEC = 10
+DEFAULT_COUNT_MAX_SIZE = 4096
+DEFAULT_COUNT_TTL_SEC = 300
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache where every entry also expires after its time to live.
+
+    Keys are tuples whose first element is the namespace (the search index) of the entry, so that
+    all entries of a namespace can be invalidated at once. Each invalidation bumps the generation
+    of the namespace: a value computed before the invalidation is not stored by put() when the caller
+    passes the generation it read before computing the value.
+    """
+
+    def __init__(self, *,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 ttl: float = DEFAULT_TTL_SEC,
+                 on_event: Optional[Callable[[str, int], None]] = None,
+                 timer: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param max_size: maximum number of entries, least recently used entries are evicted first
+        :param ttl: default time to live of an entry, in seconds
+        :param on_event: callback receiving an event name (hit, miss, eviction, expiration, invalidation)
+        and the number of entries the event applies to
+        :param timer: monotonic clock, injectable for tests
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._on_event = on_event
+        self._timer = timer
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._generations = {}  # type: Dict[Hashable, int]
+        self._lock = Lock()
+        self.stats = Counter()  # type: Counter
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """
+        Returns the value cached under {key} or None if it's absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._timer():
+                del self._entries[key]
+                entry = None
+                self._emit('expiration')
+            if entry is None:
+                self._emit('miss')
+                return None
+
+            self._entries.move_to_end(key)
+            self._emit('hit')
+            return entry[1]
+
+    def put(self, key: Tuple, value: Any, *,
+            ttl: Optional[float] = None,
+            generation: Optional[int] = None) -> None:
+        """
+        Caches {value} under {key}.
+
+        :param ttl: time to live of this entry, defaults to the cache ttl
+        :param generation: generation of the key namespace read before the value was computed. The value
+        is discarded if the namespace got invalidated in the meantime.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key[0], 0):
+                return
+
+            self._entries[key] = (self._timer() + ttl, value)
+            self._entries.move_to_end(key)
+
+            evicted = 0
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+            if evicted:
+                self._emit('eviction', evicted)
+
+    def generation(self, namespace: Hashable) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def invalidate(self, namespace: Hashable) -> None:
+        """
+        Drops every entry of {namespace}
+        """
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            keys = [key for key in self._entries if key[0] == namespace]
+            for key in keys:
+                del self._entries[key]
+            if keys:
+                self._emit('invalidation', len(keys))
+
+    def clear(self) -> None:
+        with self._lock:
+            for namespace in self._generations:
+                self._generations[namespace] += 1
+            self._entries.clear()
+
+    def _emit(self, event: str, count: int = 1) -> None:
+        self.stats[event] += count
+        if self._on_event:
+            self._on_event(event, count)
+
+
+class _Flight:
+    """
+    Call in flight of a SingleFlight, along with its outcome once done
+    """
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Optional[BaseException]
+
+
+class SingleFlight:
+    """
+    Thread safe de-duplication of identical concurrent calls: while a call of a key is in flight, the calls of
+    the same key wait for it and share its result, or its exception, instead of running again.
+    """
+
+    def __init__(self, *,
+                 on_event: Optional[Callable[[str, int], None]] = None) -> None:
+        """
+        :param on_event: callback receiving an event name (coalesced) and the number of calls it applies to
+        """
+        self._on_event = on_event
+        self._flights = {}  # type: Dict[Hashable, _Flight]
+        self._lock = Lock()
+        self.stats = Counter()  # type: Counter
+
+    def do(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        """
+        Returns the result of {call}, or of the call of {key} already in flight
+        """
+        with self._lock:
+            in_flight = self._flights.get(key)
+            if in_flight is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.stats['coalesced'] += 1
+
+        if in_flight is not None:
+            if self._on_event:
+                self._on_event('coalesced', 1)
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result
+
+        try:
+            flight.result = call()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+def normalize_query_term(query_term: Optional[str]) -> str:
+    """
+    Collapses the whitespaces of a query term, which don't change the result of a search
+    """
+    return ' '.join(query_term.split()) if query_term else ''
+
+
+def normalize_search_request(search_request: Optional[Dict]) -> str:
+    """
+    Serializes a filter search request to a canonical string. Filter values of a category are OR'ed
+    together, thus their order doesn't matter either.
+    """
+    if not search_request:
+        return ''
+
+    normalized = dict(search_request)
+    filters = search_request.get('filters')
+    if isinstance(filters, dict):
+        normalized['filters'] = {category: sorted(values, key=str) if isinstance(values, list) else values
+                                 for category, values in filters.items()}
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+class CachingProxy(BaseProxy):
+    """
+    Decorates any BaseProxy with an in-process cache of search results.
+
+    Cache key is (index, search type, query_term, search_request, page_index, page_size), all normalized.
+    Every document write to an index invalidates the cached results of the index.
+    Counts are cached apart from the search results, for longer, as their entries are tiny and badges showing
+    numbers of results repeat the same few queries.
+    With {coalesce}, concurrent identical searches missing the cache wait for a single call of the decorated proxy
+    and share its result (see SingleFlight), rather than all hitting the search engine at once.
+    Attributes that are not part of BaseProxy are delegated to the decorated proxy.
+    """
+
+    def __init__(self, *,
+                 proxy: BaseProxy,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 ttl: float = DEFAULT_TTL_SEC,
+                 empty_result_ttl: float = DEFAULT_EMPTY_RESULT_TTL_SEC,
+                 count_max_size: int = DEFAULT_COUNT_MAX_SIZE,
+                 count_ttl: float = DEFAULT_COUNT_TTL_SEC,
+                 coalesce: bool = False) -> None:
+        """
+        :param proxy: proxy client to cache results of
+        :param max_size: maximum number of cached search results
+        :param ttl: time to live of a cached search result, in seconds
+        :param empty_result_ttl: time to live of a cached search result without any result, in seconds
+        :param count_max_size: maximum number of cached counts
+        :param count_ttl: time to live of a cached count, in seconds
+        :param coalesce: whether concurrent identical searches share a single call of the decorated proxy
+        """
+        self.proxy = proxy
+        self.empty_result_ttl = empty_result_ttl
+        self.cache = TTLCache(max_size=max_size, ttl=ttl, on_event=self._on_cache_event)
+        self.count_cache = TTLCache(max_size=count_max_size, ttl=count_ttl, on_event=self._on_count_cache_event)
+        self.single_flight = SingleFlight(on_event=self._on_single_flight_event) if coalesce else None
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'proxy':
+            raise AttributeError(name)
+        return getattr(self.proxy, name)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters of the cache, to help sizing it
+        """
+        stats = dict(self.cache.stats)
+        stats['size'] = len(self.cache)
+        stats.update({f'count_{name}': value for name, value in self.count_cache.stats.items()})
+        stats['count_size'] = len(self.count_cache)
+        if self.single_flight:
+            stats.update(self.single_flight.stats)
+        return stats
+
+    @staticmethod
+    def _on_cache_event(event: str, count: int) -> None:
+        incr_counter(prefix=__name__, name=f'cache.{event}', count=count)
+
+    @staticmethod
+    def _on_count_cache_event(event: str, count: int) -> None:
+        incr_counter(prefix=__name__, name=f'count_cache.{event}', count=count)
+
+    @staticmethod
+    def _on_single_flight_event(event: str, count: int) -> None:
+        incr_counter(prefix=__name__, name=f'single_flight.{event}', count=count)
+
+    def _coalesce(self, key: Tuple, call: Callable[[], Any]) -> Any:
+        return self.single_flight.do(key, call) if self.single_flight else call()
+
+    def _invalidate(self, index: str) -> None:
+        namespace = self._resolve_index(index)
+        self.cache.invalidate(namespace)
+        self.count_cache.invalidate(namespace)
+
+    @staticmethod
+    def _resolve_index(index: str) -> str:
+        return index or current_app.config.get(config.ELASTICSEARCH_INDEX_KEY, '')
+
+    def _get_key(self, *,
+                 search_type: str,
+                 index: str,
+                 query_term: str,
+                 page_index: int,
+                 search_request: Optional[Dict] = None,
+                 cursor: Optional[str] = None,
+                 preference: Optional[str] = None,
+                 track_total_hits: Optional[Union[bool, int]] = None) -> Tuple:
+        return (self._resolve_index(index),
+                search_type,
+                normalize_query_term(query_term),
+                normalize_search_request(search_request),
+                page_index,
+                cursor,
+                getattr(self.proxy, 'page_size', None),
+                track_total_hits)
+
+    @staticmethod
+    def _search_kwargs(*, cursor: Optional[str], preference: Optional[str],
+                       track_total_hits: Optional[Union[bool, int]] = None) -> Dict[str, Any]:
+        # only passes the cursor, the preference and the counting of the results along when there are some,
+        # for proxies that don't support them. The preference only routes the search, and isn't part of the cache key.
+        kwargs = {name: value for name, value in (('cursor', cursor), ('preference', preference))
+                  if value}  # type: Dict[str, Any]
+        if track_total_hits is not None:
+            kwargs['track_total_hits'] = track_total_hits
+        return kwargs
+
+    def _put(self, key: Tuple, result: Any, generation: int) -> None:
+        # partial results of a search that ran out of time aren't cached, the next search may complete,
+        # and neither are the stale results standing in for a failed search
+        if result is not None and not getattr(result, 'partial', None) and not getattr(result, 'stale', None):
+            ttl = self.empty_result_ttl if not getattr(result, 'total_results', 0) else None
+            self.cache.put(key, result, ttl=ttl, generation=generation)
+
+    def _cached_search(self, *,
+                       search_type: str,
+                       index: str,
+                       query_term: str,
+                       page_index: int,
+                       search_request: Optional[Dict] = None,
+                       cursor: Optional[str] = None,
+                       track_total_hits: Optional[Union[bool, int]] = None,
+                       fetch: Callable[[], Any]) -> Any:
+        key = self._get_key(search_type=search_type,
+                            index=index,
+                            query_term=query_term,
+                            page_index=page_index,
+                            search_request=search_request,
+                            cursor=cursor,
+                            track_total_hits=track_total_hits)
+
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        def load() -> Any:
+            generation = self.cache.generation(key[0])
+            loaded = fetch()
+            self._put(key, loaded, generation)
+            return loaded
+
+        return self._coalesce(key, load)
+
+    def fetch_table_search_results(self, *,
+                                   query_term: str,
+                                   page_index: int = 0,
+                                   index: str = '',
+                                   cursor: Optional[str] = None,
+                                   preference: Optional[str] = None,
+                                   track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._cached_search(
+            search_type='table',
+            index=index,
+            query_term=query_term,
+            page_index=page_index,
+            cursor=cursor,
+            track_total_hits=track_total_hits,
+            fetch=lambda: self.proxy.fetch_table_search_results(query_term=query_term,
+                                                                page_index=page_index,
+                                                                index=index,
+                                                                **search_kwargs))
+
+    def fetch_user_search_results(self, *,
+                                  query_term: str,
+                                  page_index: int = 0,
+                                  index: str = '',
+                                  cursor: Optional[str] = None,
+                                  preference: Optional[str] = None,
+                                  track_total_hits: Optional[Union[bool, int]] = None) -> SearchUserResult:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._cached_search(
+            search_type='user',
+            index=index,
+            query_term=query_term,
+            page_index=page_index,
+            cursor=cursor,
+            track_total_hits=track_total_hits,
+            fetch=lambda: self.proxy.fetch_user_search_results(query_term=query_term,
+                                                               page_index=page_index,
+                                                               index=index,
+                                                               **search_kwargs))
+
+    def fetch_dashboard_search_results(self, *,
+                                       query_term: str,
+                                       page_index: int = 0,
+                                       index: str = '',
+                                       cursor: Optional[str] = None,
+                                       preference: Optional[str] = None,
+                                       track_total_hits: Optional[Union[bool, int]] = None) -> SearchDashboardResult:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._cached_search(
+            search_type='dashboard',
+            index=index,
+            query_term=query_term,
+            page_index=page_index,
+            cursor=cursor,
+            track_total_hits=track_total_hits,
+            fetch=lambda: self.proxy.fetch_dashboard_search_results(query_term=query_term,
+                                                                    page_index=page_index,
+                                                                    index=index,
+                                                                    **search_kwargs))
+
+    def fetch_search_results_with_filter(self, *,
+                                         query_term: str,
+                                         search_request: dict,
+                                         page_index: int = 0,
+                                         index: str = '',
+                                         cursor: Optional[str] = None,
+                                         preference: Optional[str] = None,
+                                         track_total_hits: Optional[Union[bool, int]] = None) \
+            -> Union[SearchTableResult, SearchDashboardResult]:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._cached_search(
+            search_type='filter',
+            index=index,
+            query_term=query_term,
+            page_index=page_index,
+            search_request=search_request,
+            cursor=cursor,
+            track_total_hits=track_total_hits,
+            fetch=lambda: self.proxy.fetch_search_results_with_filter(query_term=query_term,
+                                                                      search_request=search_request,
+                                                                      page_index=page_index,
+                                                                      index=index,
+                                                                      **search_kwargs))
+
+    def fetch_search_results_batch(self, *,
+                                   requests: List[BatchSearchRequest]) -> List[BatchSearchResult]:
+        """
+        Serves the searches of the batch from the cache, and runs the remaining ones as one batch
+        of the decorated proxy.
+        """
+        results = []  # type: List[Optional[BatchSearchResult]]
+        misses = []  # type: List[Tuple[int, Tuple, int]]
+        for position, request in enumerate(requests):
+            key = self._get_key(search_type='filter' if request.is_filter_search else request.resource,
+                                index=request.index,
+                                query_term=request.query_term,
+                                page_index=request.page_index,
+                                search_request=request.search_request)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results.append(BatchSearchResult(result=cached))
+            else:
+                results.append(None)
+                misses.append((position, key, self.cache.generation(key[0])))
+
+        if misses:
+            fetched = self.proxy.fetch_search_results_batch(requests=[requests[position]
+                                                                      for position, _, _ in misses])
+            for (position, key, generation), batch_result in zip(misses, fetched):
+                if batch_result.error is None:
+                    self._put(key, batch_result.result, generation)
+                results[position] = batch_result
+
+        return results  # type: ignore
+
+    def fetch_facets(self, *,
+                     query_term: str,
+                     search_request: Optional[dict] = None,
+                     index: str = '',
+                     preference: Optional[str] = None) -> SearchFacetsResult:
+        search_kwargs = self._search_kwargs(cursor=None, preference=preference)
+        return self._cached_search(
+            search_type='facets',
+            index=index,
+            query_term=query_term,
+            page_index=0,
+            search_request=search_request,
+            fetch=lambda: self.proxy.fetch_facets(query_term=query_term,
+                                                  search_request=search_request,
+                                                  index=index,
+                                                  **search_kwargs))
+
+    def fetch_autocomplete_results(self, *,
+                                   prefix: str,
+                                   indices: Dict[str, str],
+                                   size: int = DEFAULT_AUTOCOMPLETE_SIZE) -> Dict[str, AutocompleteResult]:
+        """
+        Serves the suggestions of every resource from the cache, and looks up the remaining resources at once
+        with the decorated proxy. Users typing the same first characters make these lookups very repetitive.
+        """
+        results = {}  # type: Dict[str, AutocompleteResult]
+        misses = {}  # type: Dict[str, Tuple[Tuple, int]]
+        for resource, index in indices.items():
+            key = (self._resolve_index(index), 'autocomplete', normalize_query_term(prefix), size)  # type: Tuple
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[resource] = cached
+            else:
+                misses[resource] = (key, self.cache.generation(key[0]))
+
+        if misses:
+            fetched = self.proxy.fetch_autocomplete_results(prefix=prefix,
+                                                            indices={resource: indices[resource]
+                                                                     for resource in misses},
+                                                            size=size)
+            for resource, result in fetched.items():
+                key, generation = misses[resource]
+                self.cache.put(key, result, ttl=None if result.results else self.empty_result_ttl,
+                               generation=generation)
+                results[resource] = result
+
+        return {resource: results[resource] for resource in indices if resource in results}
+
+    def fetch_count(self, *,
+                    query_term: str,
+                    resource: str,
+                    index: str = '',
+                    max_count: Optional[int] = None) -> SearchCountResult:
+        key = (self._resolve_index(index), resource, normalize_query_term(query_term), max_count)  # type: Tuple
+        result = self.count_cache.get(key)
+        if result is not None:
+            return result
+
+        def load() -> SearchCountResult:
+            generation = self.count_cache.generation(key[0])
+            loaded = self.proxy.fetch_count(query_term=query_term, resource=resource, index=index,
+                                            max_count=max_count)
+            self.count_cache.put(key, loaded, generation=generation)
+            return loaded
+
+        return self._coalesce(('count',) + key, load)
+
+    def create_document(self, *,
+                        data: List[Dict[str, Any]],
+                        index: str = '') -> str:
+        try:
+            return self.proxy.create_document(data=data, index=index)
+        finally:
+            self._invalidate(index)
+
+    def update_document(self, *,
+                        data: List[Dict[str, Any]],
+                        index: str = '') -> str:
+        try:
+            return self.proxy.update_document(data=data, index=index)
+        finally:
+            self._invalidate(index)
+
+    def delete_document(self, *,
+                        data: List[str],
+                        index: str = '') -> str:
+        try:
+            return self.proxy.delete_document(data=data, index=index)
+        finally:
+            self._invalidate(index)
+
+    def open_connections(self, *, count: int) -> int:
+        return self.proxy.open_connections(count=count)
+
+    def prepare_searches(self) -> None:
+        self.proxy.prepare_searches()
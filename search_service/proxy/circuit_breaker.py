@@ -0,0 +1,365 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+import time
+from threading import Lock
+from typing import (  # noqa: F401
+    Any, Callable, Dict, List, Optional, Tuple, Union,
+)
+
+import attr
+
+from search_service.models.autocomplete import AutocompleteResult
+from search_service.models.batch import BatchSearchRequest, BatchSearchResult
+from search_service.models.count import SearchCountResult
+from search_service.models.dashboard import SearchDashboardResult
+from search_service.models.facets import SearchFacetsResult
+from search_service.models.table import SearchTableResult
+from search_service.models.user import SearchUserResult
+from search_service.proxy.base import DEFAULT_AUTOCOMPLETE_SIZE, BaseProxy
+from search_service.proxy.cache import (
+    TTLCache, normalize_query_term, normalize_search_request,
+)
+from search_service.proxy.statsd_utilities import incr_counter
+
+LOGGER = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_SLOW_CALL_SEC = 2.0
+DEFAULT_OPEN_SEC = 30.0
+DEFAULT_STALE_MAX_SIZE = 4096
+DEFAULT_STALE_TTL_SEC = 3600
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling the proxy while the circuit is open, when no stale result can stand in
+    """
+
+
+class CircuitBreaker:
+    """
+    Thread safe circuit breaker.
+
+    The circuit opens after {failure_threshold} failed calls in a row, where calls slower than {slow_call_sec}
+    fail too. Calls are rejected while it's open. After {open_sec} seconds, a single trial call goes through
+    (half open): the circuit closes if it succeeds, and opens again otherwise.
+    """
+
+    def __init__(self, *,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 slow_call_sec: float = DEFAULT_SLOW_CALL_SEC,
+                 open_sec: float = DEFAULT_OPEN_SEC,
+                 on_state_change: Optional[Callable[[str], None]] = None,
+                 timer: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param on_state_change: callback receiving the new state of the circuit
+        :param timer: monotonic clock, injectable for tests
+        """
+        self.failure_threshold = failure_threshold
+        self.slow_call_sec = slow_call_sec
+        self.open_sec = open_sec
+        self._on_state_change = on_state_change
+        self._timer = timer
+        self._lock = Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call can go through. A call allowed while the circuit is half open is its trial,
+        whose outcome must be recorded.
+        """
+        with self._lock:
+            if self._state == OPEN and self._timer() - self._opened_at >= self.open_sec:
+                self._set_state(HALF_OPEN)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record(self, *, success: bool, duration: float) -> None:
+        """
+        Records the outcome of an allowed call that took {duration} seconds
+        """
+        failed = not success or duration > self.slow_call_sec
+        with self._lock:
+            self._trial_running = False
+            if not failed:
+                self._failures = 0
+                if self._state != CLOSED:
+                    self._set_state(CLOSED)
+                return
+
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._timer()
+                if self._state != OPEN:
+                    self._set_state(OPEN)
+
+    def release(self) -> None:
+        """
+        Ends an allowed call whose outcome tells nothing about the health of the proxy, e.g. an unsupported call
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def _set_state(self, state: str) -> None:
+        LOGGER.warning(f'Circuit breaker state changed from {self._state} to {state}')
+        self._state = state
+        if self._on_state_change:
+            self._on_state_change(state)
+
+
+def mark_stale(result: Any) -> Any:
+    """
+    Copy of a search result flagged as stale, leaving the result itself and its memoized serialization untouched
+    """
+    if attr.has(type(result)):
+        return attr.evolve(result, stale=True)
+    fields = {name: value for name, value in vars(result).items() if not name.startswith('_')}
+    return type(result)(**dict(fields, stale=True))
+
+
+class CircuitBreakerProxy(BaseProxy):
+    """
+    Decorates any BaseProxy with a circuit breaker, so that an overloaded search engine isn't hit by every request.
+
+    Searches keep their last good result in a local store. While the circuit is open, or when a search fails,
+    they return it marked stale rather than failing. Searches without any stored result, and the other calls,
+    fail with CircuitOpenError while the circuit is open. Document writes always go through.
+    Attributes that are not part of BaseProxy are delegated to the decorated proxy.
+    """
+
+    def __init__(self, *,
+                 proxy: BaseProxy,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 slow_call_sec: float = DEFAULT_SLOW_CALL_SEC,
+                 open_sec: float = DEFAULT_OPEN_SEC,
+                 stale_max_size: int = DEFAULT_STALE_MAX_SIZE,
+                 stale_ttl: float = DEFAULT_STALE_TTL_SEC,
+                 timer: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param proxy: proxy client to protect
+        :param failure_threshold: number of failed calls in a row opening the circuit
+        :param slow_call_sec: duration past which a call counts as failed, in seconds
+        :param open_sec: time before a trial call once the circuit is open, in seconds
+        :param stale_max_size: maximum number of stored search results
+        :param stale_ttl: time a stored search result can stand in for a failed search, in seconds
+        """
+        self.proxy = proxy
+        self._timer = timer
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold,
+                                      slow_call_sec=slow_call_sec,
+                                      open_sec=open_sec,
+                                      on_state_change=self._on_state_change,
+                                      timer=timer)
+        self.stale_results = TTLCache(max_size=stale_max_size, ttl=stale_ttl, timer=timer)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'proxy':
+            raise AttributeError(name)
+        return getattr(self.proxy, name)
+
+    @staticmethod
+    def _on_state_change(state: str) -> None:
+        incr_counter(prefix=__name__, name=f'circuit.{state}')
+
+    def _call(self, *, key: Optional[Tuple], fetch: Callable[[], Any]) -> Any:
+        """
+        Runs {fetch} through the circuit breaker. Results of searches with a {key} are stored, and stand in
+        for the search, marked stale, when the circuit is open or the search fails.
+        """
+        if not self.breaker.allow():
+            return self._get_stale(key, error=CircuitOpenError('Search is unavailable, the circuit is open'))
+
+        start = self._timer()
+        try:
+            result = fetch()
+        except (NotImplementedError, ValueError):
+            # invalid or unsupported calls, the proxy is fine
+            self.breaker.release()
+            raise
+        except Exception as e:
+            self.breaker.record(success=False, duration=self._timer() - start)
+            return self._get_stale(key, error=e)
+
+        # results of searches that ran out of time count as slow calls, and aren't good enough to be stored
+        partial = bool(getattr(result, 'partial', None))
+        self.breaker.record(success=not partial, duration=self._timer() - start)
+        if key is not None and result is not None and not partial:
+            self.stale_results.put(key, result)
+        return result
+
+    def _get_stale(self, key: Optional[Tuple], *, error: Exception) -> Any:
+        result = self.stale_results.get(key) if key is not None else None
+        if result is None:
+            raise error
+        incr_counter(prefix=__name__, name='stale')
+        return mark_stale(result)
+
+    @staticmethod
+    def _get_key(*,
+                 search_type: str,
+                 index: str,
+                 query_term: str,
+                 page_index: int,
+                 search_request: Optional[Dict] = None,
+                 cursor: Optional[str] = None,
+                 track_total_hits: Optional[Union[bool, int]] = None) -> Tuple:
+        return (index,
+                search_type,
+                normalize_query_term(query_term),
+                normalize_search_request(search_request),
+                page_index,
+                cursor,
+                track_total_hits)
+
+    @staticmethod
+    def _search_kwargs(*, cursor: Optional[str], preference: Optional[str],
+                       track_total_hits: Optional[Union[bool, int]] = None) -> Dict[str, Any]:
+        # only passes the optional arguments along when there are some, for proxies that don't support them
+        kwargs = {name: value for name, value in (('cursor', cursor), ('preference', preference))
+                  if value}  # type: Dict[str, Any]
+        if track_total_hits is not None:
+            kwargs['track_total_hits'] = track_total_hits
+        return kwargs
+
+    def fetch_table_search_results(self, *,
+                                   query_term: str,
+                                   page_index: int = 0,
+                                   index: str = '',
+                                   cursor: Optional[str] = None,
+                                   preference: Optional[str] = None,
+                                   track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._call(
+            key=self._get_key(search_type='table', index=index, query_term=query_term, page_index=page_index,
+                              cursor=cursor, track_total_hits=track_total_hits),
+            fetch=lambda: self.proxy.fetch_table_search_results(query_term=query_term,
+                                                                page_index=page_index,
+                                                                index=index,
+                                                                **search_kwargs))
+
+    def fetch_user_search_results(self, *,
+                                  query_term: str,
+                                  page_index: int = 0,
+                                  index: str = '',
+                                  cursor: Optional[str] = None,
+                                  preference: Optional[str] = None,
+                                  track_total_hits: Optional[Union[bool, int]] = None) -> SearchUserResult:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._call(
+            key=self._get_key(search_type='user', index=index, query_term=query_term, page_index=page_index,
+                              cursor=cursor, track_total_hits=track_total_hits),
+            fetch=lambda: self.proxy.fetch_user_search_results(query_term=query_term,
+                                                               page_index=page_index,
+                                                               index=index,
+                                                               **search_kwargs))
+
+    def fetch_dashboard_search_results(self, *,
+                                       query_term: str,
+                                       page_index: int = 0,
+                                       index: str = '',
+                                       cursor: Optional[str] = None,
+                                       preference: Optional[str] = None,
+                                       track_total_hits: Optional[Union[bool, int]] = None) -> SearchDashboardResult:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._call(
+            key=self._get_key(search_type='dashboard', index=index, query_term=query_term, page_index=page_index,
+                              cursor=cursor, track_total_hits=track_total_hits),
+            fetch=lambda: self.proxy.fetch_dashboard_search_results(query_term=query_term,
+                                                                    page_index=page_index,
+                                                                    index=index,
+                                                                    **search_kwargs))
+
+    def fetch_search_results_with_filter(self, *,
+                                         query_term: str,
+                                         search_request: dict,
+                                         page_index: int = 0,
+                                         index: str = '',
+                                         cursor: Optional[str] = None,
+                                         preference: Optional[str] = None,
+                                         track_total_hits: Optional[Union[bool, int]] = None) \
+            -> Union[SearchTableResult, SearchDashboardResult]:
+        search_kwargs = self._search_kwargs(cursor=cursor, preference=preference,
+                                            track_total_hits=track_total_hits)
+        return self._call(
+            key=self._get_key(search_type='filter', index=index, query_term=query_term, page_index=page_index,
+                              search_request=search_request, cursor=cursor, track_total_hits=track_total_hits),
+            fetch=lambda: self.proxy.fetch_search_results_with_filter(query_term=query_term,
+                                                                      search_request=search_request,
+                                                                      page_index=page_index,
+                                                                      index=index,
+                                                                      **search_kwargs))
+
+    def fetch_search_results_batch(self, *,
+                                   requests: List[BatchSearchRequest]) -> List[BatchSearchResult]:
+        return self._call(key=None, fetch=lambda: self.proxy.fetch_search_results_batch(requests=requests))
+
+    def fetch_facets(self, *,
+                     query_term: str,
+                     search_request: Optional[dict] = None,
+                     index: str = '',
+                     preference: Optional[str] = None) -> SearchFacetsResult:
+        search_kwargs = self._search_kwargs(cursor=None, preference=preference)
+        return self._call(key=None, fetch=lambda: self.proxy.fetch_facets(query_term=query_term,
+                                                                          search_request=search_request,
+                                                                          index=index,
+                                                                          **search_kwargs))
+
+    def fetch_count(self, *,
+                    query_term: str,
+                    resource: str,
+                    index: str = '',
+                    max_count: Optional[int] = None) -> SearchCountResult:
+        return self._call(key=None, fetch=lambda: self.proxy.fetch_count(query_term=query_term,
+                                                                         resource=resource,
+                                                                         index=index,
+                                                                         max_count=max_count))
+
+    def fetch_autocomplete_results(self, *,
+                                   prefix: str,
+                                   indices: Dict[str, str],
+                                   size: int = DEFAULT_AUTOCOMPLETE_SIZE) -> Dict[str, AutocompleteResult]:
+        return self._call(key=None, fetch=lambda: self.proxy.fetch_autocomplete_results(prefix=prefix,
+                                                                                        indices=indices,
+                                                                                        size=size))
+
+    def create_document(self, *,
+                        data: List[Dict[str, Any]],
+                        index: str = '') -> str:
+        return self.proxy.create_document(data=data, index=index)
+
+    def update_document(self, *,
+                        data: List[Dict[str, Any]],
+                        index: str = '') -> str:
+        return self.proxy.update_document(data=data, index=index)
+
+    def delete_document(self, *,
+                        data: List[str],
+                        index: str = '') -> str:
+        return self.proxy.delete_document(data=data, index=index)
+
+    def open_connections(self, *, count: int) -> int:
+        return self.proxy.open_connections(count=count)
+
+    def prepare_searches(self) -> None:
+        self.proxy.prepare_searches()
@@ -1,36 +1,117 @@
 # Copyright Contributors to the Amundsen project.
 # SPDX-License-Identifier: Apache-2.0
 
+import hashlib
 import itertools
+import json
 import logging
+import re
 import uuid
+from threading import Lock
 from typing import (
-    Any, Dict, List, Union,
+    Any, Callable, Dict, List, Mapping, Optional, Tuple, Union,
 )
 
-from amundsen_common.models.index_map import TABLE_INDEX_MAP, USER_INDEX_MAP
-from elasticsearch import Elasticsearch
-from elasticsearch.exceptions import NotFoundError
+from elasticsearch import VERSION as ELASTICSEARCH_CLIENT_VERSION, Elasticsearch
+from elasticsearch.exceptions import ConnectionTimeout, NotFoundError
 from elasticsearch_dsl import Search, query
-from flask import current_app
+from elasticsearch_dsl.response import Response
+from elasticsearch_dsl.utils import AttrDict
+from flask import current_app, has_app_context
 
 from search_service import config
 from search_service.api.dashboard import DASHBOARD_INDEX
 from search_service.api.table import TABLE_INDEX
 from search_service.api.user import USER_INDEX
+from search_service.models.autocomplete import AutocompleteResult, Suggestion
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER, BatchSearchRequest, BatchSearchResult,
+)
+from search_service.models.count import SearchCountResult
 from search_service.models.dashboard import Dashboard, SearchDashboardResult
-from search_service.models.search_result import SearchResult
+from search_service.models.facets import (
+    Facet, FacetValue, SearchFacetsResult,
+)
+from search_service.models.search_result import (
+    TOTAL_RELATION_GTE, SearchResult, decode_cursor, encode_cursor,
+)
 from search_service.models.table import SearchTableResult, Table
 from search_service.models.tag import Tag
 from search_service.models.user import SearchUserResult, User
-from search_service.proxy.base import BaseProxy
-from search_service.proxy.statsd_utilities import timer_with_counter
+from search_service.proxy.base import DEFAULT_AUTOCOMPLETE_SIZE, BaseProxy
+from search_service.proxy.elasticsearch_connection import (
+    get_client_options, get_hosts, open_pool_connections,
+)
+from search_service.proxy.elasticsearch_index_map import (
+    INDEX_MAPS, NGRAM_SIZE, NGRAM_SUBFIELD, SEARCH_FIELDS,
+)
+from search_service.proxy.statsd_utilities import incr_counter, timer_with_counter
 
 # Default Elasticsearch index to use, if none specified
 DEFAULT_ES_INDEX = 'table_search_index'
 
 LOGGING = logging.getLogger(__name__)
 
+# Sort of search results: relevance first, then tie breakers making the order total, which search_after requires
+# (see get_search_sort)
+SEARCH_SORT = (
+    '_score',
+    {'total_usage': {'order': 'desc', 'unmapped_type': 'long'}},
+)
+# resource -> keyword field holding the document id, the last tie breaker of the sort. Sorting on _id instead
+# would load the fielddata of _id on the heap of Elasticsearch 6.x nodes, on every search.
+SORT_TIE_BREAKERS = {
+    RESOURCE_TABLE: 'key',
+    RESOURCE_USER: 'email.raw',
+    # dynamically mapped by the dashboard index map, with a keyword subfield
+    RESOURCE_DASHBOARD: 'uri.keyword',
+}
+# Number of results per request when fetching every result
+SEARCH_AFTER_BATCH_SIZE = 1000
+# Searches of Elasticsearch 6.x count either every result or none (track_total_hits true or false), a number
+# of results to count at most came with Elasticsearch 7.0
+TRACK_TOTAL_HITS_LIMIT_SUPPORTED = ELASTICSEARCH_CLIENT_VERSION[0] >= 7
+
+# Parts of a search response that are read, Elasticsearch leaves everything else out of the response
+SEARCH_FILTER_PATH = 'timed_out,hits.total,hits.hits._id,hits.hits._source,hits.hits.sort'
+MULTI_SEARCH_FILTER_PATH = 'responses.timed_out,responses.hits.total,responses.hits.hits._id,' \
+                           'responses.hits.hits._source,responses.hits.hits.sort,responses.error'
+
+# Margin of the client side timeout of a search over its timeout in Elasticsearch, so that the shards time out
+# first and still return the hits they found
+SEARCH_TIMEOUT_MARGIN_SEC = 0.5
+
+# resource -> keyword fields whose prefix an autocomplete lookup matches, whether these fields are lowercase,
+# usage field ranking the suggestions, and source fields of the suggestions
+AUTOCOMPLETE_LOOKUPS = {
+    RESOURCE_TABLE: (('name.raw', 'display_name'), False, 'total_usage', ['display_name', 'schema', 'name', 'key']),
+    RESOURCE_DASHBOARD: (('name.raw',), True, 'total_usage', ['name', 'uri']),
+    RESOURCE_USER: (('full_name.raw', 'first_name.raw', 'last_name.raw', 'email.raw'), False, 'total_read',
+                    ['full_name', 'first_name', 'last_name', 'email']),
+}  # type: Dict[str, Tuple[Tuple[str, ...], bool, str, List[str]]]
+
+# index -> filter category -> keyword field counted by the facets of the category
+FACET_FIELDS = {
+    TABLE_INDEX: {
+        'database': 'database.raw',
+        'cluster': 'cluster.raw',
+        'schema': 'schema.raw',
+        'tag': 'tags',
+        'badges': 'badges',
+    },
+    DASHBOARD_INDEX: {
+        'product': 'product.keyword',
+        'group_name': 'group_name.raw',
+        'tag': 'tags',
+    },
+}  # type: Dict[str, Dict[str, str]]
+DEFAULT_FACET_SIZE = 20
+COUNT_FILTER_PATH = 'count,terminated_early'
+FACETS_FILTER_PATH = 'hits.total,aggregations.*.values.buckets.key,aggregations.*.values.buckets.doc_count'
+
+# values of filters with wildcards, which match with a wildcard clause rather than a terms clause
+WILDCARD_PATTERN = re.compile(r'[*?]')
+
 # mapping to translate request for table resources
 TABLE_MAPPING = {
     'badges': 'badges',
@@ -48,15 +129,234 @@ TAG_MAPPING = {
     'tags': Tag
 }
 
-# mapping to translate request for dashboard resources
+# mapping to translate request for dashboard resources, to keyword fields as the filters match with terms clauses
 DASHBOARD_MAPPING = {
     'group_name': 'group_name.raw',
     'name': 'name.raw',
-    'product': 'product',
+    'product': 'product.keyword',
     'tag': 'tags',
 }
 
 
+def get_tie_breaker(resource: str) -> List[Dict[str, Any]]:
+    """
+    Sort clause of the tie breaker of the searches of {resource}, if any
+    """
+    field = SORT_TIE_BREAKERS.get(resource)
+    return [{field: {'order': 'asc', 'unmapped_type': 'keyword'}}] if field else []
+
+
+def get_search_sort(model: Any) -> List[Any]:
+    """
+    Sort of the searches of {model} documents
+    """
+    sort = list(SEARCH_SORT)  # type: List[Any]
+    return sort + get_tie_breaker(model.get_type())
+
+
+_HYDRATION_PLANS = {}  # type: Dict[Any, List[Tuple[str, Optional[Callable[[Any], Any]]]]]
+
+
+def _to_tags(tag_class: Any) -> Callable[[Any], Any]:
+    # maps a list of badges or tags to instances of a tag class
+    return lambda values: [tag_class(tag_name=value) for value in values]
+
+
+def get_hydration_plan(model: Any) -> List[Tuple[str, Optional[Callable[[Any], Any]]]]:
+    """
+    Field plan to build {model} instances from documents: every attribute of the model read from
+    the documents, along with the function converting its value, if any. Computed once per model.
+    """
+    plan = _HYDRATION_PLANS.get(model)
+    if plan is None:
+        plan = _HYDRATION_PLANS[model] = [
+            (attr, _to_tags(TAG_MAPPING[attr]) if attr in TAG_MAPPING else None)
+            for attr in sorted(model.get_attrs() - {'id'})
+        ]
+    return plan
+
+
+def hydrate(*, model: Any, plan: List[Tuple[str, Optional[Callable[[Any], Any]]]],
+            payload: Dict[str, Any], id: str) -> Any:
+    """
+    Builds a {model} instance from the {payload} of a document, following the field {plan}
+    of the model (see get_hydration_plan)
+    """
+    result = {'id': id}
+    for attr, convert in plan:
+        if attr in payload:
+            value = payload[attr]
+            result[attr] = convert(value) if convert else value
+    return model(**result)
+
+
+class FilteredResponse(Response):
+    """
+    Search response trimmed with SEARCH_FILTER_PATH. Elasticsearch drops the keys of a filter path
+    without any value, e.g. hits.hits when nothing matches, which Response expects.
+    """
+
+    def __init__(self, search: Search, response: Dict[str, Any], doc_class: Any = None) -> None:
+        hits = response.setdefault('hits', {})
+        hits.setdefault('hits', [])
+        hits.setdefault('total', 0)
+        response.setdefault('timed_out', False)
+        super().__init__(search, response, doc_class=doc_class)
+
+
+# Query standing for the query parameter of the filtered search templates
+FILTER_QUERY_PLACEHOLDER = {'term': {'__query__': '__query__'}}
+
+# Searches, which can also run as stored search templates:
+# name -> (name of the method building the query DSL, model of the results)
+SEARCH_TEMPLATES = {
+    'table': ('_get_table_query', Table),
+    'user': ('_get_user_query', User),
+    'dashboard': ('_get_dashboard_query', Dashboard),
+    'table_filter': ('_get_filter_query', Table),
+    'dashboard_filter': ('_get_filter_query', Dashboard),
+}
+
+
+def get_preference_params(preference: Optional[str]) -> Dict[str, str]:
+    """
+    Search parameters routing the searches of a session to the same shard copies, whose caches are warm and whose
+    scores stay consistent from a page to the next. The session key is hashed: Elasticsearch reserves preferences
+    starting with an underscore, and session keys don't belong in its logs.
+    """
+    if not preference:
+        return {}
+    return {'preference': 'session_' + hashlib.sha1(preference.encode('utf-8')).hexdigest()[:16]}
+
+
+def get_search_timeout(index: str) -> Optional[float]:
+    """
+    Timeout of the searches of {index} in seconds, from ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC or else
+    ELASTICSEARCH_SEARCH_TIMEOUT_SEC. None when the searches have no timeout.
+    """
+    if not has_app_context():
+        return None
+    timeouts = current_app.config.get(config.ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC) or {}
+    return timeouts.get(index, current_app.config.get(config.ELASTICSEARCH_SEARCH_TIMEOUT_SEC))
+
+
+def get_timeout_body(timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Search body parameters of {timeout}: the shards stop searching when it's over and return the hits found so far
+    """
+    return {'timeout': f'{int(timeout * 1000)}ms'} if timeout else {}
+
+
+def get_timeout_params(timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Client parameters of {timeout}: the client gives up on the response SEARCH_TIMEOUT_MARGIN_SEC later
+    """
+    return {'request_timeout': timeout + SEARCH_TIMEOUT_MARGIN_SEC} if timeout else {}
+
+
+def record_search_timeout(index: str, kind: str) -> None:
+    """
+    Counts a search of {index} that ran out of time, next to the timers of the fetch methods:
+    'shard' when shards returned partial hits, 'client' when the client gave up on the response
+    """
+    incr_counter(prefix=__name__, name=f'timeout.{index}.{kind}')
+
+
+def get_total_results(total: Any, hit_count: int, start_from: Optional[int]) -> Tuple[int, Optional[str]]:
+    """
+    Number of results of a search, and TOTAL_RELATION_GTE if it is only a lower bound, from the total of its hits:
+    a number on Elasticsearch 6, -1 when the search didn't count them (track_total_hits false), or
+    {'value': 10000, 'relation': 'gte'} on Elasticsearch 7 when the search stopped counting them at a limit.
+
+    :param hit_count: number of hits of the page
+    :param start_from: offset of the page, None if the page got fetched with a cursor
+    """
+    if isinstance(total, Mapping):
+        return total.get('value', 0), TOTAL_RELATION_GTE if total.get('relation') == TOTAL_RELATION_GTE else None
+    if total is None or isinstance(total, int) and total < 0:
+        return (start_from or 0) + hit_count, TOTAL_RELATION_GTE
+    return total, None
+
+
+def get_count_limit(track_total_hits: Optional[Union[bool, int]]) -> Optional[int]:
+    """
+    Number of results that a search of {track_total_hits} counts at most with the count API rather than by itself,
+    on Elasticsearch 6.x which doesn't stop counting the results of a search at a number. None otherwise.
+    """
+    if TRACK_TOTAL_HITS_LIMIT_SUPPORTED or isinstance(track_total_hits, bool) or not track_total_hits:
+        return None
+    return track_total_hits
+
+
+def get_track_total_hits_body(track_total_hits: Optional[Union[bool, int]]) -> Dict[str, Any]:
+    """
+    Search body parameters of {track_total_hits}. A number turns into false on Elasticsearch 6.x, whose searches
+    then don't count their results, which the count API counts instead (see get_count_limit).
+    """
+    if track_total_hits is None:
+        return {}
+    if not TRACK_TOTAL_HITS_LIMIT_SUPPORTED and not isinstance(track_total_hits, bool):
+        return {'track_total_hits': False}
+    return {'track_total_hits': track_total_hits}
+
+
+def get_count_params(limit: int) -> Dict[str, Any]:
+    """
+    Parameters of a request of the count API counting up to {limit} matches per shard
+    """
+    return {'filter_path': COUNT_FILTER_PATH, 'terminate_after': limit}
+
+
+def needs_count(result: Any, limit: Optional[int], start_from: Optional[int], page_size: int) -> bool:
+    """
+    Whether the total of {result}, a search that didn't count its results, has to be counted up to {limit}: not when
+    the page isn't full, the total being the number of results up to the page then
+    """
+    if limit is None or result.total_relation != TOTAL_RELATION_GTE:
+        return False
+    return start_from is None or len(result.results) >= page_size
+
+
+def set_counted_total(result: Any, count_response: Dict[str, Any], limit: int, start_from: Optional[int]) -> Any:
+    """
+    Sets the total of {result}, a search that didn't count its results, from the response of a count request
+    up to {limit} matches per shard: at most {limit}, and a lower bound when the count stopped early.
+    """
+    count = count_response.get('count', 0)
+    result.total_results = max(min(count, limit), result.total_results)
+    result.total_relation = TOTAL_RELATION_GTE if count_response.get('terminated_early') or count > limit else None
+    if result.total_relation is None and start_from is not None \
+            and start_from + len(result.results) >= result.total_results:
+        result.next_cursor = None
+    return result
+
+
+_SOURCE_FIELDS = {}  # type: Dict[Any, List[str]]
+
+
+def get_source_fields(model: Any) -> List[str]:
+    """
+    Fields of the documents to fetch for {model}. The id comes from the document metadata.
+    """
+    fields = _SOURCE_FIELDS.get(model)
+    if fields is None:
+        fields = _SOURCE_FIELDS[model] = sorted(model.get_attrs() - {'id'})
+    return fields
+
+
+def get_autocomplete_suggestion(resource: str, source: Dict[str, Any]) -> Suggestion:
+    """
+    Suggestion of the source of a hit of an autocomplete lookup of {resource}
+    """
+    if resource == RESOURCE_TABLE:
+        return Suggestion(name=source.get('display_name') or f'{source.get("schema")}.{source.get("name")}',
+                          key=source.get('key', ''))
+    if resource == RESOURCE_USER:
+        return Suggestion(name=source.get('full_name') or f'{source.get("first_name")} {source.get("last_name")}',
+                          key=source.get('email', ''))
+    return Suggestion(name=source.get('name', ''), key=source.get('uri', ''))
+
+
 class ElasticsearchProxy(BaseProxy):
     """
     ElasticSearch connection handler
@@ -74,7 +374,8 @@ class ElasticsearchProxy(BaseProxy):
         Allows caller to pass a fully constructed Elasticsearch client, {elasticsearch_client}
         or constructs one from the parameters provided.
 
-        :param host: Elasticsearch host we should connect to
+        :param host: Elasticsearch host we should connect to, or several hosts separated by commas. Connections to
+        the hosts are set up with the ELASTICSEARCH_POOL_*, *_TIMEOUT_SEC, retry, compression and sniffing config.
         :param auth_user: user name to use for authentication
         :param auth_pw: user password to use for authentication
         :param elasticsearch_client: Elasticsearch client to use, if provided
@@ -84,38 +385,173 @@ class ElasticsearchProxy(BaseProxy):
             self.elasticsearch = client
         else:
             http_auth = (user, password) if user else None
-            self.elasticsearch = Elasticsearch(host, http_auth=http_auth)
+            client_options = get_client_options(current_app.config) if has_app_context() else {}
+            self.elasticsearch = Elasticsearch(get_hosts(host), http_auth=http_auth, **client_options)
 
         self.page_size = page_size
 
+        self._search_template_ids = None  # type: Optional[Dict[str, str]]
+        self._search_templates_lock = Lock()
+
     def _get_search_result(self, page_index: int,
                            client: Search,
                            model: Any,
-                           search_result_model: Any = SearchResult) -> Any:
+                           search_result_model: Any = SearchResult,
+                           cursor: Optional[str] = None) -> Any:
         """
         Common helper function to get result.
 
-        :param page_index:
+        Results are sorted by score, with total_usage and the document id field as tie breakers, so that the sort
+        values of the last result of a page identify where the next page starts.
+
+        :param page_index: index of the page to fetch with from+size, -1 to fetch every result.
+        Ignored when {cursor} is provided.
         :param client:
         :param model: The model to import result(table, user etc)
+        :param cursor: cursor to the page to fetch with search_after, as returned in next_cursor of a previous page
         :return:
         """
         if model is None:
             raise Exception('ES Doc model must be provided!')
 
-        results = []
-        # Use {page_index} to calculate index of results to fetch from
-        if page_index != -1:
+        client = client.sort(*get_search_sort(model)) \
+            .source(includes=get_source_fields(model)) \
+            .params(filter_path=SEARCH_FILTER_PATH) \
+            .response_class(FilteredResponse)
+        timeout = get_search_timeout(client._index[0] if client._index else '')
+        if timeout:
+            client = client.extra(**get_timeout_body(timeout)).params(**get_timeout_params(timeout))
+        if page_index == -1 and not cursor:
+            return self._get_all_search_results(client=client,
+                                                model=model,
+                                                search_result_model=search_result_model)
+
+        if cursor:
+            start_from = None  # type: Optional[int]
+            client = client.extra(search_after=decode_cursor(cursor))[0:self.page_size]
+        else:
+            # Use {page_index} to calculate index of results to fetch from
             start_from = page_index * self.page_size
-            end_at = start_from + self.page_size
-            client = client[start_from:end_at]
+            client = client[start_from:start_from + self.page_size]
+
+        total, results, hit_count, sort_values, timed_out = self._execute_search(client=client, model=model)
+        total_results, total_relation = get_total_results(total, hit_count, start_from)
+
+        next_cursor = self._get_next_cursor(sort_values=sort_values,
+                                            hit_count=hit_count,
+                                            start_from=start_from,
+                                            total_results=total_results,
+                                            total_relation=total_relation)
+
+        return search_result_model(total_results=total_results,
+                                   results=results,
+                                   next_cursor=next_cursor,
+                                   total_relation=total_relation,
+                                   partial=timed_out or None)
+
+    def _execute_search(self, *,
+                        client: Search,
+                        model: Any) -> Tuple[Any, List[Any], int, Optional[List[Any]], bool]:
+        """
+        Runs the search and hydrates its hits into {model} instances.
+
+        With ELASTICSEARCH_RAW_HYDRATION_ENABLED, the search runs through the low level client and the
+        models are built straight from the decoded response, instead of wrapping every hit with
+        elasticsearch_dsl first.
+
+        A search with a timeout (see get_search_timeout) that runs out of time returns the hits found by then,
+        or none at all if the client gave up on the response.
+
+        :return: total of the hits as returned by Elasticsearch, results, number of hits, sort values of the last hit,
+        whether the search ran out of time
+        """
+        index = client._index[0] if client._index else ''
+        try:
+            if current_app.config.get(config.ELASTICSEARCH_RAW_HYDRATION_ENABLED):
+                response = self.elasticsearch.search(index=client._index, body=client.to_dict(), **client._params)
+            else:
+                response = client.execute()
+        except ConnectionTimeout:
+            if 'request_timeout' not in client._params:
+                raise
+            LOGGING.warning(f'Search of {index} timed out')
+            record_search_timeout(index, 'client')
+            return 0, [], 0, None, True
+
+        if isinstance(response, dict):
+            hits = response.get('hits', {})
+            raw_hits = hits.get('hits', [])
+            timed_out = bool(response.get('timed_out'))
+            result = (hits.get('total', 0),
+                      self._get_results_from_raw_hits(hits=raw_hits, model=model),
+                      len(raw_hits),
+                      raw_hits[-1].get('sort') if raw_hits else None,
+                      timed_out)  # type: Tuple[Any, List[Any], int, Optional[List[Any]], bool]
         else:
-            # if page index is -1, return everything
-            client = client[0:client.count()]
+            dsl_hits = list(response)
+            total = response.hits.total
+            timed_out = response.timed_out is True
+            result = (total.to_dict() if isinstance(total, AttrDict) else total,
+                      self._get_results_from_hits(hits=dsl_hits, model=model),
+                      len(dsl_hits),
+                      self._get_sort_values(dsl_hits[-1]) if dsl_hits else None,
+                      timed_out)
+        if timed_out:
+            record_search_timeout(index, 'shard')
+        return result
 
-        response = client.execute()
+    def _get_next_cursor(self, *,
+                         sort_values: Optional[List[Any]],
+                         hit_count: int,
+                         start_from: Optional[int],
+                         total_results: int,
+                         total_relation: Optional[str] = None) -> Optional[str]:
+        """
+        Cursor to the page following a full page of results, None on the last page
+        :param start_from: offset of the page, None if the page got fetched with a cursor
+        :param total_relation: TOTAL_RELATION_GTE when {total_results} is a lower bound, which can't tell
+        whether the page is the last one
+        """
+        if not sort_values or hit_count < self.page_size:
+            return None
+        if start_from is not None and total_relation is None and start_from + hit_count >= total_results:
+            return None
+        return encode_cursor(sort_values)
+
+    def _get_all_search_results(self, *,
+                                client: Search,
+                                model: Any,
+                                search_result_model: Any) -> Any:
+        """
+        Fetches every result page after page with search_after. Unlike one response sized after
+        the number of matching documents, the cost of every page stays the same.
+        """
+        results = []  # type: List[Any]
+        search_after = None  # type: Optional[List[Any]]
+        while True:
+            page = client.extra(search_after=search_after) if search_after else client
+            total, page_results, hit_count, sort_values, timed_out = \
+                self._execute_search(client=page[0:SEARCH_AFTER_BATCH_SIZE], model=model)
+            results.extend(page_results)
+
+            # a page cut short by the timeout ends the results
+            search_after = sort_values if hit_count == SEARCH_AFTER_BATCH_SIZE and not timed_out else None
+            if not search_after:
+                total_results, total_relation = get_total_results(total, len(results), 0)
+                return search_result_model(total_results=total_results,
+                                           results=results,
+                                           total_relation=total_relation,
+                                           partial=timed_out or None)
 
-        for hit in response:
+    @staticmethod
+    def _get_sort_values(hit: Any) -> Optional[List[Any]]:
+        es_metadata = hit.__dict__.get('meta', {})
+        return list(es_metadata['sort']) if 'sort' in es_metadata else None
+
+    def _get_results_from_hits(self, *, hits: List[Any], model: Any) -> List[Any]:
+        results = []
+        plan = get_hydration_plan(model)
+        for hit in hits:
             try:
                 es_metadata = hit.__dict__.get('meta', {})
                 """
@@ -148,31 +584,76 @@ class ElasticsearchProxy(BaseProxy):
                 es_payload = hit.__dict__.get('_d_', {})
                 if not es_payload:
                     raise Exception('The ES doc not contain required field')
-                result = {}
-                for attr, val in es_payload.items():
-                    if attr in model.get_attrs():
-                        result[attr] = self._get_instance(attr=attr, val=val)
-                result['id'] = self._get_instance(attr='id', val=es_metadata['id'])
 
-                results.append(model(**result))
+                results.append(hydrate(model=model, plan=plan, payload=es_payload, id=es_metadata['id']))
             except Exception:
                 LOGGING.exception('The record doesnt contain specified field.')
 
-        return search_result_model(total_results=response.hits.total,
-                                   results=results)
+        return results
 
-    def _get_instance(self, attr: str, val: Any) -> Any:
-        if attr in TAG_MAPPING:
-            # maps a given badge or tag to a tag class
-            return [TAG_MAPPING[attr](tag_name=property_val) for property_val in val]  # type: ignore
-        else:
-            return val
+    @staticmethod
+    def _get_results_from_raw_hits(*, hits: List[Dict[str, Any]], model: Any) -> List[Any]:
+        """
+        Builds {model} instances from the hits of a decoded search response,
+        [{'_id': 'id', '_source': {...}}, ...]
+        """
+        results = []
+        plan = get_hydration_plan(model)
+        for hit in hits:
+            try:
+                es_payload = hit.get('_source')
+                if not es_payload:
+                    raise Exception('The ES doc not contain required field')
+
+                results.append(hydrate(model=model, plan=plan, payload=es_payload, id=hit['_id']))
+            except Exception:
+                LOGGING.exception('The record doesnt contain specified field.')
+
+        return results
+
+    def _get_search_result_from_response(self, response: Dict[str, Any],
+                                         model: Any,
+                                         search_result_model: Any = SearchResult,
+                                         start_from: Optional[int] = None,
+                                         search_after: bool = False) -> Any:
+        """
+        Same as _get_search_result, for a search response already decoded as dict
+        (e.g. one of the responses of a multi search request).
+
+        :param response: search response, {'hits': {'total': 1, 'hits': [{'_id': 'id', '_source': {...}}]}}
+        :param model: The model to import result(table, user etc)
+        :param start_from: offset of the page of a sorted search, to return the cursor to the next page
+        :param search_after: whether the page of a sorted search got fetched with a cursor,
+        to return the cursor to the next page
+        :return:
+        """
+        hits = response.get('hits', {})
+        results = self._get_results_from_raw_hits(hits=hits.get('hits', []), model=model)
+
+        total_results, total_relation = get_total_results(hits.get('total', 0), len(hits.get('hits', [])),
+                                                          start_from)
+
+        next_cursor = None
+        if (start_from is not None or search_after) and hits.get('hits'):
+            next_cursor = self._get_next_cursor(sort_values=hits['hits'][-1].get('sort'),
+                                                hit_count=len(hits['hits']),
+                                                start_from=start_from,
+                                                total_results=total_results,
+                                                total_relation=total_relation)
+
+        return search_result_model(total_results=total_results,
+                                   results=results,
+                                   next_cursor=next_cursor,
+                                   total_relation=total_relation,
+                                   partial=response.get('timed_out') or None)
 
     def _search_helper(self, page_index: int,
                        client: Search,
                        query_name: dict,
                        model: Any,
-                       search_result_model: Any = SearchResult) -> Any:
+                       search_result_model: Any = SearchResult,
+                       cursor: Optional[str] = None,
+                       track_total_hits: Optional[Union[bool, int]] = None) -> Any:
         """
         Constructs Elasticsearch Query DSL to:
           1. Use function score to customize scoring of search result. It currently uses "total_usage" field to score.
@@ -183,39 +664,128 @@ class ElasticsearchProxy(BaseProxy):
         :param page_index:
         :param client:
         :param query_name: name of query to query the ES
+        :param cursor: cursor to the page to fetch, takes precedence over {page_index}
+        :param track_total_hits: number of results to count at most, true to count every result or false
+        to count none, see get_total_results. Elasticsearch counts every result by default. Elasticsearch 6.x
+        counts up to the number with a count request after the search, when the page is full.
         :return:
         """
 
         if query_name:
             q = query.Q(query_name)
             client = client.query(q)
+        client = client.extra(**get_track_total_hits_body(track_total_hits))
+
+        result = self._get_search_result(page_index=page_index,
+                                         client=client,
+                                         model=model,
+                                         search_result_model=search_result_model,
+                                         cursor=cursor)
+
+        limit = get_count_limit(track_total_hits)
+        start_from = None if cursor else page_index * self.page_size
+        if limit is not None and (cursor or page_index >= 0) and needs_count(result, limit, start_from, self.page_size):
+            count_response = self.elasticsearch.count(index=client._index,
+                                                      body={'query': client.to_dict()['query']},
+                                                      params=get_count_params(limit))
+            set_counted_total(result, count_response, limit, start_from)
+        return result
 
-        return self._get_search_result(page_index=page_index,
-                                       client=client,
-                                       model=model,
-                                       search_result_model=search_result_model)
+    @staticmethod
+    def _use_search_templates(page_index: int, cursor: Optional[str],
+                              track_total_hits: Optional[Union[bool, int]] = None) -> bool:
+        # templates are written for the from+size pagination, counting every result, only
+        return bool(current_app.config.get(config.ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED)) \
+            and page_index >= 0 and not cursor and track_total_hits is None
 
-    @timer_with_counter
-    def fetch_table_search_results(self, *,
-                                   query_term: str,
-                                   page_index: int = 0,
-                                   index: str = '') -> SearchTableResult:
+    def _get_search_template_source(self, name: str) -> str:
         """
-        Query Elasticsearch and return results as list of Table objects
+        Mustache source of the search template {name}, generated from the query DSL of its query method
+        so that both ways of searching stay the same
+        """
+        # the query parameter of filtered searches is a query itself
+        query_placeholder = FILTER_QUERY_PLACEHOLDER if name.endswith('_filter') else '__query__'
+        placeholders = {
+            json.dumps(query_placeholder, sort_keys=True): '{{#toJson}}query{{/toJson}}',
+            '"__from__"': '{{from}}',
+            '"__size__"': '{{size}}',
+        }
+        s = self._build_search(name, query_placeholder).extra(**{'from': '__from__', 'size': '__size__'})
+        source = json.dumps(s.to_dict(), sort_keys=True)
+        for placeholder, tag in placeholders.items():
+            source = source.replace(placeholder, tag)
+        return source
 
-        :param query_term: search query term
-        :param page_index: index of search page user is currently on
-        :param index: current index for search. Provide different index for different resource.
-        :return: SearchResult Object
+    def register_search_templates(self) -> Dict[str, str]:
         """
-        current_index = index if index else \
-            current_app.config.get(config.ELASTICSEARCH_INDEX_KEY, DEFAULT_ES_INDEX)
-        if not query_term:
-            # return empty result for blank query term
-            return SearchTableResult(total_results=0, results=[])
+        Stores the search templates in the cluster, unless they are there already. Template id is suffixed
+        with a hash of the template source: a template tuned in the cluster is left as is until the query
+        changes in the code.
+        :return: id of every search template by name
+        """
+        if self._search_template_ids is not None:
+            return self._search_template_ids
+
+        with self._search_templates_lock:
+            if self._search_template_ids is None:
+                template_ids = {}
+                for name in SEARCH_TEMPLATES:
+                    source = self._get_search_template_source(name)
+                    template_id = f'amundsen_{name}_search_{hashlib.sha1(source.encode()).hexdigest()[:10]}'
+                    try:
+                        self.elasticsearch.get_script(id=template_id)
+                    except NotFoundError:
+                        LOGGING.info(f'Registering search template {template_id}')
+                        self.elasticsearch.put_script(id=template_id,
+                                                      body={'script': {'lang': 'mustache', 'source': source}})
+                    template_ids[name] = template_id
+                self._search_template_ids = template_ids
+
+        return self._search_template_ids
+
+    def _get_search_template_body(self, name: str, query_param: Any, page_index: int) -> Dict[str, Any]:
+        return {
+            'id': self.register_search_templates()[name],
+            'params': {
+                'query': query_param,
+                'from': page_index * self.page_size,
+                'size': self.page_size,
+            },
+        }
+
+    def _template_search(self, *,
+                         name: str,
+                         query_param: Any,
+                         index: str,
+                         page_index: int,
+                         search_result_model: Any,
+                         preference: Optional[str] = None) -> Any:
+        """
+        Runs the stored search template {name}, only the template id and its parameters go over the wire.
+        """
+        body = self._get_search_template_body(name, query_param, page_index)
+        # the timeout is only enforced by the client, search templates don't take any
+        timeout_params = get_timeout_params(get_search_timeout(index))
+        try:
+            response = self.elasticsearch.search_template(index=index, body=body, filter_path=SEARCH_FILTER_PATH,
+                                                          **get_preference_params(preference), **timeout_params)
+        except ConnectionTimeout:
+            if not timeout_params:
+                raise
+            LOGGING.warning(f'Search of {index} timed out')
+            record_search_timeout(index, 'client')
+            return search_result_model(total_results=0, results=[], partial=True)
+        return self._get_search_result_from_response(response=response,
+                                                     model=SEARCH_TEMPLATES[name][1],
+                                                     search_result_model=search_result_model,
+                                                     start_from=body['params']['from'])
 
-        s = Search(using=self.elasticsearch, index=current_index)
-        query_name = {
+    @staticmethod
+    def _get_table_query(query_term: str) -> Dict[str, Any]:
+        """
+        Query DSL of the table search, multi match query with table usage as score factor
+        """
+        return {
             "function_score": {
                 "query": {
                     "multi_match": {
@@ -239,11 +809,113 @@ class ElasticsearchProxy(BaseProxy):
             }
         }
 
+    @staticmethod
+    def _get_user_query(query_term: str) -> Dict[str, Any]:
+        """
+        Query DSL of the user search, multi match query without any weight(total_follow, total_own, total_use)
+        """
+        return {
+            "function_score": {
+                "query": {
+                    "multi_match": {
+                        "query": query_term,
+                        "fields": ["full_name.raw^30",
+                                   "full_name^5",
+                                   "first_name.raw^5",
+                                   "last_name.raw^5",
+                                   "first_name^3",
+                                   "last_name^3",
+                                   "email^3"],
+                        "operator": "and"
+                    }
+                }
+            }
+        }
+
+    @staticmethod
+    def _get_dashboard_query(query_term: str) -> Dict[str, Any]:
+        """
+        Query DSL of the dashboard search, multi match query with dashboard usage as score factor
+        """
+        return {
+            "function_score": {
+                "query": {
+                    "multi_match": {
+                        "query": query_term,
+                        "fields": ["name.raw^75",
+                                   "name^7",
+                                   "group_name.raw^15",
+                                   "group_name^7",
+                                   "description^3",
+                                   "query_names^3"]
+                    }
+                },
+                "field_value_factor": {
+                    "field": "total_usage",
+                    "modifier": "log2p"
+                }
+            }
+        }
+
+    @staticmethod
+    def _get_filter_query(filter_query: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Query DSL of the filtered search, with table usage as score factor
+        :param filter_query: bool query built by convert_query_json_to_query_dsl
+        """
+        return {
+            "function_score": {
+                "query": filter_query,
+                "field_value_factor": {
+                    "field": "total_usage",
+                    "modifier": "log2p"
+                }
+            }
+        }
+
+    @timer_with_counter
+    def fetch_table_search_results(self, *,
+                                   query_term: str,
+                                   page_index: int = 0,
+                                   index: str = '',
+                                   cursor: Optional[str] = None,
+                                   preference: Optional[str] = None,
+                                   track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
+        """
+        Query Elasticsearch and return results as list of Table objects
+
+        :param query_term: search query term
+        :param page_index: index of search page user is currently on
+        :param index: current index for search. Provide different index for different resource.
+        :param cursor: cursor to the search page to fetch instead of {page_index}
+        :param preference: key of the session of the search, e.g. a user id, searches of a session hit the same
+        shard copies
+        :return: SearchResult Object
+        """
+        current_index = index if index else \
+            current_app.config.get(config.ELASTICSEARCH_INDEX_KEY, DEFAULT_ES_INDEX)
+        if not query_term:
+            # return empty result for blank query term
+            return SearchTableResult(total_results=0, results=[])
+
+        if self._use_search_templates(page_index, cursor, track_total_hits):
+            return self._template_search(name='table',
+                                         query_param=query_term,
+                                         index=current_index,
+                                         page_index=page_index,
+                                         search_result_model=SearchTableResult,
+                                         preference=preference)
+
+        s = Search(using=self.elasticsearch, index=current_index).params(**get_preference_params(preference))
+        query_name = self._get_table_query(query_term)
+
         return self._search_helper(page_index=page_index,
                                    client=s,
                                    query_name=query_name,
                                    model=Table,
-                                   search_result_model=SearchTableResult)
+                                   search_result_model=SearchTableResult,
+                                   cursor=cursor,
+                                   track_total_hits=track_total_hits)
 
     @staticmethod
     def get_model_by_index(index: str) -> Any:
@@ -258,8 +930,12 @@ class ElasticsearchProxy(BaseProxy):
 
     @staticmethod
     def parse_filters(filter_list: Dict,
-                      index: str) -> str:
-        query_list = []  # type: List[str]
+                      index: str) -> List[Dict[str, Any]]:
+        """
+        Filter clauses of the filters of a search request, one per category, which match documents having
+        any of the values of the category
+        """
+        clauses = []  # type: List[Dict[str, Any]]
         if index == TABLE_INDEX:
             mapping = TABLE_MAPPING
         elif index == DASHBOARD_INDEX:
@@ -270,15 +946,26 @@ class ElasticsearchProxy(BaseProxy):
             mapped_category = mapping.get(category)
             if mapped_category is None:
                 LOGGING.warn(f'Unsupported filter category: {category} passed in list of filters')
-            elif item_list is '' or item_list == ['']:
+            elif item_list == '' or item_list == ['']:
                 LOGGING.warn(f'The filter value cannot be empty.In this case the filter {category} is ignored')
             else:
-                query_list.append(mapped_category + ':' + '(' + ' OR '.join(item_list) + ')')
+                values = item_list if isinstance(item_list, list) else [item_list]
+                clauses.append(ElasticsearchProxy._get_filter_clause(mapped_category, values))
 
-        if len(query_list) == 0:
-            return ''
+        return clauses
 
-        return ' AND '.join(query_list)
+    @staticmethod
+    def _get_filter_clause(field: str, values: List[Any]) -> Dict[str, Any]:
+        """
+        Clause matching documents whose {field} is any of {values}: a terms clause for the exact values, which
+        Elasticsearch caches, and a wildcard clause per value with wildcards
+        """
+        exact_values = [value for value in values if not WILDCARD_PATTERN.search(str(value))]
+        clauses = [{'terms': {field: exact_values}}] if exact_values else []  # type: List[Dict[str, Any]]
+        clauses.extend({'wildcard': {field: str(value)}} for value in values if WILDCARD_PATTERN.search(str(value)))
+        if len(clauses) == 1:
+            return clauses[0]
+        return {'bool': {'should': clauses, 'minimum_should_match': 1}}
 
     @staticmethod
     def validate_filter_values(search_request: dict) -> Any:
@@ -296,32 +983,32 @@ class ElasticsearchProxy(BaseProxy):
 
     @staticmethod
     def parse_query_term(query_term: str,
-                         index: str) -> str:
+                         index: str,
+                         ngram_subfields: bool = False) -> str:
+        """
+        Query string matching {query_term} in the searched fields of {index}, exactly or within their words.
+        Words containing the term match with wildcards, or with {ngram_subfields} with a phrase of the trigrams
+        of the term on the ngram subfields, which doesn't scan the whole term dictionary of the fields.
+        Terms shorter than a trigram keep matching with wildcards.
+        """
         # TODO: Might be some issue with using wildcard & underscore
         # https://discuss.elastic.co/t/wildcard-search-with-underscore-is-giving-no-result/114010/8
-        if index == TABLE_INDEX:
-            query_term = f'(name:(*{query_term}*) OR name:({query_term}) ' \
-                         f'OR schema:(*{query_term}*) OR schema:({query_term}) ' \
-                         f'OR description:(*{query_term}*) OR description:({query_term}) ' \
-                         f'OR column_names:(*{query_term}*) OR column_names:({query_term}) ' \
-                         f'OR column_descriptions:(*{query_term}*) OR column_descriptions:({query_term}))'
-        elif index == DASHBOARD_INDEX:
-            query_term = f'(name:(*{query_term}*) OR name:({query_term}) ' \
-                         f'OR group_name:(*{query_term}*) OR group_name:({query_term}) ' \
-                         f'OR query_names:(*{query_term}*) OR query_names:({query_term}) ' \
-                         f'OR description:(*{query_term}*) OR description:({query_term}) ' \
-                         f'OR tags:(*{query_term}*) OR tags:({query_term}) ' \
-                         f'OR badges:(*{query_term}*) OR badges:({query_term}) ' \
-                         f'OR product:(*{query_term}*) OR product:({query_term}))'
-        else:
+        if index not in SEARCH_FIELDS:
             raise Exception(f'index {index} doesnt exist nor support search filter')
-        return query_term
+
+        if ngram_subfields and len(query_term) >= NGRAM_SIZE:
+            phrase = query_term.replace('\\', '\\\\').replace('"', '\\"')
+            clauses = [f'{field}.{NGRAM_SUBFIELD}:("{phrase}") OR {field}:({query_term})'
+                       for field in SEARCH_FIELDS[index]]
+        else:
+            clauses = [f'{field}:(*{query_term}*) OR {field}:({query_term})' for field in SEARCH_FIELDS[index]]
+        return f'({" OR ".join(clauses)})'
 
     @classmethod
     def convert_query_json_to_query_dsl(self, *,
                                         search_request: dict,
                                         query_term: str,
-                                        index: str) -> str:
+                                        index: str) -> Dict[str, Any]:
         """
         Convert the generic query json to query DSL
         e.g
@@ -339,13 +1026,15 @@ class ElasticsearchProxy(BaseProxy):
 
         This generic JSON will convert into DSL depending on the backend engines.
 
-        E.g in Elasticsearch, it will become
-        'database':('hive' OR 'bigquery') AND
-        'schema':('test-schema1' OR 'test-schema2') AND
-        'table':('*amundsen*') AND
-        'column':('*ds*') AND
-        'tag':('test-tag')
+        E.g in Elasticsearch, it will become a bool query whose filter context holds
+        {'terms': {'database.raw': ['hive', 'bigquery']}},
+        {'terms': {'schema.raw': ['test-schema1', 'test-schema2']}},
+        {'wildcard': {'name.raw': '*amundsen*'}},
+        {'wildcard': {'column_names.raw': '*ds*'}},
+        {'terms': {'tags': ['test-tag']}}
         ```
+        and whose query context scores the query term, if any. Filter clauses don't score, and Elasticsearch caches
+        them from a search to the next.
 
         :param search_request:
         :param query_term:
@@ -353,45 +1042,51 @@ class ElasticsearchProxy(BaseProxy):
         :return: The search engine query DSL
         """
         filter_list = search_request.get('filters')
+        filter_clauses = []  # type: List[Dict[str, Any]]
         add_query = ''
-        query_dsl = ''
         if filter_list:
             valid_filters = self.validate_filter_values(search_request)
             if valid_filters is False:
                 raise Exception(
                     'The search filters contain invalid characters and thus cannot be handled by ES')
-            query_dsl = self.parse_filters(filter_list,
-                                           index)
+            filter_clauses = self.parse_filters(filter_list,
+                                                index)
 
         if query_term:
+            ngram_subfields = has_app_context() and \
+                bool(current_app.config.get(config.ELASTICSEARCH_NGRAM_SUBFIELDS_ENABLED))
             add_query = self.parse_query_term(query_term,
-                                              index)
+                                              index,
+                                              ngram_subfields=ngram_subfields)
 
-        if not query_dsl and not add_query:
+        if not filter_clauses and not add_query:
             raise Exception('Unable to convert parameters to valid query dsl')
 
-        result = ''
-        if query_dsl and add_query:
-            result = query_dsl + ' AND ' + add_query
-        elif add_query and not query_dsl:
-            result = add_query
-        elif query_dsl and not add_query:
-            result = query_dsl
-
-        return result
+        bool_query = {}  # type: Dict[str, Any]
+        if filter_clauses:
+            bool_query['filter'] = filter_clauses
+        if add_query:
+            bool_query['must'] = {'query_string': {'query': add_query}}
+        return {'bool': bool_query}
 
     @timer_with_counter
     def fetch_search_results_with_filter(self, *,
                                          query_term: str,
                                          search_request: dict,
                                          page_index: int = 0,
-                                         index: str = '') -> Union[SearchDashboardResult,
-                                                                   SearchTableResult]:
+                                         index: str = '',
+                                         cursor: Optional[str] = None,
+                                         preference: Optional[str] = None,
+                                         track_total_hits: Optional[Union[bool, int]] = None) \
+            -> Union[SearchDashboardResult, SearchTableResult]:
         """
         Query Elasticsearch and return results as list of Table objects
         :param search_request: A json representation of search request
         :param page_index: index of search page user is currently on
         :param index: current index for search. Provide different index for different resource.
+        :param cursor: cursor to the search page to fetch instead of {page_index}
+        :param preference: key of the session of the search, e.g. a user id, searches of a session hit the same
+        shard copies
         :return: SearchResult Object
         """
         current_index = index if index else \
@@ -407,80 +1102,161 @@ class ElasticsearchProxy(BaseProxy):
             return search_model(total_results=0, results=[])
 
         try:
-            query_string = self.convert_query_json_to_query_dsl(search_request=search_request,
+            filter_query = self.convert_query_json_to_query_dsl(search_request=search_request,
                                                                 query_term=query_term,
-                                                                index=current_index)  # type: str
+                                                                index=current_index)
         except Exception as e:
             LOGGING.exception(e)
             # return nothing if any exception is thrown under the hood
             return search_model(total_results=0, results=[])
 
-        s = Search(using=self.elasticsearch, index=current_index)
+        if self._use_search_templates(page_index, cursor, track_total_hits):
+            return self._template_search(name=f'{self.get_model_by_index(current_index).get_type()}_filter',
+                                         query_param=filter_query,
+                                         index=current_index,
+                                         page_index=page_index,
+                                         search_result_model=search_model,
+                                         preference=preference)
 
-        query_name = {
-            "function_score": {
-                "query": {
-                    "query_string": {
-                        "query": query_string
-                    }
-                },
-                "field_value_factor": {
-                    "field": "total_usage",
-                    "modifier": "log2p"
-                }
-            }
-        }
+        s = Search(using=self.elasticsearch, index=current_index).params(**get_preference_params(preference))
+        query_name = self._get_filter_query(filter_query)
 
         model = self.get_model_by_index(current_index)
         return self._search_helper(page_index=page_index,
                                    client=s,
                                    query_name=query_name,
                                    model=model,
-                                   search_result_model=search_model)
+                                   search_result_model=search_model,
+                                   cursor=cursor,
+                                   track_total_hits=track_total_hits)
+
+    @timer_with_counter
+    def fetch_facets(self, *,
+                     query_term: str,
+                     search_request: Optional[dict] = None,
+                     index: str = '',
+                     preference: Optional[str] = None) -> SearchFacetsResult:
+        """
+        Counts the values of the filter categories of FACET_FIELDS with a single search of size 0, which
+        Elasticsearch serves from its shard request cache until the next refresh of the index.
+
+        The filters only apply to the hits (post_filter), and the values of each category are counted with
+        the filters of the other categories, so that selecting a value of a category doesn't hide its other values.
+        """
+        facet_fields = FACET_FIELDS.get(index)
+        if facet_fields is None:
+            raise Exception(f'index {index} doesnt exist nor support search facets')
+
+        search_request = search_request or {}
+        filters = search_request.get('filters') or {}
+        if filters and self.validate_filter_values(search_request) is False:
+            raise Exception('The search filters contain invalid characters and thus cannot be handled by ES')
+        filter_clauses = {category: self.parse_filters({category: values}, index)
+                          for category, values in filters.items()}
+
+        body = {
+            'size': 0,
+            'query': self.convert_query_json_to_query_dsl(search_request={}, query_term=query_term, index=index)
+            if query_term else {'match_all': {}},
+            'aggs': self._get_facet_aggregations(facet_fields, filter_clauses),
+        }  # type: Dict[str, Any]
+        all_clauses = [clause for clauses in filter_clauses.values() for clause in clauses]
+        if all_clauses:
+            body['post_filter'] = {'bool': {'filter': all_clauses}}
+
+        response = self.elasticsearch.search(index=index, body=body, request_cache=True,
+                                             filter_path=FACETS_FILTER_PATH, **get_preference_params(preference))
+        aggregations = response.get('aggregations', {})
+        facets = []
+        for category in facet_fields:
+            buckets = aggregations.get(category, {}).get('values', {}).get('buckets', [])
+            facets.append(Facet(name=category, values=[FacetValue(value=bucket['key'], count=bucket['doc_count'])
+                                                       for bucket in buckets]))
+        return SearchFacetsResult(total_results=response['hits']['total'], facets=facets)
+
+    @timer_with_counter
+    def fetch_count(self, *,
+                    query_term: str,
+                    resource: str,
+                    index: str = '',
+                    max_count: Optional[int] = None) -> SearchCountResult:
+        """
+        Counts the resources matching the query of the search of {resource} with the count API, which neither
+        scores nor fetches any document. With {max_count}, every shard stops counting after {max_count} matches
+        (terminate_after), which all Elasticsearch versions support, and the count is a lower bound when a shard
+        stopped early.
+        """
+        index, name, query_param, _ = self._prepare_search(BatchSearchRequest(resource=resource,
+                                                                              query_term=query_term,
+                                                                              index=index))
+        if not query_param:
+            # return empty result for blank query term
+            return SearchCountResult(total_results=0)
+
+        params = {'filter_path': COUNT_FILTER_PATH}  # type: Dict[str, Any]
+        if max_count is not None:
+            params['terminate_after'] = max_count
+        body = {'query': self._build_search(name, query_param).to_dict()['query']}
+        response = self.elasticsearch.count(index=index, body=body, params=params)
+        return SearchCountResult(total_results=response.get('count', 0),
+                                 total_relation=TOTAL_RELATION_GTE if response.get('terminated_early') else None)
+
+    @staticmethod
+    def _get_facet_aggregations(facet_fields: Dict[str, str],
+                                filter_clauses: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        size = current_app.config.get(config.SEARCH_FACET_SIZE, DEFAULT_FACET_SIZE)
+        aggregations = {}  # type: Dict[str, Any]
+        for category, field in facet_fields.items():
+            other_clauses = [clause for other_category, clauses in filter_clauses.items() if other_category != category
+                             for clause in clauses]
+            aggregations[category] = {
+                'filter': {'bool': {'filter': other_clauses}},
+                'aggs': {'values': {'terms': {'field': field, 'size': size}}},
+            }
+        return aggregations
 
     @timer_with_counter
     def fetch_user_search_results(self, *,
                                   query_term: str,
                                   page_index: int = 0,
-                                  index: str = '') -> SearchUserResult:
+                                  index: str = '',
+                                  cursor: Optional[str] = None,
+                                  preference: Optional[str] = None,
+                                  track_total_hits: Optional[Union[bool, int]] = None) -> SearchUserResult:
         if not index:
             raise Exception('Index cant be empty for user search')
         if not query_term:
             # return empty result for blank query term
             return SearchUserResult(total_results=0, results=[])
 
-        s = Search(using=self.elasticsearch, index=index)
+        if self._use_search_templates(page_index, cursor, track_total_hits):
+            return self._template_search(name='user',
+                                         query_param=query_term,
+                                         index=index,
+                                         page_index=page_index,
+                                         search_result_model=SearchUserResult,
+                                         preference=preference)
 
-        # Don't use any weight(total_follow, total_own, total_use)
-        query_name = {
-            "function_score": {
-                "query": {
-                    "multi_match": {
-                        "query": query_term,
-                        "fields": ["full_name.raw^30",
-                                   "full_name^5",
-                                   "first_name.raw^5",
-                                   "last_name.raw^5",
-                                   "first_name^3",
-                                   "last_name^3",
-                                   "email^3"],
-                        "operator": "and"
-                    }
-                }
-            }
-        }
+        s = Search(using=self.elasticsearch, index=index).params(**get_preference_params(preference))
+
+        query_name = self._get_user_query(query_term)
 
         return self._search_helper(page_index=page_index,
                                    client=s,
                                    query_name=query_name,
                                    model=User,
-                                   search_result_model=SearchUserResult)
+                                   search_result_model=SearchUserResult,
+                                   cursor=cursor,
+                                   track_total_hits=track_total_hits)
 
     @timer_with_counter
     def fetch_dashboard_search_results(self, *,
                                        query_term: str,
                                        page_index: int = 0,
-                                       index: str = '') -> SearchDashboardResult:
+                                       index: str = '',
+                                       cursor: Optional[str] = None,
+                                       preference: Optional[str] = None,
+                                       track_total_hits: Optional[Union[bool, int]] = None) -> SearchDashboardResult:
         """
         Fetch dashboard search result with fuzzy search
 
@@ -495,33 +1271,208 @@ class ElasticsearchProxy(BaseProxy):
         if not query_term:
             # return empty result for blank query term
             return SearchDashboardResult(total_results=0, results=[])
-        s = Search(using=self.elasticsearch, index=current_index)
 
-        query_name = {
-            "function_score": {
-                "query": {
-                    "multi_match": {
-                        "query": query_term,
-                        "fields": ["name.raw^75",
-                                   "name^7",
-                                   "group_name.raw^15",
-                                   "group_name^7",
-                                   "description^3",
-                                   "query_names^3"]
-                    }
-                },
-                "field_value_factor": {
-                    "field": "total_usage",
-                    "modifier": "log2p"
-                }
-            }
-        }
+        if self._use_search_templates(page_index, cursor, track_total_hits):
+            return self._template_search(name='dashboard',
+                                         query_param=query_term,
+                                         index=current_index,
+                                         page_index=page_index,
+                                         search_result_model=SearchDashboardResult,
+                                         preference=preference)
+
+        s = Search(using=self.elasticsearch, index=current_index).params(**get_preference_params(preference))
+        query_name = self._get_dashboard_query(query_term)
 
         return self._search_helper(page_index=page_index,
                                    client=s,
                                    query_name=query_name,
                                    model=Dashboard,
-                                   search_result_model=SearchDashboardResult)
+                                   search_result_model=SearchDashboardResult,
+                                   cursor=cursor,
+                                   track_total_hits=track_total_hits)
+
+    @timer_with_counter
+    def fetch_search_results_batch(self, *,
+                                   requests: List[BatchSearchRequest]) -> List[BatchSearchResult]:
+        """
+        Runs the batch of searches as a single Elasticsearch multi search request, or multi search template
+        request when search templates are enabled.
+        `Link https://www.elastic.co/guide/en/elasticsearch/reference/6.2/search-multi-search.html`_
+
+        :param requests: searches to run
+        :return: one BatchSearchResult per request, in the same order
+        """
+        results, pending, body, use_templates = self._build_batch_search(requests)
+        if body:
+            search = self.elasticsearch.msearch_template if use_templates else self.elasticsearch.msearch
+            self._read_batch_responses(pending, search(body=body, filter_path=MULTI_SEARCH_FILTER_PATH)['responses'])
+        return results
+
+    def _build_batch_search(self, requests: List[BatchSearchRequest]) -> Tuple[List[BatchSearchResult],
+                                                                               List[Tuple[Any, ...]],
+                                                                               List[Dict[str, Any]],
+                                                                               bool]:
+        """
+        Builds the body of the multi search request of a batch. Searches without any result for sure, and searches
+        that can't be run, get their result right away.
+
+        :return: one BatchSearchResult per request, the searches pending on the response of the multi search request,
+        the body of the request, and whether it is a multi search template request
+        """
+        use_templates = self._use_search_templates(page_index=0, cursor=None)
+        results = [BatchSearchResult() for _ in requests]
+        pending = []  # type: List[Tuple[Any, ...]]
+        body = []  # type: List[Dict[str, Any]]
+
+        for request, batch_result in zip(requests, results):
+            try:
+                index, name, query_param, search_result_model = self._prepare_batch_search(request)
+            except Exception as e:
+                LOGGING.exception('Unable to prepare a search of the batch')
+                batch_result.error = str(e)
+                continue
+
+            if not query_param:
+                # return empty result for blank query term
+                batch_result.result = search_result_model(total_results=0, results=[])
+                continue
+
+            model = SEARCH_TEMPLATES[name][1]
+            start_from = request.page_index * self.page_size
+            body.append({'index': index})
+            if use_templates:
+                body.append(self._get_search_template_body(name, query_param, request.page_index))
+            else:
+                s = self._build_search(name, query_param)
+                body.append(s[start_from:start_from + self.page_size].to_dict())
+            pending.append((batch_result, start_from, model, search_result_model))
+        return results, pending, body, use_templates
+
+    def _read_batch_responses(self, pending: List[Tuple[Any, ...]], responses: List[Dict[str, Any]]) -> None:
+        """
+        Sets the result, or the error, of the searches pending on the responses of a multi search request
+        """
+        for (batch_result, start_from, model, search_result_model), response in zip(pending, responses):
+            if 'error' in response:
+                error = response['error']
+                batch_result.error = error.get('reason', str(error)) if isinstance(error, dict) else str(error)
+                continue
+            batch_result.result = self._get_search_result_from_response(response=response,
+                                                                        model=model,
+                                                                        search_result_model=search_result_model,
+                                                                        start_from=start_from)
+
+    def open_connections(self, *, count: int) -> int:
+        return open_pool_connections(self.elasticsearch, count)
+
+    def prepare_searches(self) -> None:
+        """
+        Registers the search templates when they are enabled, so that no search waits on their registration
+        """
+        if current_app.config.get(config.ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED):
+            template_ids = self.register_search_templates()
+            LOGGING.info(f'Search templates ready: {", ".join(sorted(template_ids.values()))}')
+
+    @timer_with_counter
+    def fetch_autocomplete_results(self, *,
+                                   prefix: str,
+                                   indices: Dict[str, str],
+                                   size: int = DEFAULT_AUTOCOMPLETE_SIZE) -> Dict[str, AutocompleteResult]:
+        """
+        Looks up the prefix on the keyword fields of every resource (see AUTOCOMPLETE_LOOKUPS), in a single
+        multi search request. Prefix queries on keywords only walk the terms starting with the prefix, and run in
+        filter context: no score, just the most used resources first.
+        """
+        prefix = prefix.strip()
+        if not prefix:
+            return {resource: AutocompleteResult() for resource in indices}
+
+        body = []  # type: List[Dict[str, Any]]
+        for resource, index in indices.items():
+            body.append({'index': index})
+            body.append(self._get_autocomplete_body(resource, prefix, size))
+        responses = self.elasticsearch.msearch(body=body, filter_path=MULTI_SEARCH_FILTER_PATH)['responses']
+
+        results = {}  # type: Dict[str, AutocompleteResult]
+        for resource, response in zip(indices, responses):
+            if 'error' in response:
+                LOGGING.error(f'Failed to suggest {resource} names: {response["error"]}')
+                continue
+            results[resource] = AutocompleteResult(results=[get_autocomplete_suggestion(resource, hit['_source'])
+                                                            for hit in response['hits'].get('hits', [])])
+        return results
+
+    @staticmethod
+    def _get_autocomplete_body(resource: str, prefix: str, size: int) -> Dict[str, Any]:
+        fields, lowercase, usage_field, source_fields = AUTOCOMPLETE_LOOKUPS[resource]
+        prefixes = [prefix.lower()] if lowercase else sorted({prefix, prefix.lower()})
+        return {
+            'size': size,
+            'query': {'bool': {'filter': {'bool': {
+                'should': [{'prefix': {field: value}} for field in fields for value in prefixes],
+                'minimum_should_match': 1,
+            }}}},
+            'sort': [{usage_field: {'order': 'desc', 'unmapped_type': 'long'}}] + get_tie_breaker(resource),
+            '_source': source_fields,
+        }
+
+    def _build_search(self, name: str, query_param: Any) -> Search:
+        """
+        Sorted search named {name} (see SEARCH_TEMPLATES), as sent in the body of a search request
+        """
+        query_method, model = SEARCH_TEMPLATES[name]
+        return Search().query(query.Q(getattr(self, query_method)(query_param))) \
+            .sort(*get_search_sort(model)) \
+            .source(includes=get_source_fields(model))
+
+    def _prepare_batch_search(self, request: BatchSearchRequest) -> Tuple[str, str, Any, Any]:
+        """
+        Same as _prepare_search, for a search of the batch
+        """
+        if request.page_index < 0:
+            raise ValueError('Fetching every result is not supported in a batch')
+        return self._prepare_search(request)
+
+    def _prepare_search(self, request: BatchSearchRequest) -> Tuple[str, str, Any, Any]:
+        """
+        Resolves index, search name (see SEARCH_TEMPLATES), query parameter and search result model of a search,
+        the same way the single search methods do. Query parameter is None when the search has no result for sure.
+        """
+        default_index = current_app.config.get(config.ELASTICSEARCH_INDEX_KEY, DEFAULT_ES_INDEX)
+        index = request.index or default_index
+        if request.is_filter_search:
+            return self._prepare_batch_filter_search(request, index)
+
+        query_term = request.query_term or None
+        if request.resource == RESOURCE_TABLE:
+            return index, 'table', query_term, SearchTableResult
+        if request.resource == RESOURCE_USER:
+            if not request.index:
+                raise Exception('Index cant be empty for user search')
+            return index, 'user', query_term, SearchUserResult
+        if request.resource == RESOURCE_DASHBOARD:
+            return index, 'dashboard', query_term, SearchDashboardResult
+        raise ValueError(f'Unsupported resource {request.resource}')
+
+    def _prepare_batch_filter_search(self, request: BatchSearchRequest,
+                                     index: str) -> Tuple[str, str, Any, Any]:
+        if index == DASHBOARD_INDEX:
+            search_result_model = SearchDashboardResult  # type: Any
+        elif index == TABLE_INDEX:
+            search_result_model = SearchTableResult
+        else:
+            raise RuntimeError(f'the {index} doesnt have search filter support')
+
+        filter_query = None
+        if request.search_request:
+            try:
+                filter_query = self.convert_query_json_to_query_dsl(search_request=request.search_request,
+                                                                    query_term=request.query_term,
+                                                                    index=index)
+            except Exception as e:
+                # return nothing if any exception is thrown under the hood
+                LOGGING.exception(e)
+        return index, f'{self.get_model_by_index(index).get_type()}_filter', filter_query, search_result_model
 
     # The following methods are related to document API that needs to update
     @timer_with_counter
@@ -595,7 +1546,7 @@ class ElasticsearchProxy(BaseProxy):
         indices = self._fetch_old_index(index)
 
         # set the document type
-        type = User.get_type() if index is USER_INDEX else Table.get_type()
+        type = {USER_INDEX: User.get_type(), DASHBOARD_INDEX: Dashboard.get_type()}.get(index, Table.get_type())
 
         for i in indices:
             # build a list of elasticsearch actions for bulk deletion
@@ -652,14 +1603,8 @@ class ElasticsearchProxy(BaseProxy):
             return [new_index]
 
     def _create_index_helper(self, alias: str) -> str:
-        def _get_mapping(alias: str) -> str:
-            if alias is USER_INDEX:
-                return USER_INDEX_MAP
-            elif alias is TABLE_INDEX:
-                return TABLE_INDEX_MAP
-            return ''
         index_key = str(uuid.uuid4())
-        mapping: str = _get_mapping(alias=alias)
+        mapping: str = INDEX_MAPS.get(alias, '')
         self.elasticsearch.indices.create(index=index_key, body=mapping)
 
         # alias our new index
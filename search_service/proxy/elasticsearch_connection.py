@@ -0,0 +1,144 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from queue import Empty, LifoQueue
+from typing import (  # noqa: F401
+    Any, Dict, List, Mapping, Optional, Union,
+)
+
+import urllib3
+from elasticsearch import Elasticsearch, Urllib3HttpConnection
+
+from search_service import config
+from search_service.proxy.statsd_utilities import (
+    incr_counter, record_timing, set_gauge,
+)
+
+# Timeout of the client library, in seconds, when only one of the connect and read timeouts is configured
+DEFAULT_TIMEOUT_SEC = 10
+
+# config key -> keyword argument of the Elasticsearch client (transport and connections) it sets
+CLIENT_OPTIONS = {
+    config.ELASTICSEARCH_POOL_MAXSIZE: 'maxsize',
+    config.ELASTICSEARCH_HTTP_COMPRESS: 'http_compress',
+    config.ELASTICSEARCH_MAX_RETRIES: 'max_retries',
+    config.ELASTICSEARCH_RETRY_ON_TIMEOUT: 'retry_on_timeout',
+    config.ELASTICSEARCH_SNIFF_ON_START: 'sniff_on_start',
+    config.ELASTICSEARCH_SNIFF_ON_CONNECTION_FAIL: 'sniff_on_connection_fail',
+    config.ELASTICSEARCH_SNIFFER_TIMEOUT_SEC: 'sniffer_timeout',
+}
+
+
+def get_hosts(host: Optional[str]) -> Union[Optional[str], List[str]]:
+    """
+    Hosts of the Elasticsearch client from the {host} of a proxy, which lists several nodes separated by commas
+    """
+    if host and ',' in host:
+        return [node.strip() for node in host.split(',') if node.strip()]
+    return host
+
+
+def get_client_options(app_config: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Keyword arguments of the Elasticsearch client from the ELASTICSEARCH_POOL_*, *_TIMEOUT_SEC, retry, compression
+    and sniffing config. Settings left to None keep the defaults of the client library, and aren't passed at all.
+    """
+    options = {option: app_config[key] for key, option in CLIENT_OPTIONS.items()
+               if app_config.get(key) is not None}
+
+    connect_timeout = app_config.get(config.ELASTICSEARCH_CONNECT_TIMEOUT_SEC)
+    read_timeout = app_config.get(config.ELASTICSEARCH_READ_TIMEOUT_SEC)
+    if connect_timeout is not None or read_timeout is not None:
+        options['timeout'] = urllib3.Timeout(
+            connect=connect_timeout if connect_timeout is not None else DEFAULT_TIMEOUT_SEC,
+            read=read_timeout if read_timeout is not None else DEFAULT_TIMEOUT_SEC)
+
+    if app_config.get(config.ELASTICSEARCH_POOL_BLOCK) or app_config.get(config.STATS_FEATURE_KEY):
+        options['connection_class'] = MeteredUrllib3HttpConnection
+        if app_config.get(config.ELASTICSEARCH_POOL_BLOCK):
+            options['pool_block'] = True
+    return options
+
+
+def get_async_client_options(app_config: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Keyword arguments of the async Elasticsearch client, whose connections don't support request compression
+    nor separate connect and read timeouts: the read timeout applies to the whole request.
+    """
+    options = {option: app_config[key] for key, option in CLIENT_OPTIONS.items()
+               if app_config.get(key) is not None and option != 'http_compress'}
+    if app_config.get(config.ELASTICSEARCH_READ_TIMEOUT_SEC) is not None:
+        options['timeout'] = app_config[config.ELASTICSEARCH_READ_TIMEOUT_SEC]
+    return options
+
+
+def open_pool_connections(client: Elasticsearch, count: int) -> int:
+    """
+    Opens up to {count} connections to every node of {client}, within the size of its connection pools, so that
+    the first searches don't pay for DNS, TCP and TLS handshakes.
+
+    The connections are opened with HEAD requests, which keep their connection until released: every request
+    opens a new connection, then all of them go back to the pool.
+
+    :return: number of connections opened
+    """
+    opened = 0
+    for connection in client.transport.connection_pool.connections:
+        pool = getattr(connection, 'pool', None)
+        if pool is None or pool.pool is None:
+            # not a urllib3 connection, or a closed one
+            continue
+        responses = []  # type: List[Any]
+        try:
+            for _ in range(min(count, pool.pool.maxsize)):
+                responses.append(pool.urlopen('HEAD', connection.url_prefix + '/', headers=connection.headers,
+                                              retries=False, release_conn=False, preload_content=False))
+        finally:
+            for response in responses:
+                response.release_conn()
+        opened += len(responses)
+    return opened
+
+
+class MeteredConnectionQueue(LifoQueue):
+    """
+    Queue of the idle connections of a urllib3 connection pool, publishing through statsd:
+      - pool.in_use: number of connections of the pool in use, out of maxsize
+      - pool.exhausted: number of requests finding every connection of the pool in use
+      - pool.wait: time requests waited for a connection of the pool
+    """
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        exhausted = self.empty()
+        if exhausted:
+            incr_counter(prefix=__name__, name='pool.exhausted')
+
+        start = time.perf_counter()
+        try:
+            connection = super().get(block=block, timeout=timeout)
+        except Empty:
+            set_gauge(prefix=__name__, name='pool.in_use', value=self.maxsize)
+            raise
+        if exhausted:
+            record_timing(prefix=__name__, name='pool.wait', ms=(time.perf_counter() - start) * 1000)
+        set_gauge(prefix=__name__, name='pool.in_use', value=self.maxsize - self.qsize())
+        return connection
+
+
+class MeteredUrllib3HttpConnection(Urllib3HttpConnection):
+    """
+    Urllib3HttpConnection publishing metrics of its connection pool (see MeteredConnectionQueue).
+
+    When every connection of the pool is in use, urllib3 opens a new connection and discards it after the request.
+    With {pool_block}, requests rather wait for a connection of the pool, so that the number of connections to
+    a node never exceeds maxsize.
+    """
+
+    def __init__(self, *, maxsize: int = 10, pool_block: bool = False, **kwargs: Any) -> None:
+        super().__init__(maxsize=maxsize, **kwargs)
+        self.pool.block = pool_block
+        self.pool.pool = MeteredConnectionQueue(maxsize)
+        for _ in range(maxsize):
+            # like urllib3, fill the pool with placeholders of the connections to open
+            self.pool.pool.put(None)
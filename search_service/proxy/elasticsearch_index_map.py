@@ -0,0 +1,72 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, Tuple,
+)
+
+from amundsen_common.models.index_map import (
+    DASHBOARD_ELASTICSEARCH_INDEX_MAPPING, TABLE_INDEX_MAP, USER_INDEX_MAP,
+)
+
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.table import TABLE_INDEX
+from search_service.api.user import USER_INDEX
+
+# Subfield of the searched fields indexing the trigrams of their words. A phrase of trigrams matches the words
+# containing the query term, as the leading wildcard *term* does, without scanning the whole term dictionary.
+NGRAM_SUBFIELD = 'ngram'
+NGRAM_ANALYZER = 'trigram_analyzer'
+NGRAM_SIZE = 3
+
+NGRAM_ANALYSIS = {
+    'tokenizer': {
+        'trigram_tokenizer': {
+            'type': 'ngram',
+            'min_gram': NGRAM_SIZE,
+            'max_gram': NGRAM_SIZE,
+            'token_chars': ['letter', 'digit'],
+        },
+    },
+    'analyzer': {
+        NGRAM_ANALYZER: {
+            'type': 'custom',
+            'tokenizer': 'trigram_tokenizer',
+            'filter': ['lowercase'],
+        },
+    },
+}  # type: Dict[str, Dict[str, Any]]
+
+# index -> fields matched by the query term of a search, in the order of the query
+SEARCH_FIELDS = {
+    TABLE_INDEX: ('name', 'schema', 'description', 'column_names', 'column_descriptions'),
+    DASHBOARD_INDEX: ('name', 'group_name', 'query_names', 'description', 'tags', 'badges', 'product'),
+}  # type: Dict[str, Tuple[str, ...]]
+
+# mapping of the searched fields missing from a base index map, as Elasticsearch dynamically maps them
+DYNAMIC_FIELD_MAPPING = {'type': 'text', 'fields': {'keyword': {'type': 'keyword', 'ignore_above': 256}}}
+
+
+def add_ngram_subfields(index_map: str, fields: Iterable[str]) -> str:
+    """
+    Index map {index_map} with an ngram subfield on each of {fields}, and the analyzer of these subfields
+    """
+    body = json.loads(index_map)
+    analysis = body.setdefault('settings', {}).setdefault('analysis', {})
+    for section, definitions in NGRAM_ANALYSIS.items():
+        analysis.setdefault(section, {}).update(definitions)
+
+    for properties in (doc_type['properties'] for doc_type in body['mappings'].values()):
+        for field in fields:
+            mapping = properties.setdefault(field, json.loads(json.dumps(DYNAMIC_FIELD_MAPPING)))
+            mapping.setdefault('fields', {})[NGRAM_SUBFIELD] = {'type': 'text', 'analyzer': NGRAM_ANALYZER}
+    return json.dumps(body, indent=2)
+
+
+# index maps of the indices created by the proxy
+INDEX_MAPS = {
+    TABLE_INDEX: add_ngram_subfields(TABLE_INDEX_MAP, SEARCH_FIELDS[TABLE_INDEX]),
+    DASHBOARD_INDEX: add_ngram_subfields(DASHBOARD_ELASTICSEARCH_INDEX_MAPPING, SEARCH_FIELDS[DASHBOARD_INDEX]),
+    USER_INDEX: USER_INDEX_MAP,
+}  # type: Dict[str, str]
@@ -0,0 +1,807 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import bisect
+import logging
+import math
+import re
+from abc import abstractmethod
+from array import array
+from fnmatch import fnmatchcase
+from threading import RLock
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, List, Optional, Set, Tuple, Union,
+)
+
+import numpy as np
+from flask import current_app, has_app_context
+
+from search_service import config
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.table import TABLE_INDEX
+from search_service.api.user import USER_INDEX
+from search_service.models.autocomplete import AutocompleteResult
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER,
+)
+from search_service.models.count import SearchCountResult
+from search_service.models.dashboard import Dashboard, SearchDashboardResult
+from search_service.models.facets import (
+    Facet, FacetValue, SearchFacetsResult,
+)
+from search_service.models.search_result import (
+    TOTAL_RELATION_GTE, decode_cursor, encode_cursor,
+)
+from search_service.models.table import SearchTableResult, Table
+from search_service.models.user import SearchUserResult, User
+from search_service.proxy.base import DEFAULT_AUTOCOMPLETE_SIZE, BaseProxy
+from search_service.proxy.elasticsearch import (
+    AUTOCOMPLETE_LOOKUPS, DASHBOARD_MAPPING, DEFAULT_ES_INDEX, DEFAULT_FACET_SIZE, FACET_FIELDS, TABLE_MAPPING,
+    WILDCARD_PATTERN, ElasticsearchProxy, get_autocomplete_suggestion, get_hydration_plan, hydrate,
+)
+from search_service.proxy.elasticsearch_index_map import SEARCH_FIELDS
+from search_service.proxy.statsd_utilities import timer_with_counter
+
+LOGGER = logging.getLogger(__name__)
+
+# Parameters of the BM25 similarity, Elasticsearch defaults
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Analysis of the fields: words of text fields are lowercase letters only, as with the simple analyzer of the
+# index maps, and keyword fields match their whole values, lowercase for the fields with a lowercase normalizer
+TEXT = 'text'
+KEYWORD = 'keyword'
+LOWERCASE_KEYWORD = 'lowercase_keyword'
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+# resource -> field -> document attribute and analysis of the field, after the index maps
+INDEX_FIELDS = {
+    RESOURCE_TABLE: {
+        'display_name': ('display_name', KEYWORD),
+        'name': ('name', TEXT),
+        'name.raw': ('name', KEYWORD),
+        'schema': ('schema', TEXT),
+        'schema.raw': ('schema', KEYWORD),
+        'description': ('description', TEXT),
+        'column_names': ('column_names', TEXT),
+        'column_names.raw': ('column_names', LOWERCASE_KEYWORD),
+        'column_descriptions': ('column_descriptions', TEXT),
+        'programmatic_descriptions': ('programmatic_descriptions', TEXT),
+        'tags': ('tags', KEYWORD),
+        'badges': ('badges', KEYWORD),
+        'database.raw': ('database', KEYWORD),
+        'cluster.raw': ('cluster', KEYWORD),
+    },
+    RESOURCE_USER: {
+        'full_name': ('full_name', TEXT),
+        'full_name.raw': ('full_name', KEYWORD),
+        'first_name': ('first_name', TEXT),
+        'first_name.raw': ('first_name', KEYWORD),
+        'last_name': ('last_name', TEXT),
+        'last_name.raw': ('last_name', KEYWORD),
+        'email': ('email', TEXT),
+        'email.raw': ('email', KEYWORD),
+    },
+    RESOURCE_DASHBOARD: {
+        'name': ('name', TEXT),
+        'name.raw': ('name', LOWERCASE_KEYWORD),
+        'group_name': ('group_name', TEXT),
+        'group_name.raw': ('group_name', LOWERCASE_KEYWORD),
+        'description': ('description', TEXT),
+        'query_names': ('query_names', TEXT),
+        'product': ('product', LOWERCASE_KEYWORD),
+        'product.keyword': ('product', KEYWORD),
+        'tags': ('tags', KEYWORD),
+        'badges': ('badges', KEYWORD),
+    },
+}  # type: Dict[str, Dict[str, Tuple[str, str]]]
+
+# resource -> boost of the fields matching the query term, as in the queries of ElasticsearchProxy, whether every
+# word of the query term must match, and whether the score is multiplied by the log2p of the usage of the resource
+QUERIES = {
+    RESOURCE_TABLE: ({'display_name': 1000, 'name.raw': 75, 'name': 5, 'schema': 3, 'description': 3,
+                      'column_names': 2, 'column_descriptions': 1, 'tags': 1, 'badges': 1,
+                      'programmatic_descriptions': 1}, False, True),
+    RESOURCE_USER: ({'full_name.raw': 30, 'full_name': 5, 'first_name.raw': 5, 'last_name.raw': 5, 'first_name': 3,
+                     'last_name': 3, 'email': 3}, True, False),
+    RESOURCE_DASHBOARD: ({'name.raw': 75, 'name': 7, 'group_name.raw': 15, 'group_name': 7, 'description': 3,
+                          'query_names': 3}, False, True),
+}  # type: Dict[str, Tuple[Dict[str, float], bool, bool]]
+
+INDEX_RESOURCES = {
+    TABLE_INDEX: RESOURCE_TABLE,
+    USER_INDEX: RESOURCE_USER,
+    DASHBOARD_INDEX: RESOURCE_DASHBOARD,
+}
+RESOURCE_INDICES = {resource: index for index, resource in INDEX_RESOURCES.items()}
+FILTER_MAPPINGS = {
+    RESOURCE_TABLE: TABLE_MAPPING,
+    RESOURCE_DASHBOARD: DASHBOARD_MAPPING,
+}
+MODELS = {
+    RESOURCE_TABLE: (Table, SearchTableResult),
+    RESOURCE_USER: (User, SearchUserResult),
+    RESOURCE_DASHBOARD: (Dashboard, SearchDashboardResult),
+}  # type: Dict[str, Tuple[Any, Any]]
+
+# An index is rebuilt once deleted or replaced documents take more than this share of its slots
+COMPACTION_RATIO = 0.5
+
+
+def analyze(value: Any, analysis: str) -> List[str]:
+    """
+    Terms of a value of a field, or of a query term matching the field, following the {analysis} of the field
+    """
+    values = value if isinstance(value, list) else [value]
+    if analysis == TEXT:
+        return [word for value in values if value is not None for word in WORD_PATTERN.findall(str(value).lower())]
+    if analysis == LOWERCASE_KEYWORD:
+        return [str(value).lower() for value in values if value is not None]
+    return [str(value) for value in values if value is not None]
+
+
+def get_payload(item: Any) -> Dict[str, Any]:
+    """
+    Fields of the document of a Table, User or Dashboard model
+    """
+    if hasattr(item, 'get_attrs_dict'):
+        return item.get_attrs_dict()
+    return {attr: getattr(item, attr, None) for attr in item.get_attrs()}
+
+
+class _Index:
+    """
+    Documents of an index, with a posting list per term of every field of INDEX_FIELDS.
+
+    Documents get a slot each, in the order they are indexed. Replacing or deleting a document leaves its slot
+    behind, as Lucene does with deleted documents, until the index is compacted. The posting lists are arrays of
+    slots and term frequencies, turned into NumPy arrays as searches need them, until the next write.
+    """
+
+    def __init__(self, resource: str) -> None:
+        self.resource = resource
+        self.fields = INDEX_FIELDS[resource]
+        self.ids = []  # type: List[str]
+        self.payloads = []  # type: List[Optional[Dict[str, Any]]]
+        self.slots = {}  # type: Dict[str, int]
+        self.postings = {field: {} for field in self.fields}  # type: Dict[str, Dict[str, Tuple[array, array]]]
+        self.lengths = {field: array('i') for field in self.fields}  # type: Dict[str, array]
+        self._clear_cache()
+
+    def _clear_cache(self) -> None:
+        self._arrays = {}  # type: Dict[Any, Any]
+
+    def add(self, id: str, payload: Dict[str, Any]) -> None:
+        self.remove(id)
+        slot = len(self.ids)
+        self.ids.append(id)
+        self.payloads.append(payload)
+        self.slots[id] = slot
+        for field, (attr, analysis) in self.fields.items():
+            terms = analyze(payload.get(attr), analysis)
+            self.lengths[field].append(len(terms))
+            frequencies = {}  # type: Dict[str, int]
+            for term in terms:
+                frequencies[term] = frequencies.get(term, 0) + 1
+            postings = self.postings[field]
+            for term, frequency in frequencies.items():
+                if term not in postings:
+                    postings[term] = (array('i'), array('i'))
+                postings[term][0].append(slot)
+                postings[term][1].append(frequency)
+        self._clear_cache()
+
+    def remove(self, id: str) -> bool:
+        slot = self.slots.pop(id, None)
+        if slot is None:
+            return False
+        self.payloads[slot] = None
+        self._clear_cache()
+        return True
+
+    def compact(self) -> None:
+        """
+        Rebuilds the index when most of its slots belong to deleted documents
+        """
+        if len(self.ids) - len(self.slots) <= len(self.ids) * COMPACTION_RATIO:
+            return
+        rebuilt = _Index(self.resource)
+        for id, slot in sorted(self.slots.items(), key=lambda item: item[1]):
+            rebuilt.add(id, self.payloads[slot] or {})
+        self.__dict__.update(rebuilt.__dict__)
+
+    def _cached(self, key: Any, build: Any) -> Any:
+        value = self._arrays.get(key)
+        if value is None:
+            value = self._arrays[key] = build()
+        return value
+
+    def get_postings(self, field: str, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Slots of the documents having {term} in {field}, deleted documents included, and the term frequencies
+        """
+        postings = self.postings[field].get(term)
+        if postings is None:
+            return None
+        return self._cached(('postings', field, term),
+                            lambda: (np.array(postings[0], dtype=np.int32), np.array(postings[1], dtype=np.float32)))
+
+    def get_term_scores(self, field: str, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Slots of the documents having {term} in {field}, and the BM25 score of the term in each of them
+        """
+        postings = self.get_postings(field, term)
+        if postings is None:
+            return None
+
+        def build() -> Tuple[np.ndarray, np.ndarray]:
+            slots, frequencies = postings  # type: ignore
+            lengths, average_length = self.get_lengths(field)
+            idf = math.log(1 + (len(self.ids) - len(slots) + 0.5) / (len(slots) + 0.5))
+            norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths[slots] / average_length)
+            return slots, idf * frequencies * (BM25_K1 + 1) / (frequencies + norms)
+        return self._cached(('term_scores', field, term), build)
+
+    def get_terms(self, field: str) -> List[str]:
+        """
+        Sorted terms of {field}, to look up prefixes and wildcards
+        """
+        return self._cached(('terms', field), lambda: sorted(self.postings[field]))
+
+    def get_lengths(self, field: str) -> Tuple[np.ndarray, float]:
+        """
+        Number of terms of {field} in every slot, and their average over the documents having the field
+        """
+        def build() -> Tuple[np.ndarray, float]:
+            lengths = np.array(self.lengths[field], dtype=np.float32)
+            having = np.count_nonzero(lengths)
+            return lengths, float(lengths.sum()) / having if having else 1.0
+        return self._cached(('lengths', field), build)
+
+    def get_live(self) -> np.ndarray:
+        """
+        Bitset of the slots of documents that aren't deleted
+        """
+        def build() -> np.ndarray:
+            live = np.zeros(len(self.ids), dtype=bool)
+            live[np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))] = True
+            return live
+        return self._cached('live', build)
+
+    def get_numbers(self, attr: str) -> np.ndarray:
+        """
+        Value of the numeric attribute {attr} of every slot, 0 when missing
+        """
+        return self._cached(('numbers', attr), lambda: np.array(
+            [(payload or {}).get(attr) or 0 for payload in self.payloads], dtype=np.float64))
+
+    def get_usage_factors(self) -> np.ndarray:
+        """
+        Score factor of the usage of every slot, as a log2p field value factor of total_usage: log10(2 + usage)
+        """
+        return self._cached('usage_factors', lambda: np.log10(2 + self.get_numbers('total_usage')))
+
+    def get_id_ranks(self) -> Tuple[np.ndarray, List[str]]:
+        """
+        Rank of the id of every slot in the sorted ids, the last tie breaker of the sort, and the sorted ids
+        """
+        def build() -> Tuple[np.ndarray, List[str]]:
+            order = sorted(range(len(self.ids)), key=self.ids.__getitem__)
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[np.array(order, dtype=np.int64)] = np.arange(len(order))
+            return ranks, [self.ids[slot] for slot in order]
+        return self._cached('id_ranks', build)
+
+    def get_facet_values(self, field: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Slots of every value of the keyword field {field}, flattened along with the number of the value, and the
+        values, to count the values of a bitset of slots at once
+        """
+        def build() -> Tuple[np.ndarray, np.ndarray, List[str]]:
+            values = self.get_terms(field)
+            postings = [self.postings[field][value][0] for value in values]
+            slots = np.concatenate([np.array(p, dtype=np.int64) for p in postings]) if postings else \
+                np.zeros(0, dtype=np.int64)
+            numbers = np.repeat(np.arange(len(values)), [len(p) for p in postings])
+            return slots, numbers, values
+        return self._cached(('facet_values', field), build)
+
+
+class _LocalProxy(BaseProxy):
+    """
+    Search APIs of the proxies searching documents they store themselves, loaded through the document APIs, rather
+    than a search engine: the arguments of the requests are checked here, the searches are run by the subclasses.
+    """
+
+    page_size = 10
+
+    @staticmethod
+    def _get_default_index(index: str) -> str:
+        if index:
+            return index
+        return current_app.config.get(config.ELASTICSEARCH_INDEX_KEY, DEFAULT_ES_INDEX) if has_app_context() \
+            else DEFAULT_ES_INDEX
+
+    def _search(self, *, resource: str, index: str, query_term: str, page_index: int,
+                cursor: Optional[str]) -> Any:
+        if not query_term:
+            # return empty result for blank query term
+            return MODELS[resource][1](total_results=0, results=[])
+        return self._search_matches(resource=resource, index=index, query_term=query_term, page_index=page_index,
+                                    cursor=cursor)
+
+    @abstractmethod
+    def _search_matches(self, *, resource: str, index: str, query_term: str, page_index: int,
+                        cursor: Optional[str]) -> Any:
+        """
+        Page of results of the documents of {index} matching {query_term}, sorted like ElasticsearchProxy sorts them
+        """
+        pass
+
+    @abstractmethod
+    def _search_with_filters(self, *, resource: str, index: str, query_term: str, filters: Dict[str, Any],
+                             page_index: int, cursor: Optional[str]) -> Any:
+        """
+        Page of results of the documents of {index} matching {filters}, and {query_term} if any
+        """
+        pass
+
+    @abstractmethod
+    def _count_facets(self, *, resource: str, index: str, query_term: str, filters: Dict[str, Any],
+                      facet_fields: Dict[str, str], size: int) -> SearchFacetsResult:
+        """
+        Counts the {size} most frequent values of each category of {facet_fields}, see fetch_facets
+        """
+        pass
+
+    @abstractmethod
+    def _count_matches(self, *, resource: str, index: str, query_term: str, max_count: Optional[int]) -> int:
+        """
+        Number of documents of {index} matching {query_term}, counting at least one more than {max_count} if any
+        """
+        pass
+
+    @abstractmethod
+    def _lookup_prefix(self, *, prefix: str, indices: Dict[str, str], size: int) -> Dict[str, AutocompleteResult]:
+        """
+        Suggestions of the resources of {indices} whose keyword fields of AUTOCOMPLETE_LOOKUPS start with {prefix}
+        """
+        pass
+
+    @abstractmethod
+    def _write_documents(self, *, data: List[Any], index: str, action: str) -> None:
+        pass
+
+    @timer_with_counter
+    def fetch_table_search_results(self, *,
+                                   query_term: str,
+                                   page_index: int = 0,
+                                   index: str = '',
+                                   cursor: Optional[str] = None,
+                                   preference: Optional[str] = None,
+                                   track_total_hits: Optional[Union[bool, int]] = None) -> SearchTableResult:
+        return self._search(resource=RESOURCE_TABLE, index=self._get_default_index(index), query_term=query_term,
+                            page_index=page_index, cursor=cursor)
+
+    @timer_with_counter
+    def fetch_user_search_results(self, *,
+                                  query_term: str,
+                                  page_index: int = 0,
+                                  index: str = '',
+                                  cursor: Optional[str] = None,
+                                  preference: Optional[str] = None,
+                                  track_total_hits: Optional[Union[bool, int]] = None) -> SearchUserResult:
+        if not index:
+            raise Exception('Index cant be empty for user search')
+        return self._search(resource=RESOURCE_USER, index=index, query_term=query_term, page_index=page_index,
+                            cursor=cursor)
+
+    @timer_with_counter
+    def fetch_dashboard_search_results(self, *,
+                                       query_term: str,
+                                       page_index: int = 0,
+                                       index: str = '',
+                                       cursor: Optional[str] = None,
+                                       preference: Optional[str] = None,
+                                       track_total_hits: Optional[Union[bool, int]] = None) -> SearchDashboardResult:
+        return self._search(resource=RESOURCE_DASHBOARD, index=index or DASHBOARD_INDEX, query_term=query_term,
+                            page_index=page_index, cursor=cursor)
+
+    @timer_with_counter
+    def fetch_search_results_with_filter(self, *,
+                                         query_term: str,
+                                         search_request: dict,
+                                         page_index: int = 0,
+                                         index: str = '',
+                                         cursor: Optional[str] = None,
+                                         preference: Optional[str] = None,
+                                         track_total_hits: Optional[Union[bool, int]] = None) \
+            -> Union[SearchTableResult, SearchDashboardResult]:
+        current_index = self._get_default_index(index)
+        resource = INDEX_RESOURCES.get(current_index)
+        if resource not in FILTER_MAPPINGS:
+            raise RuntimeError(f'the {index} doesnt have search filter support')
+        search_model = MODELS[resource][1]
+        if not search_request:
+            # return empty result for blank query term
+            return search_model(total_results=0, results=[])
+
+        try:
+            filters = search_request.get('filters') or {}
+            if filters and ElasticsearchProxy.validate_filter_values(search_request) is False:
+                raise Exception('The search filters contain invalid characters and thus cannot be handled')
+            if not filters and not query_term:
+                raise Exception('Unable to convert parameters to a valid query')
+        except Exception as e:
+            LOGGER.exception(e)
+            # return nothing if any exception is thrown under the hood
+            return search_model(total_results=0, results=[])
+
+        return self._search_with_filters(resource=resource, index=current_index, query_term=query_term,
+                                         filters=filters, page_index=page_index, cursor=cursor)
+
+    @timer_with_counter
+    def fetch_facets(self, *,
+                     query_term: str,
+                     search_request: Optional[dict] = None,
+                     index: str = '',
+                     preference: Optional[str] = None) -> SearchFacetsResult:
+        """
+        Counts the values of the filter categories of FACET_FIELDS among the documents matching the query term and
+        the filters of the other categories
+        """
+        facet_fields = FACET_FIELDS.get(index)
+        if facet_fields is None:
+            raise Exception(f'index {index} doesnt exist nor support search facets')
+
+        search_request = search_request or {}
+        filters = search_request.get('filters') or {}
+        if filters and ElasticsearchProxy.validate_filter_values(search_request) is False:
+            raise Exception('The search filters contain invalid characters and thus cannot be handled')
+        size = current_app.config.get(config.SEARCH_FACET_SIZE, DEFAULT_FACET_SIZE) if has_app_context() \
+            else DEFAULT_FACET_SIZE
+        return self._count_facets(resource=INDEX_RESOURCES[index], index=index, query_term=query_term,
+                                  filters=filters, facet_fields=facet_fields, size=size)
+
+    @timer_with_counter
+    def fetch_count(self, *,
+                    query_term: str,
+                    resource: str,
+                    index: str = '',
+                    max_count: Optional[int] = None) -> SearchCountResult:
+        """
+        Counts the documents matching the query of the search of {resource}, without sorting nor hydrating any of them
+        """
+        if not query_term:
+            # return empty result for blank query term
+            return SearchCountResult(total_results=0)
+        if resource == RESOURCE_TABLE:
+            index = self._get_default_index(index)
+        elif resource == RESOURCE_DASHBOARD:
+            index = index or DASHBOARD_INDEX
+        elif resource != RESOURCE_USER:
+            raise ValueError(f'Unsupported resource {resource}')
+        elif not index:
+            raise Exception('Index cant be empty for user search')
+
+        count = self._count_matches(resource=resource, index=index, query_term=query_term, max_count=max_count)
+        if max_count is not None and count > max_count:
+            return SearchCountResult(total_results=max_count, total_relation=TOTAL_RELATION_GTE)
+        return SearchCountResult(total_results=count)
+
+    @timer_with_counter
+    def fetch_autocomplete_results(self, *,
+                                   prefix: str,
+                                   indices: Dict[str, str],
+                                   size: int = DEFAULT_AUTOCOMPLETE_SIZE) -> Dict[str, AutocompleteResult]:
+        """
+        Looks up the prefix in the keyword fields of AUTOCOMPLETE_LOOKUPS, most used first
+        """
+        prefix = prefix.strip()
+        if not prefix:
+            return {resource: AutocompleteResult() for resource in indices}
+        return self._lookup_prefix(prefix=prefix, indices=indices, size=size)
+
+    def _write(self, *, data: List[Any], index: str, action: str) -> str:
+        if not index:
+            raise Exception(f'Index cant be empty for {action} document')
+        if not data:
+            LOGGER.warning('Received no data to upload')
+            return ''
+        self._write_documents(data=data, index=index, action=action)
+        return index
+
+    @timer_with_counter
+    def create_document(self, *, data: List[Any], index: str = '') -> str:
+        """
+        Indexes the documents of Table, User or Dashboard models, replacing the documents with the same ids
+        """
+        return self._write(data=data, index=index, action='creating')
+
+    @timer_with_counter
+    def update_document(self, *, data: List[Any], index: str = '') -> str:
+        """
+        Updates the fields set in the models of existing documents, ignoring the ids it doesn't know
+        """
+        return self._write(data=data, index=index, action='updating')
+
+    @timer_with_counter
+    def delete_document(self, *, data: List[str], index: str = '') -> str:
+        return self._write(data=data, index=index, action='deleting')
+
+
+class InMemoryProxy(_LocalProxy):
+    """
+    In-process search engine, for development, CI and small deployments without Elasticsearch.
+
+    Documents are only kept in memory, and get loaded through the document APIs. Searches score the fields of the
+    queries of ElasticsearchProxy with the same boosts, with BM25 and the usage of the resources, and the filters
+    and facets of TABLE_MAPPING and DASHBOARD_MAPPING match bitsets of the documents. Total numbers of results
+    are always exact.
+    """
+
+    def __init__(self, *,
+                 host: str = None,
+                 user: str = '',
+                 password: str = '',
+                 client: Any = None,
+                 page_size: int = 10) -> None:
+        self.page_size = page_size
+        self._indices = {}  # type: Dict[str, _Index]
+        self._lock = RLock()
+
+    def _get_index(self, index: str, resource: str) -> _Index:
+        """
+        Index of {index}, created on first write. Searches look their index up in _indices instead, so that searches
+        of unknown indices don't keep anything.
+        """
+        current = self._indices.get(index)
+        if current is None:
+            current = self._indices[index] = _Index(INDEX_RESOURCES.get(index, resource))
+        return current
+
+    def _score(self, current: _Index, query_term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Slots matching {query_term} and their scores: the BM25 scores of the words of the query term are summed
+        per field, and a document scores its best field (multi match of type best_fields), times its usage factor.
+        Scores are accumulated into an array of every slot, with one bincount per field matching several words.
+        """
+        boosts, all_words, usage_factor = QUERIES[current.resource]
+        best = np.zeros(len(current.ids))
+        for field, boost in boosts.items():
+            terms = list(dict.fromkeys(analyze(query_term, current.fields[field][1])))
+            term_scores = [current.get_term_scores(field, term) for term in terms]
+            postings = [p for p in term_scores if p is not None]
+            if not postings or all_words and len(postings) < len(terms):
+                continue
+            if len(postings) == 1:
+                slots, scores = postings[0]
+            else:
+                all_slots = np.concatenate([slots for slots, _ in postings])
+                sums = np.bincount(all_slots, weights=np.concatenate([scores for _, scores in postings]),
+                                   minlength=len(best))
+                if all_words:
+                    sums[np.bincount(all_slots, minlength=len(best)) < len(terms)] = 0
+                slots = np.flatnonzero(sums > 0)
+                scores = sums[slots]
+            best[slots] = np.maximum(best[slots], scores * boost)
+
+        slots = np.flatnonzero((best > 0) & current.get_live())
+        if usage_factor:
+            return slots, best[slots] * current.get_usage_factors()[slots]
+        return slots, best[slots]
+
+    @staticmethod
+    def _get_filter_bitset(current: _Index, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Bitset of the slots having any of the values of every filter category, as with
+        ElasticsearchProxy.parse_filters. Values with wildcards match the terms of the field they match.
+        """
+        bitset = current.get_live().copy()
+        mapping = FILTER_MAPPINGS[current.resource]
+        for category, item_list in filters.items():
+            field = mapping.get(category)
+            if field is None:
+                LOGGER.warning(f'Unsupported filter category: {category} passed in list of filters')
+                continue
+            if item_list == '' or item_list == ['']:
+                LOGGER.warning(f'The filter value cannot be empty.In this case the filter {category} is ignored')
+                continue
+            analysis = current.fields[field][1]
+            category_bitset = np.zeros(len(current.ids), dtype=bool)
+            for value in item_list if isinstance(item_list, list) else [item_list]:
+                value = str(value).lower() if analysis == LOWERCASE_KEYWORD else str(value)
+                if WILDCARD_PATTERN.search(value):
+                    terms = [term for term in current.get_terms(field) if fnmatchcase(term, value)]  # type: Any
+                else:
+                    terms = [value]
+                for term in terms:
+                    postings = current.get_postings(field, term)
+                    if postings is not None:
+                        category_bitset[postings[0]] = True
+            bitset &= category_bitset
+        return bitset
+
+    @staticmethod
+    def _get_query_term_scores(current: _Index, query_term: str) -> np.ndarray:
+        """
+        Number of the SEARCH_FIELDS of every slot with a term containing {query_term}, as the query string of
+        ElasticsearchProxy.parse_query_term matches them
+        """
+        needle = query_term.lower()
+        matches = np.zeros(len(current.ids))
+        for field in SEARCH_FIELDS[RESOURCE_INDICES[current.resource]]:
+            field_matches = np.zeros(len(current.ids), dtype=bool)
+            for term in current.get_terms(field):
+                if needle in term.lower():
+                    field_matches[current.get_postings(field, term)[0]] = True  # type: ignore
+            matches += field_matches
+        return matches
+
+    def _filter(self, current: _Index, query_term: str, filters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Slots matching {filters} and {query_term} if any, and their scores: the number of fields matching the query
+        term times the usage factor, 0 without query term
+        """
+        bitset = self._get_filter_bitset(current, filters)
+        scores = np.zeros(len(current.ids))
+        if query_term:
+            scores = self._get_query_term_scores(current, query_term)
+            bitset &= scores > 0
+        slots = np.flatnonzero(bitset)
+        return slots, scores[slots] * current.get_usage_factors()[slots]
+
+    def _get_search_result(self, *,
+                           current: _Index,
+                           slots: np.ndarray,
+                           scores: np.ndarray,
+                           page_index: int,
+                           cursor: Optional[str]) -> Any:
+        """
+        Page of results of the slots matching a search, sorted by score, then total_usage and id like the
+        results of ElasticsearchProxy, so that the cursors of the results of both proxies look the same
+        """
+        model, search_result_model = MODELS[current.resource]
+        total_results = len(slots)
+        usages = current.get_numbers('total_usage')[slots]
+        ranks, sorted_ids = current.get_id_ranks()
+        ranks = ranks[slots]
+
+        start_from = None  # type: Optional[int]
+        if cursor:
+            score, usage, id = decode_cursor(cursor)
+            rank = bisect.bisect_right(sorted_ids, id)
+            after = (scores < score) | (scores == score) & ((usages < usage) | (usages == usage) & (ranks >= rank))
+            slots, scores, usages, ranks = slots[after], scores[after], usages[after], ranks[after]
+            size = self.page_size  # type: Optional[int]
+            skip = 0
+        elif page_index < 0:
+            size, skip = None, 0
+        else:
+            start_from = skip = page_index * self.page_size
+            size = self.page_size
+
+        if size is not None and len(slots) > 2 * (skip + size):
+            # only the slots scoring at least as much as the last result of the page need sorting
+            threshold = np.partition(scores, len(scores) - (skip + size))[len(scores) - (skip + size)]
+            candidates = scores >= threshold
+            slots, scores, usages, ranks = slots[candidates], scores[candidates], usages[candidates], \
+                ranks[candidates]
+        order = np.lexsort((ranks, -usages, -scores))
+        order = order[skip:] if size is None else order[skip:skip + size]
+
+        plan = get_hydration_plan(model)
+        results = [hydrate(model=model, plan=plan, payload=current.payloads[slot] or {}, id=current.ids[slot])
+                   for slot in slots[order].tolist()]
+
+        next_cursor = None
+        if size is not None and len(results) == size and \
+                (start_from is None or start_from + len(results) < total_results):
+            last = order[-1]
+            next_cursor = encode_cursor([float(scores[last]), int(usages[last]), current.ids[int(slots[last])]])
+        return search_result_model(total_results=total_results, results=results, next_cursor=next_cursor)
+
+    def _search_matches(self, *, resource: str, index: str, query_term: str, page_index: int,
+                        cursor: Optional[str]) -> Any:
+        with self._lock:
+            current = self._indices.get(index)
+            if current is None:
+                return MODELS[resource][1](total_results=0, results=[])
+            slots, scores = self._score(current, query_term)
+            return self._get_search_result(current=current, slots=slots, scores=scores, page_index=page_index,
+                                           cursor=cursor)
+
+    def _search_with_filters(self, *, resource: str, index: str, query_term: str, filters: Dict[str, Any],
+                             page_index: int, cursor: Optional[str]) -> Any:
+        with self._lock:
+            current = self._indices.get(index)
+            if current is None:
+                return MODELS[resource][1](total_results=0, results=[])
+            slots, scores = self._filter(current, query_term, filters)
+            return self._get_search_result(current=current, slots=slots, scores=scores, page_index=page_index,
+                                           cursor=cursor)
+
+    def _count_facets(self, *, resource: str, index: str, query_term: str, filters: Dict[str, Any],
+                      facet_fields: Dict[str, str], size: int) -> SearchFacetsResult:
+        """
+        Counts the values of each category with a bincount of the bitset of the matching slots over the values of
+        the category
+        """
+        with self._lock:
+            current = self._indices.get(index)
+            if current is None:
+                return SearchFacetsResult(total_results=0, facets=[Facet(name=category, values=[])
+                                                                   for category in facet_fields])
+            matches = current.get_live().copy()
+            if query_term:
+                matches &= self._get_query_term_scores(current, query_term) > 0
+            bitsets = {category: self._get_filter_bitset(current, {category: values})
+                       for category, values in filters.items()}
+
+            facets = []
+            for category, field in facet_fields.items():
+                bitset = matches.copy()
+                for other_category, other_bitset in bitsets.items():
+                    if other_category != category:
+                        bitset &= other_bitset
+                slots, numbers, values = current.get_facet_values(field)
+                counts = np.bincount(numbers[bitset[slots]], minlength=len(values))
+                top = sorted(np.flatnonzero(counts).tolist(), key=lambda number: (-counts[number], values[number]))
+                facets.append(Facet(name=category, values=[FacetValue(value=values[number], count=int(counts[number]))
+                                                           for number in top[:size]]))
+            for bitset in bitsets.values():
+                matches &= bitset
+            return SearchFacetsResult(total_results=int(np.count_nonzero(matches)), facets=facets)
+
+    def _count_matches(self, *, resource: str, index: str, query_term: str, max_count: Optional[int]) -> int:
+        with self._lock:
+            current = self._indices.get(index)
+            return 0 if current is None else len(self._score(current, query_term)[0])
+
+    def _lookup_prefix(self, *, prefix: str, indices: Dict[str, str], size: int) -> Dict[str, AutocompleteResult]:
+        """
+        Looks up the prefix in the sorted terms of the keyword fields
+        """
+        results = {}  # type: Dict[str, AutocompleteResult]
+        with self._lock:
+            for resource, index in indices.items():
+                fields, lowercase, usage_field, _ = AUTOCOMPLETE_LOOKUPS[resource]
+                current = self._indices.get(index)
+                if current is None:
+                    results[resource] = AutocompleteResult(results=[])
+                    continue
+                bitset = np.zeros(len(current.ids), dtype=bool)
+                for field in fields:
+                    terms = current.get_terms(field)
+                    for value in [prefix.lower()] if lowercase else {prefix, prefix.lower()}:
+                        start = bisect.bisect_left(terms, value)
+                        for term in terms[start:bisect.bisect_left(terms, value + '\U0010ffff', start)]:
+                            bitset[current.get_postings(field, term)[0]] = True  # type: ignore
+                slots = np.flatnonzero(bitset & current.get_live())
+                order = np.lexsort((current.get_id_ranks()[0][slots], -current.get_numbers(usage_field)[slots]))
+                results[resource] = AutocompleteResult(results=[
+                    get_autocomplete_suggestion(resource, current.payloads[slot] or {})
+                    for slot in slots[order[:size]].tolist()])
+        return results
+
+    def _write_documents(self, *, data: List[Any], index: str, action: str) -> None:
+        with self._lock:
+            for item in data:
+                if action == 'deleting':
+                    current = self._indices.get(index)
+                    if current is not None:
+                        current.remove(item)
+                    continue
+                current = self._get_index(index, item.get_type())
+                payload = get_payload(item)
+                if action == 'updating':
+                    # updates the fields of an existing document only, like the update API of Elasticsearch
+                    slot = current.slots.get(item.get_id())
+                    if slot is None:
+                        LOGGER.warning(f'Document {item.get_id()} does not exist in {index}, it is not updated')
+                        continue
+                    payload = {**(current.payloads[slot] or {}), **payload}
+                current.add(item.get_id(), payload)
+            if index in self._indices:
+                self._indices[index].compact()
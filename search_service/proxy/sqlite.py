@@ -0,0 +1,532 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import logging
+import math
+import os
+import sqlite3
+from threading import local
+from typing import (
+    Any, Dict, List, Optional, Tuple,
+)
+
+from search_service.models.autocomplete import AutocompleteResult
+from search_service.models.facets import (
+    Facet, FacetValue, SearchFacetsResult,
+)
+from search_service.models.search_result import decode_cursor, encode_cursor
+from search_service.proxy.elasticsearch import (
+    AUTOCOMPLETE_LOOKUPS, WILDCARD_PATTERN, get_autocomplete_suggestion, get_hydration_plan, hydrate,
+)
+from search_service.proxy.elasticsearch_index_map import SEARCH_FIELDS
+from search_service.proxy.memory import (
+    FILTER_MAPPINGS, INDEX_FIELDS, INDEX_RESOURCES, LOWERCASE_KEYWORD, MODELS, QUERIES, RESOURCE_INDICES, TEXT,
+    _LocalProxy, analyze, get_payload,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_PATH = 'search.db'
+
+# Documents written per transaction by the document APIs
+WRITE_BATCH_SIZE = 1000
+
+# Seconds a connection waits for the lock of the database, held by the writes of any worker
+BUSY_TIMEOUT_SEC = 30
+
+# Pages of the database each connection caches on top of the page cache of the OS, which memory maps the database
+# file up to SQLITE_MMAP_SIZE bytes, and shares it between the workers
+SQLITE_CACHE_SIZE_KIB = 8192
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+# Words of text fields are letters only, as with the simple analyzer of the index maps
+FTS_TOKENIZER = "unicode61 remove_diacritics 0 separators '0123456789'"
+
+# Temporary table of the documents matching the query term of facets, counted by every category
+MATCHED_DOCUMENTS = 'matched_documents'
+
+# Lowest inverse document frequency of a term, as FTS5 scores terms of more than half of the documents
+MIN_IDF = 1e-6
+
+
+def quote(name: str) -> str:
+    """
+    SQL identifier of {name}
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def get_fts_fields(resource: str) -> List[str]:
+    """
+    Text fields of INDEX_FIELDS, the columns of the full text index of {resource}, in order
+    """
+    return [field for field, (_, analysis) in INDEX_FIELDS[resource].items() if analysis == TEXT]
+
+
+def to_glob(value: str) -> str:
+    """
+    GLOB pattern of the wildcard value of a filter, with the wildcards of Elasticsearch
+    """
+    return value.replace('[', '[[]')
+
+
+class _Tables:
+    """
+    Names of the tables of an index:
+      - documents: a row per document, with its payload in JSON and the columns sorting the results
+      - text: FTS5 index of the text fields of the document of the same rowid
+      - values: a row per value of every keyword field of a document, indexed for the filters, facets and
+        autocomplete lookups
+    """
+
+    def __init__(self, index: str) -> None:
+        self.documents = quote(f'{index}_documents')
+        self.text = quote(f'{index}_text')
+        self.values = quote(f'{index}_values')
+        self.values_document = quote(f'{index}_values_document')
+
+
+class SqliteProxy(_LocalProxy):
+    """
+    Search engine on a SQLite database, for single node deployments without Elasticsearch.
+
+    The database is the file at {host} (PROXY_ENDPOINT), in WAL mode, so that the workers of the service read it
+    concurrently, from the page cache of the OS rather than a copy of every worker. Text fields are searched with
+    FTS5, whose bm25 weights the fields with the boosts of the queries of ElasticsearchProxy. FTS5 sums the scores
+    of the fields, rather than keeping the best field as the multi match queries do. Filters, facets and autocomplete
+    lookups match the indexed values of the keyword fields. Total numbers of results are always exact.
+    """
+
+    def __init__(self, *,
+                 host: str = None,
+                 user: str = '',
+                 password: str = '',
+                 client: Any = None,
+                 page_size: int = 10) -> None:
+        self.path = host or DEFAULT_DATABASE_PATH
+        self.page_size = page_size
+        self._local = local()
+
+    def _connect(self) -> Any:
+        """
+        Connection of the current thread, opened again after a fork as connections can't be shared by processes
+        """
+        state = self._local
+        if getattr(state, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}')
+            connection.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+            state.connection, state.pid, state.indices, state.counts = connection, os.getpid(), {}, {}
+        return state.connection
+
+    def _get_tables(self, connection: Any, index: str, resource: str) -> Tuple[_Tables, str]:
+        """
+        Tables of {index}, created on first write, and the resource of the index
+        """
+        indices = self._local.indices
+        if index not in indices:
+            resource = INDEX_RESOURCES.get(index, resource)
+            tables = _Tables(index)
+            columns = ', '.join(quote(field) for field in get_fts_fields(resource))
+            connection.executescript(f"""
+                CREATE TABLE IF NOT EXISTS {tables.documents} (
+                    rowid INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    total_usage INTEGER NOT NULL,
+                    autocomplete_usage INTEGER NOT NULL,
+                    usage_factor REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS {tables.values} (
+                    field TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    document INTEGER NOT NULL,
+                    PRIMARY KEY (field, value, document)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS {tables.values_document} ON {tables.values} (document);
+                CREATE VIRTUAL TABLE IF NOT EXISTS {tables.text} USING fts5({columns}, tokenize="{FTS_TOKENIZER}");
+            """)
+            indices[index] = (tables, resource)
+        return indices[index]
+
+    def _get_existing_tables(self, connection: Any, index: str) -> Optional[_Tables]:
+        """
+        Tables of {index} if they exist, without creating them nor telling the resource of the index
+        """
+        if index in self._local.indices:
+            return self._local.indices[index][0]
+        exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                    (f'{index}_documents',)).fetchone()
+        return _Tables(index) if exists else None
+
+    def _find_tables(self, connection: Any, index: str, resource: str) -> Optional[Tuple[_Tables, str]]:
+        """
+        Tables of {index} and the resource of the index if the tables exist, so that searches of unknown indices
+        don't create anything in the database
+        """
+        indices = self._local.indices
+        if index not in indices:
+            tables = self._get_existing_tables(connection, index)
+            if tables is None:
+                return None
+            indices[index] = (tables, INDEX_RESOURCES.get(index, resource))
+        return indices[index]
+
+    def _count_documents(self, connection: Any, tables: _Tables) -> int:
+        """
+        Number of documents of an index, counted again once any connection wrote to the database
+        """
+        version = connection.execute('PRAGMA data_version').fetchone()[0]
+        count = self._local.counts.get(tables.documents)
+        if count is None or count[0] != version:
+            count = self._local.counts[tables.documents] = \
+                (version, connection.execute(f'SELECT count(*) FROM {tables.documents}').fetchone()[0])
+        return count[1]
+
+    def _get_matches(self, connection: Any, tables: _Tables, resource: str,
+                     query_term: str) -> Tuple[str, List[Any]]:
+        """
+        Query of the documents matching {query_term} and their scores, summing the scores of the parts of the query
+        they match: the bm25 score of the text fields, weighted by the boosts of the fields, and the exact matches of
+        keyword fields, scored with the boost and the inverse document frequency of the query term
+        """
+        boosts, all_words, _ = QUERIES[resource]
+        queries, params = [], []  # type: List[str], List[Any]
+
+        fields = get_fts_fields(resource)
+        words = [f'"{word}"' for word in dict.fromkeys(analyze(query_term, TEXT))]
+        if words and all_words:
+            # every word must match a same field
+            match = ' OR '.join(f'{{{quote(field)}}} : ({" AND ".join(words)})' for field in fields if field in boosts)
+        else:
+            match = ' OR '.join(words)
+        if match:
+            weights = ', '.join(str(float(boosts.get(field, 0))) for field in fields)
+            # the limit keeps SQLite from flattening the full text query into the joins of the search, where bm25
+            # can't be computed
+            queries.append(f'SELECT * FROM (SELECT rowid AS document, -bm25({tables.text}, {weights}) AS score '
+                           f'FROM {tables.text} WHERE {tables.text} MATCH ? LIMIT -1)')
+            params.append(match)
+
+        for field, boost in boosts.items():
+            analysis = INDEX_FIELDS[resource][field][1]
+            if analysis == TEXT:
+                continue
+            for value in analyze(query_term, analysis):
+                having = connection.execute(f'SELECT count(*) FROM {tables.values} WHERE field = ? AND value = ?',
+                                            (field, value)).fetchone()[0]
+                if not having:
+                    continue
+                total = self._count_documents(connection, tables)
+                idf = max(math.log((total - having + 0.5) / (having + 0.5)), MIN_IDF)
+                queries.append(f'SELECT document, ? AS score FROM {tables.values} WHERE field = ? AND value = ?')
+                params.extend([boost * idf, field, value])
+        if len(queries) > 1:
+            return f'SELECT document, sum(score) AS score FROM ({" UNION ALL ".join(queries)}) GROUP BY document', \
+                params
+        return ''.join(queries), params
+
+    @staticmethod
+    def _get_filter_conditions(resource: str, filters: Dict[str, Any]) -> Dict[str, Tuple[str, List[Any]]]:
+        """
+        Condition on the values of the keyword fields of every filter category, matching any of the values of the
+        category, as with ElasticsearchProxy.parse_filters. Values with wildcards match as GLOB patterns. The
+        categories without wildcards and with the fewest values, likely the most selective, come first.
+        """
+        conditions = []  # type: List[Tuple[Tuple[bool, int], str, Tuple[str, List[Any]]]]
+        mapping = FILTER_MAPPINGS[resource]
+        for category, item_list in filters.items():
+            field = mapping.get(category)
+            if field is None:
+                LOGGER.warning(f'Unsupported filter category: {category} passed in list of filters')
+                continue
+            if item_list == '' or item_list == ['']:
+                LOGGER.warning(f'The filter value cannot be empty.In this case the filter {category} is ignored')
+                continue
+            analysis = INDEX_FIELDS[resource][field][1]
+            values = [str(value).lower() if analysis == LOWERCASE_KEYWORD else str(value)
+                      for value in (item_list if isinstance(item_list, list) else [item_list])]
+            wildcards = [bool(WILDCARD_PATTERN.search(value)) for value in values]
+            clauses = ['value GLOB ?' if wildcard else 'value = ?' for wildcard in wildcards]
+            conditions.append(((any(wildcards), len(values)), category,
+                               (f'field = ? AND ({" OR ".join(clauses)})',
+                                [field] + [to_glob(value) if wildcard else value
+                                           for value, wildcard in zip(values, wildcards)])))
+        return {category: condition for _, category, condition in sorted(conditions, key=lambda item: item[0])}
+
+    @staticmethod
+    def _get_query_term_score(tables: _Tables, resource: str, query_term: str) -> Tuple[str, List[Any]]:
+        """
+        Expression of the number of the SEARCH_FIELDS of a document (as d, and as t in the text index) with a term
+        containing {query_term}, as the query string of ElasticsearchProxy.parse_query_term matches them. The text
+        index keeps the terms of a text field on lines of their own, which a query term can't span.
+        """
+        needle = query_term.lower()
+        expressions, params = [], []  # type: List[str], List[Any]
+        for field in SEARCH_FIELDS[RESOURCE_INDICES[resource]]:
+            if INDEX_FIELDS[resource][field][1] == TEXT:
+                expressions.append(f'(instr(t.{quote(field)}, ?) > 0)')
+                params.append(needle)
+            else:
+                expressions.append(f'EXISTS (SELECT 1 FROM {tables.values} INDEXED BY {tables.values_document} '
+                                   f'WHERE document = d.rowid AND field = ? AND instr(lower(value), ?) > 0)')
+                params.extend([field, needle])
+        return ' + '.join(expressions), params
+
+    def _get_search_result(self, *,
+                           connection: Any,
+                           tables: _Tables,
+                           resource: str,
+                           matches: str,
+                           params: List[Any],
+                           page_index: int,
+                           cursor: Optional[str]) -> Any:
+        """
+        Page of results of the documents of {matches}, sorted by their scores times their usage factor, then
+        total_usage and id like the results of ElasticsearchProxy, so that the cursors of the results of both proxies
+        look the same. Only the payloads of the documents of the page are read, once sorted.
+        """
+        model, search_result_model = MODELS[resource]
+        if not matches:
+            return search_result_model(total_results=0, results=[])
+
+        scored = f'SELECT d.rowid AS document, d.id AS id, d.total_usage AS total_usage, ' \
+                 f'm.score * d.usage_factor AS score, count(*) OVER () AS total ' \
+                 f'FROM ({matches}) AS m JOIN {tables.documents} AS d ON d.rowid = m.document'
+        where, where_params = '', []  # type: str, List[Any]
+        start_from = None  # type: Optional[int]
+        if cursor:
+            score, usage, id = decode_cursor(cursor)
+            where = 'WHERE score < ? OR score = ? AND (total_usage < ? OR total_usage = ? AND id > ?)'
+            where_params = [score, score, usage, usage, id]
+            size, skip = self.page_size, 0
+        elif page_index < 0:
+            size, skip = -1, 0
+        else:
+            start_from = skip = page_index * self.page_size
+            size = self.page_size
+
+        rows = connection.execute(f'SELECT document, id, total_usage, score, total FROM ({scored}) {where} '
+                                  f'ORDER BY score DESC, total_usage DESC, id LIMIT ? OFFSET ?',
+                                  params + where_params + [size, skip]).fetchall()
+        if rows:
+            total_results = rows[0][4]
+        else:
+            total_results = connection.execute(f'SELECT count(*) FROM ({scored})', params).fetchone()[0]
+
+        payloads = dict(connection.execute(
+            f'SELECT rowid, payload FROM {tables.documents} WHERE rowid IN ({", ".join("?" * len(rows))})',
+            [row[0] for row in rows]).fetchall()) if rows else {}
+        plan = get_hydration_plan(model)
+        results = [hydrate(model=model, plan=plan, payload=json.loads(payloads[document]), id=id)
+                   for document, id, _, _, _ in rows]
+
+        next_cursor = None
+        if size > 0 and len(results) == size and (start_from is None or start_from + len(results) < total_results):
+            _, id, usage, score, _ = rows[-1]
+            next_cursor = encode_cursor([score, usage, id])
+        return search_result_model(total_results=total_results, results=results, next_cursor=next_cursor)
+
+    def _search_matches(self, *, resource: str, index: str, query_term: str, page_index: int,
+                        cursor: Optional[str]) -> Any:
+        connection = self._connect()
+        found = self._find_tables(connection, index, resource)
+        if found is None:
+            return MODELS[resource][1](total_results=0, results=[])
+        tables, resource = found
+        matches, params = self._get_matches(connection, tables, resource, query_term)
+        return self._get_search_result(connection=connection, tables=tables, resource=resource, matches=matches,
+                                       params=params, page_index=page_index, cursor=cursor)
+
+    def _get_filtered_documents(self, tables: _Tables, resource: str, query_term: str,
+                                conditions: List[Tuple[str, List[Any]]],
+                                matched: bool = False) -> Tuple[str, List[Any]]:
+        """
+        Query of the documents matching {query_term} if any and every condition, and their scores: the number of
+        fields matching the query term, 0 without query term. The documents of the first condition are looked up,
+        then checked against the other conditions one by one.
+
+        :param matched: whether the documents are also among the documents of the temporary table MATCHED_DOCUMENTS
+        """
+        wheres, params = [], []  # type: List[str], List[Any]
+        for number, (condition, condition_params) in enumerate(conditions):
+            if number == 0:
+                wheres.append(f'd.rowid IN (SELECT document FROM {tables.values} WHERE {condition})')
+            else:
+                wheres.append(f'EXISTS (SELECT 1 FROM {tables.values} INDEXED BY {tables.values_document} '
+                              f'WHERE document = d.rowid AND {condition})')
+            params.extend(condition_params)
+        if matched:
+            wheres.append(f'd.rowid IN temp.{MATCHED_DOCUMENTS}')
+        where = ' AND '.join(wheres) or '1'
+        if not query_term:
+            return f'SELECT d.rowid AS document, 0 AS score FROM {tables.documents} AS d WHERE {where}', params
+
+        score, score_params = self._get_query_term_score(tables, resource, query_term)
+        return (f'SELECT document, score FROM (SELECT d.rowid AS document, {score} AS score '
+                f'FROM {tables.documents} AS d JOIN {tables.text} AS t ON t.rowid = d.rowid WHERE {where}) '
+                f'WHERE score > 0'), score_params + params
+
+    def _search_with_filters(self, *, resource: str, index: str, query_term: str, filters: Dict[str, Any],
+                             page_index: int, cursor: Optional[str]) -> Any:
+        connection = self._connect()
+        found = self._find_tables(connection, index, resource)
+        if found is None:
+            return MODELS[resource][1](total_results=0, results=[])
+        tables, resource = found
+        conditions = self._get_filter_conditions(resource, filters)
+        matches, params = self._get_filtered_documents(tables, resource, query_term, list(conditions.values()))
+        return self._get_search_result(connection=connection, tables=tables, resource=resource, matches=matches,
+                                       params=params, page_index=page_index, cursor=cursor)
+
+    def _count_facets(self, *, resource: str, index: str, query_term: str, filters: Dict[str, Any],
+                      facet_fields: Dict[str, str], size: int) -> SearchFacetsResult:
+        """
+        Counts the values of each category grouping the indexed values of the category. The documents matching
+        the query term are looked up once, into the temporary table MATCHED_DOCUMENTS of the connection.
+        """
+        connection = self._connect()
+        found = self._find_tables(connection, index, resource)
+        if found is None:
+            return SearchFacetsResult(total_results=0, facets=[Facet(name=category, values=[])
+                                                               for category in facet_fields])
+        tables, resource = found
+        conditions = self._get_filter_conditions(resource, filters)
+        if query_term:
+            documents, params = self._get_filtered_documents(tables, resource, query_term, [])
+            connection.execute(f'CREATE TEMP TABLE IF NOT EXISTS {MATCHED_DOCUMENTS} (document INTEGER PRIMARY KEY)')
+            connection.execute(f'DELETE FROM temp.{MATCHED_DOCUMENTS}')
+            connection.execute(f'INSERT INTO temp.{MATCHED_DOCUMENTS} SELECT document FROM ({documents})', params)
+
+        facets = []
+        for category, field in facet_fields.items():
+            documents, params = self._get_filtered_documents(
+                tables, resource, '',
+                [condition for other_category, condition in conditions.items() if other_category != category],
+                matched=bool(query_term))
+            rows = connection.execute(f'SELECT value, count(*) FROM {tables.values} '
+                                      f'WHERE field = ? AND document IN (SELECT document FROM ({documents})) '
+                                      f'GROUP BY value ORDER BY count(*) DESC, value LIMIT ?',
+                                      [field, *params, size]).fetchall()
+            facets.append(Facet(name=category, values=[FacetValue(value=value, count=count) for value, count in rows]))
+
+        documents, params = self._get_filtered_documents(tables, resource, '', list(conditions.values()),
+                                                         matched=bool(query_term))
+        total_results = connection.execute(f'SELECT count(*) FROM ({documents})', params).fetchone()[0]
+        return SearchFacetsResult(total_results=total_results, facets=facets)
+
+    def _count_matches(self, *, resource: str, index: str, query_term: str, max_count: Optional[int]) -> int:
+        """
+        Counts the documents matching the query term, up to one more than {max_count}
+        """
+        connection = self._connect()
+        found = self._find_tables(connection, index, resource)
+        if found is None:
+            return 0
+        tables, resource = found
+        matches, params = self._get_matches(connection, tables, resource, query_term)
+        count = 0
+        if matches:
+            count = connection.execute(f'SELECT count(*) FROM (SELECT document FROM ({matches}) LIMIT ?)',
+                                       params + [-1 if max_count is None else max_count + 1]).fetchone()[0]
+        return count
+
+    def _lookup_prefix(self, *, prefix: str, indices: Dict[str, str], size: int) -> Dict[str, AutocompleteResult]:
+        """
+        Looks up the prefix in the indexed values of the keyword fields
+        """
+        connection = self._connect()
+        results = {}  # type: Dict[str, AutocompleteResult]
+        for resource, index in indices.items():
+            fields, lowercase, _, _ = AUTOCOMPLETE_LOOKUPS[resource]
+            found = self._find_tables(connection, index, resource)
+            if found is None:
+                results[resource] = AutocompleteResult(results=[])
+                continue
+            tables, _ = found
+            lookups = [(field, value) for field in fields
+                       for value in ([prefix.lower()] if lowercase else dict.fromkeys([prefix, prefix.lower()]))]
+            documents = ' UNION '.join(f'SELECT document FROM {tables.values} '
+                                       f'WHERE field = ? AND value >= ? AND value < ?' for _ in lookups)
+            params = [param for field, value in lookups
+                      for param in (field, value, value + '\U0010ffff')]  # type: List[Any]
+            rows = connection.execute(f'SELECT payload FROM {tables.documents} WHERE rowid IN ({documents}) '
+                                      f'ORDER BY autocomplete_usage DESC, id LIMIT ?', params + [size]).fetchall()
+            results[resource] = AutocompleteResult(results=[get_autocomplete_suggestion(resource, json.loads(payload))
+                                                            for payload, in rows])
+        return results
+
+    @staticmethod
+    def _delete(connection: Any, tables: _Tables, rowid: int) -> None:
+        connection.execute(f'DELETE FROM {tables.text} WHERE rowid = ?', (rowid,))
+        connection.execute(f'DELETE FROM {tables.values} WHERE document = ?', (rowid,))
+        connection.execute(f'DELETE FROM {tables.documents} WHERE rowid = ?', (rowid,))
+
+    @staticmethod
+    def _insert(connection: Any, tables: _Tables, resource: str, id: str, payload: Dict[str, Any]) -> None:
+        _, _, usage_factor = QUERIES[resource]
+        usage_field = AUTOCOMPLETE_LOOKUPS[resource][2]
+        total_usage = payload.get('total_usage') or 0
+        rowid = connection.execute(
+            f'INSERT INTO {tables.documents} (id, payload, total_usage, autocomplete_usage, usage_factor) '
+            f'VALUES (?, ?, ?, ?, ?)',
+            (id, json.dumps(payload, default=str), total_usage, payload.get(usage_field) or 0,
+             math.log10(2 + total_usage) if usage_factor else 1.0)).lastrowid
+
+        fts_fields = get_fts_fields(resource)
+        connection.execute(f'INSERT INTO {tables.text} (rowid, {", ".join(quote(field) for field in fts_fields)}) '
+                           f'VALUES (?{", ?" * len(fts_fields)})',
+                           [rowid] + ['\n'.join(analyze(payload.get(INDEX_FIELDS[resource][field][0]), TEXT))
+                                      for field in fts_fields])
+        connection.executemany(f'INSERT OR IGNORE INTO {tables.values} (field, value, document) VALUES (?, ?, ?)',
+                               [(field, value, rowid) for field, (attr, analysis) in INDEX_FIELDS[resource].items()
+                                if analysis != TEXT for value in analyze(payload.get(attr), analysis)])
+
+    def _write_document(self, connection: Any, tables: _Tables, resource: str, item: Any, action: str) -> None:
+        id = item if action == 'deleting' else item.get_id()
+        existing = connection.execute(f'SELECT rowid, payload FROM {tables.documents} WHERE id = ?', (id,)).fetchone()
+        if action == 'deleting':
+            if existing:
+                self._delete(connection, tables, existing[0])
+            return
+        payload = get_payload(item)
+        if action == 'updating':
+            # updates the fields of an existing document only, like the update API of Elasticsearch
+            if existing is None:
+                LOGGER.warning(f'Document {id} does not exist, it is not updated')
+                return
+            payload = {**json.loads(existing[1]), **payload}
+        if existing:
+            self._delete(connection, tables, existing[0])
+        self._insert(connection, tables, resource, id, payload)
+
+    def _write_documents(self, *, data: List[Any], index: str, action: str) -> None:
+        """
+        Writes the documents in transactions of WRITE_BATCH_SIZE documents, each taking the write lock of the
+        database once rather than once per statement
+        """
+        connection = self._connect()
+        if action == 'deleting':
+            # the ids of deletes don't tell the resource of an index that isn't known yet, nor have anything to delete
+            # in an index that doesn't exist
+            existing = self._get_existing_tables(connection, index)
+            if existing is None:
+                return
+            tables, resource = existing, ''
+        else:
+            tables, resource = self._get_tables(connection, index, data[0].get_type())
+        for start in range(0, len(data), WRITE_BATCH_SIZE):
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                for item in data[start:start + WRITE_BATCH_SIZE]:
+                    self._write_document(connection, tables, resource, item, action)
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            finally:
+                # the data version only changes with the writes of the other connections
+                self._local.counts.clear()
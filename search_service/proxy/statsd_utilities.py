@@ -7,7 +7,7 @@ from typing import (  # noqa: F401
     Any, Callable, Dict,
 )
 
-from flask import current_app
+from flask import current_app, has_app_context
 from statsd import StatsClient
 
 from search_service import config
@@ -53,6 +53,57 @@ def timer_with_counter(f: Callable) -> Any:
     return wrapper
 
 
+def incr_counter(*, prefix: str, name: str, count: int = 1) -> None:
+    """
+    Increments statsd counter {prefix}.{name}. It's a no-op when the stats feature is disabled
+    or when it's called outside of the Flask application context.
+
+    :param prefix: statsd prefix, usually the module name of the caller
+    :param name: metric name
+    :param count: value to increment the counter with
+    """
+    if not has_app_context():
+        return
+
+    statsd_client = _get_statsd_client(prefix=prefix)
+    if statsd_client:
+        statsd_client.incr(name, count)
+
+
+def record_timing(*, prefix: str, name: str, ms: float) -> None:
+    """
+    Records statsd timing {prefix}.{name}. Like incr_counter, it's a no-op when the stats feature is disabled
+    or when it's called outside of the Flask application context.
+
+    :param prefix: statsd prefix, usually the module name of the caller
+    :param name: metric name
+    :param ms: duration in milliseconds
+    """
+    if not has_app_context():
+        return
+
+    statsd_client = _get_statsd_client(prefix=prefix)
+    if statsd_client:
+        statsd_client.timing(name, ms)
+
+
+def set_gauge(*, prefix: str, name: str, value: float) -> None:
+    """
+    Sets statsd gauge {prefix}.{name}. Like incr_counter, it's a no-op when the stats feature is disabled
+    or when it's called outside of the Flask application context.
+
+    :param prefix: statsd prefix, usually the module name of the caller
+    :param name: metric name
+    :param value: value of the gauge
+    """
+    if not has_app_context():
+        return
+
+    statsd_client = _get_statsd_client(prefix=prefix)
+    if statsd_client:
+        statsd_client.gauge(name, value)
+
+
 def _get_statsd_client(*, prefix: str) -> StatsClient:
     """
     Object pool method that reuse already created StatsClient based on prefix
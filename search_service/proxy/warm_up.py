@@ -0,0 +1,94 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+import time
+from threading import Event, Thread
+
+from flask import Flask
+
+from search_service import config
+from search_service.api.batch import RESOURCE_INDEX
+from search_service.models.batch import BatchSearchRequest
+from search_service.proxy import get_proxy_client
+from search_service.proxy.statsd_utilities import incr_counter, record_timing
+
+LOGGER = logging.getLogger(__name__)
+
+# set while no warm-up of the proxy client is running
+_ready = Event()
+_ready.set()
+
+
+def is_proxy_client_ready() -> bool:
+    """
+    Whether the proxy client is ready to serve searches, i.e. no warm-up of the proxy client is running
+    """
+    return _ready.is_set()
+
+
+def warm_up_proxy_client(app: Flask) -> Thread:
+    """
+    Builds the proxy client of {app} in a background thread, ahead of the first request. It then prepares its
+    searches in the backend (e.g. registers the search templates of Elasticsearch), opens
+    PROXY_CLIENT_WARMUP_CONNECTIONS connections to the backend, and searches every resource for each of
+    PROXY_CLIENT_WARMUP_QUERIES. The proxy client is reported as not ready until the warm-up completes,
+    whether it succeeds or not: a backend down at boot time must not keep the service out of rotation.
+
+    Servers forking their workers after loading the app (e.g. gunicorn --preload) must warm up each worker after
+    the fork instead, as the forked workers would share the connections of the parent.
+
+    :return: thread of the warm-up
+    """
+    _ready.clear()
+    thread = Thread(target=_warm_up, args=(app,), name='proxy-client-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def prepare_proxy_client_searches(app: Flask) -> None:
+    """
+    Prepares the searches of the proxy client of {app} in its backend, for apps not warming up their proxy client.
+    A failure is logged and counted rather than raised, for a backend down at boot time: the searches then prepare
+    what they need on their first use.
+    """
+    with app.app_context():
+        try:
+            get_proxy_client().prepare_searches()
+        except Exception:
+            LOGGER.exception('Failed to prepare the searches of the proxy client, they will prepare on first use')
+            incr_counter(prefix=__name__, name='prepare_searches.failure')
+
+
+def _warm_up(app: Flask) -> None:
+    start = time.perf_counter()
+    try:
+        with app.app_context():
+            try:
+                _open_connections_and_search(app)
+            except Exception:
+                LOGGER.exception('Failed to warm up the proxy client')
+                incr_counter(prefix=__name__, name='warm_up.failure')
+            record_timing(prefix=__name__, name='warm_up', ms=(time.perf_counter() - start) * 1000)
+    finally:
+        _ready.set()
+    LOGGER.info(f'Warmed up the proxy client in {time.perf_counter() - start:.3f}s')
+
+
+def _open_connections_and_search(app: Flask) -> None:
+    proxy = get_proxy_client()
+    proxy.prepare_searches()
+
+    connections = app.config.get(config.PROXY_CLIENT_WARMUP_CONNECTIONS)
+    if connections:
+        opened = proxy.open_connections(count=connections)
+        LOGGER.info(f'Opened {opened} connections of the proxy client')
+
+    query_terms = app.config.get(config.PROXY_CLIENT_WARMUP_QUERIES) or []
+    if query_terms:
+        results = proxy.fetch_search_results_batch(requests=[
+            BatchSearchRequest(resource=resource, query_term=query_term, index=index)
+            for query_term in query_terms for resource, index in RESOURCE_INDEX.items()])
+        failed = sum(1 for result in results if result.error is not None)
+        if failed:
+            LOGGER.warning(f'{failed} of the {len(results)} warm-up searches of the proxy client failed')
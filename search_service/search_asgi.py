@@ -0,0 +1,304 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import (  # noqa: F401
+    Any, Awaitable, Callable, Dict, List, Optional, Tuple,
+)
+
+from flask import (
+    Flask, Response, _app_ctx_stack, json,
+)
+from werkzeug.exceptions import HTTPException, abort
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+from werkzeug.utils import import_string
+
+from search_service import config, create_app
+from search_service.api.base import BaseFilterAPI, get_search_kwargs
+from search_service.api.batch import SearchBatchAPI
+from search_service.api.dashboard import DASHBOARD_INDEX, SearchDashboardAPI
+from search_service.api.search_all import DEFAULT_TIMEOUT_SEC, SearchAllAPI
+from search_service.api.serialization import dump, make_result_response
+from search_service.api.table import TABLE_INDEX, SearchTableAPI
+from search_service.api.user import USER_INDEX, SearchUserAPI
+from search_service.exception import NotFoundException
+from search_service.models.batch import (
+    RESOURCE_DASHBOARD, RESOURCE_TABLE, RESOURCE_USER,
+)
+from search_service.models.dashboard import SearchDashboardResultSchema
+from search_service.models.table import SearchTableResultSchema
+from search_service.models.user import SearchUserResultSchema
+from search_service.proxy import DEFAULT_PAGE_SIZE
+
+"""
+Entry Point to ASGI servers, e.g. uvicorn search_service.search_asgi:application
+"""
+
+LOGGING = logging.getLogger(__name__)
+
+SEARCH_ERROR_MESSAGE = 'Exception encountered while processing search request'
+
+# status, headers and body of a response
+ResponseParts = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+class SearchASGIApplication:
+    """
+    Serves the routes of a search service Flask app over ASGI.
+
+    Searches are awaited on the async proxy client (ASYNC_PROXY_CLIENT), so that a request waiting on the search
+    proxy doesn't hold a thread. They answer with the same JSON as the Flask resources, whose request parsers,
+    validation and serialization they reuse. Every other route, and every route when there is no async proxy client,
+    is served by the Flask app on a thread pool.
+
+    Flask contexts are bound to threads rather than tasks: the app context stays pushed on the thread of the event
+    loop, and request contexts are only pushed around code that doesn't await.
+
+    Searches awaited on the async proxy client skip the search cache (SEARCH_CACHE_ENABLED) and the circuit breaker
+    (SEARCH_CIRCUIT_BREAKER_ENABLED), which only decorate the proxy client of the Flask app.
+    """
+
+    def __init__(self, app: Flask, proxy: Any = None, max_workers: Optional[int] = None) -> None:
+        """
+        :param app: Flask app created by create_app
+        :param proxy: async proxy client, built from the ASYNC_PROXY_CLIENT config if not provided
+        :param max_workers: size of the thread pool serving the routes of the Flask app
+        :raises ImportError: when the dependencies of the ASYNC_PROXY_CLIENT config aren't installed
+        """
+        self.app = app
+        self.proxy = proxy  # type: Any
+        self._proxy_created = proxy is not None
+        # resolved now rather than at the first request, to fail at startup on missing dependencies
+        self._proxy_class = self._get_proxy_class() if proxy is None else None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='search_asgi')
+        self.routes = {
+            ('GET', '/search'): self.search_table,
+            ('GET', '/search_user'): self.search_user,
+            ('GET', '/search_dashboard'): self.search_dashboard,
+            ('POST', '/search_table'): self.search_table_filter,
+            ('POST', '/search_dashboard_filter'): self.search_dashboard_filter,
+            ('POST', '/search_batch'): self.search_batch,
+            ('GET', '/search_all'): self.search_all,
+        }  # type: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Awaitable[Any]]]
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f'Unsupported scope type {scope["type"]}')
+
+        self._start()
+        environ = self._get_environ(scope, await self._read_body(receive))
+        handler = self.routes.get((scope['method'], scope['path'])) if self.proxy is not None else None
+        if handler is None:
+            loop = asyncio.get_event_loop()
+            status, headers, body = await loop.run_in_executor(self.executor, self._call_flask, environ)
+        else:
+            status, headers, body = await self._call_handler(handler, environ)
+
+        await send({'type': 'http.response.start',
+                    'status': status,
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.proxy is not None:
+                    await self.proxy.close()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _start(self) -> None:
+        if _app_ctx_stack.top is None or _app_ctx_stack.top.app is not self.app:
+            self.app.app_context().push()
+        if not self._proxy_created:
+            self.proxy = self._create_proxy()
+            self._proxy_created = True
+
+    def _get_proxy_class(self) -> Any:
+        proxy_client = self.app.config.get(config.ASYNC_PROXY_CLIENT)
+        if not proxy_client:
+            return None
+
+        proxy_class = import_string(proxy_client)
+        if hasattr(proxy_class, 'check_dependencies'):
+            proxy_class.check_dependencies()
+        for skipped in (config.SEARCH_CACHE_ENABLED, config.SEARCH_CIRCUIT_BREAKER_ENABLED):
+            if self.app.config.get(skipped):
+                LOGGING.warning(f'{skipped} only applies to the routes served by the Flask app, '
+                                f'not to the searches awaited on {proxy_client}')
+        return proxy_class
+
+    def _create_proxy(self) -> Any:
+        if self._proxy_class is None:
+            LOGGING.info('No async proxy client configured, serving every route with the Flask app')
+            return None
+
+        return self._proxy_class(host=self.app.config[config.PROXY_ENDPOINT],
+                                 user=self.app.config[config.PROXY_USER],
+                                 password=self.app.config[config.PROXY_PASSWORD],
+                                 page_size=self.app.config.get(config.SEARCH_PAGE_SIZE_KEY, DEFAULT_PAGE_SIZE))
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> bytes:
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return body
+
+    @staticmethod
+    def _get_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        server = scope.get('server') or ('localhost', 80)
+        builder = EnvironBuilder(path=scope['path'],
+                                 base_url=f'{scope.get("scheme", "http")}://{server[0]}:{server[1]}'
+                                          f'{scope.get("root_path", "")}',
+                                 query_string=scope.get('query_string', b'').decode('latin-1'),
+                                 method=scope['method'],
+                                 headers=[(name.decode('latin-1'), value.decode('latin-1'))
+                                          for name, value in scope.get('headers', [])],
+                                 data=body)
+        try:
+            return builder.get_environ()
+        finally:
+            builder.close()
+
+    def _call_flask(self, environ: Dict[str, Any]) -> ResponseParts:
+        app_iter, status, headers = run_wsgi_app(self.app.wsgi_app, environ, buffered=True)
+        try:
+            body = b''.join(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+        return int(status.split(' ', 1)[0]), list(headers.to_wsgi_list()), body
+
+    async def _call_handler(self,
+                            handler: Callable[[Dict[str, Any]], Awaitable[Any]],
+                            environ: Dict[str, Any]) -> ResponseParts:
+        try:
+            rv = await handler(environ)
+        except HTTPException as e:
+            rv = e.response if e.response is not None else \
+                (getattr(e, 'data', None) or {'message': e.description}, e.code)
+        except Exception:
+            LOGGING.exception(SEARCH_ERROR_MESSAGE)
+            rv = {'message': SEARCH_ERROR_MESSAGE}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+        with self.app.request_context(environ):
+            response = self.app.process_response(self._make_response(rv))
+        return response.status_code, list(response.headers.to_wsgi_list()), response.get_data()
+
+    @staticmethod
+    def _make_response(rv: Any) -> Response:
+        """
+        Turns what a Flask resource returns, a response or a (data, status) tuple, into a response
+        """
+        if isinstance(rv, tuple):
+            data, status = rv
+            return Response(json.dumps(data) + '\n', status=int(status), mimetype='application/json')
+        return rv
+
+    def _parse(self, environ: Dict[str, Any], parse: Callable[[], Any]) -> Any:
+        """
+        Runs the before request functions of the Flask app, e.g. the validation of flasgger, then {parse}
+        """
+        with self.app.request_context(environ):
+            rv = self.app.preprocess_request()
+            if rv is not None:
+                abort(self.app.make_response(rv))
+            return parse()
+
+    @staticmethod
+    def _parse_search_args(resource: Any) -> Callable[[], Tuple[Any, Dict[str, Any]]]:
+        # parses the arguments of the request with the parser of {resource}, along with the optional proxy kwargs
+        def parse() -> Tuple[Any, Dict[str, Any]]:
+            args = resource.parser.parse_args(strict=True)
+            return args, get_search_kwargs(args)
+        return parse
+
+    async def _search(self, environ: Dict[str, Any], resource: Any, fetch: Callable[..., Awaitable[Any]],
+                      schema: Any) -> Any:
+        args, search_kwargs = self._parse(environ, self._parse_search_args(resource))
+        results = await fetch(query_term=args.get('query_term'),
+                              page_index=args.get('page_index'),
+                              index=args.get('index'),
+                              **search_kwargs)
+        return make_result_response(results, schema)
+
+    async def search_table(self, environ: Dict[str, Any]) -> Any:
+        return await self._search(environ, SearchTableAPI, self.proxy.fetch_table_search_results,
+                                  SearchTableResultSchema)
+
+    async def search_user(self, environ: Dict[str, Any]) -> Any:
+        return await self._search(environ, SearchUserAPI, self.proxy.fetch_user_search_results,
+                                  SearchUserResultSchema)
+
+    async def search_dashboard(self, environ: Dict[str, Any]) -> Any:
+        try:
+            return await self._search(environ, SearchDashboardAPI, self.proxy.fetch_dashboard_search_results,
+                                      SearchDashboardResultSchema)
+        except NotFoundException:
+            return {'message': 'query_term does not exist'}, HTTPStatus.NOT_FOUND
+
+    async def _search_with_filter(self, environ: Dict[str, Any], index: str, schema: Any) -> Any:
+        search_kwargs = self._parse(environ, lambda: BaseFilterAPI.parse_search_args(index=index))
+        results = await self.proxy.fetch_search_results_with_filter(**search_kwargs)
+        return make_result_response(results, schema)
+
+    async def search_table_filter(self, environ: Dict[str, Any]) -> Any:
+        return await self._search_with_filter(environ, TABLE_INDEX, SearchTableResultSchema)
+
+    async def search_dashboard_filter(self, environ: Dict[str, Any]) -> Any:
+        return await self._search_with_filter(environ, DASHBOARD_INDEX, SearchDashboardResultSchema)
+
+    async def search_batch(self, environ: Dict[str, Any]) -> Any:
+        requests = self._parse(environ, SearchBatchAPI.parse_requests)
+        batch_results = await self.proxy.fetch_search_results_batch(requests=requests)
+        return SearchBatchAPI.make_response(requests, batch_results)
+
+    async def search_all(self, environ: Dict[str, Any]) -> Any:
+        args, search_kwargs = self._parse(environ, self._parse_search_args(SearchAllAPI))
+        kwargs = dict(query_term=args['query_term'], page_index=args['page_index'], **search_kwargs)
+        searches = {
+            RESOURCE_TABLE: (self.proxy.fetch_table_search_results(index=TABLE_INDEX, **kwargs),
+                             SearchTableResultSchema),
+            RESOURCE_USER: (self.proxy.fetch_user_search_results(index=USER_INDEX, **kwargs),
+                            SearchUserResultSchema),
+            RESOURCE_DASHBOARD: (self.proxy.fetch_dashboard_search_results(index=DASHBOARD_INDEX, **kwargs),
+                                 SearchDashboardResultSchema),
+        }  # type: Dict[str, Any]
+        tasks = {resource: asyncio.ensure_future(search) for resource, (search, _) in searches.items()}
+        await asyncio.wait(tasks.values(),
+                           timeout=self.app.config.get(config.SEARCH_ALL_TIMEOUT_SEC, DEFAULT_TIMEOUT_SEC))
+
+        results = {}  # type: Dict[str, Any]
+        timed_out = []  # type: List[str]
+        failed = []  # type: List[str]
+        for resource, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                timed_out.append(resource)
+            elif task.exception() is not None:
+                LOGGING.error(f'Failed to search {resource}', exc_info=task.exception())
+                failed.append(resource)
+            else:
+                results[resource] = dump(task.result(), searches[resource][1])
+        return SearchAllAPI.make_response(results=results, timed_out=timed_out, failed=failed)
+
+
+config_module_class = (os.getenv('SEARCH_SVC_CONFIG_MODULE_CLASS') or
+                       'search_service.config.LocalConfig')
+
+application = SearchASGIApplication(create_app(config_module_class=config_module_class))
@@ -11,6 +11,11 @@ requirements_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'r
 with open(requirements_path) as requirements_file:
     requirements = requirements_file.readlines()
 
+# asyncio transport of the elasticsearch 6.x client, for the async proxy client of the ASGI entry point
+asgi = ['elasticsearch-async>=6.2.0,<7.0']
+
+all_deps = asgi
+
 setup(
     name='amundsen-search',
     version=__version__,
@@ -23,5 +28,9 @@ setup(
     zip_safe=False,
     dependency_links=[],
     install_requires=requirements,
+    extras_require={
+        'all': all_deps,
+        'asgi': asgi,
+    },
     python_requires=">=3.6"
 )
@@ -0,0 +1,69 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from http import HTTPStatus
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from search_service import create_app
+from search_service.models.autocomplete import AutocompleteResult, Suggestion
+
+
+class TestAutocompleteAPI(TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.Config')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.mock_client = patch('search_service.api.autocomplete.get_proxy_client')
+        self.mock_proxy = self.mock_client.start().return_value = Mock()
+        self.mock_proxy.fetch_autocomplete_results.return_value = {
+            'table': AutocompleteResult(results=[Suggestion(name='schema.table', key='hive://gold.schema/table')]),
+            'user': AutocompleteResult(results=[]),
+        }
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+        self.mock_client.stop()
+
+    def test_should_get_suggestions_of_every_resource(self) -> None:
+        response = self.app.test_client().get('/autocomplete', query_string=dict(prefix='sch'))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {
+            'results': {
+                'table': {'results': [{'name': 'schema.table', 'key': 'hive://gold.schema/table'}]},
+                'user': {'results': []},
+            },
+            'failed': ['dashboard'],
+        })
+        self.mock_proxy.fetch_autocomplete_results.assert_called_with(
+            prefix='sch',
+            indices={'table': 'table_search_index',
+                     'dashboard': 'dashboard_search_index',
+                     'user': 'user_search_index'},
+            size=5)
+
+    def test_should_get_suggestions_of_resources(self) -> None:
+        response = self.app.test_client().get('/autocomplete',
+                                              query_string=dict(prefix='sch', resources='user, table', size=50))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json['failed'], [])
+        self.mock_proxy.fetch_autocomplete_results.assert_called_with(
+            prefix='sch',
+            indices={'user': 'user_search_index', 'table': 'table_search_index'},
+            size=20)
+
+    def test_should_fail_with_unknown_resource(self) -> None:
+        response = self.app.test_client().get('/autocomplete', query_string=dict(prefix='sch', resources='foo'))
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.mock_proxy.fetch_autocomplete_results.assert_not_called()
+
+    def test_should_fail_without_prefix(self) -> None:
+        response = self.app.test_client().get('/autocomplete')
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -0,0 +1,102 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from http import HTTPStatus
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from search_service import create_app
+from search_service.models.batch import BatchSearchRequest, BatchSearchResult
+from search_service.models.table import SearchTableResult
+from search_service.models.user import SearchUserResult
+from tests.unit.api.table.fixtures import mock_json_response, mock_proxy_results
+
+
+class TestSearchBatchAPI(TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.Config')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.mock_client = patch('search_service.api.batch.get_proxy_client')
+        self.mock_proxy = self.mock_client.start().return_value = Mock()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+        self.mock_client.stop()
+
+    def test_should_get_result_per_search(self) -> None:
+        self.mock_proxy.fetch_search_results_batch.return_value = [
+            BatchSearchResult(result=SearchTableResult(total_results=1, results=[mock_proxy_results()])),
+            BatchSearchResult(error='search failed'),
+        ]
+
+        response = self.app.test_client().post('/search_batch', json={'requests': [
+            {'resource': 'table', 'query_term': 'searchterm'},
+            {'resource': 'dashboard', 'query_term': 'searchterm', 'search_request': {'filters': {'tag': ['a']}}},
+        ]})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {'results': [
+            {'status': 200, 'result': {'total_results': 1, 'results': [mock_json_response()]}},
+            {'status': 500, 'message': 'search failed'},
+        ]})
+        self.mock_proxy.fetch_search_results_batch.assert_called_with(requests=[
+            BatchSearchRequest(resource='table', query_term='searchterm', index='table_search_index'),
+            BatchSearchRequest(resource='dashboard', query_term='searchterm', index='dashboard_search_index',
+                               search_request={'filters': {'tag': ['a']}}),
+        ])
+
+    def test_should_dump_result_with_resource_schema(self) -> None:
+        self.mock_proxy.fetch_search_results_batch.return_value = [
+            BatchSearchResult(result=SearchUserResult(total_results=0, results=[])),
+        ]
+
+        response = self.app.test_client().post('/search_batch', json={'requests': [
+            {'resource': 'user', 'query_term': 'searchterm', 'index': 'custom_user_index'},
+        ]})
+
+        self.assertEqual(response.json, {'results': [{'status': 200,
+                                                      'result': {'total_results': 0, 'results': []}}]})
+        self.mock_proxy.fetch_search_results_batch.assert_called_with(requests=[
+            BatchSearchRequest(resource='user', query_term='searchterm', index='custom_user_index'),
+        ])
+
+    def test_should_fail_with_invalid_request(self) -> None:
+        response = self.app.test_client().post('/search_batch', json={'requests': [{'query_term': 'searchterm'}]})
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.mock_proxy.fetch_search_results_batch.assert_not_called()
+
+    def test_should_fail_with_unsupported_resource(self) -> None:
+        response = self.app.test_client().post('/search_batch', json={'requests': [{'resource': 'column'}]})
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_should_fail_with_user_filter_search(self) -> None:
+        response = self.app.test_client().post('/search_batch', json={'requests': [
+            {'resource': 'user', 'query_term': 'searchterm', 'search_request': {}},
+        ]})
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_should_fail_when_batch_is_too_large(self) -> None:
+        self.app.config['SEARCH_BATCH_MAX_SIZE'] = 1
+
+        response = self.app.test_client().post('/search_batch', json={'requests': [
+            {'resource': 'table', 'query_term': 'a'},
+            {'resource': 'table', 'query_term': 'b'},
+        ]})
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_should_fail_when_proxy_fails(self) -> None:
+        self.mock_proxy.fetch_search_results_batch.side_effect = RuntimeError('search failed')
+
+        response = self.app.test_client().post('/search_batch', json={'requests': [
+            {'resource': 'table', 'query_term': 'searchterm'},
+        ]})
+
+        self.assertEqual(response.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -0,0 +1,50 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from http import HTTPStatus
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from search_service import create_app
+from search_service.models.count import SearchCountResult
+
+
+class TestSearchCountAPI(TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.Config')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.mock_client = patch('search_service.api.count.get_proxy_client')
+        self.mock_proxy = self.mock_client.start().return_value = Mock()
+        self.mock_proxy.fetch_count.return_value = SearchCountResult(total_results=100, total_relation='gte')
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+        self.mock_client.stop()
+
+    def test_should_count_results(self) -> None:
+        response = self.app.test_client().get('/search_count',
+                                              query_string=dict(query_term='test', resource='user', max_count=100))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {'total_results': 100, 'total_relation': 'gte'})
+        self.mock_proxy.fetch_count.assert_called_with(query_term='test', resource='user',
+                                                       index='user_search_index', max_count=100)
+
+    def test_should_leave_out_exact_relation(self) -> None:
+        self.mock_proxy.fetch_count.return_value = SearchCountResult(total_results=3)
+
+        response = self.app.test_client().get('/search_count', query_string=dict(query_term='test', resource='table'))
+
+        self.assertEqual(response.json, {'total_results': 3})
+        self.mock_proxy.fetch_count.assert_called_with(query_term='test', resource='table',
+                                                       index='table_search_index', max_count=None)
+
+    def test_should_fail_with_unknown_resource(self) -> None:
+        response = self.app.test_client().get('/search_count', query_string=dict(query_term='test', resource='foo'))
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.mock_proxy.fetch_count.assert_not_called()
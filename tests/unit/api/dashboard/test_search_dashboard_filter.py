@@ -28,14 +28,14 @@ class SearchDashboardFilterTest(unittest.TestCase):
     def tear_down(self) -> None:
         self.app_context.pop()
 
-    @patch('search_service.api.dashboard.reqparse.RequestParser')
+    @patch('search_service.api.base.BaseFilterAPI.parser')
     @patch('search_service.api.base.get_proxy_client')
-    def test_post(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_post(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy()
-        RequestParser().parse_args.return_value = dict(index=self.mock_index,
-                                                       page_index=self.mock_page_index,
-                                                       query_term=self.mock_term,
-                                                       search_request=self.mock_search_request)
+        parser.parse_args.return_value = dict(index=self.mock_index,
+                                              page_index=self.mock_page_index,
+                                              query_term=self.mock_term,
+                                              search_request=self.mock_search_request)
 
         self.app.test_client().post(self.url)
         mock_proxy.fetch_search_results_with_filter.assert_called_with(index=self.mock_index,
@@ -43,22 +43,22 @@ class SearchDashboardFilterTest(unittest.TestCase):
                                                                        query_term=self.mock_term,
                                                                        search_request=self.mock_search_request)
 
-    @patch('search_service.api.dashboard.reqparse.RequestParser')
+    @patch('search_service.api.base.BaseFilterAPI.parser')
     @patch('search_service.api.base.get_proxy_client')
-    def test_post_return_400_if_no_search_request(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
-        RequestParser().parse_args.return_value = dict(index=self.mock_index,
-                                                       query_term=self.mock_term)
+    def test_post_return_400_if_no_search_request(self, get_proxy: MagicMock, parser: MagicMock) -> None:
+        parser.parse_args.return_value = dict(index=self.mock_index,
+                                              query_term=self.mock_term)
 
         response = self.app.test_client().post(self.url)
         self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
 
-    @patch('search_service.api.dashboard.reqparse.RequestParser')
+    @patch('search_service.api.base.BaseFilterAPI.parser')
     @patch('search_service.api.base.get_proxy_client')
-    def test_post_return_400_if_bad_query_term(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
-        RequestParser().parse_args.return_value = dict(index=self.mock_index,
-                                                       page_index=self.mock_page_index,
-                                                       query_term='name:bad_syntax',
-                                                       search_request=self.mock_search_request)
+    def test_post_return_400_if_bad_query_term(self, get_proxy: MagicMock, parser: MagicMock) -> None:
+        parser.parse_args.return_value = dict(index=self.mock_index,
+                                              page_index=self.mock_page_index,
+                                              query_term='name:bad_syntax',
+                                              search_request=self.mock_search_request)
 
         response = self.app.test_client().post(self.url)
         self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -21,11 +21,11 @@ class TestDocumentTableAPI(unittest.TestCase):
     def tear_down(self) -> None:
         self.app_context.pop()
 
-    @patch('search_service.api.document.reqparse.RequestParser')
+    @patch('search_service.api.document.DocumentTableAPI.parser')
     @patch('search_service.api.document.get_proxy_client')
-    def test_delete(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_delete(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy.return_value = Mock()
-        RequestParser().parse_args.return_value = dict(data='[]', index='fake_index')
+        parser.parse_args.return_value = dict(data='[]', index='fake_index')
 
         response = DocumentTableAPI().delete(document_id='fake id')
         self.assertEqual(list(response)[1], HTTPStatus.OK)
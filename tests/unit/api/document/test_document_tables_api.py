@@ -25,29 +25,29 @@ class TestDocumentTablesAPI(unittest.TestCase):
     def tear_down(self) -> None:
         self.app_context.pop()
 
-    @patch('search_service.api.document.reqparse.RequestParser')
+    @patch('search_service.api.document.DocumentTablesAPI.parser')
     @patch('search_service.api.document.get_proxy_client')
-    def test_post(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_post(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy.return_value = Mock()
-        RequestParser().parse_args.return_value = dict(data=[], index='fake_index')
+        parser.parse_args.return_value = dict(data=[], index='fake_index')
 
         response = DocumentTablesAPI().post()
         self.assertEqual(list(response)[1], HTTPStatus.OK)
         mock_proxy.create_document.assert_called_with(data=[], index='fake_index')
 
-    @patch('search_service.api.document.reqparse.RequestParser')
+    @patch('search_service.api.document.DocumentTablesAPI.parser')
     @patch('search_service.api.document.get_proxy_client')
-    def test_put(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_put(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy.return_value = Mock()
-        RequestParser().parse_args.return_value = dict(data=[], index='fake_index')
+        parser.parse_args.return_value = dict(data=[], index='fake_index')
 
         response = DocumentTablesAPI().put()
         self.assertEqual(list(response)[1], HTTPStatus.OK)
         mock_proxy.update_document.assert_called_with(data=[], index='fake_index')
 
-    @patch('search_service.api.document.reqparse.RequestParser')
+    @patch('search_service.api.document.DocumentTablesAPI.parser')
     @patch('search_service.api.document.get_proxy_client')
-    def test_put_multiple_tables(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_put_multiple_tables(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy.return_value = Mock()
         input_data = [
             json.dumps({
@@ -71,7 +71,7 @@ class TestDocumentTablesAPI(unittest.TestCase):
                 'tags': [{'tag_name': 'tag3'}, {'tag_name': 'tag4'}]
             })
         ]
-        RequestParser().parse_args.return_value = dict(data=input_data, index='fake_index')
+        parser.parse_args.return_value = dict(data=input_data, index='fake_index')
 
         expected_data = [Table(id='table1', database='database1', cluster='cluster1', schema='schema1', name='name1',
                                key='table1', tags=[Tag(tag_name='tag1'), Tag(tag_name='tag2')],
@@ -84,9 +84,9 @@ class TestDocumentTablesAPI(unittest.TestCase):
         self.assertEqual(list(response)[1], HTTPStatus.OK)
         mock_proxy.update_document.assert_called_with(data=expected_data, index='fake_index')
 
-    @patch('search_service.api.document.reqparse.RequestParser')
+    @patch('search_service.api.document.DocumentTablesAPI.parser')
     @patch('search_service.api.document.get_proxy_client')
-    def test_put_multiple_tables_fails(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_put_multiple_tables_fails(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         input_data = [
             json.dumps({
                 'anykey1': 'anyval1'
@@ -95,7 +95,7 @@ class TestDocumentTablesAPI(unittest.TestCase):
                 'anykey2': 'anyval2'
             })
         ]
-        RequestParser().parse_args.return_value = dict(data=input_data, index='fake_index')
+        parser.parse_args.return_value = dict(data=input_data, index='fake_index')
 
         with self.assertRaises(ValidationError):
             DocumentTablesAPI().put()
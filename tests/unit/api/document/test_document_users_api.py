@@ -21,21 +21,21 @@ class TestDocumentUsersAPI(unittest.TestCase):
     def tear_down(self) -> None:
         self.app_context.pop()
 
-    @patch('search_service.api.document.reqparse.RequestParser')
+    @patch('search_service.api.document.DocumentUsersAPI.parser')
     @patch('search_service.api.document.get_proxy_client')
-    def test_post(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_post(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy.return_value = Mock()
-        RequestParser().parse_args.return_value = dict(data={}, index='fake_index')
+        parser.parse_args.return_value = dict(data={}, index='fake_index')
 
         response = DocumentUsersAPI().post()
         self.assertEqual(list(response)[1], HTTPStatus.OK)
         mock_proxy.create_document.assert_called_with(data=[], index='fake_index')
 
-    @patch('search_service.api.document.reqparse.RequestParser')
+    @patch('search_service.api.document.DocumentUsersAPI.parser')
     @patch('search_service.api.document.get_proxy_client')
-    def test_put(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_put(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy.return_value = Mock()
-        RequestParser().parse_args.return_value = dict(data=[], index='fake_index')
+        parser.parse_args.return_value = dict(data=[], index='fake_index')
 
         response = DocumentUsersAPI().put()
         self.assertEqual(list(response)[1], HTTPStatus.OK)
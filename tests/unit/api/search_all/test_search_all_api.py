@@ -0,0 +1,94 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from http import HTTPStatus
+from threading import Event
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from search_service import create_app
+from search_service.models.dashboard import SearchDashboardResult
+from search_service.models.table import SearchTableResult
+from search_service.models.user import SearchUserResult
+from tests.unit.api.dashboard.fixtures import (
+    mock_json_response as mock_dashboard_json_response, mock_proxy_results as mock_dashboard_proxy_results,
+)
+from tests.unit.api.table.fixtures import mock_json_response, mock_proxy_results
+
+
+class TestSearchAllAPI(TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.Config')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.mock_client = patch('search_service.api.search_all.get_proxy_client')
+        self.mock_proxy = self.mock_client.start().return_value = Mock()
+        self.mock_proxy.fetch_table_search_results.return_value = \
+            SearchTableResult(total_results=1, results=[mock_proxy_results()])
+        self.mock_proxy.fetch_user_search_results.return_value = SearchUserResult(total_results=0, results=[])
+        self.mock_proxy.fetch_dashboard_search_results.return_value = \
+            SearchDashboardResult(total_results=1, results=[mock_dashboard_proxy_results()])
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+        self.mock_client.stop()
+
+    def test_should_get_every_section(self) -> None:
+        response = self.app.test_client().get('/search_all',
+                                              query_string=dict(query_term='searchterm', page_index=1))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {
+            'results': {
+                'table': {'total_results': 1, 'results': [mock_json_response()]},
+                'user': {'total_results': 0, 'results': []},
+                'dashboard': {'total_results': 1, 'results': [mock_dashboard_json_response()]},
+            },
+            'timed_out': [],
+            'failed': [],
+        })
+        self.mock_proxy.fetch_table_search_results.assert_called_with(query_term='searchterm',
+                                                                      page_index=1,
+                                                                      index='table_search_index')
+        self.mock_proxy.fetch_user_search_results.assert_called_with(query_term='searchterm',
+                                                                     page_index=1,
+                                                                     index='user_search_index')
+        self.mock_proxy.fetch_dashboard_search_results.assert_called_with(query_term='searchterm',
+                                                                          page_index=1,
+                                                                          index='dashboard_search_index')
+
+    def test_should_leave_out_sections_over_budget(self) -> None:
+        self.app.config['SEARCH_ALL_TIMEOUT_SEC'] = 0.1
+        release = Event()
+        self.mock_proxy.fetch_user_search_results.side_effect = lambda **kwargs: release.wait(5)
+
+        try:
+            response = self.app.test_client().get('/search_all', query_string=dict(query_term='searchterm'))
+        finally:
+            release.set()
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(set(response.json['results']), {'table', 'dashboard'})
+        self.assertEqual(response.json['timed_out'], ['user'])
+
+    def test_should_leave_out_failed_sections(self) -> None:
+        self.mock_proxy.fetch_dashboard_search_results.side_effect = RuntimeError('search failed')
+
+        response = self.app.test_client().get('/search_all', query_string=dict(query_term='searchterm'))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(set(response.json['results']), {'table', 'user'})
+        self.assertEqual(response.json['failed'], ['dashboard'])
+
+    def test_should_fail_when_every_section_fails(self) -> None:
+        for fetch in (self.mock_proxy.fetch_table_search_results,
+                      self.mock_proxy.fetch_user_search_results,
+                      self.mock_proxy.fetch_dashboard_search_results):
+            fetch.side_effect = RuntimeError('search failed')
+
+        response = self.app.test_client().get('/search_all', query_string=dict(query_term='searchterm'))
+
+        self.assertEqual(response.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -0,0 +1,120 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from http import HTTPStatus
+from typing import (  # noqa: F401
+    Any, List, Tuple,
+)
+from unittest import TestCase
+
+import attr
+from marshmallow import fields
+from marshmallow3_annotations.ext.attrs import AttrsSchema
+from mock import Mock, patch
+
+from search_service import create_app
+from search_service.api.serialization import (
+    JSON_ENCODERS, dump, get_field_plan, make_result_response,
+)
+from search_service.models.dashboard import SearchDashboardResult, SearchDashboardResultSchema
+from search_service.models.table import (
+    SearchTableResult, SearchTableResultSchema, TableSchema,
+)
+from search_service.models.user import (
+    SearchUserResult, SearchUserResultSchema, User,
+)
+from tests.unit.api.dashboard.fixtures import mock_proxy_results as mock_dashboard_proxy_results
+from tests.unit.api.table.fixtures import mock_default_proxy_results, mock_proxy_results
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class Event:
+    name: str
+
+
+class EventSchema(AttrsSchema):
+    class Meta:
+        target = Event
+        register_as_scheme = True
+
+    created = fields.DateTime()
+
+
+def mock_user() -> User:
+    return User(id='jdoe', email='jdoe@example.com', first_name='Jane', last_name='Doe',
+                full_name='Jane Doe', is_active=True, other_key_values={'team': 'data'})
+
+
+class TestSerialization(TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.Config')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_should_dump_like_marshmallow(self) -> None:
+        results: List[Tuple[Any, Any]] = [
+            (SearchTableResult(total_results=2, results=[mock_proxy_results(), mock_default_proxy_results()]),
+             SearchTableResultSchema),
+            (SearchTableResult(total_results=3, results=[mock_proxy_results()], next_cursor='WzFd'),
+             SearchTableResultSchema),
+            (SearchUserResult(total_results=1, results=[mock_user()]), SearchUserResultSchema),
+            (SearchDashboardResult(total_results=1, results=[mock_dashboard_proxy_results()]),
+             SearchDashboardResultSchema),
+            (SearchDashboardResult(total_results=0, results=[]), SearchDashboardResultSchema),
+        ]
+        for result, schema in results:
+            with self.subTest(schema=schema.__name__):
+                self.assertEqual(dump(result, schema), schema().dump(result))
+
+    def test_should_fall_back_to_marshmallow_for_unsupported_schemas(self) -> None:
+        self.assertIsNotNone(get_field_plan(SearchTableResultSchema))
+        self.assertIsNone(get_field_plan(EventSchema))
+
+    def test_should_compile_schemas_after_loads(self) -> None:
+        TableSchema(many=True).load([{'id': 'id', 'database': 'database', 'cluster': 'cluster', 'schema': 'schema',
+                                      'name': 'name', 'key': 'key', 'tags': [{'tag_name': 'tag'}]}])
+
+        with patch.dict('search_service.api.serialization._field_plans', clear=True):
+            self.assertIsNotNone(get_field_plan(SearchTableResultSchema))
+
+    @patch('search_service.api.serialization._compile', side_effect=ValueError('too many values to unpack'))
+    def test_should_fall_back_to_marshmallow_when_compiling_fails(self, _: Mock) -> None:
+        result = SearchTableResult(total_results=1, results=[mock_proxy_results()])
+
+        with patch.dict('search_service.api.serialization._field_plans', clear=True):
+            self.assertIsNone(get_field_plan(SearchTableResultSchema))
+            self.assertEqual(dump(result, SearchTableResultSchema), SearchTableResultSchema().dump(result))
+
+    def test_should_encode_result_once(self) -> None:
+        encoder = Mock(return_value=b'{}')
+        self.app.config['SEARCH_JSON_ENCODER'] = 'mock'
+        result = SearchTableResult(total_results=1, results=[mock_proxy_results()])
+
+        with patch.dict(JSON_ENCODERS, {'mock': encoder}):
+            responses = [make_result_response(result, SearchTableResultSchema) for _ in range(2)]
+
+        self.assertEqual([response.get_data() for response in responses], [b'{}', b'{}'])
+        self.assertEqual(responses[0].mimetype, 'application/json')
+        encoder.assert_called_once_with(SearchTableResultSchema().dump(result))
+
+    def test_should_encode_with_every_encoder(self) -> None:
+        result = SearchTableResult(total_results=1, results=[mock_proxy_results()])
+        for name in JSON_ENCODERS:
+            with self.subTest(encoder=name):
+                self.app.config['SEARCH_JSON_ENCODER'] = name
+                response = make_result_response(SearchTableResult(**attr.asdict(result, recurse=False)),
+                                                SearchTableResultSchema)
+                self.assertEqual(json.loads(response.get_data()), SearchTableResultSchema().dump(result))
+
+    def test_should_leave_responses_to_marshmallow(self) -> None:
+        self.app.config['SEARCH_JSON_ENCODER'] = 'marshmallow'
+        result = SearchTableResult(total_results=1, results=[mock_proxy_results()])
+
+        response = make_result_response(result, SearchTableResultSchema)
+
+        self.assertEqual(response, (SearchTableResultSchema().dump(result), HTTPStatus.OK))
@@ -7,6 +7,7 @@ from unittest import TestCase
 from mock import Mock, patch
 
 from search_service import create_app
+from search_service.models.search_result import encode_cursor
 from search_service.models.table import SearchTableResult
 from tests.unit.api.table.fixtures import (
     default_json_response, mock_default_proxy_results, mock_json_response, mock_proxy_results,
@@ -69,6 +70,89 @@ class TestSearchTableAPI(TestCase):
 
         self.assertEqual(response.json, expected_response)
 
+    def test_should_get_page_of_cursor(self) -> None:
+        cursor = encode_cursor([1.5, 10, 'key'])
+        self.mock_proxy.fetch_table_search_results.return_value = \
+            SearchTableResult(total_results=1, results=[mock_proxy_results()], next_cursor='next')
+
+        response = self.app.test_client().get('/search', query_string=dict(query_term='searchterm', cursor=cursor))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {
+            "total_results": 1,
+            "results": [mock_json_response()],
+            "next_cursor": 'next'
+        })
+        self.mock_proxy.fetch_table_search_results.assert_called_with(query_term='searchterm', page_index=0,
+                                                                      index='table_search_index', cursor=cursor)
+
+    def test_should_search_with_session_preference(self) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = SearchTableResult(total_results=0, results=[])
+
+        response = self.app.test_client().get('/search', query_string=dict(query_term='searchterm'),
+                                              headers={'X-Search-Session': 'user_id'})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.mock_proxy.fetch_table_search_results.assert_called_with(query_term='searchterm', page_index=0,
+                                                                      index='table_search_index',
+                                                                      preference='user_id')
+
+    def test_should_search_with_track_total_hits(self) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = \
+            SearchTableResult(total_results=10, results=[mock_proxy_results()], total_relation='gte')
+
+        response = self.app.test_client().get('/search', query_string=dict(query_term='searchterm',
+                                                                           track_total_hits='10'))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {
+            "total_results": 10,
+            "results": [mock_json_response()],
+            "total_relation": 'gte'
+        })
+        self.mock_proxy.fetch_table_search_results.assert_called_with(query_term='searchterm', page_index=0,
+                                                                      index='table_search_index',
+                                                                      track_total_hits=10)
+
+    def test_should_mark_partial_results(self) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = \
+            SearchTableResult(total_results=1, results=[mock_proxy_results()], partial=True)
+
+        response = self.app.test_client().get('/search', query_string=dict(query_term='searchterm'))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {
+            "total_results": 1,
+            "results": [mock_json_response()],
+            "partial": True
+        })
+
+    def test_should_fail_with_invalid_track_total_hits(self) -> None:
+        response = self.app.test_client().get('/search', query_string=dict(query_term='searchterm',
+                                                                           track_total_hits='-1'))
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.mock_proxy.fetch_table_search_results.assert_not_called()
+
+    def test_should_fail_with_invalid_cursor(self) -> None:
+        response = self.app.test_client().get('/search', query_string=dict(query_term='searchterm', cursor='!'))
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.mock_proxy.fetch_table_search_results.assert_not_called()
+
+    def test_should_fail_with_cursor_of_other_sort_values(self) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = SearchTableResult(total_results=0, results=[])
+
+        for cursor, status in ((encode_cursor([1.5, 10, 'key']), HTTPStatus.OK),
+                               (encode_cursor([1.5, 10]), HTTPStatus.BAD_REQUEST),
+                               (encode_cursor([1.5, 10, 'key', 'key']), HTTPStatus.BAD_REQUEST),
+                               (encode_cursor([1.5, 'key', 10]), HTTPStatus.BAD_REQUEST),
+                               (encode_cursor([1.5, True, 'key']), HTTPStatus.BAD_REQUEST)):
+            response = self.app.test_client().get('/search', query_string=dict(query_term='searchterm',
+                                                                               cursor=cursor))
+            self.assertEqual(response.status_code, status, cursor)
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 1)
+
     def test_should_fail_without_query_term(self) -> None:
         response = self.app.test_client().get('/search')
 
@@ -80,3 +164,24 @@ class TestSearchTableAPI(TestCase):
         response = self.app.test_client().get('/search?query_term=searchterm')
 
         self.assertEqual(response.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def test_should_fail_when_proxy_does_not_support_cursors(self) -> None:
+        self.mock_proxy.fetch_table_search_results.side_effect = \
+            NotImplementedError('Cursor pagination is not supported by the Atlas proxy')
+
+        response = self.app.test_client().get('/search', query_string=dict(
+            query_term='searchterm', cursor=encode_cursor([1.5, 10, 'key'])))
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_IMPLEMENTED)
+        self.assertEqual(response.json, {'message': 'Cursor pagination is not supported by the Atlas proxy'})
+
+    @patch('search_service.api.table.reqparse.RequestParser')
+    def test_should_reuse_parser_across_requests(self, RequestParser: Mock) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = SearchTableResult(total_results=0, results=[])
+
+        responses = [self.app.test_client().get('/search', query_string=dict(query_term=term))
+                     for term in ('searchterm', '', None)]
+
+        self.assertEqual([response.status_code for response in responses],
+                         [HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.BAD_REQUEST])
+        RequestParser.assert_not_called()
@@ -0,0 +1,75 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+from http import HTTPStatus
+
+from mock import MagicMock, patch
+
+from search_service import create_app
+from search_service.models.facets import (
+    Facet, FacetValue, SearchFacetsResult,
+)
+
+
+class SearchTableFacetsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.mock_search_request = {
+            'type': 'AND',
+            'filters': {
+                'database': ['db1', 'db2']
+            }
+        }
+        self.url = '/search_table_facets'
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    @patch('search_service.api.base.get_proxy_client')
+    def test_post(self, get_proxy: MagicMock) -> None:
+        mock_proxy = get_proxy()
+        mock_proxy.fetch_facets.return_value = SearchFacetsResult(
+            total_results=3,
+            facets=[Facet(name='database', values=[FacetValue(value='db1', count=2), FacetValue(value='db2', count=1)]),
+                    Facet(name='tag')])
+
+        response = self.app.test_client().post(self.url, json=dict(query_term='test',
+                                                                   search_request=self.mock_search_request))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json, {
+            'total_results': 3,
+            'facets': [{'name': 'database', 'values': [{'value': 'db1', 'count': 2}, {'value': 'db2', 'count': 1}]},
+                       {'name': 'tag', 'values': []}],
+        })
+        mock_proxy.fetch_facets.assert_called_with(index='table_search_index',
+                                                   query_term='test',
+                                                   search_request=self.mock_search_request)
+
+    @patch('search_service.api.base.get_proxy_client')
+    def test_post_without_query_term_nor_filters(self, get_proxy: MagicMock) -> None:
+        mock_proxy = get_proxy()
+        mock_proxy.fetch_facets.return_value = SearchFacetsResult(total_results=0)
+
+        response = self.app.test_client().post(self.url, json={})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        mock_proxy.fetch_facets.assert_called_with(index='table_search_index', query_term='', search_request=None)
+
+    @patch('search_service.api.base.get_proxy_client')
+    def test_post_return_400_if_query_term_is_invalid(self, get_proxy: MagicMock) -> None:
+        response = self.app.test_client().post(self.url, json=dict(query_term='name:test'))
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        get_proxy().fetch_facets.assert_not_called()
+
+    @patch('search_service.api.base.get_proxy_client')
+    def test_post_return_501_if_proxy_does_not_support_facets(self, get_proxy: MagicMock) -> None:
+        get_proxy().fetch_facets.side_effect = NotImplementedError
+
+        response = self.app.test_client().post(self.url, json=dict(query_term='test'))
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_IMPLEMENTED)
@@ -7,6 +7,7 @@ from http import HTTPStatus
 from mock import MagicMock, patch
 
 from search_service import create_app
+from search_service.models.search_result import encode_cursor
 
 
 class SearchTableFilterTest(unittest.TestCase):
@@ -28,14 +29,14 @@ class SearchTableFilterTest(unittest.TestCase):
     def tear_down(self) -> None:
         self.app_context.pop()
 
-    @patch('search_service.api.table.reqparse.RequestParser')
+    @patch('search_service.api.base.BaseFilterAPI.parser')
     @patch('search_service.api.base.get_proxy_client')
-    def test_post(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
+    def test_post(self, get_proxy: MagicMock, parser: MagicMock) -> None:
         mock_proxy = get_proxy()
-        RequestParser().parse_args.return_value = dict(index=self.mock_index,
-                                                       page_index=self.mock_page_index,
-                                                       query_term=self.mock_term,
-                                                       search_request=self.mock_search_request)
+        parser.parse_args.return_value = dict(index=self.mock_index,
+                                              page_index=self.mock_page_index,
+                                              query_term=self.mock_term,
+                                              search_request=self.mock_search_request)
 
         self.app.test_client().post(self.url)
         mock_proxy.fetch_search_results_with_filter.assert_called_with(index=self.mock_index,
@@ -43,22 +44,34 @@ class SearchTableFilterTest(unittest.TestCase):
                                                                        query_term=self.mock_term,
                                                                        search_request=self.mock_search_request)
 
-    @patch('search_service.api.table.reqparse.RequestParser')
+    @patch('search_service.api.base.BaseFilterAPI.parser')
     @patch('search_service.api.base.get_proxy_client')
-    def test_post_return_400_if_no_search_request(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
-        RequestParser().parse_args.return_value = dict(index=self.mock_index,
-                                                       query_term=self.mock_term)
+    def test_post_return_400_if_no_search_request(self, get_proxy: MagicMock, parser: MagicMock) -> None:
+        parser.parse_args.return_value = dict(index=self.mock_index,
+                                              query_term=self.mock_term)
 
         response = self.app.test_client().post(self.url)
         self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
 
-    @patch('search_service.api.table.reqparse.RequestParser')
+    @patch('search_service.api.base.BaseFilterAPI.parser')
     @patch('search_service.api.base.get_proxy_client')
-    def test_post_return_400_if_bad_query_term(self, get_proxy: MagicMock, RequestParser: MagicMock) -> None:
-        RequestParser().parse_args.return_value = dict(index=self.mock_index,
-                                                       page_index=self.mock_page_index,
-                                                       query_term='column:bad_syntax',
-                                                       search_request=self.mock_search_request)
+    def test_post_return_400_if_bad_query_term(self, get_proxy: MagicMock, parser: MagicMock) -> None:
+        parser.parse_args.return_value = dict(index=self.mock_index,
+                                              page_index=self.mock_page_index,
+                                              query_term='column:bad_syntax',
+                                              search_request=self.mock_search_request)
 
         response = self.app.test_client().post(self.url)
         self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    @patch('search_service.api.base.get_proxy_client')
+    def test_post_return_501_if_cursors_not_supported(self, get_proxy: MagicMock) -> None:
+        get_proxy().fetch_search_results_with_filter.side_effect = \
+            NotImplementedError('Cursor pagination is not supported by the Atlas proxy')
+
+        response = self.app.test_client().post(self.url, json=dict(query_term=self.mock_term,
+                                                                   search_request=self.mock_search_request,
+                                                                   cursor=encode_cursor([1.5, 10, 'key'])))
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_IMPLEMENTED)
+        self.assertEqual(response.json, {'message': 'Cursor pagination is not supported by the Atlas proxy'})
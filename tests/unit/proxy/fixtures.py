@@ -0,0 +1,318 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import unittest
+from typing import (  # noqa: F401
+    Any, Dict, List, Optional,
+)
+
+from elasticsearch import Elasticsearch, Transport
+from mock import patch
+
+from search_service import create_app
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.table import TABLE_INDEX
+from search_service.api.user import USER_INDEX
+from search_service.models.autocomplete import Suggestion
+from search_service.models.dashboard import Dashboard
+from search_service.models.facets import Facet, FacetValue
+from search_service.models.search_result import TOTAL_RELATION_GTE
+from search_service.models.table import Table
+from search_service.models.tag import Tag
+from search_service.models.user import User
+from search_service.proxy import get_proxy_client
+
+SOURCES = {
+    'table_search_index': {
+        'name': 'test_table',
+        'key': 'hive://gold.test_schema/test_table',
+        'description': 'test_description',
+        'cluster': 'gold',
+        'database': 'hive',
+        'schema': 'test_schema',
+        'column_names': ['test_col1', 'test_col2'],
+        'tags': ['tag'],
+        'badges': [],
+        'last_updated_timestamp': 1527283287,
+        'display_name': 'test_schema.test_table',
+        'programmatic_descriptions': [],
+        'total_usage': 10,
+        'schema_description': None,
+    },
+    'user_search_index': {
+        'full_name': 'Jane Doe',
+        'first_name': 'Jane',
+        'last_name': 'Doe',
+        'email': 'jdoe@example.com',
+        'is_active': True,
+    },
+    'dashboard_search_index': {
+        'uri': 'mode_dashboard://gold.group/dashboard',
+        'cluster': 'gold',
+        'group_name': 'group',
+        'group_url': 'group_url',
+        'product': 'mode',
+        'name': 'dashboard',
+        'url': 'dashboard_url',
+        'description': 'test_dashboard',
+        'last_successful_run_timestamp': 1000,
+    },
+}  # type: Dict[str, Dict[str, Any]]
+
+
+def get_search_response(index: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Search response with a single hit of the resource of {index}, counted unless the search {body} counts nothing
+    """
+    total = -1 if (body or {}).get('track_total_hits') is False else 1
+    return {'hits': {'total': total,
+                     'hits': [{'_id': f'{index}_id', '_source': SOURCES[index], 'sort': [1.0, 10, 'id']}]}}
+
+
+# response of the count API to any request
+COUNT_RESPONSE = {'count': 1}
+
+
+class StubTransport(Transport):
+    """
+    Transport answering searches and multi searches with get_search_response, and counts with COUNT_RESPONSE,
+    without any cluster
+    """
+
+    def perform_request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                        params: Optional[Dict[str, Any]] = None, body: Any = None) -> Any:
+        if url.endswith('/_msearch'):
+            searches = [json.loads(line) for line in (body or '').splitlines() if line]
+            return {'responses': [get_search_response(header['index']) for header in searches[::2]]}
+        if url.endswith('/_count'):
+            return COUNT_RESPONSE
+        return get_search_response(url.split('/')[1], body)
+
+
+def get_stub_client() -> Elasticsearch:
+    return Elasticsearch(transport_class=StubTransport)
+
+
+class StubAsyncElasticsearch:
+    """
+    Async client answering searches and multi searches with get_search_response, and counts with COUNT_RESPONSE,
+    recording the requests
+    """
+
+    def __init__(self) -> None:
+        self.requests = []  # type: List[Dict[str, Any]]
+
+    async def search(self, *, index: str, body: Dict[str, Any], **params: Any) -> Dict[str, Any]:
+        self.requests.append(dict(index=index, body=body, **params))
+        return get_search_response(index, body)
+
+    async def count(self, *, index: str, body: Dict[str, Any], **params: Any) -> Dict[str, Any]:
+        self.requests.append(dict(index=index, body=body, **params))
+        return COUNT_RESPONSE
+
+    async def msearch(self, *, body: List[Dict[str, Any]], **params: Any) -> Dict[str, Any]:
+        self.requests.append(dict(body=body, **params))
+        return {'responses': [get_search_response(header['index']) for header in body[::2]]}
+
+
+def make_table(name: str, *, schema: str = 'core', database: str = 'hive', total_usage: int = 0,
+               tags: Any = (), **kwargs: Any) -> Table:
+    key = f'{database}://gold.{schema}/{name}'
+    return Table(id=key, key=key, database=database, cluster='gold', schema=schema, name=name,
+                 tags=[Tag(tag_name=tag) for tag in tags], badges=[], total_usage=total_usage, **kwargs)
+
+
+class LocalProxyTestCase(unittest.TestCase):
+    """
+    Tests shared by the proxies searching local documents, which implement create_proxy and get_proxy_config.
+    The test modules import this module rather than the class, or the test runners would collect it.
+    """
+
+    def create_proxy(self) -> Any:
+        raise NotImplementedError
+
+    def get_proxy_config(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.addCleanup(self.app_context.pop)
+        self.proxy = self.create_proxy()  # type: Any
+        self.proxy.create_document(index=TABLE_INDEX, data=[
+            make_table('orders', total_usage=10, tags=['finance'], description='orders of the customers',
+                       column_names=['order_id', 'amount']),
+            make_table('order_items', total_usage=100, tags=['finance', 'sales'], description='items of the orders'),
+            make_table('customers', schema='crm', total_usage=1000, tags=['sales'],
+                       description='customers placing orders'),
+            make_table('events', schema='raw', database='presto', description='tracking events'),
+        ])
+
+    def search(self, query_term: str, **kwargs: Any) -> Any:
+        return self.proxy.fetch_table_search_results(query_term=query_term, index=TABLE_INDEX, **kwargs)
+
+    def search_dashboards(self, query_term: str) -> List[Dashboard]:
+        return get_proxy_client().fetch_dashboard_search_results(query_term=query_term, index=DASHBOARD_INDEX).results
+
+    def test_table_search_ranks_names_over_descriptions(self) -> None:
+        result = self.search('orders', page_index=-1)
+
+        self.assertEqual(result.total_results, 3)
+        # the simple analyzer splits order_items into order and items, which only match its description
+        self.assertEqual([table.name for table in result.results], ['orders', 'customers', 'order_items'])
+        self.assertEqual(result.results[0].tags, [Tag(tag_name='finance')])
+        self.assertIsNone(result.next_cursor)
+
+    def test_table_search_ranks_equal_matches_by_usage(self) -> None:
+        result = self.search('finance', page_index=-1)
+
+        self.assertEqual([table.name for table in result.results], ['order_items', 'orders'])
+
+    def test_table_search_pages_and_cursors(self) -> None:
+        first = self.search('orders')
+        second = self.search('orders', page_index=1)
+        after_cursor = self.search('orders', cursor=first.next_cursor)
+
+        self.assertEqual([table.name for table in first.results], ['orders', 'customers'])
+        self.assertIsNotNone(first.next_cursor)
+        self.assertEqual([table.name for table in second.results], ['order_items'])
+        self.assertIsNone(second.next_cursor)
+        self.assertEqual(after_cursor.results, second.results)
+        self.assertEqual(self.search('').total_results, 0)
+
+    def test_user_search_matches_every_word(self) -> None:
+        self.proxy.create_document(index=USER_INDEX, data=[
+            User(id='jdoe@example.com', email='jdoe@example.com', first_name='Jane', last_name='Doe',
+                 full_name='Jane Doe'),
+            User(id='jroe@example.com', email='jroe@example.com', first_name='Jane', last_name='Roe',
+                 full_name='Jane Roe'),
+        ])
+
+        result = self.proxy.fetch_user_search_results(query_term='jane doe', index=USER_INDEX)
+
+        self.assertEqual([user.email for user in result.results], ['jdoe@example.com'])
+        with self.assertRaises(Exception):
+            self.proxy.fetch_user_search_results(query_term='jane', index='')
+
+    def test_dashboard_search(self) -> None:
+        self.proxy.create_document(index=DASHBOARD_INDEX, data=[
+            Dashboard(id='mode://1', uri='mode://1', cluster='gold', group_name='Sales', group_url='', product='Mode',
+                      name='Revenue', url='', description='revenue of the quarter'),
+        ])
+
+        result = self.proxy.fetch_dashboard_search_results(query_term='revenue', index=DASHBOARD_INDEX)
+        filtered = self.proxy.fetch_search_results_with_filter(
+            query_term='', search_request={'filters': {'product': ['Mode']}}, index=DASHBOARD_INDEX)
+        # the product is a keyword field, whose values contain the query term
+        matched = self.proxy.fetch_search_results_with_filter(
+            query_term='mod', search_request={'filters': {'group_name': ['SALES']}}, index=DASHBOARD_INDEX)
+
+        self.assertEqual([dashboard.uri for dashboard in result.results], ['mode://1'])
+        self.assertEqual([dashboard.uri for dashboard in filtered.results], ['mode://1'])
+        self.assertEqual([dashboard.uri for dashboard in matched.results], ['mode://1'])
+
+    def test_filter_search(self) -> None:
+        def names(search_request: dict, query_term: str = '') -> Any:
+            result = self.proxy.fetch_search_results_with_filter(query_term=query_term, search_request=search_request,
+                                                                 index=TABLE_INDEX, page_index=-1)
+            return [table.name for table in result.results]
+
+        self.assertEqual(names({'filters': {'schema': ['core'], 'tag': ['finance']}}), ['order_items', 'orders'])
+        self.assertEqual(names({'filters': {'table': ['order*'], 'database': ['hive']}}), ['order_items', 'orders'])
+        self.assertEqual(names({'filters': {'column': ['ORDER_ID']}}), ['orders'])
+        self.assertEqual(names({'filters': {'schema': ['core']}}, query_term='item'), ['order_items'])
+        self.assertEqual(names({'filters': {'schema': ['core/']}}), [])
+        with self.assertRaises(RuntimeError):
+            self.proxy.fetch_search_results_with_filter(query_term='', search_request={'filters': {}},
+                                                        index=USER_INDEX)
+
+    def test_facets_count_values_with_the_filters_of_other_categories(self) -> None:
+        result = self.proxy.fetch_facets(query_term='', search_request={'filters': {'schema': ['core']}},
+                                         index=TABLE_INDEX)
+
+        self.assertEqual(result.total_results, 2)
+        facets = {facet.name: facet for facet in result.facets}
+        self.assertEqual(facets['schema'], Facet(name='schema', values=[FacetValue(value='core', count=2),
+                                                                        FacetValue(value='crm', count=1),
+                                                                        FacetValue(value='raw', count=1)]))
+        self.assertEqual(facets['tag'], Facet(name='tag', values=[FacetValue(value='finance', count=2),
+                                                                  FacetValue(value='sales', count=1)]))
+
+    def test_count(self) -> None:
+        count = self.proxy.fetch_count(query_term='orders', resource='table', index=TABLE_INDEX)
+        capped = self.proxy.fetch_count(query_term='orders', resource='table', index=TABLE_INDEX, max_count=2)
+
+        self.assertEqual((count.total_results, count.total_relation), (3, None))
+        self.assertEqual((capped.total_results, capped.total_relation), (2, TOTAL_RELATION_GTE))
+
+    def search_unknown_indices(self) -> None:
+        """
+        Runs every search on indices without any document, which find nothing
+        """
+        tables = self.proxy.fetch_table_search_results(query_term='orders', index='junk"; drop_orders')
+        users = self.proxy.fetch_user_search_results(query_term='jane', index=USER_INDEX)
+        dashboards = self.proxy.fetch_search_results_with_filter(
+            query_term='', search_request={'filters': {'product': ['Mode']}}, index=DASHBOARD_INDEX)
+        facets = self.proxy.fetch_facets(query_term='revenue', index=DASHBOARD_INDEX)
+        count = self.proxy.fetch_count(query_term='orders', resource='table', index='junk0')
+        suggestions = self.proxy.fetch_autocomplete_results(prefix='ord', indices={'table': 'junk1', 'user': 'junk2'})
+
+        self.assertEqual([tables.total_results, users.total_results, dashboards.total_results,
+                          facets.total_results, count.total_results], [0] * 5)
+        self.assertTrue(facets.facets)
+        self.assertEqual([facet.values for facet in facets.facets], [[]] * len(facets.facets))
+        self.assertEqual({resource: result.results for resource, result in suggestions.items()},
+                         {'table': [], 'user': []})
+
+    def test_searches_of_unknown_indices_find_nothing(self) -> None:
+        self.search_unknown_indices()
+
+    def test_autocomplete_suggests_most_used_first(self) -> None:
+        results = self.proxy.fetch_autocomplete_results(prefix='ord', indices={'table': TABLE_INDEX})
+
+        self.assertEqual(results['table'].results,
+                         [Suggestion(name='core.order_items', key='hive://gold.core/order_items'),
+                          Suggestion(name='core.orders', key='hive://gold.core/orders')])
+
+    def test_update_and_delete_documents(self) -> None:
+        self.proxy.update_document(index=TABLE_INDEX, data=[
+            make_table('events', schema='raw', database='presto', description='orders shipped'),
+            make_table('unknown'),
+        ])
+        self.assertEqual(self.search('shipped').results[0].name, 'events')
+        self.assertEqual(self.search('unknown').total_results, 0)
+
+        self.proxy.delete_document(index=TABLE_INDEX, data=['hive://gold.core/orders', 'presto://gold.raw/events'])
+
+        self.assertEqual([table.name for table in self.search('orders', page_index=-1).results],
+                         ['customers', 'order_items'])
+
+    @patch('search_service.proxy._proxy_client', None)
+    # the API modules may still be patched by the API tests, which don't stop their patches
+    @patch('search_service.api.table.get_proxy_client', get_proxy_client)
+    @patch('search_service.api.document.get_proxy_client', get_proxy_client)
+    def test_documents_posted_to_the_api_are_searchable(self) -> None:
+        self.app.config.update(self.get_proxy_config())
+        self.assertIsInstance(get_proxy_client(), type(self.proxy))
+        client = self.app.test_client()
+        table = make_table('payments').get_attrs_dict()
+
+        response = client.post('/document_table', json={'data': [str(table)], 'index': TABLE_INDEX})
+        self.assertEqual(response.status_code, 200)
+
+        response = client.get('/search', query_string={'query_term': 'payments'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['key'] for result in json.loads(response.data)['results']],
+                         ['hive://gold.core/payments'])
+
+        dashboard = Dashboard(id='mode_revenue', uri='mode://1', cluster='gold', group_name='Sales', group_url='',
+                              product='Mode', name='Revenue', url='', description='revenue of the quarter')
+        response = client.post('/document_dashboard', json={'data': [str(dashboard.get_attrs_dict())]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result.uri for result in self.search_dashboards('revenue')], ['mode://1'])
+
+        response = client.delete('/document_dashboard/mode_revenue')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.search_dashboards('revenue'), [])
@@ -0,0 +1,107 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import unittest
+from typing import Any, Awaitable  # noqa: F401
+
+from search_service import create_app
+from search_service.models.batch import BatchSearchRequest
+from search_service.models.search_result import encode_cursor
+from search_service.proxy.async_elasticsearch import AsyncElasticsearchProxy
+from search_service.proxy.elasticsearch import (
+    SEARCH_FILTER_PATH, ElasticsearchProxy, get_preference_params,
+)
+from tests.unit.proxy.fixtures import StubAsyncElasticsearch, get_stub_client
+
+
+class TestAsyncElasticsearchProxy(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.loop = asyncio.new_event_loop()
+
+        self.es_proxy = ElasticsearchProxy(client=get_stub_client(), page_size=1)
+        self.async_client = StubAsyncElasticsearch()
+        self.async_proxy = AsyncElasticsearchProxy(client=self.async_client, page_size=1, proxy=self.es_proxy)
+
+    def tearDown(self) -> None:
+        self.loop.close()
+        self.app_context.pop()
+
+    def run_async(self, awaitable: Awaitable) -> Any:
+        return self.loop.run_until_complete(awaitable)
+
+    def test_should_search_like_sync_proxy(self) -> None:
+        cursor = encode_cursor([1.0, 10, 'id'])
+        searches = [
+            ('fetch_table_search_results', dict(query_term='test')),
+            ('fetch_table_search_results', dict(query_term='test', cursor=cursor)),
+            ('fetch_table_search_results', dict(query_term='test', page_index=-1)),
+            # counted with the count API on Elasticsearch 6.x
+            ('fetch_table_search_results', dict(query_term='test', track_total_hits=5)),
+            ('fetch_user_search_results', dict(query_term='test', index='user_search_index')),
+            ('fetch_dashboard_search_results', dict(query_term='test', index='dashboard_search_index')),
+            ('fetch_search_results_with_filter', dict(query_term='test', index='table_search_index',
+                                                      search_request={'type': 'AND',
+                                                                      'filters': {'database': ['hive']}})),
+        ]
+        for method, kwargs in searches:
+            with self.subTest(method=method, kwargs=kwargs):
+                expected = getattr(self.es_proxy, method)(**kwargs)
+                result = self.run_async(getattr(self.async_proxy, method)(**kwargs))
+                self.assertEqual(result, expected)
+
+    def test_should_send_same_search_body_as_batch(self) -> None:
+        request = BatchSearchRequest(resource='table', query_term='test', page_index=2, index='table_search_index')
+        _, _, batch_body, _ = self.es_proxy._build_batch_search([request])
+
+        self.run_async(self.async_proxy.fetch_table_search_results(query_term='test', page_index=2))
+
+        self.assertEqual(self.async_client.requests, [dict(index='table_search_index',
+                                                           body=batch_body[1],
+                                                           filter_path=SEARCH_FILTER_PATH)])
+
+    def test_should_search_with_preference(self) -> None:
+        self.run_async(self.async_proxy.fetch_table_search_results(query_term='test', preference='session'))
+
+        self.assertEqual(self.async_client.requests[0]['preference'], get_preference_params('session')['preference'])
+
+    def test_should_search_with_timeout(self) -> None:
+        self.app.config['ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC'] = {'table_search_index': 1.5}
+
+        self.run_async(self.async_proxy.fetch_table_search_results(query_term='test'))
+
+        self.assertEqual(self.async_client.requests[0]['body']['timeout'], '1500ms')
+        self.assertEqual(self.async_client.requests[0]['request_timeout'], 2.0)
+
+    def test_should_count_up_to_track_total_hits(self) -> None:
+        result = self.run_async(self.async_proxy.fetch_table_search_results(query_term='test', track_total_hits=5))
+
+        self.assertFalse(self.async_client.requests[0]['body']['track_total_hits'])
+        self.assertEqual(self.async_client.requests[1]['params']['terminate_after'], 5)
+        self.assertEqual((result.total_results, result.total_relation), (1, None))
+
+    def test_should_not_search_without_query_term(self) -> None:
+        result = self.run_async(self.async_proxy.fetch_table_search_results(query_term=''))
+
+        self.assertEqual(result.total_results, 0)
+        self.assertEqual(self.async_client.requests, [])
+
+    def test_should_fail_filter_search_of_unsupported_index(self) -> None:
+        with self.assertRaises(RuntimeError):
+            self.run_async(self.async_proxy.fetch_search_results_with_filter(query_term='test',
+                                                                             index='user_search_index',
+                                                                             search_request={}))
+
+    def test_should_run_batch_like_sync_proxy(self) -> None:
+        requests = [BatchSearchRequest(resource='table', query_term='test', index='table_search_index'),
+                    BatchSearchRequest(resource='user', query_term='', index='user_search_index'),
+                    BatchSearchRequest(resource='dashboard', query_term='test', index='dashboard_search_index')]
+
+        results = self.run_async(self.async_proxy.fetch_search_results_batch(requests=requests))
+
+        self.assertEqual(results, self.es_proxy.fetch_search_results_batch(requests=requests))
+        self.assertEqual(len(self.async_client.requests), 1)
@@ -9,6 +9,7 @@ from typing import (
 from mock import MagicMock, patch
 
 from search_service import config, create_app
+from search_service.models.autocomplete import Suggestion
 from search_service.models.table import SearchTableResult, Table
 from search_service.models.tag import Tag
 from search_service.proxy import get_proxy_client
@@ -252,6 +253,20 @@ class TestAtlasProxy(unittest.TestCase):
             self.assertDictEqual(vars(resp.results[0]), vars(expected.results[0]),
                                  "Search Result doesn't match with expected result!")
 
+    def test_autocomplete_from_search(self) -> None:
+        entity_collection = MagicMock()
+        entity_collection.entities = [self.to_class(self.entity1)]
+        entity_collection._data = {'approximateCount': 1}
+
+        with patch.object(self.proxy.atlas.search_basic, 'create', MagicMock(return_value=entity_collection)):
+            results = self.proxy.fetch_autocomplete_results(prefix='Tab', indices={'table': 'table_search_index',
+                                                                                   'user': 'user_search_index'})
+
+        self.assertEqual(list(results), ['table'])
+        self.assertEqual(results['table'].results,
+                         [Suggestion(name=f'{self.db}.{self.entity1_name}',
+                                     key=f'{self.entity_type}://{self.cluster}.{self.db}/{self.entity1_name}')])
+
     def test_search_empty(self) -> None:
         expected = SearchTableResult(total_results=0,
                                      results=[])
@@ -0,0 +1,393 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+import unittest
+from threading import Event, Thread
+from typing import (
+    Any, Callable, List,
+)
+
+from mock import MagicMock, patch
+
+from search_service import create_app
+from search_service.models.autocomplete import AutocompleteResult, Suggestion
+from search_service.models.batch import BatchSearchRequest, BatchSearchResult
+from search_service.models.count import SearchCountResult
+from search_service.models.facets import SearchFacetsResult
+from search_service.models.table import SearchTableResult, Table
+from search_service.proxy import cache, get_proxy_client
+from search_service.proxy.base import BaseProxy
+from search_service.proxy.cache import (
+    CachingProxy, SingleFlight, TTLCache,
+)
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.timer = FakeTimer()
+        self.cache = TTLCache(max_size=2, ttl=10, timer=self.timer)
+
+    def test_get_and_put(self) -> None:
+        self.assertIsNone(self.cache.get(('index', 'a')))
+        self.cache.put(('index', 'a'), 'value')
+
+        self.assertEqual(self.cache.get(('index', 'a')), 'value')
+        self.assertEqual(self.cache.stats['hit'], 1)
+        self.assertEqual(self.cache.stats['miss'], 1)
+
+    def test_entry_expires(self) -> None:
+        self.cache.put(('index', 'a'), 'value')
+        self.cache.put(('index', 'b'), 'value', ttl=1)
+
+        self.timer.now = 5
+        self.assertIsNone(self.cache.get(('index', 'b')))
+        self.assertEqual(self.cache.get(('index', 'a')), 'value')
+
+        self.timer.now = 10
+        self.assertIsNone(self.cache.get(('index', 'a')))
+        self.assertEqual(self.cache.stats['expiration'], 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_evicts_least_recently_used(self) -> None:
+        self.cache.put(('index', 'a'), 'a')
+        self.cache.put(('index', 'b'), 'b')
+        self.cache.get(('index', 'a'))
+        self.cache.put(('index', 'c'), 'c')
+
+        self.assertEqual(self.cache.get(('index', 'a')), 'a')
+        self.assertIsNone(self.cache.get(('index', 'b')))
+        self.assertEqual(self.cache.get(('index', 'c')), 'c')
+        self.assertEqual(self.cache.stats['eviction'], 1)
+
+    def test_invalidate_namespace(self) -> None:
+        self.cache.put(('index', 'a'), 'a')
+        self.cache.put(('other_index', 'a'), 'a')
+
+        self.cache.invalidate('index')
+
+        self.assertIsNone(self.cache.get(('index', 'a')))
+        self.assertEqual(self.cache.get(('other_index', 'a')), 'a')
+
+    def test_put_ignores_value_of_stale_generation(self) -> None:
+        generation = self.cache.generation('index')
+        self.cache.invalidate('index')
+        self.cache.put(('index', 'a'), 'a', generation=generation)
+
+        self.assertIsNone(self.cache.get(('index', 'a')))
+
+    def test_on_event(self) -> None:
+        on_event = MagicMock()
+        ttl_cache = TTLCache(max_size=1, ttl=10, on_event=on_event)
+        ttl_cache.get(('index', 'a'))
+        ttl_cache.put(('index', 'a'), 'a')
+        ttl_cache.put(('index', 'b'), 'b')
+
+        on_event.assert_any_call('miss', 1)
+        on_event.assert_any_call('eviction', 1)
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('timed out waiting for the condition')
+        time.sleep(0.001)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.events = []  # type: List[Any]
+        self.single_flight = SingleFlight(on_event=lambda event, count: self.events.append((event, count)))
+        self.started = Event()
+        self.release = Event()
+
+    def _blocking_call(self, result: Any) -> Any:
+        self.started.set()
+        self.release.wait(5)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _run_concurrently(self, key: str, leader_result: Any, followers: int) -> List[Any]:
+        outcomes = []  # type: List[Any]
+
+        def run(call: Any) -> None:
+            try:
+                outcomes.append(self.single_flight.do(key, call))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads = [Thread(target=run, args=(lambda: self._blocking_call(leader_result),))]
+        threads[0].start()
+        self.started.wait(5)
+        threads += [Thread(target=run, args=(lambda: 'not called',)) for _ in range(followers)]
+        for thread in threads[1:]:
+            thread.start()
+        wait_for(lambda: self.single_flight.stats['coalesced'] == followers)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return outcomes
+
+    def test_shares_result_of_call_in_flight(self) -> None:
+        outcomes = self._run_concurrently('key', 'result', followers=3)
+
+        self.assertEqual(outcomes, ['result'] * 4)
+        self.assertEqual(self.events, [('coalesced', 1)] * 3)
+        # the next call runs again
+        self.assertEqual(self.single_flight.do('key', lambda: 'next'), 'next')
+
+    def test_shares_exception_of_call_in_flight(self) -> None:
+        error = RuntimeError('failed')
+
+        outcomes = self._run_concurrently('key', error, followers=2)
+
+        self.assertEqual(outcomes, [error] * 3)
+
+    def test_does_not_coalesce_different_keys(self) -> None:
+        self.assertEqual(self.single_flight.do('a', lambda: 1), 1)
+        self.assertEqual(self.single_flight.do('b', lambda: 2), 2)
+        self.assertEqual(self.single_flight.stats['coalesced'], 0)
+
+
+class TestCachingProxy(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.mock_proxy = MagicMock(spec=BaseProxy)
+        self.mock_proxy.page_size = 10
+        self.result = SearchTableResult(total_results=1,
+                                        results=[Table(id='key', name='name', key='key', cluster='gold',
+                                                       database='db', schema='schema')])
+        self.mock_proxy.fetch_table_search_results.return_value = self.result
+        self.proxy = CachingProxy(proxy=self.mock_proxy, max_size=10, ttl=60, empty_result_ttl=5)
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_caches_search_results(self) -> None:
+        first = self.proxy.fetch_table_search_results(query_term='test', page_index=0, index='table_search_index')
+        second = self.proxy.fetch_table_search_results(query_term=' test ', page_index=0, index='')
+
+        self.assertEqual(first, self.result)
+        self.assertEqual(second, self.result)
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 1)
+
+    def test_distinguishes_page_index(self) -> None:
+        self.proxy.fetch_table_search_results(query_term='test', page_index=0)
+        self.proxy.fetch_table_search_results(query_term='test', page_index=1)
+
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 2)
+
+    def test_distinguishes_cursor(self) -> None:
+        self.proxy.fetch_table_search_results(query_term='test')
+        self.proxy.fetch_table_search_results(query_term='test', cursor='cursor')
+
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 2)
+        self.mock_proxy.fetch_table_search_results.assert_called_with(query_term='test', page_index=0, index='',
+                                                                      cursor='cursor')
+
+    def test_passes_preference_along_without_keying_on_it(self) -> None:
+        self.proxy.fetch_table_search_results(query_term='test', preference='session1')
+        self.proxy.fetch_table_search_results(query_term='test', preference='session2')
+
+        self.mock_proxy.fetch_table_search_results.assert_called_once_with(query_term='test', page_index=0, index='',
+                                                                           preference='session1')
+
+    def test_caches_filter_search_regardless_of_filter_order(self) -> None:
+        self.mock_proxy.fetch_search_results_with_filter.return_value = self.result
+        self.proxy.fetch_search_results_with_filter(query_term='test',
+                                                    search_request={'filters': {'database': ['hive', 'bq']}},
+                                                    index='table_search_index')
+        self.proxy.fetch_search_results_with_filter(query_term='test',
+                                                    search_request={'filters': {'database': ['bq', 'hive']}},
+                                                    index='table_search_index')
+
+        self.assertEqual(self.mock_proxy.fetch_search_results_with_filter.call_count, 1)
+
+    def test_write_invalidates_index(self) -> None:
+        self.mock_proxy.fetch_user_search_results.return_value = self.result
+        self.proxy.fetch_table_search_results(query_term='test', index='table_search_index')
+        self.proxy.fetch_user_search_results(query_term='test', index='user_search_index')
+
+        self.proxy.update_document(data=[], index='table_search_index')
+        self.proxy.fetch_table_search_results(query_term='test', index='table_search_index')
+        self.proxy.fetch_user_search_results(query_term='test', index='user_search_index')
+
+        self.mock_proxy.update_document.assert_called_with(data=[], index='table_search_index')
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 2)
+        self.assertEqual(self.mock_proxy.fetch_user_search_results.call_count, 1)
+
+    def test_failed_write_invalidates_index(self) -> None:
+        self.mock_proxy.delete_document.side_effect = RuntimeError('bulk failed')
+        self.proxy.fetch_table_search_results(query_term='test', index='table_search_index')
+
+        with self.assertRaises(RuntimeError):
+            self.proxy.delete_document(data=['key'], index='table_search_index')
+        self.proxy.fetch_table_search_results(query_term='test', index='table_search_index')
+
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 2)
+
+    def test_empty_result_uses_shorter_ttl(self) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = SearchTableResult(total_results=0, results=[])
+        with patch.object(self.proxy.cache, 'put') as mock_put:
+            self.proxy.fetch_table_search_results(query_term='nothing')
+
+        self.assertEqual(mock_put.call_args[1]['ttl'], 5)
+
+    def test_emits_statsd_counters(self) -> None:
+        with patch.object(cache, 'incr_counter') as mock_incr:
+            self.proxy.fetch_table_search_results(query_term='test')
+            self.proxy.fetch_table_search_results(query_term='test')
+
+        mock_incr.assert_any_call(prefix=cache.__name__, name='cache.miss', count=1)
+        mock_incr.assert_any_call(prefix=cache.__name__, name='cache.hit', count=1)
+        self.assertEqual(self.proxy.stats()['size'], 1)
+
+    def test_batch_fetches_only_cache_misses(self) -> None:
+        self.proxy.fetch_table_search_results(query_term='cached', index='table_search_index')
+        self.mock_proxy.fetch_search_results_batch.return_value = [BatchSearchResult(result=self.result),
+                                                                   BatchSearchResult(error='search failed')]
+        requests = [BatchSearchRequest(resource='table', query_term='cached', index='table_search_index'),
+                    BatchSearchRequest(resource='table', query_term='missed', index='table_search_index'),
+                    BatchSearchRequest(resource='user', query_term='failed', index='user_search_index')]
+
+        results = self.proxy.fetch_search_results_batch(requests=requests)
+
+        self.mock_proxy.fetch_search_results_batch.assert_called_once_with(requests=requests[1:])
+        self.assertEqual([result.result for result in results], [self.result, self.result, None])
+        self.assertEqual(results[2].error, 'search failed')
+
+        self.proxy.fetch_table_search_results(query_term='missed', index='table_search_index')
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 1)
+
+    def test_autocomplete_fetches_only_cache_misses(self) -> None:
+        suggestions = AutocompleteResult(results=[Suggestion(name='schema.table', key='key')])
+        self.mock_proxy.fetch_autocomplete_results.side_effect = [
+            {'table': suggestions},
+            {'user': AutocompleteResult()},
+        ]
+
+        self.proxy.fetch_autocomplete_results(prefix='sch', indices={'table': 'table_search_index'}, size=5)
+        indices = {'user': 'user_search_index', 'table': 'table_search_index', 'dashboard': 'dashboard_search_index'}
+        results = self.proxy.fetch_autocomplete_results(prefix='sch ', indices=indices, size=5)
+
+        self.assertEqual(self.mock_proxy.fetch_autocomplete_results.call_args_list[1][1],
+                         dict(prefix='sch ', indices={'user': 'user_search_index',
+                                                      'dashboard': 'dashboard_search_index'}, size=5))
+        self.assertEqual(results, {'user': AutocompleteResult(), 'table': suggestions})
+
+        self.proxy.create_document(data=[], index='table_search_index')
+        self.mock_proxy.fetch_autocomplete_results.side_effect = [{'table': suggestions}]
+        self.proxy.fetch_autocomplete_results(prefix='sch', indices={'table': 'table_search_index'}, size=5)
+        self.assertEqual(self.mock_proxy.fetch_autocomplete_results.call_count, 3)
+
+    def test_caches_facets_until_document_write(self) -> None:
+        self.mock_proxy.fetch_facets.return_value = SearchFacetsResult(total_results=1)
+        search_request = {'type': 'AND', 'filters': {'database': ['hive', 'bigquery']}}
+
+        self.proxy.fetch_facets(query_term='test', search_request=search_request, index='table_search_index')
+        self.proxy.fetch_facets(query_term='test ', index='table_search_index', preference='user',
+                                search_request={'type': 'AND', 'filters': {'database': ['bigquery', 'hive']}})
+        self.proxy.fetch_table_search_results(query_term='test', index='table_search_index')
+        self.assertEqual(self.mock_proxy.fetch_facets.call_count, 1)
+
+        self.proxy.update_document(data=[], index='table_search_index')
+        self.proxy.fetch_facets(query_term='test', search_request=search_request, index='table_search_index')
+        self.assertEqual(self.mock_proxy.fetch_facets.call_count, 2)
+
+    def test_does_not_cache_partial_results(self) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = SearchTableResult(total_results=1, results=[],
+                                                                                    partial=True)
+
+        self.proxy.fetch_table_search_results(query_term='test')
+        self.proxy.fetch_table_search_results(query_term='test')
+
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 2)
+
+    def test_distinguishes_track_total_hits(self) -> None:
+        self.proxy.fetch_table_search_results(query_term='test')
+        self.proxy.fetch_table_search_results(query_term='test', track_total_hits=False)
+        self.proxy.fetch_table_search_results(query_term='test', track_total_hits=False)
+
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 2)
+        self.mock_proxy.fetch_table_search_results.assert_called_with(query_term='test', page_index=0, index='',
+                                                                      track_total_hits=False)
+
+    def test_caches_counts_apart_until_document_write(self) -> None:
+        self.mock_proxy.fetch_count.return_value = SearchCountResult(total_results=0)
+
+        self.proxy.fetch_count(query_term='test', resource='table', index='table_search_index', max_count=100)
+        self.proxy.fetch_count(query_term=' test', resource='table', index='table_search_index', max_count=100)
+        self.assertEqual(self.mock_proxy.fetch_count.call_count, 1)
+        self.assertEqual(len(self.proxy.count_cache), 1)
+        self.assertEqual(len(self.proxy.cache), 0)
+
+        self.proxy.create_document(data=[], index='table_search_index')
+        self.proxy.fetch_count(query_term='test', resource='table', index='table_search_index', max_count=100)
+        self.assertEqual(self.mock_proxy.fetch_count.call_count, 2)
+
+    def test_coalesces_identical_searches_without_cache(self) -> None:
+        proxy = CachingProxy(proxy=self.mock_proxy, max_size=0, coalesce=True)
+        started = Event()
+        release = Event()
+
+        def fetch(**kwargs: Any) -> SearchTableResult:
+            started.set()
+            release.wait(5)
+            return self.result
+
+        self.mock_proxy.fetch_table_search_results.side_effect = fetch
+        results = []  # type: List[Any]
+
+        def search() -> None:
+            with self.app.app_context():
+                results.append(proxy.fetch_table_search_results(query_term='test'))
+
+        threads = [Thread(target=search) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        wait_for(lambda: proxy.stats().get('coalesced', 0) == 2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, [self.result] * 3)
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 1)
+        self.assertEqual(len(proxy.cache), 0)
+
+    def test_delegates_unknown_attributes(self) -> None:
+        self.assertEqual(self.proxy.page_size, 10)
+
+    @patch('search_service.proxy._proxy_client', None)
+    def test_get_proxy_client_with_cache_enabled(self) -> None:
+        self.app.config['SEARCH_CACHE_ENABLED'] = True
+        proxy: Any = get_proxy_client()
+
+        self.assertIsInstance(proxy, CachingProxy)
+        self.assertEqual(proxy.cache.max_size, self.app.config['SEARCH_CACHE_MAX_SIZE'])
+
+    @patch('search_service.proxy._proxy_client', None)
+    def test_get_proxy_client_with_coalescing_only(self) -> None:
+        self.app.config['SEARCH_COALESCING_ENABLED'] = True
+        proxy: Any = get_proxy_client()
+
+        self.assertIsInstance(proxy, CachingProxy)
+        self.assertIsNotNone(proxy.single_flight)
+        self.assertEqual(proxy.cache.max_size, 0)
@@ -0,0 +1,137 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+from typing import Any
+
+from mock import MagicMock, patch
+
+from search_service import create_app
+from search_service.models.search_result import SearchResult
+from search_service.models.table import SearchTableResult, Table
+from search_service.proxy import get_proxy_client
+from search_service.proxy.base import BaseProxy
+from search_service.proxy.cache import CachingProxy
+from search_service.proxy.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerProxy, CircuitOpenError, mark_stale,
+)
+from tests.unit.proxy.test_cache import FakeTimer
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.timer = FakeTimer()
+        self.breaker = CircuitBreaker(failure_threshold=2, slow_call_sec=1.0, open_sec=30, timer=self.timer)
+
+    def test_opens_after_failures_in_a_row(self) -> None:
+        self.breaker.record(success=False, duration=0.1)
+        self.breaker.record(success=True, duration=0.1)
+        self.breaker.record(success=False, duration=0.1)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        # slow calls fail too
+        self.breaker.record(success=True, duration=1.5)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_lets_a_single_trial_through_once_open_for_a_while(self) -> None:
+        self.breaker.record(success=False, duration=0.1)
+        self.breaker.record(success=False, duration=0.1)
+
+        self.timer.now = 30
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record(success=False, duration=0.1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.timer.now = 60
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(success=True, duration=0.1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+
+class TestCircuitBreakerProxy(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.timer = FakeTimer()
+        self.mock_proxy = MagicMock(spec=BaseProxy)
+        self.result = SearchTableResult(total_results=1,
+                                        results=[Table(id='key', name='name', key='key', cluster='gold',
+                                                       database='db', schema='schema')])
+        self.mock_proxy.fetch_table_search_results.return_value = self.result
+        self.proxy = CircuitBreakerProxy(proxy=self.mock_proxy, failure_threshold=2, open_sec=30, timer=self.timer)
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_serves_stale_result_of_failed_search(self) -> None:
+        self.proxy.fetch_table_search_results(query_term='test')
+        self.mock_proxy.fetch_table_search_results.side_effect = RuntimeError('unavailable')
+
+        result = self.proxy.fetch_table_search_results(query_term=' test ')
+
+        self.assertTrue(result.stale)
+        self.assertEqual(result.results, self.result.results)
+        self.assertIsNone(self.result.stale)
+
+    def test_serves_stale_results_without_calling_proxy_while_open(self) -> None:
+        self.proxy.fetch_table_search_results(query_term='test')
+        self.mock_proxy.fetch_table_search_results.side_effect = RuntimeError('unavailable')
+        self.proxy.fetch_table_search_results(query_term='test')
+        self.proxy.fetch_table_search_results(query_term='test')
+        self.assertEqual(self.proxy.breaker.state, OPEN)
+
+        result = self.proxy.fetch_table_search_results(query_term='test')
+
+        self.assertTrue(result.stale)
+        self.assertEqual(self.mock_proxy.fetch_table_search_results.call_count, 3)
+        with self.assertRaises(CircuitOpenError):
+            self.proxy.fetch_table_search_results(query_term='other')
+
+    def test_fails_without_stale_result(self) -> None:
+        self.mock_proxy.fetch_table_search_results.side_effect = RuntimeError('unavailable')
+
+        with self.assertRaises(RuntimeError):
+            self.proxy.fetch_table_search_results(query_term='test')
+
+    def test_unsupported_call_does_not_count_as_failure(self) -> None:
+        self.mock_proxy.fetch_facets.side_effect = NotImplementedError('no facets')
+
+        for _ in range(3):
+            with self.assertRaises(NotImplementedError):
+                self.proxy.fetch_facets(query_term='test', index='table_search_index')
+
+        self.assertEqual(self.proxy.breaker.state, CLOSED)
+
+    def test_does_not_store_partial_results(self) -> None:
+        self.mock_proxy.fetch_table_search_results.return_value = SearchTableResult(total_results=0, partial=True)
+        self.proxy.fetch_table_search_results(query_term='test')
+
+        self.assertEqual(len(self.proxy.stale_results), 0)
+
+    def test_mark_stale_of_plain_search_result(self) -> None:
+        result = SearchResult(total_results=1, results=['result'], next_cursor='next')
+
+        stale = mark_stale(result)
+
+        self.assertTrue(stale.stale)
+        self.assertEqual((stale.total_results, stale.results, stale.next_cursor), (1, ['result'], 'next'))
+
+    @patch('search_service.proxy._proxy_client', None)
+    def test_get_proxy_client_with_circuit_breaker_enabled(self) -> None:
+        self.app.config['SEARCH_CIRCUIT_BREAKER_ENABLED'] = True
+        self.app.config['SEARCH_CACHE_ENABLED'] = True
+
+        client: Any = get_proxy_client()
+
+        self.assertIsInstance(client, CachingProxy)
+        self.assertIsInstance(client.proxy, CircuitBreakerProxy)
@@ -1,22 +1,38 @@
 # Copyright Contributors to the Amundsen project.
 # SPDX-License-Identifier: Apache-2.0
 
+import json
 import unittest
 from typing import (  # noqa: F401
-    Any, Iterable, List,
+    Any, Dict, Iterable, List,
 )
 from unittest.mock import MagicMock, patch
 
+from elasticsearch.exceptions import ConnectionTimeout, NotFoundError
+from elasticsearch_dsl import Q, Search
+
 from search_service import create_app
+from search_service.api.dashboard import DASHBOARD_INDEX
 from search_service.api.table import TABLE_INDEX
 from search_service.api.user import USER_INDEX
+from search_service.models.autocomplete import AutocompleteResult, Suggestion
+from search_service.models.batch import BatchSearchRequest
+from search_service.models.count import SearchCountResult
 from search_service.models.dashboard import Dashboard
-from search_service.models.search_result import SearchResult
+from search_service.models.facets import (
+    Facet, FacetValue, SearchFacetsResult,
+)
+from search_service.models.search_result import (
+    SearchResult, decode_cursor, encode_cursor,
+)
 from search_service.models.table import Table
 from search_service.models.tag import Tag
 from search_service.models.user import User
 from search_service.proxy import get_proxy_client
-from search_service.proxy.elasticsearch import ElasticsearchProxy
+from search_service.proxy.elasticsearch import (
+    SEARCH_FILTER_PATH, ElasticsearchProxy, FilteredResponse, get_hydration_plan, get_preference_params,
+    get_search_sort, get_source_fields, get_total_results,
+)
 
 
 class MockSearchResult:
@@ -312,6 +328,114 @@ class TestElasticsearchProxy(unittest.TestCase):
                                  vars(expected.results[i]),
                                  "Search result doesn't match with expected result!")
 
+    def _get_sorted_hits(self, count: int) -> List[TableResponse]:
+        hits = []
+        for i in range(count):
+            hit = TableResponse(result=dict(vars(self.mock_result1), key=f'test_key{i}'))
+            hit.meta['sort'] = [1.0, 10, f'test_key{i}']
+            hits.append(hit)
+        return hits
+
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_returns_cursor_to_next_page(self, mock_execute: MagicMock) -> None:
+        mock_results = MagicMock()
+        mock_results.hits.total = 25
+        mock_results.__iter__.return_value = self._get_sorted_hits(10)
+        mock_execute.return_value = mock_results
+
+        resp = self.es_proxy.fetch_table_search_results(query_term='test_query_term', page_index=1)
+
+        body = mock_execute.call_args[0][0].to_dict()
+        self.assertEqual((body['from'], body['size']), (10, 10))
+        self.assertEqual(body['sort'], ['_score', {'total_usage': {'order': 'desc', 'unmapped_type': 'long'}},
+                                        {'key': {'order': 'asc', 'unmapped_type': 'keyword'}}])
+        self.assertEqual(len(resp.results), 10)
+        self.assertEqual(decode_cursor(resp.next_cursor), [1.0, 10, 'test_key9'])
+
+    def test_search_sort_breaks_ties_on_document_id_fields(self) -> None:
+        # sorting on _id would load its fielddata on the heap of the nodes
+        self.assertEqual([get_search_sort(model)[-1] for model in (Table, User, Dashboard)],
+                         [{'key': {'order': 'asc', 'unmapped_type': 'keyword'}},
+                          {'email.raw': {'order': 'asc', 'unmapped_type': 'keyword'}},
+                          {'uri.keyword': {'order': 'asc', 'unmapped_type': 'keyword'}}])
+
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_fetches_model_fields_only(self, mock_execute: MagicMock) -> None:
+        self.es_proxy.fetch_user_search_results(query_term='test_query_term', index='user_search_index')
+
+        search = mock_execute.call_args[0][0]
+        self.assertEqual(search.to_dict()['_source'], {'includes': get_source_fields(User)})
+        self.assertNotIn('id', get_source_fields(User))
+        self.assertEqual(search._params['filter_path'],
+                         'timed_out,hits.total,hits.hits._id,hits.hits._source,hits.hits.sort')
+        self.assertIs(search._response_class, FilteredResponse)
+
+    def test_filtered_response_without_hits(self) -> None:
+        response = FilteredResponse(Search(), {'hits': {'total': 0}})
+
+        self.assertEqual(list(response), [])
+        self.assertEqual(response.hits.total, 0)
+
+    def test_filtered_response_with_hits(self) -> None:
+        response = FilteredResponse(Search(), {'hits': {'total': 1, 'hits': [
+            {'_id': 'test_key', '_source': {'name': 'test_table'}, 'sort': [1.0, 0, 'test_key']},
+        ]}})
+
+        hit = list(response)[0]
+        self.assertEqual(hit.meta.id, 'test_key')
+        self.assertEqual(list(hit.meta.sort), [1.0, 0, 'test_key'])
+        self.assertEqual(hit.name, 'test_table')
+
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_returns_no_cursor_on_last_page(self, mock_execute: MagicMock) -> None:
+        mock_results = MagicMock()
+        mock_results.hits.total = 30
+        mock_results.__iter__.return_value = self._get_sorted_hits(10)
+        mock_execute.return_value = mock_results
+
+        resp = self.es_proxy.fetch_table_search_results(query_term='test_query_term', page_index=2)
+
+        self.assertIsNone(resp.next_cursor)
+
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_with_cursor(self, mock_execute: MagicMock) -> None:
+        mock_results = MagicMock()
+        mock_results.hits.total = 25
+        mock_results.__iter__.return_value = self._get_sorted_hits(5)
+        mock_execute.return_value = mock_results
+
+        resp = self.es_proxy.fetch_table_search_results(query_term='test_query_term',
+                                                        page_index=3,
+                                                        cursor=encode_cursor([2.0, 5, 'test_key']))
+
+        body = mock_execute.call_args[0][0].to_dict()
+        self.assertEqual(body['search_after'], [2.0, 5, 'test_key'])
+        self.assertEqual((body.get('from', 0), body['size']), (0, 10))
+        self.assertEqual(len(resp.results), 5)
+        self.assertIsNone(resp.next_cursor)
+
+    @patch('search_service.proxy.elasticsearch.SEARCH_AFTER_BATCH_SIZE', 3)
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_every_result_page_after_page(self, mock_execute: MagicMock) -> None:
+        hits = self._get_sorted_hits(4)
+        first_page, last_page = MagicMock(), MagicMock()
+        first_page.hits.total = last_page.hits.total = 4
+        first_page.__iter__.return_value = hits[:3]
+        last_page.__iter__.return_value = hits[3:]
+        mock_execute.side_effect = [first_page, last_page]
+
+        resp = self.es_proxy.fetch_table_search_results(query_term='test_query_term', page_index=-1)
+
+        self.assertEqual(mock_execute.call_count, 2)
+        first_body = mock_execute.call_args_list[0][0][0].to_dict()
+        last_body = mock_execute.call_args_list[1][0][0].to_dict()
+        self.assertNotIn('search_after', first_body)
+        self.assertEqual(last_body['search_after'], [1.0, 10, 'test_key2'])
+        self.assertEqual(last_body['size'], 3)
+        self.assertEqual(resp.total_results, 4)
+        self.assertEqual([table.key for table in resp.results], ['test_key0', 'test_key1', 'test_key2', 'test_key3'])
+        self.es_proxy.elasticsearch.count.assert_not_called()
+
     @patch('elasticsearch_dsl.Search.execute')
     def test_search_table_filter(self, mock_search: MagicMock) -> None:
         mock_results = MagicMock()
@@ -383,20 +507,50 @@ class TestElasticsearchProxy(unittest.TestCase):
             'column': ['*ds*'],
             'tag': ['test-tag'],
         }
-        expected_result = "database.raw:(hive OR bigquery) " \
-                          "AND schema.raw:(test-schema1 OR test-schema2) " \
-                          "AND name.raw:(*amundsen*) " \
-                          "AND column_names.raw:(*ds*) " \
-                          "AND tags:(test-tag)"
+        expected_result = [
+            {'terms': {'database.raw': ['hive', 'bigquery']}},
+            {'terms': {'schema.raw': ['test-schema1', 'test-schema2']}},
+            {'wildcard': {'name.raw': '*amundsen*'}},
+            {'wildcard': {'column_names.raw': '*ds*'}},
+            {'terms': {'tags': ['test-tag']}},
+        ]
         self.assertEqual(self.es_proxy.parse_filters(filter_list,
                                                      index=TABLE_INDEX), expected_result)
 
+    def test_parse_filters_with_exact_and_wildcard_values(self) -> None:
+        filter_list = {
+            'schema': ['test_schema', 'test_*'],
+            'database': 'hive',
+            'table': [''],
+        }
+        expected_result = [
+            {'bool': {'should': [{'terms': {'schema.raw': ['test_schema']}},
+                                 {'wildcard': {'schema.raw': 'test_*'}}],
+                      'minimum_should_match': 1}},
+            {'terms': {'database.raw': ['hive']}},
+        ]
+        self.assertEqual(self.es_proxy.parse_filters(filter_list,
+                                                     index=TABLE_INDEX), expected_result)
+
+    def test_parse_filters_of_dashboards_on_keyword_fields(self) -> None:
+        # the product values of the facets, e.g. 'Mode', are not the terms of the analyzed product field
+        filter_list = {
+            'product': ['Mode'],
+            'group_name': ['Sales'],
+        }
+        expected_result = [
+            {'terms': {'product.keyword': ['Mode']}},
+            {'terms': {'group_name.raw': ['Sales']}},
+        ]
+        self.assertEqual(self.es_proxy.parse_filters(filter_list,
+                                                     index=DASHBOARD_INDEX), expected_result)
+
     def test_parse_filters_return_no_results(self) -> None:
         filter_list = {
             'unsupported_category': ['fake']
         }
         self.assertEqual(self.es_proxy.parse_filters(filter_list,
-                                                     index=TABLE_INDEX), '')
+                                                     index=TABLE_INDEX), [])
 
     def test_validate_wrong_filters_values(self) -> None:
         search_request = {
@@ -431,6 +585,36 @@ class TestElasticsearchProxy(unittest.TestCase):
         self.assertEqual(self.es_proxy.parse_query_term(term,
                                                         index=TABLE_INDEX), expected_result)
 
+    def test_parse_query_term_ngram_subfields(self) -> None:
+        expected_result = '(name.ngram:("te\\"st") OR name:(te"st) OR schema.ngram:("te\\"st") OR schema:(te"st) ' \
+                          'OR description.ngram:("te\\"st") OR description:(te"st) ' \
+                          'OR column_names.ngram:("te\\"st") OR column_names:(te"st) ' \
+                          'OR column_descriptions.ngram:("te\\"st") OR column_descriptions:(te"st))'
+        self.assertEqual(self.es_proxy.parse_query_term('te"st', index=TABLE_INDEX, ngram_subfields=True),
+                         expected_result)
+        # terms shorter than a trigram keep the wildcards
+        self.assertEqual(self.es_proxy.parse_query_term('ds', index=TABLE_INDEX, ngram_subfields=True),
+                         self.es_proxy.parse_query_term('ds', index=TABLE_INDEX))
+
+    def test_convert_query_json_to_query_dsl_ngram_subfields(self) -> None:
+        self.app.config['ELASTICSEARCH_NGRAM_SUBFIELDS_ENABLED'] = True
+
+        query_dsl = self.es_proxy.convert_query_json_to_query_dsl(search_request={'filters': {}}, query_term='test',
+                                                                  index=TABLE_INDEX)
+
+        self.assertEqual(query_dsl['bool']['must']['query_string']['query'],
+                         self.es_proxy.parse_query_term('test', index=TABLE_INDEX, ngram_subfields=True))
+
+    def test_create_index_with_ngram_subfields(self) -> None:
+        client = MagicMock()
+        es_proxy = ElasticsearchProxy(client=client)
+
+        es_proxy._create_index_helper(alias=DASHBOARD_INDEX)
+
+        body = json.loads(client.indices.create.call_args[1]['body'])
+        self.assertEqual(body['mappings']['dashboard']['properties']['name']['fields']['ngram'],
+                         {'type': 'text', 'analyzer': 'trigram_analyzer'})
+
     def test_convert_query_json_to_query_dsl_term_and_filters(self) -> None:
         term = 'test'
         test_filters = {
@@ -445,8 +629,10 @@ class TestElasticsearchProxy(unittest.TestCase):
             'filters': test_filters
         }
 
-        expected_result = self.es_proxy.parse_filters(test_filters, index=TABLE_INDEX) + " AND " + \
-            self.es_proxy.parse_query_term(term, index=TABLE_INDEX)
+        expected_result = {'bool': {
+            'filter': self.es_proxy.parse_filters(test_filters, index=TABLE_INDEX),
+            'must': {'query_string': {'query': self.es_proxy.parse_query_term(term, index=TABLE_INDEX)}},
+        }}
         ret_result = self.es_proxy.convert_query_json_to_query_dsl(search_request=search_request,
                                                                    query_term=term,
                                                                    index=TABLE_INDEX)
@@ -461,8 +647,8 @@ class TestElasticsearchProxy(unittest.TestCase):
             'type': 'AND',
             'filters': test_filters
         }
-        expected_result = self.es_proxy.parse_filters(test_filters,
-                                                      index=TABLE_INDEX)
+        expected_result = {'bool': {'filter': self.es_proxy.parse_filters(test_filters,
+                                                                          index=TABLE_INDEX)}}
         ret_result = self.es_proxy.convert_query_json_to_query_dsl(search_request=search_request,
                                                                    query_term=term,
                                                                    index=TABLE_INDEX)
@@ -474,8 +660,8 @@ class TestElasticsearchProxy(unittest.TestCase):
             'type': 'AND',
             'filters': {}
         }
-        expected_result = self.es_proxy.parse_query_term(term,
-                                                         index=TABLE_INDEX)
+        expected_result = {'bool': {'must': {'query_string': {'query': self.es_proxy.parse_query_term(
+            term, index=TABLE_INDEX)}}}}
         ret_result = self.es_proxy.convert_query_json_to_query_dsl(search_request=search_request,
                                                                    query_term=term,
                                                                    index=TABLE_INDEX)
@@ -694,19 +880,23 @@ class TestElasticsearchProxy(unittest.TestCase):
         self.assertEqual(expected_alias, result)
         mock_elasticsearch.bulk.assert_called_with(expected_data)
 
-    def test_get_instance_string(self) -> None:
-        result = self.es_proxy._get_instance('column', 'value')
-        self.assertEqual('value', result)
+    @patch('uuid.uuid4')
+    def test_delete_dashboard_document(self, mock_uuid: MagicMock) -> None:
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        new_index_name = 'tester_index_name'
+        mock_uuid.return_value = new_index_name
+        mock_elasticsearch.indices.get_alias.return_value = dict([(new_index_name, {})])
+        expected_alias = 'dashboard_search_index'
+        data = ['id1', 'id2']
 
-    def test_get_instance_tag(self) -> None:
-        result = self.es_proxy._get_instance('tags', ['value'])
-        tags = [Tag(tag_name='value')]
-        self.assertEqual(tags, result)
+        expected_data = [
+            {'delete': {'_index': new_index_name, '_id': 'id1', '_type': 'dashboard'}},
+            {'delete': {'_index': new_index_name, '_id': 'id2', '_type': 'dashboard'}}
+        ]
+        result = self.es_proxy.delete_document(data=data, index=expected_alias)
 
-    def test_get_instance_badge(self) -> None:
-        result = self.es_proxy._get_instance('badges', ['badge1'])
-        badges = [Tag(tag_name='badge1')]
-        self.assertEqual(badges, result)
+        self.assertEqual(expected_alias, result)
+        mock_elasticsearch.bulk.assert_called_with(expected_data)
 
     @patch('search_service.proxy.elasticsearch.ElasticsearchProxy._search_helper')
     def test_fetch_dashboard_search_results(self,
@@ -746,3 +936,502 @@ class TestElasticsearchProxy(unittest.TestCase):
         self.assertDictEqual(vars(resp.results[0]),
                              vars(expected.results[0]),
                              "Search result doesn't match with expected result!")
+
+    def test_fetch_search_results_batch(self) -> None:
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.msearch.return_value = {
+            'responses': [
+                {'hits': {'total': 1, 'hits': [{'_id': 'test_key', '_source': vars(self.mock_result1)}]}},
+                {'error': {'type': 'index_not_found_exception', 'reason': 'no such index'}},
+            ]
+        }
+
+        results = self.es_proxy.fetch_search_results_batch(requests=[
+            BatchSearchRequest(resource='table', query_term='test', index='table_search_index'),
+            BatchSearchRequest(resource='user', query_term='', index='user_search_index'),
+            BatchSearchRequest(resource='dashboard', query_term='test', index='dashboard_search_index'),
+            BatchSearchRequest(resource='user', query_term='test'),
+        ])
+
+        body = mock_elasticsearch.msearch.call_args[1]['body']
+        self.assertIn('responses.hits.hits._source', mock_elasticsearch.msearch.call_args[1]['filter_path'])
+        self.assertEqual(len(body), 4)
+        self.assertEqual(body[1]['_source'], {'includes': get_source_fields(Table)})
+        self.assertEqual(body[0], {'index': 'table_search_index'})
+        self.assertEqual(body[1]['query'], Q(self.es_proxy._get_table_query('test')).to_dict())
+        self.assertEqual((body[1]['from'], body[1]['size']), (0, 10))
+        self.assertEqual(body[2], {'index': 'dashboard_search_index'})
+
+        self.assertEqual(results[0].result.total_results, 1)
+        self.assertDictEqual(vars(results[0].result.results[0]),
+                             vars(Table(id='test_key',
+                                        name='test_table',
+                                        key='test_key',
+                                        description='test_description',
+                                        cluster='gold',
+                                        database='test_db',
+                                        schema='test_schema',
+                                        column_names=['test_col1', 'test_col2'],
+                                        tags=[],
+                                        badges=[],
+                                        last_updated_timestamp=1527283287,
+                                        programmatic_descriptions=[])))
+        self.assertEqual(results[1].result.total_results, 0)
+        self.assertEqual(results[2].error, 'no such index')
+        self.assertIsNotNone(results[3].error)
+
+    def test_fetch_autocomplete_results(self) -> None:
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.msearch.return_value = {
+            'responses': [
+                {'hits': {'total': 1, 'hits': [{'_id': 'test_key', '_source': {
+                    'display_name': 'test_schema.test_table', 'schema': 'test_schema', 'name': 'test_table',
+                    'key': 'test_key'}}]}},
+                {'error': {'type': 'index_not_found_exception', 'reason': 'no such index'}},
+                {'hits': {'total': 1, 'hits': [{'_id': 'jdoe', '_source': {
+                    'first_name': 'Jane', 'last_name': 'Doe', 'email': 'jdoe@example.com'}}]}},
+            ]
+        }
+
+        results = self.es_proxy.fetch_autocomplete_results(prefix=' Test ',
+                                                           indices={'table': TABLE_INDEX,
+                                                                    'dashboard': DASHBOARD_INDEX,
+                                                                    'user': USER_INDEX},
+                                                           size=3)
+
+        body = mock_elasticsearch.msearch.call_args[1]['body']
+        self.assertEqual([header['index'] for header in body[::2]], [TABLE_INDEX, DASHBOARD_INDEX, USER_INDEX])
+        self.assertEqual(body[1], {
+            'size': 3,
+            'query': {'bool': {'filter': {'bool': {
+                'should': [{'prefix': {'name.raw': 'Test'}}, {'prefix': {'name.raw': 'test'}},
+                           {'prefix': {'display_name': 'Test'}}, {'prefix': {'display_name': 'test'}}],
+                'minimum_should_match': 1,
+            }}}},
+            'sort': [{'total_usage': {'order': 'desc', 'unmapped_type': 'long'}},
+                     {'key': {'order': 'asc', 'unmapped_type': 'keyword'}}],
+            '_source': ['display_name', 'schema', 'name', 'key'],
+        })
+        self.assertEqual(body[3]['query']['bool']['filter']['bool']['should'], [{'prefix': {'name.raw': 'test'}}])
+        self.assertEqual(body[5]['sort'], [{'total_read': {'order': 'desc', 'unmapped_type': 'long'}},
+                                           {'email.raw': {'order': 'asc', 'unmapped_type': 'keyword'}}])
+
+        self.assertEqual(results, {
+            'table': AutocompleteResult(results=[Suggestion(name='test_schema.test_table', key='test_key')]),
+            'user': AutocompleteResult(results=[Suggestion(name='Jane Doe', key='jdoe@example.com')]),
+        })
+
+    def test_fetch_autocomplete_results_without_prefix(self) -> None:
+        results = self.es_proxy.fetch_autocomplete_results(prefix=' ', indices={'table': TABLE_INDEX})
+
+        self.es_proxy.elasticsearch.msearch.assert_not_called()
+        self.assertEqual(results, {'table': AutocompleteResult()})
+
+    def test_fetch_facets(self) -> None:
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.search.return_value = {
+            'hits': {'total': 3},
+            'aggregations': {
+                'database': {'values': {'buckets': [{'key': 'hive', 'doc_count': 3},
+                                                    {'key': 'bigquery', 'doc_count': 2}]}},
+                'tag': {'values': {'buckets': [{'key': 'pii', 'doc_count': 1}]}},
+            },
+        }
+        search_request = {'type': 'AND', 'filters': {'database': ['hive'], 'tag': 'pii'}}
+
+        result = self.es_proxy.fetch_facets(query_term='test', search_request=search_request, index=TABLE_INDEX,
+                                            preference='user')
+
+        kwargs = mock_elasticsearch.search.call_args[1]
+        body = kwargs['body']
+        self.assertEqual((kwargs['index'], kwargs['request_cache']), (TABLE_INDEX, True))
+        self.assertEqual(kwargs['preference'], get_preference_params('user')['preference'])
+        self.assertEqual(body['size'], 0)
+        self.assertEqual(body['query'], self.es_proxy.convert_query_json_to_query_dsl(search_request={},
+                                                                                      query_term='test',
+                                                                                      index=TABLE_INDEX))
+        database_filter, tag_filter = {'terms': {'database.raw': ['hive']}}, {'terms': {'tags': ['pii']}}
+        self.assertEqual(body['post_filter'], {'bool': {'filter': [database_filter, tag_filter]}})
+        self.assertEqual(body['aggs']['database'], {'filter': {'bool': {'filter': [tag_filter]}},
+                                                    'aggs': {'values': {'terms': {'field': 'database.raw',
+                                                                                  'size': 20}}}})
+        self.assertEqual(body['aggs']['tag']['filter'], {'bool': {'filter': [database_filter]}})
+        self.assertEqual(body['aggs']['cluster']['filter'], {'bool': {'filter': [database_filter, tag_filter]}})
+
+        self.assertEqual(result.total_results, 3)
+        self.assertEqual([facet.name for facet in result.facets], ['database', 'cluster', 'schema', 'tag', 'badges'])
+        self.assertEqual(result.facets[0].values, [FacetValue(value='hive', count=3),
+                                                   FacetValue(value='bigquery', count=2)])
+        self.assertEqual(result.facets[1].values, [])
+
+    def test_fetch_facets_without_query_term_nor_filters(self) -> None:
+        self.app.config['SEARCH_FACET_SIZE'] = 5
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.search.return_value = {'hits': {'total': 0}}
+
+        result = self.es_proxy.fetch_facets(query_term='', index=DASHBOARD_INDEX)
+
+        body = mock_elasticsearch.search.call_args[1]['body']
+        self.assertEqual(body['query'], {'match_all': {}})
+        self.assertNotIn('post_filter', body)
+        self.assertEqual(body['aggs']['product']['aggs']['values']['terms'], {'field': 'product.keyword', 'size': 5})
+        self.assertEqual(result, SearchFacetsResult(total_results=0, facets=[Facet(name='product'),
+                                                                             Facet(name='group_name'),
+                                                                             Facet(name='tag')]))
+
+    def test_fetch_facets_of_user_index(self) -> None:
+        with self.assertRaises(Exception):
+            self.es_proxy.fetch_facets(query_term='test', index=USER_INDEX)
+
+    def test_fetch_search_results_batch_returns_cursor_to_next_page(self) -> None:
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.msearch.return_value = {
+            'responses': [{'hits': {'total': 25, 'hits': [{'_id': f'test_key{i}',
+                                                           '_source': dict(vars(self.mock_result1), key=f'test_key{i}'),
+                                                           'sort': [1.0, 10, f'test_key{i}']}
+                                                          for i in range(10)]}}]
+        }
+
+        results = self.es_proxy.fetch_search_results_batch(requests=[
+            BatchSearchRequest(resource='table', query_term='test', page_index=1),
+        ])
+
+        # the sort values of the hits make the cursor, they have to be kept by the filter of the response
+        self.assertIn('responses.hits.hits.sort', mock_elasticsearch.msearch.call_args[1]['filter_path'].split(','))
+        self.assertEqual(len(results[0].result.results), 10)
+        self.assertEqual(decode_cursor(results[0].result.next_cursor), [1.0, 10, 'test_key9'])
+
+    def test_fetch_search_results_batch_filter_search(self) -> None:
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.msearch.return_value = {'responses': [{'hits': {'total': 0, 'hits': []}}]}
+        search_request = {
+            'type': 'AND',
+            'filters': {
+                'database': ['hive', 'bigquery'],
+            }
+        }
+
+        results = self.es_proxy.fetch_search_results_batch(requests=[
+            BatchSearchRequest(resource='table', query_term='test', index=TABLE_INDEX,
+                               search_request=search_request, page_index=2),
+        ])
+
+        body = mock_elasticsearch.msearch.call_args[1]['body']
+        filter_query = self.es_proxy.convert_query_json_to_query_dsl(search_request=search_request,
+                                                                     query_term='test',
+                                                                     index=TABLE_INDEX)
+        self.assertEqual(body[1]['query'], Q(self.es_proxy._get_filter_query(filter_query)).to_dict())
+        self.assertEqual((body[1]['from'], body[1]['size']), (20, 10))
+        self.assertEqual(results[0].result.total_results, 0)
+
+    def test_fetch_search_results_batch_without_search_to_run(self) -> None:
+        results = self.es_proxy.fetch_search_results_batch(requests=[
+            BatchSearchRequest(resource='table', query_term='', index=TABLE_INDEX),
+        ])
+
+        self.es_proxy.elasticsearch.msearch.assert_not_called()
+        self.assertEqual(results[0].result.total_results, 0)
+
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_with_preference(self, mock_execute: MagicMock) -> None:
+        mock_execute.return_value = MagicMock()
+
+        self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX, preference='user@example.com')
+        self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX, preference='user@example.com')
+        self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX)
+
+        preferences = [call[0][0]._params.get('preference') for call in mock_execute.call_args_list]
+        self.assertEqual(preferences[0], preferences[1])
+        self.assertTrue(preferences[0].startswith('session_'))
+        self.assertNotIn('user@example.com', preferences[0])
+        self.assertIsNone(preferences[2])
+
+    def test_search_template_with_preference(self) -> None:
+        self.app.config['ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'] = True
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.search_template.return_value = {'hits': {'total': 0, 'hits': []}}
+
+        self.es_proxy.fetch_table_search_results(query_term='test', index=TABLE_INDEX, preference='session')
+
+        self.assertEqual(mock_elasticsearch.search_template.call_args[1]['preference'],
+                         get_preference_params('session')['preference'])
+
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_with_filter_in_filter_context(self, mock_execute: MagicMock) -> None:
+        mock_execute.return_value = MagicMock()
+        search_request = {'type': 'AND', 'filters': {'database': ['hive'], 'cluster': ['gold']}}
+
+        self.es_proxy.fetch_search_results_with_filter(query_term='test', search_request=search_request,
+                                                       index=TABLE_INDEX)
+
+        bool_query = mock_execute.call_args[0][0].to_dict()['query']['function_score']['query']['bool']
+        self.assertEqual(bool_query['filter'], [{'terms': {'database.raw': ['hive']}},
+                                                {'terms': {'cluster.raw': ['gold']}}])
+        self.assertEqual(bool_query['must'], [{'query_string': {'query': self.es_proxy.parse_query_term(
+            'test', index=TABLE_INDEX)}}])
+
+    def test_filter_search_template_source(self) -> None:
+        source = self.es_proxy._get_search_template_source('table_filter')
+
+        self.assertIn('"query": {{#toJson}}query{{/toJson}}', source)
+        self.assertNotIn('__query__', source)
+
+    def test_search_template_source(self) -> None:
+        source = self.es_proxy._get_search_template_source('user')
+
+        self.assertIn('"query": {{#toJson}}query{{/toJson}}', source)
+        self.assertIn('"from": {{from}}', source)
+        self.assertIn('"size": {{size}}', source)
+        self.assertIn('"full_name.raw^30"', source)
+
+    def test_register_search_templates(self) -> None:
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.get_script.side_effect = NotFoundError(404, 'resource_not_found_exception', {})
+
+        template_ids = self.es_proxy.register_search_templates()
+        self.es_proxy.register_search_templates()
+
+        self.assertEqual(set(template_ids), {'table', 'user', 'dashboard', 'table_filter', 'dashboard_filter'})
+        self.assertTrue(template_ids['table'].startswith('amundsen_table_search_'))
+        self.assertEqual(mock_elasticsearch.put_script.call_count, 5)
+        put_kwargs = mock_elasticsearch.put_script.call_args_list[0][1]
+        self.assertEqual(put_kwargs['body']['script']['lang'], 'mustache')
+
+    def test_register_search_templates_keeps_stored_templates(self) -> None:
+        self.es_proxy.register_search_templates()
+
+        self.es_proxy.elasticsearch.put_script.assert_not_called()
+
+    def test_prepare_searches_registers_search_templates(self) -> None:
+        self.es_proxy.prepare_searches()
+        self.es_proxy.elasticsearch.get_script.assert_not_called()
+
+        self.app.config['ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'] = True
+        self.es_proxy.prepare_searches()
+
+        self.assertEqual(self.es_proxy.elasticsearch.get_script.call_count, 5)
+
+    def test_search_with_search_template(self) -> None:
+        self.app.config['ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'] = True
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.search_template.return_value = {
+            'hits': {'total': 1, 'hits': [{'_id': 'test_key', '_source': vars(self.mock_result1)}]}
+        }
+
+        resp = self.es_proxy.fetch_table_search_results(query_term='test', page_index=2, index=TABLE_INDEX)
+
+        call_kwargs = mock_elasticsearch.search_template.call_args[1]
+        self.assertEqual(call_kwargs['index'], TABLE_INDEX)
+        self.assertEqual(call_kwargs['body'], {'id': self.es_proxy.register_search_templates()['table'],
+                                               'params': {'query': 'test', 'from': 20, 'size': 10}})
+        self.assertEqual(resp.total_results, 1)
+        self.assertEqual(resp.results[0].key, 'test_key')
+
+    @patch('elasticsearch_dsl.Search.execute')
+    def test_search_with_cursor_does_not_use_search_template(self, mock_search: MagicMock) -> None:
+        self.app.config['ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'] = True
+        mock_search.return_value = MagicMock()
+
+        self.es_proxy.fetch_table_search_results(query_term='test', cursor=encode_cursor([1.0, 0, 'key']))
+
+        self.es_proxy.elasticsearch.search_template.assert_not_called()
+        mock_search.assert_called_once()
+
+    def test_fetch_search_results_batch_with_search_template(self) -> None:
+        self.app.config['ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'] = True
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.msearch_template.return_value = {'responses': [{'hits': {'total': 0}}]}
+
+        results = self.es_proxy.fetch_search_results_batch(requests=[
+            BatchSearchRequest(resource='dashboard', query_term='test', index='dashboard_search_index',
+                               search_request={'filters': {'product': ['mode']}}),
+        ])
+
+        body = mock_elasticsearch.msearch_template.call_args[1]['body']
+        self.assertEqual(body[0], {'index': 'dashboard_search_index'})
+        self.assertEqual(body[1]['id'], self.es_proxy.register_search_templates()['dashboard_filter'])
+        self.assertEqual(body[1]['params']['from'], 0)
+        mock_elasticsearch.msearch.assert_not_called()
+        self.assertEqual(results[0].result.total_results, 0)
+
+    def test_search_with_raw_hydration(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        source = dict(vars(self.mock_result1), tags=['match'], badges=['name'], column_descriptions=['ignored'])
+        mock_elasticsearch.search.return_value = {
+            'hits': {'total': 1, 'hits': [{'_id': 'test_key', '_source': source, 'sort': [1.0, 0, 'test_key']}]}
+        }
+
+        resp = self.es_proxy.fetch_table_search_results(query_term='test', index=TABLE_INDEX)
+
+        call_kwargs = mock_elasticsearch.search.call_args[1]
+        self.assertEqual(call_kwargs['index'], [TABLE_INDEX])
+        self.assertEqual(call_kwargs['body']['_source'], {'includes': get_source_fields(Table)})
+        self.assertEqual(call_kwargs['filter_path'], SEARCH_FILTER_PATH)
+        self.assertEqual(resp.total_results, 1)
+        self.assertDictEqual(vars(resp.results[0]),
+                             vars(Table(id='test_key',
+                                        name='test_table',
+                                        key='test_key',
+                                        description='test_description',
+                                        cluster='gold',
+                                        database='test_db',
+                                        schema='test_schema',
+                                        column_names=['test_col1', 'test_col2'],
+                                        tags=[self.mock_tag],
+                                        badges=[self.mock_badge],
+                                        last_updated_timestamp=1527283287,
+                                        programmatic_descriptions=[])))
+
+    def test_search_with_raw_hydration_skips_invalid_hits(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        self.es_proxy.elasticsearch.search.return_value = {
+            'hits': {'total': 2, 'hits': [{'_id': 'empty', '_source': {}},
+                                          {'_id': 'test@email.com', '_source': vars(self.mock_result4)}]}
+        }
+
+        resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX)
+
+        self.assertEqual(resp.total_results, 2)
+        self.assertEqual([user.id for user in resp.results], ['test@email.com'])
+        self.assertFalse(hasattr(resp.results[0], 'new_attr'))
+
+    def test_get_hydration_plan(self) -> None:
+        plan = dict(get_hydration_plan(Table))  # type: Dict[str, Any]
+
+        self.assertNotIn('id', plan)
+        self.assertIsNone(plan['name'])
+        self.assertEqual(plan['tags'](['match']), [self.mock_tag])
+        self.assertIs(get_hydration_plan(Table), get_hydration_plan(Table))
+
+    def test_get_total_results(self) -> None:
+        self.assertEqual(get_total_results(42, 10, 0), (42, None))
+        # the search didn't count its hits
+        self.assertEqual(get_total_results(-1, 10, 20), (30, 'gte'))
+        self.assertEqual(get_total_results({'value': 1000, 'relation': 'gte'}, 10, 0), (1000, 'gte'))
+        self.assertEqual(get_total_results({'value': 42, 'relation': 'eq'}, 10, 0), (42, None))
+
+    def test_search_with_track_total_hits(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        self.app.config['ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED'] = True
+        hits = [{'_id': f'user{i}', '_source': vars(self.mock_result4), 'sort': [1.0, i]} for i in range(10)]
+        self.es_proxy.elasticsearch.search.return_value = {'hits': {'total': -1, 'hits': hits}}
+
+        resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX, page_index=1,
+                                                       track_total_hits=False)
+
+        self.es_proxy.elasticsearch.search_template.assert_not_called()
+        self.assertFalse(self.es_proxy.elasticsearch.search.call_args[1]['body']['track_total_hits'])
+        self.assertEqual(resp.total_results, 20)
+        self.assertEqual(resp.total_relation, 'gte')
+        # the total can't tell whether the page is the last one
+        self.assertIsNotNone(resp.next_cursor)
+
+    def test_search_with_track_total_hits_limit(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        hits = [{'_id': f'user{i}', '_source': vars(self.mock_result4), 'sort': [1.0, i]} for i in range(10)]
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.search.return_value = {'hits': {'total': -1, 'hits': hits}}
+        mock_elasticsearch.count.return_value = {'count': 100, 'terminated_early': True}
+
+        resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX, page_index=1,
+                                                       track_total_hits=100)
+
+        # Elasticsearch 6.x rejects a number, the results get counted up to it with the count API instead
+        self.assertFalse(mock_elasticsearch.search.call_args[1]['body']['track_total_hits'])
+        count_kwargs = mock_elasticsearch.count.call_args[1]
+        self.assertEqual(count_kwargs['params']['terminate_after'], 100)
+        self.assertEqual(count_kwargs['body']['query'], mock_elasticsearch.search.call_args[1]['body']['query'])
+        self.assertEqual((resp.total_results, resp.total_relation), (100, 'gte'))
+        self.assertIsNotNone(resp.next_cursor)
+
+        mock_elasticsearch.count.return_value = {'count': 20}
+        resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX, page_index=1,
+                                                       track_total_hits=100)
+
+        self.assertEqual((resp.total_results, resp.total_relation), (20, None))
+        self.assertIsNone(resp.next_cursor)
+
+        # the total of a page that isn't full is the number of results up to the page
+        mock_elasticsearch.count.reset_mock()
+        mock_elasticsearch.search.return_value = {'hits': {'total': -1, 'hits': hits[:5]}}
+        resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX, page_index=1,
+                                                       track_total_hits=100)
+
+        mock_elasticsearch.count.assert_not_called()
+        self.assertEqual(resp.total_results, 15)
+
+    @patch('search_service.proxy.elasticsearch.TRACK_TOTAL_HITS_LIMIT_SUPPORTED', True)
+    def test_search_with_track_total_hits_limit_on_elasticsearch_7(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        mock_elasticsearch = self.es_proxy.elasticsearch
+        mock_elasticsearch.search.return_value = {'hits': {'total': {'value': 100, 'relation': 'gte'}, 'hits': []}}
+
+        resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX, track_total_hits=100)
+
+        self.assertEqual(mock_elasticsearch.search.call_args[1]['body']['track_total_hits'], 100)
+        mock_elasticsearch.count.assert_not_called()
+        self.assertEqual((resp.total_results, resp.total_relation), (100, 'gte'))
+
+    def test_fetch_count(self) -> None:
+        self.es_proxy.elasticsearch.count.return_value = {'count': 100, 'terminated_early': True}
+
+        resp = self.es_proxy.fetch_count(query_term='test', resource='table', index=TABLE_INDEX, max_count=100)
+
+        self.assertEqual(resp, SearchCountResult(total_results=100, total_relation='gte'))
+        kwargs = self.es_proxy.elasticsearch.count.call_args[1]
+        self.assertEqual(kwargs['params']['terminate_after'], 100)
+        self.assertEqual(kwargs['body']['query']['function_score']['query']['multi_match']['query'], 'test')
+
+    def test_fetch_count_without_query_term(self) -> None:
+        resp = self.es_proxy.fetch_count(query_term='', resource='table', index=TABLE_INDEX)
+
+        self.assertEqual(resp, SearchCountResult(total_results=0))
+        self.es_proxy.elasticsearch.count.assert_not_called()
+
+    @patch('elasticsearch_dsl.Search.execute', autospec=True)
+    def test_search_with_index_timeout(self, mock_execute: MagicMock) -> None:
+        mock_execute.return_value = MagicMock()
+        self.app.config['ELASTICSEARCH_SEARCH_TIMEOUT_SEC'] = 2.0
+        self.app.config['ELASTICSEARCH_INDEX_SEARCH_TIMEOUT_SEC'] = {USER_INDEX: 0.25}
+
+        self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX)
+        self.es_proxy.fetch_table_search_results(query_term='test', index=TABLE_INDEX)
+
+        searches = [call[0][0] for call in mock_execute.call_args_list]
+        self.assertEqual(searches[0].to_dict()['timeout'], '250ms')
+        self.assertEqual(searches[0]._params['request_timeout'], 0.75)
+        self.assertEqual(searches[1].to_dict()['timeout'], '2000ms')
+
+    def test_search_timed_out_in_shards_is_partial(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        self.app.config['ELASTICSEARCH_SEARCH_TIMEOUT_SEC'] = 1.0
+        self.es_proxy.elasticsearch.search.return_value = {
+            'timed_out': True,
+            'hits': {'total': 1, 'hits': [{'_id': 'test@email.com', '_source': vars(self.mock_result4)}]}
+        }
+
+        with patch('search_service.proxy.elasticsearch.incr_counter') as mock_incr_counter:
+            resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX)
+
+        self.assertTrue(resp.partial)
+        self.assertEqual([user.id for user in resp.results], ['test@email.com'])
+        mock_incr_counter.assert_called_once_with(prefix='search_service.proxy.elasticsearch',
+                                                  name=f'timeout.{USER_INDEX}.shard')
+
+    def test_search_timed_out_in_client_is_partial(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        self.app.config['ELASTICSEARCH_SEARCH_TIMEOUT_SEC'] = 1.0
+        self.es_proxy.elasticsearch.search.side_effect = ConnectionTimeout('TIMEOUT', 'timed out', None)
+
+        resp = self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX)
+
+        self.assertTrue(resp.partial)
+        self.assertEqual(resp.results, [])
+
+    def test_search_without_timeout_fails_on_client_timeout(self) -> None:
+        self.app.config['ELASTICSEARCH_RAW_HYDRATION_ENABLED'] = True
+        self.es_proxy.elasticsearch.search.side_effect = ConnectionTimeout('TIMEOUT', 'timed out', None)
+
+        with self.assertRaises(ConnectionTimeout):
+            self.es_proxy.fetch_user_search_results(query_term='test', index=USER_INDEX)
@@ -0,0 +1,173 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from queue import Empty
+from socketserver import ThreadingMixIn
+from threading import Thread, Timer
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import urllib3
+from elasticsearch import Elasticsearch
+
+from search_service import create_app
+from search_service.proxy.elasticsearch import ElasticsearchProxy
+from search_service.proxy.elasticsearch_connection import (
+    MeteredConnectionQueue, MeteredUrllib3HttpConnection, get_async_client_options, get_client_options, get_hosts,
+    open_pool_connections,
+)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+class TestElasticsearchConnection(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def set_connection_config(self) -> None:
+        self.app.config.update(ELASTICSEARCH_POOL_MAXSIZE=25,
+                               ELASTICSEARCH_POOL_BLOCK=True,
+                               ELASTICSEARCH_READ_TIMEOUT_SEC=2.5,
+                               ELASTICSEARCH_MAX_RETRIES=1,
+                               ELASTICSEARCH_RETRY_ON_TIMEOUT=True,
+                               ELASTICSEARCH_HTTP_COMPRESS=True,
+                               ELASTICSEARCH_SNIFF_ON_CONNECTION_FAIL=True,
+                               ELASTICSEARCH_SNIFFER_TIMEOUT_SEC=60)
+
+    def test_should_split_hosts(self) -> None:
+        self.assertEqual(get_hosts('http://host'), 'http://host')
+        self.assertEqual(get_hosts('http://host1:9200, http://host2:9200'), ['http://host1:9200', 'http://host2:9200'])
+        self.assertIsNone(get_hosts(None))
+
+    def test_should_keep_library_defaults(self) -> None:
+        self.assertEqual(get_client_options(self.app.config), {})
+        self.assertEqual(get_async_client_options(self.app.config), {})
+
+    def test_should_get_client_options(self) -> None:
+        self.set_connection_config()
+
+        options = get_client_options(self.app.config)
+
+        timeout = options.pop('timeout')
+        self.assertEqual((timeout.connect_timeout, timeout.read_timeout), (10, 2.5))
+        self.assertEqual(options, dict(maxsize=25,
+                                       pool_block=True,
+                                       connection_class=MeteredUrllib3HttpConnection,
+                                       max_retries=1,
+                                       retry_on_timeout=True,
+                                       http_compress=True,
+                                       sniff_on_connection_fail=True,
+                                       sniffer_timeout=60))
+        self.assertEqual(get_async_client_options(self.app.config), dict(maxsize=25,
+                                                                         timeout=2.5,
+                                                                         max_retries=1,
+                                                                         retry_on_timeout=True,
+                                                                         sniff_on_connection_fail=True,
+                                                                         sniffer_timeout=60))
+
+    def test_should_meter_connections_with_stats(self) -> None:
+        self.app.config['STATS'] = True
+
+        self.assertEqual(get_client_options(self.app.config),
+                         dict(connection_class=MeteredUrllib3HttpConnection))
+
+    def test_should_set_up_connections_of_every_host(self) -> None:
+        self.set_connection_config()
+
+        proxy = ElasticsearchProxy(host='http://host1:9200,http://host2:9200')
+
+        transport = proxy.elasticsearch.transport
+        self.assertCountEqual([connection.host for connection in transport.connection_pool.connections],
+                              ['http://host1:9200', 'http://host2:9200'])
+        self.assertEqual((transport.max_retries, transport.retry_on_timeout), (1, True))
+        for connection in transport.connection_pool.connections:
+            self.assertIsInstance(connection, MeteredUrllib3HttpConnection)
+            self.assertTrue(connection.http_compress)
+            self.assertTrue(connection.pool.block)
+            self.assertEqual(connection.pool.pool.qsize(), 25)
+            self.assertIsInstance(connection.pool.timeout, urllib3.Timeout)
+
+    @patch('search_service.proxy.elasticsearch.Elasticsearch', autospec=True)
+    def test_should_pass_only_configured_options(self, elasticsearch_mock: MagicMock) -> None:
+        self.app.config['ELASTICSEARCH_MAX_RETRIES'] = 5
+
+        ElasticsearchProxy(host='http://unit-test-host', user='')
+
+        elasticsearch_mock.assert_called_once_with('http://unit-test-host', http_auth=None, max_retries=5)
+
+    def test_should_publish_pool_metrics(self) -> None:
+        queue = MeteredConnectionQueue(2)
+        queue.put(None)
+
+        with patch('search_service.proxy.elasticsearch_connection.set_gauge') as set_gauge, \
+                patch('search_service.proxy.elasticsearch_connection.incr_counter') as incr_counter:
+            queue.get(block=False)
+            self.assertEqual(set_gauge.call_args[1], dict(prefix='search_service.proxy.elasticsearch_connection',
+                                                          name='pool.in_use', value=2))
+            incr_counter.assert_not_called()
+
+            with self.assertRaises(Empty):
+                queue.get(block=False)
+            incr_counter.assert_called_once_with(prefix='search_service.proxy.elasticsearch_connection',
+                                                 name='pool.exhausted')
+
+    def test_should_publish_pool_wait(self) -> None:
+        queue = MeteredConnectionQueue(1)
+        Timer(0.05, queue.put, [None]).start()
+
+        with patch('search_service.proxy.elasticsearch_connection.record_timing') as record_timing:
+            queue.get(block=True)
+
+        self.assertEqual(record_timing.call_args[1]['name'], 'pool.wait')
+        self.assertGreaterEqual(record_timing.call_args[1]['ms'], 40)
+
+    def test_should_be_default_client_without_config(self) -> None:
+        self.app_context.pop()
+        try:
+            proxy = ElasticsearchProxy(host='http://host')
+        finally:
+            self.app_context.push()
+
+        self.assertIsInstance(proxy.elasticsearch, Elasticsearch)
+        self.assertNotIsInstance(proxy.elasticsearch.transport.connection_pool.connections[0],
+                                 MeteredUrllib3HttpConnection)
+
+    def test_should_open_pool_connections_to_every_node(self) -> None:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            host = f'http://127.0.0.1:{server.server_address[1]}'
+            client = Elasticsearch([host, host], maxsize=3)
+
+            opened = open_pool_connections(client, 5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(opened, 6)
+        for connection in client.transport.connection_pool.connections:
+            # every connection was opened by its own request, and went back to the pool
+            self.assertEqual(connection.pool.num_connections, 3)
+            self.assertEqual(len([conn for conn in connection.pool.pool.queue if conn is not None]), 3)
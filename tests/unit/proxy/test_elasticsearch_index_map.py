@@ -0,0 +1,44 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import unittest
+
+from amundsen_common.models.index_map import TABLE_INDEX_MAP, USER_INDEX_MAP
+
+from search_service.api.dashboard import DASHBOARD_INDEX
+from search_service.api.table import TABLE_INDEX
+from search_service.api.user import USER_INDEX
+from search_service.proxy.elasticsearch_index_map import (
+    INDEX_MAPS, NGRAM_ANALYZER, SEARCH_FIELDS, add_ngram_subfields,
+)
+
+
+class TestElasticsearchIndexMap(unittest.TestCase):
+
+    def test_should_add_ngram_subfields(self) -> None:
+        body = json.loads(add_ngram_subfields(TABLE_INDEX_MAP, ['name', 'description']))
+        base = json.loads(TABLE_INDEX_MAP)
+
+        properties = body['mappings']['table']['properties']
+        self.assertEqual(properties['name']['fields'], {'raw': {'type': 'keyword'},
+                                                        'ngram': {'type': 'text', 'analyzer': NGRAM_ANALYZER}})
+        self.assertEqual(properties['description']['fields'], {'ngram': {'type': 'text', 'analyzer': NGRAM_ANALYZER}})
+        self.assertEqual(properties['schema'], base['mappings']['table']['properties']['schema'])
+        self.assertEqual(body['settings']['analysis']['normalizer'], base['settings']['analysis']['normalizer'])
+        self.assertEqual(body['settings']['analysis']['analyzer'][NGRAM_ANALYZER]['tokenizer'], 'trigram_tokenizer')
+        self.assertEqual(body['settings']['analysis']['tokenizer']['trigram_tokenizer']['type'], 'ngram')
+
+    def test_should_map_missing_fields_dynamically(self) -> None:
+        properties = json.loads(INDEX_MAPS[DASHBOARD_INDEX])['mappings']['dashboard']['properties']
+
+        self.assertEqual(properties['product']['type'], 'text')
+        self.assertEqual(properties['product']['fields']['keyword']['type'], 'keyword')
+        self.assertIn('ngram', properties['product']['fields'])
+
+    def test_should_add_ngram_subfields_to_searched_fields(self) -> None:
+        for index, doc_type in ((TABLE_INDEX, 'table'), (DASHBOARD_INDEX, 'dashboard')):
+            properties = json.loads(INDEX_MAPS[index])['mappings'][doc_type]['properties']
+            for field in SEARCH_FIELDS[index]:
+                self.assertIn('ngram', properties[field]['fields'])
+        self.assertEqual(INDEX_MAPS[USER_INDEX], USER_INDEX_MAP)
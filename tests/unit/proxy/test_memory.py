@@ -0,0 +1,32 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Any, Dict  # noqa: F401
+
+from search_service import config
+from search_service.api.table import TABLE_INDEX
+from search_service.proxy.memory import InMemoryProxy
+from tests.unit.proxy import fixtures
+
+
+class TestInMemoryProxy(fixtures.LocalProxyTestCase):
+
+    def create_proxy(self) -> InMemoryProxy:
+        return InMemoryProxy(page_size=2)
+
+    def get_proxy_config(self) -> Dict[str, Any]:
+        return {config.PROXY_CLIENT: config.PROXY_CLIENTS['MEMORY']}
+
+    def test_index_is_compacted_once_most_of_its_slots_are_deleted(self) -> None:
+        # the replaced document takes a new slot, the deletes then leave 2 live slots out of 5
+        self.proxy.update_document(index=TABLE_INDEX, data=[
+            fixtures.make_table('events', schema='raw', database='presto', description='orders shipped'),
+        ])
+        self.proxy.delete_document(index=TABLE_INDEX, data=['hive://gold.core/orders', 'presto://gold.raw/events'])
+
+        self.assertEqual(len(self.proxy._indices[TABLE_INDEX].ids), 2)
+
+    def test_searches_of_unknown_indices_keep_no_index(self) -> None:
+        self.search_unknown_indices()
+
+        self.assertEqual(list(self.proxy._indices), [TABLE_INDEX])
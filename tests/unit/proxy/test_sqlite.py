@@ -0,0 +1,90 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import tempfile
+from threading import Thread
+from typing import (  # noqa: F401
+    Any, Dict, List,
+)
+
+from mock import patch
+
+from search_service import config
+from search_service.api.table import TABLE_INDEX
+from search_service.models.user import User
+from search_service.proxy.sqlite import SqliteProxy
+from tests.unit.proxy import fixtures
+from tests.unit.proxy.fixtures import make_table
+
+
+class TestSqliteProxy(fixtures.LocalProxyTestCase):
+
+    def create_proxy(self) -> SqliteProxy:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'search.db')
+        return SqliteProxy(host=self.path, page_size=2)
+
+    def get_proxy_config(self) -> Dict[str, Any]:
+        return {config.PROXY_CLIENT: config.PROXY_CLIENTS['SQLITE'], config.PROXY_ENDPOINT: self.path}
+
+    def test_deletes_remove_the_values_of_the_documents(self) -> None:
+        self.proxy.delete_document(index=TABLE_INDEX, data=['hive://gold.core/orders', 'presto://gold.raw/events'])
+
+        # the values of the keyword fields of the deleted documents are deleted along with them
+        self.assertEqual(self.proxy._connect().execute(
+            f'SELECT count(DISTINCT document) FROM "{TABLE_INDEX}_values"').fetchone()[0], 2)
+
+    def test_searches_of_unknown_indices_create_no_table(self) -> None:
+        def get_schema() -> List[Any]:
+            return self.proxy._connect().execute('SELECT type, name FROM sqlite_master ORDER BY name').fetchall()
+        schema = get_schema()
+
+        self.search_unknown_indices()
+
+        self.assertEqual(get_schema(), schema)
+
+    def test_deletes_keep_the_resource_of_an_index_unknown(self) -> None:
+        # the resource of an index outside of the default ones comes from its first documents, deletes don't tell it
+        self.proxy.delete_document(index='people', data=['jdoe@example.com'])
+        self.proxy.create_document(index='people', data=[
+            User(id='jdoe@example.com', email='jdoe@example.com', first_name='Jane', last_name='Doe',
+                 full_name='Jane Doe'),
+        ])
+
+        result = self.proxy.fetch_user_search_results(query_term='jane', index='people')
+
+        self.assertEqual([user.email for user in result.results], ['jdoe@example.com'])
+
+    def test_writes_batches_of_documents_in_transactions(self) -> None:
+        with patch('search_service.proxy.sqlite.WRITE_BATCH_SIZE', 2):
+            self.proxy.create_document(index=TABLE_INDEX, data=[make_table(f'payments_{i}') for i in range(5)])
+            with self.assertRaises(AttributeError):
+                # the first batch is committed, the documents of the failing batch are rolled back
+                self.proxy.create_document(index=TABLE_INDEX, data=[
+                    make_table('refunds'), make_table('returns'), make_table('credits'), None])
+
+        self.assertEqual(self.search('payments').total_results, 5)
+        self.assertEqual(self.search('refunds returns credits', page_index=-1).total_results, 2)
+        self.assertEqual(self.proxy._connect().execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+    def test_workers_read_the_database_concurrently(self) -> None:
+        # another worker, with its own connections to the same database
+        worker = SqliteProxy(host=self.path, page_size=2)
+        results = []  # type: List[Any]
+
+        def search() -> None:
+            with self.app.app_context():
+                results.append(worker.fetch_table_search_results(query_term='orders', index=TABLE_INDEX))
+
+        threads = [Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual([result.total_results for result in results], [3] * 4)
+        self.proxy.delete_document(index=TABLE_INDEX, data=['hive://gold.core/orders'])
+        self.assertEqual(worker.fetch_count(query_term='orders', resource='table', index=TABLE_INDEX).total_results,
+                         2)
@@ -0,0 +1,116 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+from threading import Event
+from typing import Any
+
+from mock import MagicMock, patch
+
+from search_service import create_app
+from search_service.models.batch import BatchSearchResult
+from search_service.proxy.base import BaseProxy
+from search_service.proxy.cache import CachingProxy
+from search_service.proxy.circuit_breaker import CircuitBreakerProxy
+from search_service.proxy.warm_up import (
+    is_proxy_client_ready, prepare_proxy_client_searches, warm_up_proxy_client,
+)
+
+
+class TestWarmUp(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app.config.update(PROXY_CLIENT_WARMUP_CONNECTIONS=2, PROXY_CLIENT_WARMUP_QUERIES=['test'])
+        self.client = self.app.test_client()
+        self.mock_proxy = MagicMock()
+        self.mock_proxy.fetch_search_results_batch.side_effect = \
+            lambda requests: [BatchSearchResult(result=None) for _ in requests]
+        patcher = patch('search_service.proxy.warm_up.get_proxy_client', return_value=self.mock_proxy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_opens_connections_and_searches_every_resource(self) -> None:
+        warm_up_proxy_client(self.app).join(5)
+
+        self.mock_proxy.prepare_searches.assert_called_once_with()
+        self.mock_proxy.open_connections.assert_called_once_with(count=2)
+        requests = self.mock_proxy.fetch_search_results_batch.call_args[1]['requests']
+        self.assertEqual([(request.resource, request.query_term, request.index) for request in requests],
+                         [('table', 'test', 'table_search_index'),
+                          ('user', 'test', 'user_search_index'),
+                          ('dashboard', 'test', 'dashboard_search_index')])
+        self.assertTrue(is_proxy_client_ready())
+
+    def test_healthcheck_is_not_ready_until_warmed_up(self) -> None:
+        started, release = Event(), Event()
+
+        def open_connections(count: int) -> int:
+            started.set()
+            release.wait(5)
+            return count
+
+        self.mock_proxy.open_connections.side_effect = open_connections
+        thread = warm_up_proxy_client(self.app)
+        started.wait(5)
+        try:
+            self.assertFalse(is_proxy_client_ready())
+            self.assertEqual(self.client.get('/healthcheck').status_code, 503)
+        finally:
+            release.set()
+            thread.join(5)
+
+        self.assertEqual(self.client.get('/healthcheck').status_code, 200)
+
+    def test_is_ready_after_failed_warm_up(self) -> None:
+        self.mock_proxy.open_connections.side_effect = ConnectionError('connection refused')
+
+        warm_up_proxy_client(self.app).join(5)
+
+        self.mock_proxy.fetch_search_results_batch.assert_not_called()
+        self.assertTrue(is_proxy_client_ready())
+        self.assertEqual(self.client.get('/healthcheck').status_code, 200)
+
+    def test_skips_searches_without_queries(self) -> None:
+        self.app.config.update(PROXY_CLIENT_WARMUP_CONNECTIONS=0, PROXY_CLIENT_WARMUP_QUERIES=[])
+
+        warm_up_proxy_client(self.app).join(5)
+
+        self.mock_proxy.open_connections.assert_not_called()
+        self.mock_proxy.fetch_search_results_batch.assert_not_called()
+
+    @patch('search_service.warm_up_proxy_client')
+    def test_create_app_warms_up_when_enabled(self, warm_up: MagicMock) -> None:
+        create_app(config_module_class='search_service.config.LocalConfig')
+        warm_up.assert_not_called()
+
+        with patch('search_service.config.LocalConfig.PROXY_CLIENT_WARMUP_ENABLED', True):
+            app = create_app(config_module_class='search_service.config.LocalConfig')
+
+        warm_up.assert_called_once_with(app)
+
+    @patch('search_service.prepare_proxy_client_searches')
+    def test_create_app_prepares_searches_without_warm_up(self, prepare_searches: MagicMock) -> None:
+        with patch('search_service.config.LocalConfig.ELASTICSEARCH_SEARCH_TEMPLATES_ENABLED', True):
+            app = create_app(config_module_class='search_service.config.LocalConfig')
+
+        prepare_searches.assert_called_once_with(app)
+
+    @patch('search_service.proxy.warm_up.LOGGER')
+    def test_prepare_searches_logs_failure(self, logger: MagicMock) -> None:
+        self.mock_proxy.prepare_searches.side_effect = ConnectionError('connection refused')
+
+        prepare_proxy_client_searches(self.app)
+
+        logger.exception.assert_called_once()
+
+    def test_decorators_open_connections_of_the_proxy(self) -> None:
+        proxy: Any = MagicMock(spec=BaseProxy)
+        proxy.open_connections.return_value = 4
+
+        decorated = CachingProxy(proxy=CircuitBreakerProxy(proxy=proxy), max_size=0)
+
+        self.assertEqual(decorated.open_connections(count=2), 4)
+        proxy.open_connections.assert_called_once_with(count=2)
+        decorated.prepare_searches()
+        proxy.prepare_searches.assert_called_once_with()
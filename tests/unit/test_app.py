@@ -1,6 +1,9 @@
 # Copyright Contributors to the Amundsen project.
 # SPDX-License-Identifier: Apache-2.0
 
+import json
+import subprocess
+import sys
 import unittest
 
 from flask import current_app
@@ -24,3 +27,21 @@ class AppTest(unittest.TestCase):
 
     def test_app_exists(self) -> None:
         self.assertFalse(current_app is None)
+
+
+class AppImportsTest(unittest.TestCase):
+    """
+    Test the service imports the optional and backend-specific modules only when configured
+    """
+
+    def test_create_app_defers_optional_modules(self) -> None:
+        modules = ['flasgger', 'flask_cors', 'jsonschema', 'atlasclient', 'elasticsearch',
+                   'search_service.proxy.elasticsearch']
+        script = ('import json, sys\n'
+                  'from search_service import create_app\n'
+                  'create_app(config_module_class="search_service.config.Config")\n'
+                  f'print(json.dumps([m for m in {modules!r} if m in sys.modules]))')
+
+        output = subprocess.run([sys.executable, '-c', script], check=True, stdout=subprocess.PIPE).stdout
+
+        self.assertEqual(json.loads(output.decode().strip().splitlines()[-1]), [])
@@ -0,0 +1,126 @@
+# Copyright Contributors to the Amundsen project.
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import json
+import unittest
+from typing import (  # noqa: F401
+    Any, Dict, List, Optional, Tuple,
+)
+
+from mock import patch
+
+from search_service import create_app
+from search_service.proxy.async_elasticsearch import AsyncElasticsearchProxy
+from search_service.proxy.elasticsearch import ElasticsearchProxy
+from search_service.search_asgi import SearchASGIApplication
+from tests.unit.proxy.fixtures import StubAsyncElasticsearch, get_stub_client
+
+SEARCH_REQUEST = {'type': 'AND', 'filters': {'database': ['hive']}}
+
+# method, path, query string, JSON body
+REQUESTS = [
+    ('GET', '/search', 'query_term=test', None),
+    ('GET', '/search', 'query_term=test&page_index=1', None),
+    ('GET', '/search', '', None),
+    ('GET', '/search', 'query_term=test&cursor=!', None),
+    ('GET', '/search_user', 'query_term=test', None),
+    ('GET', '/search_dashboard', 'query_term=test', None),
+    ('POST', '/search_table', '', {'query_term': 'test', 'search_request': SEARCH_REQUEST}),
+    ('POST', '/search_table', '', {'query_term': 'test'}),
+    ('POST', '/search_dashboard_filter', '', {'query_term': 'test', 'search_request': SEARCH_REQUEST}),
+    ('POST', '/search_batch', '', {'requests': [{'resource': 'table', 'query_term': 'test'},
+                                                {'resource': 'user', 'query_term': 'test'}]}),
+    ('POST', '/search_batch', '', {'requests': [{'resource': 'column', 'query_term': 'test'}]}),
+    ('GET', '/search_all', 'query_term=test', None),
+]  # type: List[Tuple[str, str, str, Optional[Dict[str, Any]]]]
+
+
+class TestSearchASGIApplication(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='search_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.loop = asyncio.new_event_loop()
+
+        self.proxy_client = patch('search_service.proxy._proxy_client', ElasticsearchProxy(client=get_stub_client()))
+        self.proxy_client.start()
+        self.async_client = StubAsyncElasticsearch()
+        self.asgi = SearchASGIApplication(self.app, proxy=AsyncElasticsearchProxy(
+            client=self.async_client, proxy=ElasticsearchProxy(client=get_stub_client())))
+
+    def tearDown(self) -> None:
+        self.proxy_client.stop()
+        self.asgi.executor.shutdown()
+        self.loop.close()
+        self.app_context.pop()
+
+    def asgi_request(self, method: str, path: str, query_string: str,
+                     json_body: Optional[Dict[str, Any]]) -> Tuple[int, Dict[str, str], bytes]:
+        body = json.dumps(json_body).encode('utf-8') if json_body is not None else b''
+        scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': query_string.encode('latin-1'),
+            'headers': [(b'content-type', b'application/json')] if json_body is not None else [],
+            'scheme': 'http',
+            'server': ('localhost', 5001),
+        }
+        messages = []  # type: List[Dict[str, Any]]
+
+        async def receive() -> Dict[str, Any]:
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            messages.append(message)
+
+        self.loop.run_until_complete(self.asgi(scope, receive, send))
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in messages[0]['headers']}
+        return messages[0]['status'], headers, messages[1]['body']
+
+    def test_should_answer_like_flask_app(self) -> None:
+        client = self.app.test_client()
+        for method, path, query_string, json_body in REQUESTS:
+            with self.subTest(method=method, path=path, query_string=query_string, json_body=json_body):
+                expected = client.open(path, method=method, query_string=query_string, json=json_body)
+
+                status, headers, body = self.asgi_request(method, path, query_string, json_body)
+
+                self.assertEqual(status, expected.status_code)
+                self.assertEqual(headers['content-type'], 'application/json')
+                self.assertEqual(json.loads(body), expected.json)
+
+    def test_should_await_searches_on_async_proxy(self) -> None:
+        self.asgi_request('GET', '/search_all', 'query_term=test', None)
+
+        self.assertEqual([request['index'] for request in self.async_client.requests],
+                         ['table_search_index', 'user_search_index', 'dashboard_search_index'])
+
+    def test_should_serve_other_routes_with_flask_app(self) -> None:
+        status, _, body = self.asgi_request('GET', '/healthcheck', '', None)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'')
+        self.assertEqual(self.async_client.requests, [])
+
+    def test_should_fail_at_creation_without_async_client(self) -> None:
+        # neither elasticsearch-async nor an elasticsearch client shipping its own AsyncElasticsearch
+        with patch.dict('sys.modules', {'elasticsearch_async': None}), \
+                self.assertRaisesRegex(ImportError, r'amundsen-search\[asgi\]'):
+            SearchASGIApplication(self.app)
+
+        self.app.config['ASYNC_PROXY_CLIENT'] = None
+        with patch.dict('sys.modules', {'elasticsearch_async': None}):
+            self.assertIsNone(SearchASGIApplication(self.app)._proxy_class)
+
+    def test_should_serve_every_route_with_flask_app_without_async_proxy(self) -> None:
+        self.app.config['ASYNC_PROXY_CLIENT'] = None
+        self.asgi = SearchASGIApplication(self.app)
+
+        status, _, body = self.asgi_request('GET', '/search', 'query_term=test', None)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['total_results'], 1)
+        self.assertEqual(self.async_client.requests, [])
@@ -1,10 +1,16 @@
 # Copyright Contributors to the Amundsen project.
 # SPDX-License-Identifier: Apache-2.0
 
+import json
+import os
 import unittest
 from typing import Any, Dict
 
-from search_service import create_app
+from mock import patch
+
+from search_service import ROOT_DIR, create_app
+from search_service.api.swagger import COMPILED_SPEC_PATH, compile_spec
+from search_service.config import LocalConfig
 
 
 class TestSwagger(unittest.TestCase):
@@ -61,6 +67,28 @@ class TestSwagger(unittest.TestCase):
             if endpoint not in paths_excluded_from_swagger and endpoint not in paths_in_swagger:
                 self.fail(f'The following endpoint is not in swagger: {endpoint}')
 
+    def test_compiled_spec_matches_flasgger(self) -> None:
+        with open(os.path.join(ROOT_DIR, COMPILED_SPEC_PATH)) as spec_file:
+            compiled_spec = json.load(spec_file)
+
+        self.assertEqual(compiled_spec, compile_spec(self.app),
+                         'The compiled spec is outdated, compile it again with `make swagger_spec`')
+
+    @patch.object(LocalConfig, 'SWAGGER_SPEC_PATH', COMPILED_SPEC_PATH)
+    def test_should_serve_compiled_spec_without_yaml(self) -> None:
+        with patch('flasgger.utils.load_from_file') as load_from_file, \
+                patch('flasgger.base.Swagger.load_swagger_file') as load_swagger_file:
+            app = create_app(config_module_class='search_service.config.LocalConfig')
+            client = app.test_client()
+
+            healthcheck_response = client.get('/healthcheck')
+            spec_response = client.get('/apispec_1.json')
+
+        self.assertEqual(healthcheck_response.status_code, 200)
+        self.assertEqual(spec_response.json, compile_spec(self.app))
+        load_from_file.assert_not_called()
+        load_swagger_file.assert_not_called()
+
     @staticmethod
     def find(key: str, json_response: Dict[str, Any]) -> Any:
         for json_key, json_value in json_response.items():